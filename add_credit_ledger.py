@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the credit_ledger table.
+
+Every credit-changing write appends a row (delta, running balance, source and
+the id of the session, bonus or completion behind it), and user_stats.total_credits
+holds the latest running balance (see GameStorage.record_credits). Rows can't be
+updated or deleted unless the transaction sets gamercred.ledger_maintenance to 'on'.
+
+The first run backfills the ledger from gaming_sessions, bonuses and
+game_completions in time order and sets every balance to its ledger total,
+first creating the user_stats row of any user who has history but no row.
+It is safe to re-run: the backfill is skipped once the ledger has rows.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def create_table():
+    """Create the credit_ledger table, its index and the append-only trigger"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        print("Creating credit_ledger table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS credit_ledger (
+                id BIGSERIAL PRIMARY KEY,
+                user_id BIGINT NOT NULL REFERENCES user_stats(user_id),
+                delta FLOAT NOT NULL,
+                balance FLOAT NOT NULL,
+                source VARCHAR NOT NULL,
+                reference_id INTEGER,
+                created_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
+            )
+        """)
+
+        # A user's history, and their balance at any moment, is one range scan of this index
+        print("Creating ix_credit_ledger_user_created index...")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_credit_ledger_user_created
+            ON credit_ledger (user_id, created_at, id)
+        """)
+
+        print("Creating append-only trigger...")
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION credit_ledger_append_only() RETURNS trigger AS $$
+            BEGIN
+                IF current_setting('gamercred.ledger_maintenance', true) = 'on' THEN
+                    IF TG_OP = 'DELETE' THEN
+                        RETURN OLD;
+                    END IF;
+                    RETURN NEW;
+                END IF;
+                RAISE EXCEPTION 'credit_ledger is append-only';
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS credit_ledger_append_only ON credit_ledger")
+        cursor.execute("""
+            CREATE TRIGGER credit_ledger_append_only
+            BEFORE UPDATE OR DELETE ON credit_ledger
+            FOR EACH ROW EXECUTE FUNCTION credit_ledger_append_only()
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS credit_ledger_no_truncate ON credit_ledger")
+        cursor.execute("""
+            CREATE TRIGGER credit_ledger_no_truncate
+            BEFORE TRUNCATE ON credit_ledger
+            FOR EACH STATEMENT EXECUTE FUNCTION credit_ledger_append_only()
+        """)
+
+        # Commit changes
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Successfully created credit_ledger table")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating table: {str(e)}")
+        return False
+
+def backfill_ledger():
+    """Write the existing session, bonus and completion history into an empty ledger"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    conn = psycopg2.connect(database_url)
+    try:
+        cursor = conn.cursor()
+
+        # Writers block until the backfill commits, so no entry lands between the history and the balances
+        cursor.execute("LOCK TABLE user_stats, credit_ledger IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM credit_ledger)")
+        if cursor.fetchone()[0]:
+            print("Ledger already has entries, skipping the backfill")
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            return True
+
+        # Every ledger entry needs its user's user_stats row (as GameStorage.ensure_user_stats creates them)
+        cursor.execute("""
+            INSERT INTO user_stats (user_id, total_credits)
+            SELECT user_id, 0 FROM gaming_sessions
+            UNION
+            SELECT user_id, 0 FROM bonuses
+            UNION
+            SELECT user_id, 0 FROM game_completions
+            ON CONFLICT (user_id) DO NOTHING
+        """)
+        print(f"   - {cursor.rowcount} missing user_stats rows created")
+
+        print("Backfilling credit_ledger from sessions, bonuses and completions...")
+        cursor.execute("""
+            INSERT INTO credit_ledger (user_id, delta, balance, source, reference_id, created_at)
+            SELECT user_id, delta,
+                   SUM(delta) OVER (PARTITION BY user_id ORDER BY created_at, source, reference_id
+                                    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW),
+                   source, reference_id, created_at
+            FROM (
+                SELECT user_id, credits_earned AS delta, 'session' AS source, id AS reference_id, timestamp AS created_at
+                FROM gaming_sessions
+                UNION ALL
+                SELECT user_id, credits, 'bonus', id, timestamp
+                FROM bonuses
+                UNION ALL
+                SELECT user_id, COALESCE(credits_awarded, 0), 'completion', id, COALESCE(completed_at, LOCALTIMESTAMP)
+                FROM game_completions
+            ) history
+            ORDER BY user_id, created_at, source, reference_id
+        """)
+        print(f"   - {cursor.rowcount} entries written")
+
+        # The ledger is the source of truth: every balance becomes its latest running balance
+        cursor.execute("""
+            UPDATE user_stats us
+            SET total_credits = COALESCE(latest.balance, 0)
+            FROM user_stats u
+            LEFT JOIN LATERAL (
+                SELECT balance FROM credit_ledger
+                WHERE user_id = u.user_id
+                ORDER BY id DESC
+                LIMIT 1
+            ) latest ON true
+            WHERE us.user_id = u.user_id
+              AND abs(COALESCE(us.total_credits, 0) - COALESCE(latest.balance, 0)) > 0.001
+        """)
+        print(f"   - {cursor.rowcount} balances corrected to their ledger total")
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Credit ledger backfilled")
+        return True
+
+    except Exception as e:
+        # Nothing is written unless the whole backfill succeeds; let the cause reach the operator
+        print(f"❌ Error backfilling ledger: {str(e)}")
+        conn.rollback()
+        conn.close()
+        raise
+
+def verify_table():
+    """Check that every balance equals its user's latest ledger balance"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COUNT(*) FROM credit_ledger")
+        print(f"✅ Table 'credit_ledger' exists with {cursor.fetchone()[0]} rows")
+
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM user_stats us
+            LEFT JOIN LATERAL (
+                SELECT balance FROM credit_ledger
+                WHERE user_id = us.user_id
+                ORDER BY id DESC
+                LIMIT 1
+            ) latest ON true
+            WHERE abs(COALESCE(us.total_credits, 0) - COALESCE(latest.balance, 0)) > 0.001
+        """)
+        mismatched = cursor.fetchone()[0]
+
+        cursor.close()
+        conn.close()
+
+        if mismatched:
+            print(f"❌ {mismatched} balances don't match the ledger")
+            return False
+        print("✅ Every balance matches the ledger")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying table: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting credit ledger migration...")
+
+    if create_table() and backfill_ledger():
+        if not verify_table():
+            sys.exit(1)
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
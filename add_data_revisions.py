@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the data_revisions table and the triggers that keep
+it current. Read APIs derive ETags from it (see GameStorage.get_data_revisions)
+and answer If-None-Match with 304 without running their queries.
+
+Every committed transaction that inserts, updates or deletes rows of a
+tracked table moves that table's revision to a new value from
+data_revision_seq. The bump runs in a deferred trigger, at commit, and
+bumps all tables the transaction touched in name order. Concurrent writers
+therefore queue on the counter rows briefly instead of deadlocking.
+
+It is safe to re-run; run it again after adding a table to TRACKED_TABLES.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Tables whose writes change what the cached read APIs return
+TRACKED_TABLES = [
+    'games',
+    'gaming_sessions',
+    'user_stats',
+    'leaderboard_rollups',
+    'bonuses',
+    'leaderboard_history',
+    'leaderboard_periods',
+]
+
+def create_table():
+    """Create the data_revisions table, its sequence and the trigger functions"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        print("Creating data_revisions table...")
+        cursor.execute("CREATE SEQUENCE IF NOT EXISTS data_revision_seq")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_revisions (
+                table_name VARCHAR PRIMARY KEY,
+                revision BIGINT NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        # Statement trigger: remember which tracked tables this transaction wrote
+        print("Creating note_data_revision() function...")
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION note_data_revision() RETURNS trigger AS $$
+            DECLARE
+                touched TEXT := COALESCE(current_setting('gamercred.touched_tables', true), '');
+            BEGIN
+                IF position(',' || TG_TABLE_NAME || ',' IN touched) = 0 THEN
+                    PERFORM set_config('gamercred.touched_tables',
+                                       COALESCE(NULLIF(touched, ''), ',') || TG_TABLE_NAME || ',', true);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+
+        # Deferred trigger: at commit, bump every touched table once, in name order
+        print("Creating bump_data_revisions() function...")
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION bump_data_revisions() RETURNS trigger AS $$
+            DECLARE
+                touched TEXT := COALESCE(current_setting('gamercred.touched_tables', true), '');
+            BEGIN
+                IF touched = '' THEN
+                    RETURN NULL;
+                END IF;
+                PERFORM set_config('gamercred.touched_tables', '', true);
+                INSERT INTO data_revisions (table_name, revision, updated_at)
+                SELECT name, nextval('data_revision_seq'), LOCALTIMESTAMP
+                FROM unnest(string_to_array(trim(BOTH ',' FROM touched), ',')) AS name
+                ORDER BY name
+                ON CONFLICT (table_name) DO UPDATE
+                SET revision = EXCLUDED.revision, updated_at = EXCLUDED.updated_at;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+
+        # Commit changes
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Successfully created data_revisions table")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating table: {str(e)}")
+        return False
+
+def create_triggers():
+    """Attach the revision triggers to every tracked table and seed its revision"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        for table in TRACKED_TABLES:
+            print(f"Adding revision triggers to {table}...")
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_note_revision ON {table}")
+            cursor.execute(f"""
+                CREATE TRIGGER {table}_note_revision
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION note_data_revision()
+            """)
+            # Constraint triggers are per row; after the first one in a transaction they only read a setting
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_bump_revision ON {table}")
+            cursor.execute(f"""
+                CREATE CONSTRAINT TRIGGER {table}_bump_revision
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                DEFERRABLE INITIALLY DEFERRED
+                FOR EACH ROW EXECUTE FUNCTION bump_data_revisions()
+            """)
+            cursor.execute("""
+                INSERT INTO data_revisions (table_name, revision, updated_at)
+                VALUES (%s, nextval('data_revision_seq'), LOCALTIMESTAMP)
+                ON CONFLICT (table_name) DO NOTHING
+            """, (table,))
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Tracking revisions of {len(TRACKED_TABLES)} tables")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating triggers: {str(e)}")
+        return False
+
+def verify_table():
+    """Show the current revision of every tracked table"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT table_name, revision, updated_at FROM data_revisions ORDER BY table_name")
+        print("✅ Table 'data_revisions' exists")
+        for table_name, revision, updated_at in cursor.fetchall():
+            print(f"   - {table_name}: {revision} (updated {updated_at})")
+
+        cursor.close()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying table: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting data revisions migration...")
+
+    if create_table() and create_triggers():
+        verify_table()
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the game_enrichment_jobs table, the durable queue
+of RAWG metadata lookups processed by enrichment_worker.py.
+
+After creating the table it queues every existing game that is still missing
+RAWG data. It is safe to re-run: games that already have a job are skipped.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def create_table():
+    """Create the game_enrichment_jobs table and its index using raw SQL"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        # Create game_enrichment_jobs table
+        print("Creating game_enrichment_jobs table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS game_enrichment_jobs (
+                id SERIAL PRIMARY KEY,
+                game_id INTEGER NOT NULL UNIQUE REFERENCES games(id) ON DELETE CASCADE,
+                status VARCHAR NOT NULL DEFAULT 'pending',
+                force BOOLEAN NOT NULL DEFAULT FALSE,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMP NOT NULL,
+                locked_at TIMESTAMP,
+                last_error VARCHAR,
+                updated_at TIMESTAMP
+            )
+        """)
+
+        # Workers look for due jobs by status and time
+        print("Creating ix_game_enrichment_jobs_due index...")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_game_enrichment_jobs_due
+            ON game_enrichment_jobs (status, next_attempt_at)
+        """)
+
+        # Commit changes
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Successfully created game_enrichment_jobs table")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating table: {str(e)}")
+        return False
+
+def queue_existing_games():
+    """Queue a RAWG lookup for every game that is missing RAWG data"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        print("Queueing games without RAWG data...")
+        cursor.execute("""
+            INSERT INTO game_enrichment_jobs (game_id, status, next_attempt_at, updated_at)
+            SELECT id, 'pending', LOCALTIMESTAMP, LOCALTIMESTAMP
+            FROM games
+            WHERE rawg_id IS NULL
+               OR box_art_url IS NULL OR box_art_url = ''
+               OR description IS NULL OR description = ''
+            ON CONFLICT (game_id) DO NOTHING
+        """)
+        queued = cursor.rowcount
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Queued {queued} games for enrichment")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error queueing games: {str(e)}")
+        return False
+
+def verify_table():
+    """Verify that the table was created and show the queue by status"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables
+                WHERE table_name = 'game_enrichment_jobs'
+            )
+        """)
+        if not cursor.fetchone()[0]:
+            print("❌ Table 'game_enrichment_jobs' does not exist")
+            return False
+
+        cursor.execute("SELECT status, COUNT(*) FROM game_enrichment_jobs GROUP BY status ORDER BY status")
+        rows = cursor.fetchall()
+        print("✅ Table 'game_enrichment_jobs' exists")
+        for status, count in rows:
+            print(f"   - {status}: {count}")
+
+        cursor.close()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying table: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting game enrichment queue migration...")
+
+    # Create the queue, then queue the games that still need metadata
+    if create_table() and queue_existing_games():
+        verify_table()
+        print("Run 'python enrichment_worker.py --once' to process the queue now")
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the game_reviews (game_id, timestamp, id) index.
+
+A game's reviews are read a page at a time, newest first, with a keyset
+cursor on (timestamp, id) (see GameStorage._query_game_reviews); each page
+is a range scan of this index. It replaces ix_game_reviews_game_id, a
+prefix of it, which is dropped once the new index is built.
+
+The index is built CONCURRENTLY so the bot and website keep writing while the
+migration runs. It is safe to re-run: an existing index is kept and an
+invalid leftover from an interrupted build is rebuilt.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+INDEX_NAME = 'ix_game_reviews_game_timestamp'
+REDUNDANT_INDEX = 'ix_game_reviews_game_id'
+
+# Query as storage.py issues it; its plan should use the new index
+PAGE_QUERY = (
+    "SELECT * FROM game_reviews WHERE game_id = 1 AND (timestamp, id) < (now(), 1) "
+    "ORDER BY timestamp DESC, id DESC LIMIT 20"
+)
+
+def create_index():
+    """Create the index using raw SQL and drop the one it replaces"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn = psycopg2.connect(database_url)
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        # An interrupted concurrent build leaves an invalid index behind; drop it so it gets rebuilt
+        cursor.execute("""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (INDEX_NAME,))
+        row = cursor.fetchone()
+        if row and not row[0]:
+            print(f"Dropping invalid index {INDEX_NAME}...")
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+        print(f"Creating {INDEX_NAME} on game_reviews (game_id, timestamp, id)...")
+        cursor.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON game_reviews (game_id, timestamp, id)
+        """)
+
+        print(f"Dropping redundant index {REDUNDANT_INDEX}...")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {REDUNDANT_INDEX}")
+
+        # Refresh planner statistics so the new index is considered straight away
+        cursor.execute("ANALYZE game_reviews")
+
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Successfully created {INDEX_NAME}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating index: {str(e)}")
+        return False
+
+def verify_index():
+    """Verify that the index exists and that EXPLAIN uses it for a page of reviews"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (INDEX_NAME,))
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            print(f"❌ Index '{INDEX_NAME}' is missing or invalid")
+            return False
+        print(f"✅ Index '{INDEX_NAME}' exists")
+
+        # Small tables are cheaper to scan sequentially, so check the index is usable when seq scans are off
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {PAGE_QUERY}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        cursor.close()
+        conn.close()
+
+        if INDEX_NAME not in plan:
+            print(f"❌ A page of reviews does not use {INDEX_NAME}")
+            print(plan)
+            return False
+        print(f"✅ A page of reviews uses {INDEX_NAME}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying index: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting game reviews page index migration...")
+
+    if create_index():
+        if not verify_index():
+            sys.exit(1)
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Migration script to add indexes for the hot query paths:
+- gaming_sessions (user_id, game_id, timestamp), (game_id, timestamp), (timestamp)
+- games lower(name) for case-insensitive name lookups
+- foreign key indexes on bonuses, game_completions, game_ratings,
+  game_reviews and leaderboard_history
+
+Indexes are built CONCURRENTLY so the bot and website keep writing while the
+migration runs. It is safe to re-run: existing indexes are skipped and any
+invalid leftovers from an interrupted build are rebuilt.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# (index name, table, indexed columns/expressions)
+INDEXES = [
+    ('ix_gaming_sessions_user_game_timestamp', 'gaming_sessions', 'user_id, game_id, timestamp'),
+    ('ix_gaming_sessions_game_timestamp', 'gaming_sessions', 'game_id, timestamp'),
+    ('ix_gaming_sessions_timestamp', 'gaming_sessions', 'timestamp'),
+    ('ix_games_lower_name', 'games', 'lower(name)'),
+    ('ix_bonuses_user_id', 'bonuses', 'user_id'),
+    ('ix_game_completions_user_id', 'game_completions', 'user_id'),
+    ('ix_game_completions_game_id', 'game_completions', 'game_id'),
+    ('ix_game_ratings_user_id', 'game_ratings', 'user_id'),
+    ('ix_game_ratings_game_id', 'game_ratings', 'game_id'),
+    ('ix_game_reviews_user_id', 'game_reviews', 'user_id'),
+    ('ix_game_reviews_game_id', 'game_reviews', 'game_id'),
+    ('ix_leaderboard_history_user_id', 'leaderboard_history', 'user_id'),
+    ('ix_leaderboard_history_period_id', 'leaderboard_history', 'period_id'),
+]
+
+# (description, query as storage.py issues it, index the plan should use)
+HOT_QUERIES = [
+    ("User's hours on a game",
+     "SELECT SUM(hours) FROM gaming_sessions WHERE user_id = 1 AND game_id = 1",
+     'ix_gaming_sessions_user_game_timestamp'),
+    ("User's sessions",
+     "SELECT SUM(credits_earned) FROM gaming_sessions WHERE user_id = 1",
+     'ix_gaming_sessions_user_game_timestamp'),
+    ("Game's recent sessions",
+     "SELECT * FROM gaming_sessions WHERE game_id = 1 ORDER BY timestamp DESC LIMIT 10",
+     'ix_gaming_sessions_game_timestamp'),
+    ("Sessions in a leaderboard period",
+     "SELECT user_id, SUM(credits_earned) FROM gaming_sessions "
+     "WHERE timestamp >= now() - interval '7 days' AND timestamp < now() GROUP BY user_id",
+     'ix_gaming_sessions_timestamp'),
+    ("Game by name",
+     "SELECT * FROM games WHERE lower(name) = lower('Elden Ring')",
+     'ix_games_lower_name'),
+    ("User's bonuses",
+     "SELECT SUM(credits) FROM bonuses WHERE user_id = 1",
+     'ix_bonuses_user_id'),
+    ("User's completions",
+     "SELECT * FROM game_completions WHERE user_id = 1",
+     'ix_game_completions_user_id'),
+    ("Game's completions",
+     "SELECT * FROM game_completions WHERE game_id = 1",
+     'ix_game_completions_game_id'),
+    ("User's ratings",
+     "SELECT * FROM game_ratings WHERE user_id = 1",
+     'ix_game_ratings_user_id'),
+    ("Game's ratings",
+     "SELECT AVG(rating) FROM game_ratings WHERE game_id = 1",
+     'ix_game_ratings_game_id'),
+    ("User's reviews",
+     "SELECT * FROM game_reviews WHERE user_id = 1",
+     'ix_game_reviews_user_id'),
+    ("Game's reviews",
+     "SELECT * FROM game_reviews WHERE game_id = 1",
+     'ix_game_reviews_game_id'),
+    ("User's leaderboard history",
+     "SELECT * FROM leaderboard_history WHERE user_id = 1",
+     'ix_leaderboard_history_user_id'),
+    ("Period's leaderboard history",
+     "SELECT * FROM leaderboard_history WHERE period_id = 1",
+     'ix_leaderboard_history_period_id'),
+]
+
+def create_indexes():
+    """Create the indexes using raw SQL"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn = psycopg2.connect(database_url)
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        for name, table, columns in INDEXES:
+            # An interrupted concurrent build leaves an invalid index behind; drop it so it gets rebuilt
+            cursor.execute("""
+                SELECT i.indisvalid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (name,))
+            row = cursor.fetchone()
+            if row and not row[0]:
+                print(f"Dropping invalid index {name}...")
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+            print(f"Creating {name} on {table} ({columns})...")
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+        # Refresh planner statistics so the new indexes are considered straight away
+        for table in sorted({table for _, table, _ in INDEXES}):
+            cursor.execute(f"ANALYZE {table}")
+
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Successfully created {len(INDEXES)} indexes")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating indexes: {str(e)}")
+        return False
+
+def verify_indexes():
+    """Verify that the indexes exist and that EXPLAIN uses them for each hot query"""
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+        all_ok = True
+
+        for name, table, _ in INDEXES:
+            cursor.execute("""
+                SELECT i.indisvalid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (name,))
+            row = cursor.fetchone()
+            if row and row[0]:
+                print(f"✅ Index '{name}' exists")
+            else:
+                print(f"❌ Index '{name}' is missing or invalid")
+                all_ok = False
+
+        for description, query, index_name in HOT_QUERIES:
+            cursor.execute(f"EXPLAIN {query}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            if index_name in plan:
+                print(f"✅ {description}: uses {index_name}")
+                continue
+
+            # Small tables are cheaper to scan sequentially, so check the index is usable when seq scans are off
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {query}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RESET enable_seqscan")
+            if index_name in plan:
+                print(f"✅ {description}: can use {index_name} (planner prefers a seq scan at the current table size)")
+            else:
+                print(f"❌ {description}: does not use {index_name}")
+                print(plan)
+                all_ok = False
+
+        cursor.close()
+        conn.close()
+
+        if all_ok:
+            print("✅ All indexes verified successfully!")
+        return all_ok
+
+    except Exception as e:
+        print(f"❌ Error verifying indexes: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting gaming session indexes migration...")
+
+    # Create indexes, then check the hot queries use them
+    if create_indexes():
+        if not verify_indexes():
+            sys.exit(1)
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Migration script to add a unique (period_id, user_id) index to leaderboard_history.
+
+Period rollovers write every placement of a period with one upsert on this
+index (see GameStorage.roll_over_period), so recording the same period again
+updates its rows instead of adding more.
+
+Placements used to be written by deleting and re-inserting rows one at a
+time, which could leave a player with more than one row for a period; only
+the most recently written row is kept. The index is built CONCURRENTLY. It is
+safe to re-run: an existing index is kept and an invalid leftover from an
+interrupted build is rebuilt.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+INDEX_NAME = 'ux_leaderboard_history_period_user'
+
+def remove_duplicates():
+    """Keep only the newest leaderboard_history row for each (period_id, user_id)"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        print("Removing duplicate placements...")
+        cursor.execute("""
+            DELETE FROM leaderboard_history lh
+            USING leaderboard_history newer
+            WHERE newer.period_id = lh.period_id
+              AND newer.user_id = lh.user_id
+              AND newer.id > lh.id
+        """)
+        print(f"   - {cursor.rowcount} duplicate rows removed")
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Error removing duplicates: {str(e)}")
+        return False
+
+def create_index():
+    """Create the unique index using raw SQL"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn = psycopg2.connect(database_url)
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        # An interrupted concurrent build leaves an invalid index behind; drop it so it gets rebuilt
+        cursor.execute("""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (INDEX_NAME,))
+        row = cursor.fetchone()
+        if row and not row[0]:
+            print(f"Dropping invalid index {INDEX_NAME}...")
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+        print(f"Creating {INDEX_NAME} on leaderboard_history (period_id, user_id)...")
+        cursor.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON leaderboard_history (period_id, user_id)
+        """)
+
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Successfully created {INDEX_NAME}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating index: {str(e)}")
+        return False
+
+def verify_index():
+    """Verify that the index exists, is valid and is unique"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT i.indisvalid, i.indisunique
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (INDEX_NAME,))
+        row = cursor.fetchone()
+
+        cursor.close()
+        conn.close()
+
+        if not row or not row[0] or not row[1]:
+            print(f"❌ Index '{INDEX_NAME}' is missing, invalid or not unique")
+            return False
+        print(f"✅ Unique index '{INDEX_NAME}' exists")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying index: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting leaderboard history unique index migration...")
+
+    if remove_duplicates() and create_index():
+        if not verify_index():
+            sys.exit(1)
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
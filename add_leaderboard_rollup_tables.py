@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the leaderboard rollup tables:
+- leaderboard_rollups       (period, user) running totals
+- leaderboard_game_rollups  (period, user, game) running totals
+
+After creating the tables it backfills them from gaming_sessions, bonuses and
+game_completions. It is safe to re-run: the backfill rebuilds every rollup row.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def create_tables():
+    """Create the rollup tables and their ranking index using raw SQL"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        # Create leaderboard_rollups table
+        print("Creating leaderboard_rollups table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard_rollups (
+                period_type VARCHAR NOT NULL,
+                period_start TIMESTAMP NOT NULL,
+                user_id BIGINT NOT NULL REFERENCES user_stats(user_id),
+                credits FLOAT NOT NULL DEFAULT 0,
+                total_hours FLOAT NOT NULL DEFAULT 0,
+                session_count INTEGER NOT NULL DEFAULT 0,
+                games_played INTEGER NOT NULL DEFAULT 0,
+                most_played_game_id INTEGER REFERENCES games(id),
+                most_played_hours FLOAT NOT NULL DEFAULT 0,
+                PRIMARY KEY (period_type, period_start, user_id)
+            )
+        """)
+
+        # Leaderboard reads are an ordered scan of one period
+        print("Creating ix_leaderboard_rollups_ranking index...")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_leaderboard_rollups_ranking
+            ON leaderboard_rollups (period_type, period_start, credits DESC)
+        """)
+
+        # Create leaderboard_game_rollups table
+        print("Creating leaderboard_game_rollups table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard_game_rollups (
+                period_type VARCHAR NOT NULL,
+                period_start TIMESTAMP NOT NULL,
+                user_id BIGINT NOT NULL REFERENCES user_stats(user_id),
+                game_id INTEGER NOT NULL REFERENCES games(id),
+                hours FLOAT NOT NULL DEFAULT 0,
+                credits FLOAT NOT NULL DEFAULT 0,
+                session_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (period_type, period_start, user_id, game_id)
+            )
+        """)
+
+        # Commit changes
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Successfully created leaderboard rollup tables:")
+        print("   - leaderboard_rollups")
+        print("   - leaderboard_game_rollups")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating tables: {str(e)}")
+        return False
+
+def backfill_rollups():
+    """Populate the rollup tables from the existing session, bonus and completion history"""
+
+    try:
+        # Add the project root to the path so we can import storage
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from storage import GameStorage
+
+        storage = GameStorage()
+        session = storage.Session()
+        try:
+            print("Backfilling leaderboard rollups...")
+            storage.rebuild_leaderboard_rollups(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        print("✅ Leaderboard rollups backfilled")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error backfilling rollups: {str(e)}")
+        return False
+
+def verify_tables():
+    """Verify that the tables were created and populated"""
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        for table in ['leaderboard_rollups', 'leaderboard_game_rollups']:
+            cursor.execute("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.tables
+                    WHERE table_name = %s
+                )
+            """, (table,))
+            exists = cursor.fetchone()[0]
+
+            if not exists:
+                print(f"❌ Table '{table}' does not exist")
+                return False
+
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            print(f"✅ Table '{table}' exists with {cursor.fetchone()[0]} rows")
+
+        cursor.close()
+        conn.close()
+
+        print("✅ Leaderboard rollup tables verified successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying tables: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting leaderboard rollup tables migration...")
+
+    # Create tables, then backfill them from history
+    if create_tables() and backfill_rollups():
+        verify_tables()
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
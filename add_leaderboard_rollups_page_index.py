@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the leaderboard_rollups
+(period_type, period_start, credits DESC, user_id) index.
+
+Leaderboards are read a page at a time with a keyset cursor on
+(credits, user_id) (see GameStorage.get_leaderboard_page); each page is a
+range scan of this index. It replaces ix_leaderboard_rollups_ranking, which
+lacks user_id to break ties, and which is dropped once the new index is built.
+
+The index is built CONCURRENTLY so the bot and website keep writing while the
+migration runs. It is safe to re-run: an existing index is kept and an
+invalid leftover from an interrupted build is rebuilt.
+"""
+
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+INDEX_NAME = 'ix_leaderboard_rollups_page'
+REDUNDANT_INDEX = 'ix_leaderboard_rollups_ranking'
+
+# Query as storage.py issues it; its plan should use the new index
+PAGE_QUERY = (
+    "SELECT * FROM leaderboard_rollups WHERE period_type = 'weekly' AND period_start = '2025-01-06' "
+    "AND (credits < 100 OR (credits = 100 AND user_id > 1)) ORDER BY credits DESC, user_id LIMIT 51"
+)
+
+def create_index():
+    """Create the index using raw SQL and drop the one it replaces"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn = psycopg2.connect(database_url)
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        # An interrupted concurrent build leaves an invalid index behind; drop it so it gets rebuilt
+        cursor.execute("""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (INDEX_NAME,))
+        row = cursor.fetchone()
+        if row and not row[0]:
+            print(f"Dropping invalid index {INDEX_NAME}...")
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+        print(f"Creating {INDEX_NAME} on leaderboard_rollups (period_type, period_start, credits DESC, user_id)...")
+        cursor.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON leaderboard_rollups (period_type, period_start, credits DESC, user_id)
+        """)
+
+        print(f"Dropping redundant index {REDUNDANT_INDEX}...")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {REDUNDANT_INDEX}")
+
+        # Refresh planner statistics so the new index is considered straight away
+        cursor.execute("ANALYZE leaderboard_rollups")
+
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Successfully created {INDEX_NAME}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating index: {str(e)}")
+        return False
+
+def verify_index():
+    """Verify that the index exists and that EXPLAIN uses it for a leaderboard page"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        """, (INDEX_NAME,))
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            print(f"❌ Index '{INDEX_NAME}' is missing or invalid")
+            return False
+        print(f"✅ Index '{INDEX_NAME}' exists")
+
+        # Small tables are cheaper to scan sequentially, so check the index is usable when seq scans are off
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {PAGE_QUERY}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        cursor.close()
+        conn.close()
+
+        if INDEX_NAME not in plan:
+            print(f"❌ A leaderboard page does not use {INDEX_NAME}")
+            print(plan)
+            return False
+        print(f"✅ A leaderboard page uses {INDEX_NAME}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying index: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting leaderboard page index migration...")
+
+    if create_index():
+        if not verify_index():
+            sys.exit(1)
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to add profile_updated_at to the user_stats table.
+It records when username/avatar_url were last fetched from Discord, so
+profile_resolver.py can tell fresh profiles from stale ones.
+Run this script to add the new column to your existing database.
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def run_migration():
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("Error: DATABASE_URL environment variable not set")
+        sys.exit(1)
+    
+    print(f"Connecting to database: {database_url}")
+    
+    # Create engine
+    engine = create_engine(database_url)
+    
+    try:
+        with engine.connect() as conn:
+            # Check if the column already exists
+            result = conn.execute(text("""
+                SELECT column_name 
+                FROM information_schema.columns 
+                WHERE table_name = 'user_stats' 
+                AND column_name = 'profile_updated_at'
+            """))
+            existing_columns = [row[0] for row in result]
+            
+            if 'profile_updated_at' not in existing_columns:
+                print("Adding profile_updated_at column...")
+                # Left NULL for existing rows: their profiles are served as-is and refreshed on first view
+                conn.execute(text("""
+                    ALTER TABLE user_stats 
+                    ADD COLUMN profile_updated_at TIMESTAMP
+                """))
+                print("✓ Added profile_updated_at column")
+            else:
+                print("✓ profile_updated_at column already exists")
+            
+            # Commit the changes
+            conn.commit()
+            print("\nMigration completed successfully!")
+            
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,67 @@
+"""
+Awaitable GameStorage for the Discord bot and the website's async views.
+
+GameStorage runs synchronous SQLAlchemy/psycopg2 queries, including inside
+its `async def` methods. Awaiting them on the discord.py event loop blocks
+gateway heartbeats and every other command for as long as the query runs.
+AsyncGameStorage runs every storage call on a bounded thread pool, so the
+event loop only ever awaits a future.
+
+Each worker thread gets its own scoped session, which is removed after
+every call. The pool is no larger than the database connection pool, so
+queued calls wait in the executor instead of timing out on a connection.
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import db_pool
+
+class AsyncGameStorage:
+    """Run GameStorage calls off the event loop on a bounded DB thread pool"""
+
+    def __init__(self, storage, max_workers: int = None):
+        self.storage = storage
+        self.cst = storage.cst
+        if max_workers is None:
+            settings = db_pool.pool_settings()
+            max_workers = int(os.getenv('BOT_DB_WORKERS', settings['pool_size'] + settings['max_overflow']))
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bot-db')
+
+    def _call(self, func: Callable, args, kwargs) -> Any:
+        try:
+            result = func(*args, **kwargs)
+            if inspect.iscoroutine(result):
+                # GameStorage's async methods query synchronously; drive them on this thread's own loop
+                result = asyncio.run(result)
+            return result
+        finally:
+            self.storage.Session.remove()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking (or GameStorage async) callable on the DB executor and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, func, args, kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.storage, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return call
+
+    async def announce_period_end(self, bot, leaderboard_type, old_period) -> None:
+        """Load the final placements off the loop, then send the announcement from the bot loop"""
+        placements = await self.run(self.storage.get_period_placements, old_period.id, leaderboard_type)
+        await self.storage.announce_period_end(bot, leaderboard_type, old_period, placements=placements)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,105 @@
+"""
+Shared per-process event loop for running coroutines from threaded code.
+
+The website runs under threaded gunicorn workers. Instead of each request
+creating or borrowing an event loop, every coroutine goes to one long-lived
+loop per process, running in a daemon thread. Many requests can then wait
+on Discord/RAWG I/O at the same time, and HTTP sessions can be shared
+across requests.
+
+The loop is started lazily and restarted after fork, so importing a module
+that uses it under gunicorn's preload_app is safe.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+import db_pool
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for a blocking run(); keeps a slow upstream call below gunicorn's 30s worker timeout. It always
+# outlasts the pool's checkout timeout, so a request starved of connections fails with the pool's error
+DEFAULT_TIMEOUT = max(float(os.getenv('ASYNC_CALL_TIMEOUT', '25')), db_pool.pool_settings()['pool_timeout'] + 5)
+
+class BackgroundLoop:
+    """An asyncio event loop running forever in a daemon thread"""
+
+    def __init__(self, name: str = 'background-loop'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop for this process, started on first use"""
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    self._start()
+        return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_forever():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=run_forever, name=self.name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop, self._thread, self._pid = loop, thread, os.getpid()
+        logger.info(f"Started {self.name} in process {self._pid}")
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop, keeping the caller's context (e.g. Flask's request context)"""
+        loop = self.loop
+        future = concurrent.futures.Future()
+        context = contextvars.copy_context()
+
+        def start():
+            task = loop.create_task(coro)
+
+            def copy_result(done_task):
+                if future.cancelled():
+                    return
+                if done_task.cancelled():
+                    future.cancel()
+                elif done_task.exception() is not None:
+                    future.set_exception(done_task.exception())
+                else:
+                    future.set_result(done_task.result())
+
+            task.add_done_callback(copy_result)
+            future.add_done_callback(lambda f: f.cancelled() and loop.call_soon_threadsafe(task.cancel))
+
+        # Tasks copy the context current when they are created, so start them inside the caller's context
+        loop.call_soon_threadsafe(start, context=context)
+        return future
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = DEFAULT_TIMEOUT) -> Any:
+        """Run a coroutine on the loop and block the calling thread for its result"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(f"{self.name}.run() called from its own loop; await the coroutine instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Async call did not finish within {timeout}s")
+
+background_loop = BackgroundLoop()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GameStorage.get_alltime_leaderboard with thousands of players.
+
+Synthetic players are added to the database in steps (up to 10,000 by
+default), each with sessions on one to four test games. At every step the
+leaderboard is built by the current single-statement implementation and by a
+reference copy of the original one, which ran a most-played query per user.
+The SQL statements each one sends are counted: the current implementation
+must stay at one, and both must agree on every synthetic player's row.
+Run with: python bench_alltime_leaderboard.py [player_count ...]
+The reference implementation is skipped above REFERENCE_MAX_PLAYERS players.
+"""
+
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import event, func, text
+
+# Load environment variables
+load_dotenv()
+
+from models import Bonus, Game, GameCompletion, GamingSession
+from storage import GameStorage
+
+FIRST_USER_ID = 990000000010000001
+GAME_PREFIX = '__bench_alltime_game_'
+GAMES = 4
+DEFAULT_STEPS = [100, 1000, 10000]
+REFERENCE_MAX_PLAYERS = 10000
+
+def reference_leaderboard(storage):
+    """Reference copy of the original get_alltime_leaderboard, with one most-played query per user"""
+    db_session = storage.Session()
+    try:
+        # Get total credits from gaming sessions for each user
+        session_credits = db_session.query(
+            GamingSession.user_id,
+            func.sum(GamingSession.credits_earned).label('session_credits'),
+            func.count(GamingSession.game_id.distinct()).label('games_played'),
+            func.sum(GamingSession.hours).label('total_hours')
+        ).group_by(
+            GamingSession.user_id
+        ).subquery()
+
+        # Get total bonus credits for each user
+        bonus_credits = db_session.query(
+            Bonus.user_id,
+            func.sum(Bonus.credits).label('bonus_credits')
+        ).group_by(
+            Bonus.user_id
+        ).subquery()
+
+        # Get total completion credits for each user
+        completion_credits = db_session.query(
+            GameCompletion.user_id,
+            func.sum(GameCompletion.credits_awarded).label('completion_credits')
+        ).group_by(
+            GameCompletion.user_id
+        ).subquery()
+
+        # Combine session credits, bonus credits, and completion credits
+        results = db_session.query(
+            session_credits.c.user_id,
+            (func.coalesce(session_credits.c.session_credits, 0) + 
+             func.coalesce(bonus_credits.c.bonus_credits, 0) + 
+             func.coalesce(completion_credits.c.completion_credits, 0)).label('total_credits'),
+            session_credits.c.games_played,
+            session_credits.c.total_hours
+        ).outerjoin(
+            bonus_credits,
+            session_credits.c.user_id == bonus_credits.c.user_id
+        ).outerjoin(
+            completion_credits,
+            session_credits.c.user_id == completion_credits.c.user_id
+        ).order_by(
+            (func.coalesce(session_credits.c.session_credits, 0) + 
+             func.coalesce(bonus_credits.c.bonus_credits, 0) + 
+             func.coalesce(completion_credits.c.completion_credits, 0)).desc()
+        ).all()
+
+        # Get most played game for each user
+        most_played_games = {}
+        for user_id, _, _, _ in results:
+            most_played = db_session.query(
+                Game.name,
+                func.sum(GamingSession.hours).label('game_hours')
+            ).join(
+                GamingSession, Game.id == GamingSession.game_id
+            ).filter(
+                GamingSession.user_id == user_id
+            ).group_by(
+                Game.name
+            ).order_by(
+                func.sum(GamingSession.hours).desc()
+            ).first()
+
+            if most_played:
+                most_played_games[user_id] = (most_played.name, float(most_played.game_hours))
+            else:
+                most_played_games[user_id] = ('No games', 0.0)
+
+        # Format the results
+        leaderboard = []
+        for user_id, total_credits, games_played, total_hours in results:
+            most_played_game, most_played_hours = most_played_games.get(user_id, ('No games', 0.0))
+            leaderboard.append((
+                user_id,
+                float(total_credits or 0),
+                int(games_played or 0),
+                most_played_game,
+                float(most_played_hours or 0),
+                float(total_hours or 0)
+            ))
+
+        return leaderboard
+    finally:
+        db_session.close()
+
+def add_players(storage, first, count):
+    """Players first..first+count-1 (0-based), player n with sessions on 1 + n % GAMES games"""
+    with storage.Session() as session:
+        session.execute(text("""
+            INSERT INTO games (name, credits_per_hour)
+            SELECT :prefix || n || '__', 1.0 FROM generate_series(1, :games) AS n
+            ON CONFLICT (name) DO NOTHING
+        """), {"prefix": GAME_PREFIX, "games": GAMES})
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username)
+            SELECT :first_id + n, 0, 'bench-' || n FROM generate_series(:first, :last) AS n
+        """), {"first_id": FIRST_USER_ID, "first": first, "last": first + count - 1})
+        # Later games get more hours, so every player has a single most played game
+        session.execute(text("""
+            INSERT INTO gaming_sessions (user_id, game_id, hours, credits_earned, timestamp, players)
+            SELECT :first_id + n, g.id, g.rank * 0.75 + (n % 3) * 0.1, g.rank * 0.75 + (n % 3) * 0.1,
+                   LOCALTIMESTAMP - make_interval(hours => g.rank::int), 1
+            FROM generate_series(:first, :last) AS n
+            JOIN (SELECT id, ROW_NUMBER() OVER (ORDER BY name) AS rank FROM games WHERE starts_with(name, :prefix)) g
+              ON g.rank <= 1 + n % :games
+        """), {"first_id": FIRST_USER_ID, "first": first, "last": first + count - 1,
+               "prefix": GAME_PREFIX, "games": GAMES})
+        session.commit()
+
+def cleanup(storage):
+    with storage.Session() as session:
+        session.execute(text("DELETE FROM gaming_sessions WHERE user_id >= :first_id"), {"first_id": FIRST_USER_ID})
+        session.execute(text("DELETE FROM user_stats WHERE user_id >= :first_id"), {"first_id": FIRST_USER_ID})
+        session.execute(text("DELETE FROM games WHERE starts_with(name, :prefix)"), {"prefix": GAME_PREFIX})
+        session.commit()
+
+def measured(storage, func):
+    """Run func; returns (result, SQL statements sent from this thread, seconds)"""
+    statements = []
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    event.listen(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        start = time.perf_counter()
+        result = func()
+        return result, len(statements), time.perf_counter() - start
+    finally:
+        event.remove(storage.engine, 'before_cursor_execute', before_cursor_execute)
+
+def synthetic_rows(leaderboard):
+    return {row[0]: (round(row[1], 6), row[2], row[3], round(row[4], 6), round(row[5], 6))
+            for row in leaderboard if row[0] >= FIRST_USER_ID}
+
+def main():
+    steps = sorted(int(arg) for arg in sys.argv[1:]) or DEFAULT_STEPS
+    storage = GameStorage()
+    cleanup(storage)
+    ok = True
+    try:
+        # Warm up the connection pool so the first step doesn't pay for connecting
+        storage.get_alltime_leaderboard()
+        players = 0
+        print(f"{'players':>8} {'queries':>8} {'seconds':>8} {'reference queries':>18} {'reference seconds':>18}")
+        for step in steps:
+            add_players(storage, players, step - players)
+            players = step
+
+            leaderboard, queries, seconds = measured(storage, storage.get_alltime_leaderboard)
+            line = f"{players:8,d} {queries:8d} {seconds:8.3f}"
+            if queries != 1:
+                ok = False
+            if players <= REFERENCE_MAX_PLAYERS:
+                reference, reference_queries, reference_seconds = measured(storage, lambda: reference_leaderboard(storage))
+                line += f" {reference_queries:18,d} {reference_seconds:18.3f}"
+                if synthetic_rows(leaderboard) != synthetic_rows(reference):
+                    print("❌ The leaderboard differs from the reference implementation")
+                    ok = False
+            print(line)
+            if len(synthetic_rows(leaderboard)) != players:
+                print(f"❌ Expected {players} synthetic players on the leaderboard")
+                ok = False
+    finally:
+        cleanup(storage)
+
+    print()
+    if ok:
+        print("✅ The all-time leaderboard took one query at every size and matches the reference")
+    else:
+        print("❌ Query count grew with the player count or the results disagree")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for credit_engine on a synthetic 1M-session table.
+
+Compares the original per-row while-loop calculations against the closed-form
+scalar functions and the vectorized batch functions, and checks that all three
+agree. Run with: python bench_credit_engine.py [session_count]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import credit_engine
+
+def loop_credits_for_total_hours(hours, base_cph, half_life_hours=None):
+    """Reference copy of the original GameStorage.calculate_credits_with_half_life loop"""
+    if half_life_hours is None or half_life_hours <= 0:
+        return hours * base_cph
+    total_credits = 0.0
+    remaining_hours = hours
+    current_cph = base_cph
+    current_threshold = half_life_hours
+    while remaining_hours > 0:
+        hours_at_current_rate = min(remaining_hours, current_threshold)
+        total_credits += hours_at_current_rate * current_cph
+        remaining_hours -= hours_at_current_rate
+        if remaining_hours > 0:
+            current_cph /= 2.0
+            current_threshold *= 2.0
+    return total_credits
+
+def loop_credits_for_session(session_hours, total_game_hours, base_cph, half_life_hours=None):
+    """Reference copy of the original GameStorage.calculate_credits_with_half_life_for_session loop"""
+    if half_life_hours is None or half_life_hours <= 0:
+        return session_hours * base_cph
+    total_credits = 0.0
+    remaining_session_hours = session_hours
+    current_hour = total_game_hours
+    while remaining_session_hours > 0:
+        boundaries_crossed = int(current_hour // half_life_hours)
+        current_cph = base_cph / (2 ** boundaries_crossed)
+        next_threshold = (boundaries_crossed + 1) * half_life_hours
+        hours_at_current_rate = min(remaining_session_hours, next_threshold - current_hour)
+        total_credits += hours_at_current_rate * current_cph
+        remaining_session_hours -= hours_at_current_rate
+        current_hour += hours_at_current_rate
+    return total_credits
+
+def make_sessions(count, seed=42):
+    """Synthetic sessions: 1-8h each, up to 500h already played, a third of games without half-life"""
+    rng = np.random.default_rng(seed)
+    hours = rng.uniform(0.25, 8.0, count)
+    prior_hours = rng.uniform(0.0, 500.0, count)
+    cph = rng.choice([0.5, 1.0, 2.0, 5.0, 10.0], count)
+    half_life = rng.choice([np.nan, 5.0, 10.0, 25.0, 100.0], count)
+    return hours, prior_hours, cph, half_life
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f}s")
+    return np.asarray(result, dtype=np.float64), elapsed
+
+def check(label, expected, actual):
+    max_error = float(np.max(np.abs(expected - actual) / np.maximum(1.0, np.abs(expected))))
+    status = "✅" if max_error < 1e-9 else "❌"
+    print(f"  {status} {label}: max relative error {max_error:.2e}")
+    return max_error < 1e-9
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"🚀 Building {count:,} synthetic sessions...")
+    hours, prior_hours, cph, half_life = make_sessions(count)
+    rows = list(zip(hours.tolist(), prior_hours.tolist(), cph.tolist(),
+                    [None if np.isnan(hl) else hl for hl in half_life.tolist()]))
+
+    ok = True
+
+    print("\nTotal-hours schedule (recalculation path):")
+    loop, loop_time = timed("while-loop per row", lambda: [loop_credits_for_total_hours(h, c, hl) for h, _, c, hl in rows])
+    scalar, scalar_time = timed("closed form per row", lambda: [credit_engine.credits_for_total_hours(h, c, hl) for h, _, c, hl in rows])
+    batch, batch_time = timed("batch (numpy)", lambda: credit_engine.batch_credits_for_total_hours(hours, cph, half_life))
+    ok &= check("closed form", loop, scalar)
+    ok &= check("batch", loop, batch)
+    print(f"  batch speedup over loop: {loop_time / batch_time:.0f}x")
+
+    print("\nSession schedule (logging path):")
+    loop, loop_time = timed("while-loop per row", lambda: [loop_credits_for_session(h, p, c, hl) for h, p, c, hl in rows])
+    scalar, scalar_time = timed("closed form per row", lambda: [credit_engine.credits_for_session(h, p, c, hl) for h, p, c, hl in rows])
+    batch, batch_time = timed("batch (numpy)", lambda: credit_engine.batch_credits_for_sessions(hours, prior_hours, cph, half_life))
+    ok &= check("closed form", loop, scalar)
+    ok &= check("batch", loop, batch)
+    print(f"  batch speedup over loop: {loop_time / batch_time:.0f}x")
+
+    print()
+    if ok:
+        print("✅ All implementations agree")
+    else:
+        print("❌ Implementations disagree")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
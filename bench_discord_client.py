@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark for discord_client against a local stand-in for the Discord API.
+
+The stand-in server adds a fixed latency to every request, enforces a
+per-route rate limit with Discord's X-RateLimit-* headers and 429 responses,
+and answers 404 from the guild member endpoint for users who are not members.
+It compares the original lookups against the pooled client:
+- the old batch function: guild and global requests awaited one at a time
+- the old per-user function: a new session per user, all users gathered at once
+- DiscordClient, including overlapping callers asking for the same users
+
+Run with: python bench_discord_client.py [user_count]
+"""
+
+import asyncio
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+from discord_client import DiscordClient, avatar_url_for
+
+GUILD_ID = '1'
+LATENCY_SECONDS = 0.02
+RATE_LIMIT = 50              # requests per route per window
+RATE_WINDOW_SECONDS = 1.0
+NON_MEMBER_EVERY = 5         # every 5th user is not in the guild
+
+class FakeDiscord:
+    """Minimal Discord REST stand-in with per-route rate limits"""
+
+    def __init__(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.connections = set()
+        self.windows = {}
+
+    def reset(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.connections = set()
+        self.windows = {}
+
+    def _rate_limit(self, bucket):
+        now = time.time()
+        window_start, used = self.windows.get(bucket, (now, 0))
+        if now - window_start >= RATE_WINDOW_SECONDS:
+            window_start, used = now, 0
+        reset = window_start + RATE_WINDOW_SECONDS
+        headers = {
+            'X-RateLimit-Bucket': bucket,
+            'X-RateLimit-Limit': str(RATE_LIMIT),
+            'X-RateLimit-Reset': f"{reset:.3f}",
+            'X-RateLimit-Reset-After': f"{max(reset - now, 0):.3f}",
+        }
+        if used >= RATE_LIMIT:
+            self.rate_limited += 1
+            headers['X-RateLimit-Remaining'] = '0'
+            return web.json_response({'message': 'You are being rate limited.', 'retry_after': max(reset - now, 0.001),
+                                      'global': False}, status=429, headers=headers)
+        self.windows[bucket] = (window_start, used + 1)
+        headers['X-RateLimit-Remaining'] = str(RATE_LIMIT - used - 1)
+        return headers
+
+    async def _handle(self, request, bucket, build):
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info('peername'))
+        await asyncio.sleep(LATENCY_SECONDS)
+        limited = self._rate_limit(bucket)
+        if isinstance(limited, web.Response):
+            return limited
+        status, body = build(request.match_info['user_id'])
+        return web.json_response(body, status=status, headers=limited)
+
+    async def member(self, request):
+        def build(user_id):
+            if int(user_id) % NON_MEMBER_EVERY == 0:
+                return 404, {'message': 'Unknown Member', 'code': 10007}
+            return 200, {'nick': None, 'user': {'id': user_id, 'username': f'member{user_id}', 'avatar': None}}
+        return await self._handle(request, 'members', build)
+
+    async def user(self, request):
+        return await self._handle(request, 'users',
+                                  lambda user_id: (200, {'id': user_id, 'username': f'user{user_id}', 'avatar': 'abc'}))
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/api/v10/guilds/{guild_id}/members/{user_id}', self.member)
+        app.router.add_get('/api/v10/users/{user_id}', self.user)
+        return app
+
+async def legacy_batch(api_url, user_ids):
+    """Reference copy of the original get_batch_discord_user_info request pattern"""
+    results = {}
+    headers = {'Authorization': 'Bot token'}
+    async with aiohttp.ClientSession() as session:
+        for user_id in user_ids:
+            for url in (f"{api_url}/guilds/{GUILD_ID}/members/{user_id}", f"{api_url}/users/{user_id}"):
+                async with session.get(url, headers=headers) as response:
+                    if user_id not in results and response.status == 200:
+                        data = await response.json()
+                        user = data.get('user', data)
+                        results[user_id] = {'username': user['username'], 'avatar_url': avatar_url_for(user_id, user.get('avatar'))}
+    return results
+
+async def legacy_single(api_url, user_id):
+    """Reference copy of the original get_discord_user_info request pattern"""
+    headers = {'Authorization': 'Bot token'}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{api_url}/guilds/{GUILD_ID}/members/{user_id}", headers=headers) as response:
+            if response.status == 200:
+                user = (await response.json())['user']
+                return {'username': user['username'], 'avatar_url': avatar_url_for(user_id, user.get('avatar'))}
+        async with session.get(f"{api_url}/users/{user_id}", headers=headers) as response:
+            if response.status == 200:
+                user = await response.json()
+                return {'username': user['username'], 'avatar_url': avatar_url_for(user_id, user.get('avatar'))}
+    return None
+
+async def run(label, fake, workload, user_ids):
+    fake.reset()
+    start = time.perf_counter()
+    profiles = await workload()
+    elapsed = time.perf_counter() - start
+    found = sum(1 for user_id in user_ids if profiles.get(user_id))
+    print(f"  {label:<38} {elapsed:7.2f}s  {fake.requests:5d} requests  {fake.rate_limited:4d} x 429  "
+          f"{len(fake.connections):4d} connections  {found}/{len(user_ids)} profiles")
+    return profiles, elapsed
+
+def expected_profile(user_id):
+    if int(user_id) % NON_MEMBER_EVERY == 0:
+        return {'username': f'user{user_id}', 'avatar_url': avatar_url_for(user_id, 'abc')}
+    return {'username': f'member{user_id}', 'avatar_url': avatar_url_for(user_id, None)}
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    user_ids = [str(100000 + i) for i in range(count)]
+
+    fake = FakeDiscord()
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    api_url = f"http://127.0.0.1:{port}/api/v10"
+
+    print(f"🚀 Looking up {count} users ({LATENCY_SECONDS * 1000:.0f}ms latency, "
+          f"{RATE_LIMIT} requests/{RATE_WINDOW_SECONDS:.0f}s per route)")
+
+    async def legacy_gather():
+        profiles = await asyncio.gather(*[legacy_single(api_url, user_id) for user_id in user_ids])
+        return dict(zip(user_ids, profiles))
+
+    client = DiscordClient(token='token', guild_id=GUILD_ID, api_url=api_url)
+
+    async def overlapping_callers():
+        # Three requests asking for overlapping pages of the same users at once
+        pages = [user_ids, user_ids[:count // 2], user_ids[count // 4:]]
+        results = await asyncio.gather(*[client.get_user_profiles(page) for page in pages])
+        return {k: v for result in results for k, v in result.items()}
+
+    _, legacy_batch_time = await run("old batch (sequential)", fake, lambda: legacy_batch(api_url, user_ids), user_ids)
+    await run("old per-user sessions (gathered)", fake, legacy_gather, user_ids)
+    await asyncio.sleep(RATE_WINDOW_SECONDS)
+    profiles, client_time = await run("DiscordClient", fake, lambda: client.get_user_profiles(user_ids), user_ids)
+    await asyncio.sleep(RATE_WINDOW_SECONDS)
+    coalesced_before = client.stats['coalesced']
+    _, _ = await run("DiscordClient, 3 overlapping callers", fake, overlapping_callers, user_ids)
+    coalesced = client.stats['coalesced'] - coalesced_before
+
+    await client.close()
+    await runner.cleanup()
+
+    print(f"\n  DiscordClient speedup over old batch: {legacy_batch_time / client_time:.1f}x, "
+          f"{coalesced} duplicate lookups coalesced")
+    ok = all(profiles.get(user_id) == expected_profile(user_id) for user_id in user_ids)
+    if ok:
+        print("✅ DiscordClient returned every profile, member and non-member")
+    else:
+        print("❌ DiscordClient returned wrong or missing profiles")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the rank lookup in GameStorage.get_user_overall_stats.
+
+Synthetic players are added to the database in steps (up to 10,000 by
+default), each with a few sessions and the matching balance. At every step
+a sample of players has their rank looked up with the current count-above
+query on ix_user_stats_total_credits and with a reference copy of the
+original user_rank CTE, which ranked every user over a UNION ALL of all
+sessions, bonuses and completions. Both must agree, and the current lookup
+must stay fast as the player count grows.
+Run with: python bench_user_rank.py [player_count ...]
+"""
+
+import random
+import sys
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+# Load environment variables
+load_dotenv()
+
+from storage import GameStorage
+
+FIRST_USER_ID = 990000000020000001
+GAME_NAME = '__bench_user_rank_game__'
+DEFAULT_STEPS = [100, 1000, 10000]
+SAMPLE_SIZE = 20
+# Slowest acceptable average rank lookup, in milliseconds, at any size
+MAX_LOOKUP_MS = 50
+
+# Reference copy of the original rank computation
+REFERENCE_RANK_SQL = """
+    WITH user_rank AS (
+        SELECT
+            user_id,
+            RANK() OVER (ORDER BY (COALESCE(SUM(credits_earned), 0) + COALESCE(SUM(bonus_credits), 0) + COALESCE(SUM(completion_credits), 0)) DESC) as rank
+        FROM (
+            SELECT
+                gs.user_id,
+                gs.credits_earned,
+                0 as bonus_credits,
+                0 as completion_credits
+            FROM gaming_sessions gs
+            UNION ALL
+            SELECT
+                b.user_id,
+                0 as credits_earned,
+                b.credits as bonus_credits,
+                0 as completion_credits
+            FROM bonuses b
+            UNION ALL
+            SELECT
+                gc.user_id,
+                0 as credits_earned,
+                0 as bonus_credits,
+                gc.credits_awarded as completion_credits
+            FROM game_completions gc
+        ) combined_credits
+        GROUP BY user_id
+    )
+    SELECT rank FROM user_rank WHERE user_id = :user_id
+"""
+
+def add_players(storage, first, count):
+    """Players first..first+count-1 (0-based), player n with three sessions worth n % 997 credits in total"""
+    with storage.Session() as session:
+        game_id = session.execute(text("""
+            INSERT INTO games (name, credits_per_hour) VALUES (:name, 1.0)
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id
+        """), {"name": GAME_NAME}).scalar()
+        params = {"first_id": FIRST_USER_ID, "first": first, "last": first + count - 1, "game_id": game_id}
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username)
+            SELECT :first_id + n, n % 997, 'bench-' || n FROM generate_series(:first, :last) AS n
+        """), params)
+        session.execute(text("""
+            INSERT INTO gaming_sessions (user_id, game_id, hours, credits_earned, timestamp, players)
+            SELECT :first_id + n, :game_id, 1.0, (n % 997) / 3.0, LOCALTIMESTAMP - make_interval(hours => k), 1
+            FROM generate_series(:first, :last) AS n, generate_series(1, 3) AS k
+        """), params)
+        session.commit()
+
+def cleanup(storage):
+    with storage.Session() as session:
+        session.execute(text("DELETE FROM gaming_sessions WHERE user_id >= :first_id"), {"first_id": FIRST_USER_ID})
+        session.execute(text("DELETE FROM user_stats WHERE user_id >= :first_id"), {"first_id": FIRST_USER_ID})
+        session.execute(text("DELETE FROM games WHERE name = :name"), {"name": GAME_NAME})
+        session.commit()
+
+def reference_rank(storage, user_id):
+    with storage.Session() as session:
+        return session.execute(text(REFERENCE_RANK_SQL), {"user_id": user_id}).scalar()
+
+def timed(func, user_ids):
+    """Call func for every user; returns (results, average milliseconds per call)"""
+    start = time.perf_counter()
+    results = [func(user_id) for user_id in user_ids]
+    return results, (time.perf_counter() - start) * 1000 / len(user_ids)
+
+def main():
+    steps = sorted(int(arg) for arg in sys.argv[1:]) or DEFAULT_STEPS
+    storage = GameStorage()
+    cleanup(storage)
+    ok = True
+    try:
+        players = 0
+        print(f"{'players':>8} {'rank ms':>8} {'reference ms':>13}")
+        for step in steps:
+            add_players(storage, players, step - players)
+            players = step
+            with storage.Session() as session:
+                session.execute(text("ANALYZE user_stats"))
+                session.commit()
+
+            # Players with n % 997 == 0 have no credits, which the original query didn't rank the same way
+            sample = [FIRST_USER_ID + n for n in random.sample(range(players), min(SAMPLE_SIZE, players)) if n % 997]
+            # Warm up the connection pool so the first lookup doesn't pay for connecting
+            storage.get_user_overall_stats(str(sample[0]))
+            stats, rank_ms = timed(lambda user_id: storage.get_user_overall_stats(str(user_id)), sample)
+            reference, reference_ms = timed(lambda user_id: reference_rank(storage, user_id), sample)
+            print(f"{players:8,d} {rank_ms:8.2f} {reference_ms:13.2f}")
+
+            if [row['rank'] for row in stats] != reference:
+                print("❌ Ranks differ from the reference implementation")
+                ok = False
+            if rank_ms > MAX_LOOKUP_MS:
+                print(f"❌ Rank lookups averaged more than {MAX_LOOKUP_MS}ms")
+                ok = False
+    finally:
+        cleanup(storage)
+
+    print()
+    if ok:
+        print("✅ Ranks match the reference and stay fast at every size")
+    else:
+        print("❌ Ranks disagree or the lookup is too slow")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
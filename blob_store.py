@@ -0,0 +1,192 @@
+"""
+Content-addressed storage for uploaded media (screenshots, backgrounds).
+
+A blob's key is the SHA-256 of its bytes. Identical uploads are stored once,
+a key never changes meaning, and the key doubles as a strong ETag. Only the
+key lives in Postgres; the bytes live in a backend:
+
+- local       files under BLOB_STORE_DIR (default: blobs/ next to this file),
+              fanned out as ab/cd/<key>
+- cloudinary  uploaded through cloud_storage with the key as public id, for
+              hosts whose local disk does not survive a deploy
+
+Select the backend with BLOB_STORE_BACKEND ('local' by default).
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blobs')
+
+class BlobTooLarge(ValueError):
+    """Raised when a blob exceeds the size limit while it is being written"""
+
+class LocalBlobBackend:
+    """Blobs stored as files on the local filesystem"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def save(self, key: str, temp_path: str, mime_type: Optional[str] = None) -> None:
+        path = self.path(key)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Rename is atomic, so readers never see a partly written blob
+        os.replace(temp_path, path)
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path(key))
+        except OSError:
+            return None
+
+    def public_url(self, key: str, mime_type: Optional[str] = None) -> Optional[str]:
+        return None
+
+    def public_variant_url(self, key: str, width: int, fmt: str) -> Optional[str]:
+        return None
+
+class CloudinaryBlobBackend(LocalBlobBackend):
+    """Blobs uploaded to Cloudinary through cloud_storage; served by redirecting to its CDN"""
+
+    def __init__(self, root: str):
+        super().__init__(root)
+        from cloud_storage import cloud_storage
+        self.cloud_storage = cloud_storage
+
+    def save(self, key: str, temp_path: str, mime_type: Optional[str] = None) -> None:
+        try:
+            self.cloud_storage.upload_blob(temp_path, key, mime_type)
+        finally:
+            os.remove(temp_path)
+
+    def exists(self, key: str) -> bool:
+        return True
+
+    def size(self, key: str) -> Optional[int]:
+        return None
+
+    def public_url(self, key: str, mime_type: Optional[str] = None) -> Optional[str]:
+        resource_type = 'video' if mime_type and mime_type.startswith('video/') else 'image'
+        return self.cloud_storage.blob_url(key, resource_type)
+
+    def public_variant_url(self, key: str, width: int, fmt: str) -> Optional[str]:
+        # Cloudinary resizes, re-encodes and strips metadata on its CDN
+        return self.cloud_storage.blob_url(key, 'image', transformation={
+            'width': width, 'crop': 'limit', 'format': fmt, 'quality': 'auto'})
+
+class BlobWriter:
+    """
+    Incremental blob write: chunks go to a temp file and into the hash as they arrive,
+    and the size limit is enforced on every chunk. Nothing is stored until commit().
+    """
+
+    def __init__(self, store: 'BlobStore', max_bytes: Optional[int] = None):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        os.makedirs(store._tmp_dir, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(dir=store._tmp_dir)
+        self._file = os.fdopen(fd, 'wb')
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self.discard()
+            raise BlobTooLarge(f"Blob exceeds {self.max_bytes} bytes")
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self, mime_type: Optional[str] = None) -> Tuple[str, int]:
+        """Store the written bytes under their hash; returns (key, size)"""
+        self._file.close()
+        key = self._digest.hexdigest()
+        try:
+            self.store.backend.save(key, self._temp_path, mime_type)
+        finally:
+            self.discard()
+        return key, self.size
+
+    def discard(self) -> None:
+        """Drop the written bytes (a no-op after commit)"""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def __enter__(self) -> 'BlobWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # Anything not committed by the end of the block is thrown away
+        self.discard()
+
+class BlobStore:
+    """Write blobs by content hash and look them up by key"""
+
+    def __init__(self, root: Optional[str] = None, backend: Optional[str] = None):
+        self.root = root or os.getenv('BLOB_STORE_DIR', DEFAULT_ROOT)
+        backend = (backend or os.getenv('BLOB_STORE_BACKEND', 'local')).lower()
+        if backend == 'cloudinary':
+            self.backend = CloudinaryBlobBackend(self.root)
+        else:
+            self.backend = LocalBlobBackend(self.root)
+        self._tmp_dir = os.path.join(self.root, 'tmp')
+
+    def put_stream(self, stream: BinaryIO, mime_type: Optional[str] = None,
+                   max_bytes: Optional[int] = None) -> Tuple[str, int]:
+        """Copy a stream into the store in chunks, hashing as it goes; returns (key, size)"""
+        with self.writer(max_bytes) as writer:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+            return writer.commit(mime_type)
+
+    def writer(self, max_bytes: Optional[int] = None) -> BlobWriter:
+        """Start a blob written chunk by chunk (see BlobWriter)"""
+        return BlobWriter(self, max_bytes)
+
+    def put_bytes(self, data: bytes, mime_type: Optional[str] = None) -> Tuple[str, int]:
+        """Store an in-memory blob; returns (key, size)"""
+        return self.put_stream(io.BytesIO(data), mime_type)
+
+    def exists(self, key: str) -> bool:
+        return self.backend.exists(key)
+
+    def path(self, key: str) -> str:
+        """Local file path of a blob (local backend only)"""
+        return self.backend.path(key)
+
+    def size(self, key: str) -> Optional[int]:
+        return self.backend.size(key)
+
+    def public_url(self, key: str, mime_type: Optional[str] = None) -> Optional[str]:
+        """External URL to redirect to, or None if the blob is served from local disk"""
+        return self.backend.public_url(key, mime_type)
+
+    def public_variant_url(self, key: str, width: int, fmt: str) -> Optional[str]:
+        """External URL of a resized variant (see image_variants.py), or None if it is rendered locally"""
+        return self.backend.public_variant_url(key, width, fmt)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.backend.path(key), 'rb')
+
+blob_store = BlobStore()
@@ -53,6 +53,38 @@ class CloudStorage:
             print(f"Cloudinary upload failed: {e}")
             return self._save_locally(file, file_type)
     
+    def _configure_cloudinary(self):
+        import cloudinary
+        cloudinary.config(
+            cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
+            api_key=os.getenv('CLOUDINARY_API_KEY'),
+            api_secret=os.getenv('CLOUDINARY_API_SECRET')
+        )
+        return cloudinary
+
+    def upload_blob(self, file_path, public_id, mime_type=None):
+        """
+        Upload a blob_store file to Cloudinary under a fixed public id.
+        The id is the content hash, so an existing upload is never replaced.
+        """
+        cloudinary = self._configure_cloudinary()
+        import cloudinary.uploader
+        cloudinary.uploader.upload(
+            file_path,
+            folder="gamer_cred/blobs",
+            public_id=public_id,
+            resource_type='video' if mime_type and mime_type.startswith('video/') else 'image',
+            overwrite=False
+        )
+
+    def blob_url(self, public_id, resource_type='image', transformation=None):
+        """Delivery URL of a blob uploaded with upload_blob, optionally with a transformation (width, format, ...)"""
+        cloudinary = self._configure_cloudinary()
+        import cloudinary.utils
+        url, _ = cloudinary.utils.cloudinary_url(f"gamer_cred/blobs/{public_id}", resource_type=resource_type, secure=True,
+                                                 **(transformation or {}))
+        return url
+    
     def _upload_to_imgbb(self, file):
         """Upload to ImgBB (free image hosting)"""
         try:
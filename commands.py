@@ -3,19 +3,22 @@ from discord import Embed
 import discord
 from typing import Optional
 from storage import GameStorage, get_period_boundaries
+from async_storage import AsyncGameStorage
+from enrichment_worker import EnrichmentWorker
 from constants import MESSAGES, COMMANDS, CHANNEL_ID
-from models import LeaderboardPeriod, LeaderboardType
+from models import LeaderboardType
 import re
 import asyncio
 import pytz
 from discord.ext import tasks
-from datetime import datetime, timedelta
+from datetime import datetime
 import urllib.parse
 
 class GamingCommands(commands.Cog):
     def __init__(self, bot, storage):
         self.bot = bot
-        self.storage = storage
+        # Every storage call is awaited on a DB thread pool so queries never block the bot loop
+        self.storage = storage if isinstance(storage, AsyncGameStorage) else AsyncGameStorage(storage)
         
         # Remove default help command first
         if bot.help_command:
@@ -23,6 +26,13 @@ class GamingCommands(commands.Cog):
         
         print('Commands initialized successfully!')
 
+    async def cog_load(self):
+        # Fill in RAWG metadata for queued games in the background
+        self.enrichment_task = asyncio.create_task(EnrichmentWorker(self.storage.storage).run_forever())
+
+    async def cog_unload(self):
+        self.enrichment_task.cancel()
+
     async def cog_check(self, ctx):
         """Check if the command is being used in the correct channel"""
         if CHANNEL_ID and ctx.channel.id != CHANNEL_ID:
@@ -57,7 +67,7 @@ class GamingCommands(commands.Cog):
             credits_earned = await self.storage.add_gaming_hours(ctx.author.id, hours, game)
 
             # Get game info for the response
-            game_info = self.storage.get_game_info(game)
+            game_info = await self.storage.get_game_info(game)
             if not game_info:
                 # This shouldn't happen since add_gaming_hours should have created the game
                 await ctx.send(f"Error: Could not find game '{game}' after logging hours. Please contact an administrator.")
@@ -162,7 +172,7 @@ class GamingCommands(commands.Cog):
                 await ctx.send("❌ Please provide a game name (!rate <game>)")
                 return
 
-            game_info = self.storage.get_game_info(game)
+            game_info = await self.storage.get_game_info(game)
             if game_info:
                 # Get the user who set the rate
                 setter = None
@@ -197,7 +207,7 @@ class GamingCommands(commands.Cog):
     async def check_balance(self, ctx):
         """Check personal gamer cred balance"""
         try:
-            credits = self.storage.get_user_credits(ctx.author.id)
+            credits = await self.storage.get_user_credits(ctx.author.id)
             if credits == 0:
                 await ctx.send(MESSAGES['no_balance'])
             else:
@@ -209,7 +219,7 @@ class GamingCommands(commands.Cog):
     async def show_leaderboard(self, ctx):
         """Show the gamer cred leaderboard"""
         try:
-            leaderboard = self.storage.get_leaderboard()
+            leaderboard = await self.storage.get_leaderboard()
 
             if not leaderboard:
                 await ctx.send(MESSAGES['no_data'])
@@ -299,7 +309,7 @@ class GamingCommands(commands.Cog):
         """Show a user's leaderboard placement history"""
         try:
             target_user = member or ctx.author
-            history = self.storage.get_user_placement_history(target_user.id)
+            history = await self.storage.get_user_placement_history(target_user.id)
 
             if not history:
                 await ctx.send(f"{target_user.display_name} hasn't placed in any leaderboards yet!")
@@ -354,8 +364,8 @@ class GamingCommands(commands.Cog):
     async def show_history(self, ctx):
         """Show your gaming history and totals per game"""
         try:
-            history = self.storage.get_user_gaming_history(str(ctx.author.id))
-            summaries = self.storage.get_user_game_summaries(str(ctx.author.id))
+            history = await self.storage.get_user_gaming_history(str(ctx.author.id))
+            summaries = await self.storage.get_user_game_summaries(str(ctx.author.id))
 
             if not history:
                 await ctx.send("You haven't logged any gaming sessions yet!")
@@ -401,7 +411,7 @@ class GamingCommands(commands.Cog):
     async def show_achievements(self, ctx):
         """Show your gaming achievements"""
         try:
-            achievements = self.storage.get_user_achievements(ctx.author.id)
+            achievements = await self.storage.get_user_achievements(ctx.author.id)
 
             # Achievement categories and their descriptions
             achievement_categories = {
@@ -477,7 +487,7 @@ class GamingCommands(commands.Cog):
                 await ctx.send("❌ Please provide a game name (!gamestats <game>)")
                 return
 
-            stats = self.storage.get_game_stats(game)
+            stats = await self.storage.get_game_stats(game)
             if not stats:
                 await ctx.send(f"❓ Game '{game}' not found in database\n🌐 View on [Gamer Cred](https://gamercred.onrender.com)")
                 return
@@ -531,7 +541,7 @@ class GamingCommands(commands.Cog):
     async def show_my_game_stats(self, ctx, game: str):
         """Helper function to show game-specific stats"""
         try:
-            stats = self.storage.get_user_game_stats(ctx.author.id, game)
+            stats = await self.storage.get_user_game_stats(ctx.author.id, game)
             if not stats:
                 await ctx.send(f"❓ You haven't played '{game}' yet!")
                 return
@@ -592,7 +602,7 @@ class GamingCommands(commands.Cog):
                 return
 
             # Get overall stats
-            stats = self.storage.get_user_overall_stats(str(ctx.author.id))
+            stats = await self.storage.get_user_overall_stats(str(ctx.author.id))
             if not stats:
                 await ctx.send("You haven't logged any gaming sessions yet!")
                 return
@@ -777,7 +787,7 @@ class GamingCommands(commands.Cog):
                 return
 
             # Add the bonus credits
-            new_total = self.storage.add_bonus_credits(user.id, credits_float, reason, ctx.author.id)
+            new_total = await self.storage.add_bonus_credits(user.id, credits_float, reason, ctx.author.id)
 
             # Determine if this is an addition or reduction
             action_word = "added to" if credits_float > 0 else "removed from"
@@ -823,13 +833,13 @@ class GamingCommands(commands.Cog):
         """Rename a game in the system (Moderator only)"""
         try:
             # Get original game info first
-            old_game_info = self.storage.get_game_info(old_name)
+            old_game_info = await self.storage.get_game_info(old_name)
             if not old_game_info:
                 await ctx.send(f"❌ Game '{old_name}' not found in database")
                 return
 
             # Try to rename the game
-            result = self.storage.rename_game(old_name, new_name, ctx.author.id)
+            result = await self.storage.rename_game(old_name, new_name, ctx.author.id)
             if not result:
                 await ctx.send(f"❌ Failed to rename game. '{new_name}' might already exist.")
                 return
@@ -865,7 +875,7 @@ class GamingCommands(commands.Cog):
                 return
 
             # Try to delete the game
-            result = self.storage.delete_game(game)
+            result = await self.storage.delete_game(game)
             if not result:
                 await ctx.send(f"❌ Game '{game}' not found in database")
                 return
@@ -964,7 +974,7 @@ class GamingCommands(commands.Cog):
                 return
 
             # Get user's overall stats
-            summaries = self.storage.get_user_game_summaries(member.id)
+            summaries = await self.storage.get_user_game_summaries(member.id)
             if not summaries:
                 await ctx.send(f"{member.display_name} hasn't logged any gaming sessions yet!")
                 return
@@ -980,7 +990,7 @@ class GamingCommands(commands.Cog):
             top_games = sorted_games[:5]  # Get top 5 most played games
 
             # Get placement history
-            history = self.storage.get_user_placement_history(member.id)
+            history = await self.storage.get_user_placement_history(member.id)
             weekly_history = [h for h in history if h['type'] == 'weekly'][:3]  # Last 3 weekly placements
             monthly_history = [h for h in history if h['type'] == 'monthly'][:3]  # Last 3 monthly placements
 
@@ -1050,7 +1060,7 @@ class GamingCommands(commands.Cog):
                 )
 
             # Get achievements
-            achievements = self.storage.get_user_achievements(member.id)
+            achievements = await self.storage.get_user_achievements(member.id)
             achieved = sum(1 for v in achievements.values() if v)
             total = len(achievements)
             embed.add_field(
@@ -1067,7 +1077,7 @@ class GamingCommands(commands.Cog):
     async def show_other_user_game_stats(self, ctx, member: discord.Member, game: str):
         """Helper function to show game-specific stats for another user"""
         try:
-            stats = self.storage.get_user_game_stats(member.id, game)
+            stats = await self.storage.get_user_game_stats(member.id, game)
             if not stats:
                 await ctx.send(f"❓ {member.display_name} hasn't played '{game}' yet!")
                 return
@@ -1121,59 +1131,16 @@ class GamingCommands(commands.Cog):
     async def check_periods(self):
         try:
             print("\nChecking leaderboard periods...")
-            utc_now = datetime.now(pytz.UTC)
-            now = utc_now.astimezone(self.storage.cst)
-            print(f"Current time - UTC: {utc_now}, CST: {now}")
-            # Check weekly period
-            weekly_period = await self.storage.get_or_create_current_period(LeaderboardType.WEEKLY)
-            print(f"Weekly period: {weekly_period.start_time} to {weekly_period.end_time} CST")
-            # Check monthly period
-            monthly_period = await self.storage.get_or_create_current_period(LeaderboardType.MONTHLY)
-            print(f"Monthly period: {monthly_period.start_time} to {monthly_period.end_time} CST")
-            # Check if either period has ended
-            if now >= weekly_period.end_time:
-                print("Weekly period has ended - forcing transition")
-                session = self.storage.Session()
-                try:
-                    # Use unified period boundary calculation
-                    start, end = get_period_boundaries(weekly_period.start_time, 'weekly')
-                    placements = await self.storage.get_leaderboard_by_timeframe(LeaderboardType.WEEKLY, self.bot, custom_start=start, custom_end=end)
-                    await self.storage.record_leaderboard_placements(LeaderboardType.WEEKLY, placements, weekly_period)
-                    weekly_period.is_active = False
-                    session.commit()
-                    await self.storage.announce_period_end(self.bot, LeaderboardType.WEEKLY, weekly_period)
-                    new_period = LeaderboardPeriod(
-                        leaderboard_type=LeaderboardType.WEEKLY,
-                        start_time=weekly_period.end_time,
-                        end_time=weekly_period.end_time + timedelta(days=7),
-                        is_active=True
-                    )
-                    session.add(new_period)
-                    session.commit()
-                    print("Created new weekly period")
-                finally:
-                    session.close()
-            if now >= monthly_period.end_time:
-                print("Monthly period has ended - forcing transition")
-                session = self.storage.Session()
-                try:
-                    start, end = get_period_boundaries(monthly_period.start_time, 'monthly')
-                    placements = await self.storage.get_leaderboard_by_timeframe(LeaderboardType.MONTHLY, self.bot, custom_start=start, custom_end=end)
-                    await self.storage.record_leaderboard_placements(LeaderboardType.MONTHLY, placements, monthly_period)
-                    monthly_period.is_active = False
-                    session.commit()
-                    await self.storage.announce_period_end(self.bot, LeaderboardType.MONTHLY, monthly_period)
-                    new_period = LeaderboardPeriod(
-                        leaderboard_type=LeaderboardType.MONTHLY,
-                        start_time=monthly_period.end_time,
-                        end_time=monthly_period.end_time.replace(day=1) + timedelta(days=32),
-                        is_active=True
-                    )
-                    session.add(new_period)
-                    session.commit()
-                    print("Created new monthly period")
-                finally:
-                    session.close()
+            for leaderboard_type in (LeaderboardType.WEEKLY, LeaderboardType.MONTHLY):
+                current_period = await self.storage.get_or_create_current_period(leaderboard_type)
+                print(f"{leaderboard_type.value.capitalize()} period: {current_period.start_time} to {current_period.end_time} CST")
+                # Every ended period is closed in one transaction; one that failed is still active and retried next time
+                for ended_period in await self.storage.get_ended_periods(leaderboard_type):
+                    print(f"{leaderboard_type.value.capitalize()} period {ended_period.id} has ended - closing it")
+                    new_period = await self.storage.roll_over_period(ended_period.id)
+                    # Only the period that just ended is announced; stale periods left open by downtime close quietly
+                    if new_period is not None and new_period.id == current_period.id:
+                        await self.storage.announce_period_end(self.bot, leaderboard_type, ended_period)
         except Exception as e:
             print(f"Error checking periods: {str(e)}")
             import traceback
@@ -0,0 +1,80 @@
+"""
+Closed-form half-life credit calculations.
+
+Two half-life schedules are in use:
+
+- Session schedule (used when logging hours): the rate for hour ``x`` of a
+  user's play on a game is ``cph / 2 ** floor(x / half_life)``. A session's
+  credits depend on the hours already played before it.
+- Total-hours schedule (used by the bulk recalculations): the first
+  ``half_life`` hours earn ``cph``, the next ``2 * half_life`` earn ``cph / 2``,
+  the next ``4 * half_life`` earn ``cph / 4``, and so on.
+
+Both are geometric series, so they are computed directly instead of stepping
+through each half-life boundary. The ``batch_*`` functions take NumPy arrays
+(or anything array-like) and evaluate a whole table of sessions in one pass.
+A half-life of ``None``/NaN or <= 0 means no decay.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+def _has_half_life(half_life_hours: Optional[float]) -> bool:
+    return half_life_hours is not None and not math.isnan(half_life_hours) and half_life_hours > 0
+
+def _cumulative_session_credits(hours: float, base_cph: float, half_life_hours: float) -> float:
+    """Credits for the first `hours` hours of play under the session schedule"""
+    periods = math.floor(hours / half_life_hours)
+    # Full periods: cph * hl * (1 + 1/2 + ... + 1/2**(periods-1)); then the partial period at the decayed rate
+    return (2.0 * base_cph * half_life_hours * (1.0 - 0.5 ** periods)
+            + (hours - periods * half_life_hours) * base_cph * 0.5 ** periods)
+
+def credits_for_session(session_hours: float, prior_hours: float, base_cph: float, half_life_hours: Optional[float] = None) -> float:
+    """Credits for one session given the hours already played on the game before it"""
+    if not _has_half_life(half_life_hours):
+        return session_hours * base_cph
+    return (_cumulative_session_credits(prior_hours + session_hours, base_cph, half_life_hours)
+            - _cumulative_session_credits(prior_hours, base_cph, half_life_hours))
+
+def credits_for_total_hours(hours: float, base_cph: float, half_life_hours: Optional[float] = None) -> float:
+    """Credits for `hours` of play under the total-hours schedule"""
+    if not _has_half_life(half_life_hours):
+        return hours * base_cph
+    if hours <= 0:
+        return 0.0
+    # Segment k is half_life * 2**k hours long at base_cph / 2**k, so every full segment is worth half_life * base_cph
+    segments = math.floor(math.log2(hours / half_life_hours + 1.0))
+    return (segments * half_life_hours * base_cph
+            + (hours - half_life_hours * (2.0 ** segments - 1.0)) * base_cph / 2.0 ** segments)
+
+def _as_arrays(*columns):
+    arrays = np.broadcast_arrays(*[np.asarray(column, dtype=np.float64) for column in columns])
+    return [np.array(array) for array in arrays]
+
+def batch_credits_for_sessions(hours, prior_hours, cph, half_life) -> np.ndarray:
+    """Vectorized credits_for_session over arrays of (hours, prior_hours, cph, half_life)"""
+    hours, prior_hours, cph, half_life = _as_arrays(hours, prior_hours, cph, half_life)
+    decays = np.isfinite(half_life) & (half_life > 0)
+    safe_half_life = np.where(decays, half_life, 1.0)
+
+    def cumulative(total_hours):
+        periods = np.floor(total_hours / safe_half_life)
+        decay = np.exp2(-periods)
+        return 2.0 * cph * safe_half_life * (1.0 - decay) + (total_hours - periods * safe_half_life) * cph * decay
+
+    decayed = cumulative(prior_hours + hours) - cumulative(prior_hours)
+    return np.where(decays, decayed, hours * cph)
+
+def batch_credits_for_total_hours(hours, cph, half_life) -> np.ndarray:
+    """Vectorized credits_for_total_hours over arrays of (hours, cph, half_life)"""
+    hours, cph, half_life = _as_arrays(hours, cph, half_life)
+    decays = np.isfinite(half_life) & (half_life > 0)
+    safe_half_life = np.where(decays, half_life, 1.0)
+    segments = np.floor(np.log2(np.maximum(hours, 0.0) / safe_half_life + 1.0))
+    decayed = np.where(hours > 0,
+                       segments * safe_half_life * cph
+                       + (hours - safe_half_life * (np.exp2(segments) - 1.0)) * cph * np.exp2(-segments),
+                       0.0)
+    return np.where(decays, decayed, hours * cph)
@@ -0,0 +1,170 @@
+"""
+Database connection pool configuration and metrics.
+
+Every process that talks to Postgres (each gunicorn worker, the Discord bot,
+scripts) builds its engine through create_pooled_engine so pool sizes come
+from one place and together stay under the database's connection limit.
+
+Settings are read from the environment:
+- DB_MAX_CONNECTIONS  connections this service may hold in total (default 20)
+- WEB_CONCURRENCY     processes sharing that budget (gunicorn workers, default 1;
+                      gunicorn_config.py defaults it to default_process_count())
+- DB_POOL_SIZE        persistent connections per process (default: half the per-process share)
+- DB_MAX_OVERFLOW     extra connections per process under load (default: the rest of the share)
+- DB_POOL_TIMEOUT     seconds to wait for a free connection before failing (default 10)
+- DB_POOL_RECYCLE     seconds before a connection is replaced (default 1800)
+- DB_POOL_PRE_PING    test connections before use, "true"/"false" (default true)
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Checkouts that wait longer than this count as contended
+SLOW_CHECKOUT_SECONDS = 0.05
+# Fewest connections a process should get from the budget; a page fans out several queries at once
+MIN_CONNECTIONS_PER_PROCESS = 5
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}, using {default}")
+        return default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def connection_budget() -> int:
+    """Connections this service may hold in total across its processes"""
+    return max(1, _env_int('DB_MAX_CONNECTIONS', 20))
+
+def default_process_count(cpu_count: int) -> int:
+    """Worker processes to run when WEB_CONCURRENCY isn't set: 2 * CPUs + 1, as long as the budget allows each
+    of them MIN_CONNECTIONS_PER_PROCESS connections"""
+    return max(1, min(cpu_count * 2 + 1, connection_budget() // MIN_CONNECTIONS_PER_PROCESS))
+
+def pool_settings() -> Dict[str, Any]:
+    """Resolve the pool settings for this process from the environment"""
+    budget = connection_budget()
+    processes = max(1, _env_int('WEB_CONCURRENCY', 1))
+    per_process = max(2, budget // processes)
+
+    pool_size = max(1, _env_int('DB_POOL_SIZE', per_process // 2))
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max(0, _env_int('DB_MAX_OVERFLOW', per_process - pool_size)),
+        'pool_timeout': max(1, _env_int('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+class PoolMetrics:
+    """Checkout wait and saturation counters for one connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+
+    def record_checkout(self, wait: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if wait > SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        with self._lock:
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            checked_out = pool.checkedout()
+            return {
+                'pid': os.getpid(),
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'capacity': capacity,
+                'checked_out': checked_out,
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'saturation': round(checked_out / capacity, 3) if capacity else 0.0,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_saturation': round(self.peak_checked_out / capacity, 3) if capacity else 0.0,
+                'checkouts': self.checkouts,
+                'slow_checkouts': self.slow_checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            logger.warning(f"Database pool exhausted: {self.status()}")
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+def create_pooled_engine(database_url: str, **overrides):
+    """Create an engine with the configured, instrumented pool"""
+    settings = pool_settings()
+    settings.update(overrides)
+    engine = create_engine(database_url, poolclass=InstrumentedQueuePool, **settings)
+    logger.info(f"Database pool: size={settings['pool_size']} overflow={settings['max_overflow']} "
+                f"recycle={settings['pool_recycle']} pre_ping={settings['pool_pre_ping']}")
+
+    # A forked child (gunicorn preload_app) must not reuse the parent's sockets;
+    # drop the inherited pool without closing the parent's connections
+    engine_ref = weakref.ref(engine)
+
+    def _reset_pool_after_fork():
+        forked_engine = engine_ref()
+        if forked_engine is not None:
+            forked_engine.dispose(close=False)
+
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+    return engine
+
+def pool_metrics(engine) -> Dict[str, Any]:
+    """Current metrics for an engine created by create_pooled_engine"""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {'pid': os.getpid(), 'status': pool.status()}
+    return pool.metrics.snapshot(pool)
@@ -0,0 +1,249 @@
+"""
+Shared Discord REST client for user profile lookups.
+
+One aiohttp session per process keeps connections to Discord alive, and a
+semaphore bounds how many requests are in flight at once. Discord's
+X-RateLimit-* headers are tracked per bucket. A request waits for its
+bucket to reset instead of collecting 429s, and a 429 is retried after the
+Retry-After delay Discord asks for.
+
+A profile is looked up with the guild member endpoint first, because our
+users are members of the server. The global user endpoint is only used
+when the user is not a member. Concurrent lookups of the same user share a
+single request.
+
+Settings are read from the environment:
+- DISCORD_TOKEN            bot token used for the lookups
+- DISCORD_GUILD_ID         guild whose member endpoint is tried first
+- DISCORD_API_URL          API base URL (default https://discord.com/api/v10)
+- DISCORD_MAX_CONCURRENCY  requests in flight per process (default 10)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = 'https://discord.com/api/v10'
+DEFAULT_GUILD_ID = '693741073394040843'
+DEFAULT_MAX_CONCURRENCY = 10
+# Attempts per request when Discord answers 429
+MAX_ATTEMPTS = 3
+REQUEST_TIMEOUT_SECONDS = 10
+
+def avatar_url_for(user_id: str, avatar_hash: Optional[str]) -> str:
+    """CDN URL for a user's avatar, or their default avatar when none is set"""
+    if avatar_hash:
+        extension = 'gif' if avatar_hash.startswith('a_') else 'png'
+        return f"https://cdn.discordapp.com/avatars/{user_id}/{avatar_hash}.{extension}"
+    return f"https://cdn.discordapp.com/embed/avatars/{int(user_id[-1]) % 6}.png"
+
+class RateLimitBucket:
+    """Remaining requests and reset time for one Discord rate limit bucket"""
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.window = 0.0
+        self.limited = True
+        self._probe: Optional[asyncio.Event] = None
+
+    async def acquire(self) -> Optional[asyncio.Event]:
+        """
+        Wait until the bucket has a request left and reserve it. Returns a probe token when this request
+        is the one sent to learn the limits; pass it to release() once the request has finished.
+        """
+        while self.limited:
+            if self.remaining is None:
+                # Limits unknown (first use or a new window): send one request to learn them
+                if self._probe is None:
+                    self._probe = asyncio.Event()
+                    return self._probe
+                await self._probe.wait()
+            elif self.remaining > 0:
+                self.remaining -= 1
+                return
+            else:
+                delay = self.reset_at - time.monotonic()
+                if delay <= 0:
+                    self.remaining = None
+                else:
+                    await asyncio.sleep(delay)
+        return None
+
+    def release(self, probe: Optional[asyncio.Event]) -> None:
+        """Let requests waiting on a probe continue once it has finished; only the probe's own request releases it"""
+        if probe is None:
+            return
+        probe.set()
+        if self._probe is probe:
+            self._probe = None
+
+    def update(self, headers) -> None:
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        if remaining is None or reset_after is None:
+            if self.remaining is None:
+                # Route without rate limit headers
+                self.limited = False
+            return
+        # X-RateLimit-Reset identifies the window; responses can arrive out of order
+        window = float(headers.get('X-RateLimit-Reset') or time.time() + float(reset_after))
+        if window > self.window:
+            self.window = window
+            self.remaining = int(remaining)
+            self.reset_at = time.monotonic() + float(reset_after)
+        elif window == self.window and self.remaining is not None:
+            self.remaining = min(int(remaining), self.remaining)
+
+class DiscordClient:
+    """Pooled, rate-limited Discord API client with coalesced profile lookups"""
+
+    def __init__(self, token: Optional[str] = None, guild_id: Optional[str] = None,
+                 api_url: Optional[str] = None, max_concurrency: Optional[int] = None):
+        self._token = token
+        self._guild_id = guild_id
+        self._api_url = api_url
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv('DISCORD_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+        self._route_buckets: Dict[str, str] = {}
+        self._global_reset_at = 0.0
+        self.stats = {'requests': 0, 'rate_limited': 0, 'coalesced': 0}
+
+    # Read lazily so load_dotenv() may run after import
+    @property
+    def token(self) -> Optional[str]:
+        return self._token or os.getenv('DISCORD_TOKEN')
+
+    @property
+    def guild_id(self) -> str:
+        return self._guild_id or os.getenv('DISCORD_GUILD_ID', DEFAULT_GUILD_ID)
+
+    @property
+    def api_url(self) -> str:
+        return (self._api_url or os.getenv('DISCORD_API_URL', DEFAULT_API_URL)).rstrip('/')
+
+    def _bind_loop(self) -> None:
+        """Create the session and per-loop state for the running loop (a new loop after fork gets fresh ones)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._session is not None and not self._session.closed:
+            return
+        self._loop = loop
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+            headers={'Authorization': f'Bot {self.token}'}
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._inflight = {}
+
+    def _bucket(self, route: str, major: str) -> RateLimitBucket:
+        # Until Discord names the bucket, every route is its own bucket
+        key = (self._route_buckets.get(route, route), major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RateLimitBucket()
+        return bucket
+
+    async def _request(self, route: str, major: str, path: str) -> Tuple[int, Any]:
+        """GET path, respecting rate limits; returns (status, JSON body or None)"""
+        self._bind_loop()
+        for attempt in range(MAX_ATTEMPTS):
+            global_delay = self._global_reset_at - time.monotonic()
+            if global_delay > 0:
+                await asyncio.sleep(global_delay)
+
+            # Wait on the bucket before taking a slot so other buckets keep flowing meanwhile
+            bucket = self._bucket(route, major)
+            probe = await bucket.acquire()
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    async with self._session.get(f"{self.api_url}{path}") as response:
+                        bucket_name = response.headers.get('X-RateLimit-Bucket')
+                        if bucket_name and self._route_buckets.get(route) != bucket_name:
+                            # Keep what this bucket has learned when Discord tells us its name
+                            self._route_buckets[route] = bucket_name
+                            self._buckets.setdefault((bucket_name, major), bucket)
+                        self._bucket(route, major).update(response.headers)
+
+                        if response.status == 429:
+                            self.stats['rate_limited'] += 1
+                            body = await response.json(content_type=None) or {}
+                            retry_after = float(body.get('retry_after') or response.headers.get('Retry-After') or 1)
+                            if body.get('global') or response.headers.get('X-RateLimit-Global'):
+                                self._global_reset_at = time.monotonic() + retry_after
+                            else:
+                                limited = self._bucket(route, major)
+                                limited.remaining = 0
+                                limited.reset_at = max(limited.reset_at, time.monotonic() + retry_after)
+                            logger.warning(f"Discord rate limited {route} (attempt {attempt + 1}), retrying in {retry_after:.2f}s")
+                            continue
+
+                        body = await response.json(content_type=None) if response.status == 200 else None
+                        return response.status, body
+            finally:
+                bucket.release(probe)
+        return 429, None
+
+    async def _fetch_profile(self, user_id: str) -> Optional[Dict[str, str]]:
+        try:
+            status, member = await self._request('GET /guilds/{guild_id}/members/{user_id}', self.guild_id,
+                                                 f"/guilds/{self.guild_id}/members/{user_id}")
+            if status == 200 and member:
+                user = member.get('user', {})
+                username = user.get('username') or member.get('nick')
+                if username:
+                    return {'username': username, 'avatar_url': avatar_url_for(user_id, user.get('avatar'))}
+
+            # Not a member of the guild (or no usable data): fall back to the global user
+            if status in (200, 403, 404):
+                status, user = await self._request('GET /users/{user_id}', '', f"/users/{user_id}")
+                if status == 200 and user and user.get('username'):
+                    return {'username': user['username'], 'avatar_url': avatar_url_for(user_id, user.get('avatar'))}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Discord lookup failed for user {user_id}: {str(e)}")
+        return None
+
+    async def get_user_profile(self, user_id) -> Optional[Dict[str, str]]:
+        """{'username', 'avatar_url'} for a user, or None if Discord could not return it"""
+        if not self.token:
+            logger.warning("DISCORD_TOKEN not set, skipping Discord lookups")
+            return None
+        self._bind_loop()
+        user_id = str(user_id)
+        future = self._inflight.get(user_id)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._fetch_profile(user_id))
+        self._inflight[user_id] = future
+        future.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        return await asyncio.shield(future)
+
+    async def get_user_profiles(self, user_ids: Iterable) -> Dict[str, Dict[str, str]]:
+        """Profiles for several users fetched concurrently; users Discord could not return are left out"""
+        if not self.token:
+            logger.warning("DISCORD_TOKEN not set, skipping Discord lookups")
+            return {}
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        profiles = await asyncio.gather(*[self.get_user_profile(user_id) for user_id in ids])
+        return {user_id: profile for user_id, profile in zip(ids, profiles) if profile}
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+discord_client = DiscordClient()
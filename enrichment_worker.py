@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Worker for the game_enrichment_jobs queue.
+
+Games that need RAWG metadata are queued by the writes that create or
+re-rate them (GameStorage.enqueue_game_enrichment). This worker claims due
+jobs with FOR UPDATE SKIP LOCKED, so the bot, the website and a standalone
+process can all run it against the same queue. It looks the games up on
+RAWG with bounded concurrency and writes the results back.
+
+- A failed request is retried with exponential backoff, up to MAX_ATTEMPTS.
+- A game RAWG has no match for is marked 'not_found' and looked up again
+  after NOT_FOUND_RETRY_DAYS (negative caching).
+- A job left 'running' by a worker that died is picked up again after
+  STALE_LOCK_MINUTES.
+
+Run standalone with: python enrichment_worker.py [--once]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# RAWG lookups in flight at once
+RAWG_CONCURRENCY = int(os.getenv('RAWG_CONCURRENCY', 4))
+BATCH_SIZE = 20
+POLL_INTERVAL_SECONDS = 30
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 60 * 60
+NOT_FOUND_RETRY_DAYS = 7
+STALE_LOCK_MINUTES = 10
+
+class EnrichmentWorker:
+    """Claim queued games, fetch their RAWG metadata and store it"""
+
+    def __init__(self, storage, concurrency: int = RAWG_CONCURRENCY, batch_size: int = BATCH_SIZE,
+                 poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.storage = storage
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+
+    async def _run_db(self, func, *args):
+        # DB work happens on a thread so it never blocks the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._db_call, func, args)
+
+    def _db_call(self, func, args):
+        try:
+            return func(*args)
+        finally:
+            self.storage.Session.remove()
+
+    def claim_jobs(self, limit: int) -> List[Dict[str, Any]]:
+        """Mark up to limit due jobs as running and return them"""
+        session = self.storage.Session()
+        try:
+            rows = session.execute(text("""
+                UPDATE game_enrichment_jobs AS j
+                SET status = 'running',
+                    attempts = j.attempts + 1,
+                    locked_at = LOCALTIMESTAMP,
+                    updated_at = LOCALTIMESTAMP
+                FROM games g
+                WHERE j.id IN (
+                    SELECT id FROM game_enrichment_jobs
+                    WHERE (status IN ('pending', 'not_found') AND next_attempt_at <= LOCALTIMESTAMP)
+                       OR (status = 'running' AND locked_at < LOCALTIMESTAMP - make_interval(mins => :stale_minutes))
+                    ORDER BY next_attempt_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                AND g.id = j.game_id
+                RETURNING j.id, j.game_id, j.force, j.attempts, g.name
+            """), {"limit": limit, "stale_minutes": STALE_LOCK_MINUTES}).fetchall()
+            session.commit()
+            return [{'id': row.id, 'game_id': row.game_id, 'force': row.force,
+                     'attempts': row.attempts, 'name': row.name} for row in rows]
+        except Exception:
+            session.rollback()
+            raise
+
+    def complete_job(self, job: Dict[str, Any], details: Optional[Dict[str, Any]]) -> None:
+        """Store the fetched metadata (only filling gaps unless forced) and close the job"""
+        session = self.storage.Session()
+        try:
+            if details is None:
+                session.execute(text("""
+                    UPDATE game_enrichment_jobs
+                    SET status = 'not_found', force = FALSE, attempts = 0, last_error = NULL,
+                        next_attempt_at = LOCALTIMESTAMP + make_interval(days => :days),
+                        locked_at = NULL, updated_at = LOCALTIMESTAMP
+                    WHERE id = :id
+                """), {"id": job['id'], "days": NOT_FOUND_RETRY_DAYS})
+            else:
+                session.execute(text("""
+                    UPDATE games
+                    SET rawg_id = CASE WHEN :force OR rawg_id IS NULL THEN :rawg_id ELSE rawg_id END,
+                        box_art_url = CASE WHEN :force OR box_art_url IS NULL OR box_art_url = ''
+                                           THEN COALESCE(:box_art_url, box_art_url) ELSE box_art_url END,
+                        release_date = CASE WHEN :force OR release_date IS NULL
+                                            THEN COALESCE(:release_date, release_date) ELSE release_date END,
+                        description = CASE WHEN :force OR description IS NULL OR description = ''
+                                           THEN COALESCE(:description, description) ELSE description END
+                    WHERE id = :game_id
+                """), {"game_id": job['game_id'], "force": job['force'],
+                       "rawg_id": details.get('rawg_id'), "box_art_url": details.get('box_art_url'),
+                       "release_date": details.get('release_date'), "description": details.get('description')})
+                session.execute(text("""
+                    UPDATE game_enrichment_jobs
+                    SET status = 'done', force = FALSE, last_error = NULL,
+                        locked_at = NULL, updated_at = LOCALTIMESTAMP
+                    WHERE id = :id
+                """), {"id": job['id']})
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    def fail_job(self, job: Dict[str, Any], error: str) -> None:
+        """Schedule a retry with exponential backoff, or give up after MAX_ATTEMPTS"""
+        session = self.storage.Session()
+        try:
+            delay = min(RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1), RETRY_MAX_SECONDS)
+            session.execute(text("""
+                UPDATE game_enrichment_jobs
+                SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+                    next_attempt_at = LOCALTIMESTAMP + make_interval(secs => :delay),
+                    last_error = :error, locked_at = NULL, updated_at = LOCALTIMESTAMP
+                WHERE id = :id
+            """), {"id": job['id'], "max_attempts": MAX_ATTEMPTS, "delay": delay, "error": error[:500]})
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    async def _process(self, job, http_session, semaphore) -> bool:
+        async with semaphore:
+            try:
+                details = await self.storage.search_rawg_game(job['name'], http_session)
+            except Exception as e:
+                logger.warning(f"RAWG lookup for {job['name']} failed (attempt {job['attempts']}): {str(e)}")
+                await self._run_db(self.fail_job, job, str(e) or type(e).__name__)
+                return False
+        await self._run_db(self.complete_job, job, details)
+        return True
+
+    async def run_once(self) -> int:
+        """Process one batch of due jobs; returns how many were claimed"""
+        if not os.getenv('RAWG_API_KEY'):
+            logger.warning("RAWG_API_KEY not set, game enrichment is paused")
+            return 0
+        jobs = await self._run_db(self.claim_jobs, self.batch_size)
+        if not jobs:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as http_session:
+            await asyncio.gather(*[self._process(job, http_session, semaphore) for job in jobs])
+        return len(jobs)
+
+    async def run_until_empty(self) -> int:
+        """Process batches until no job is due; returns how many jobs were claimed"""
+        total = 0
+        while True:
+            claimed = await self.run_once()
+            total += claimed
+            if claimed < self.batch_size:
+                return total
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_until_empty()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing game enrichment jobs: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from storage import GameStorage
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    worker = EnrichmentWorker(GameStorage())
+    try:
+        if '--once' in sys.argv:
+            print(f"✅ Processed {asyncio.run(worker.run_until_empty())} enrichment jobs")
+        else:
+            asyncio.run(worker.run_forever())
+    except KeyboardInterrupt:
+        print("\nEnrichment worker stopped")
@@ -5,6 +5,7 @@ import pytz
 from storage import GameStorage, get_period_boundaries
 from models import LeaderboardType, LeaderboardPeriod, LeaderboardHistory
 from sqlalchemy import and_, func, create_engine, text
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 import os
 import argparse
@@ -33,10 +34,12 @@ args = parser.parse_args()
 
 # Test database connection first
 try:
-    engine = create_engine(DATABASE_URL)
+    # One-off probe; don't keep an idle pool open next to GameStorage's
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
     with engine.connect() as connection:
         result = connection.execute(text("SELECT 1"))
         print("Database connection successful!")
+    engine.dispose()
 except Exception as e:
     print(f"Error connecting to database: {str(e)}")
     raise
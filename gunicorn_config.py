@@ -1,13 +1,24 @@
 import multiprocessing
 import os
 
+import db_pool
+
 # Server socket
 bind = "0.0.0.0:" + str(os.getenv("PORT", "10000"))
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
+# Each worker sizes its database pool from its share of DB_MAX_CONNECTIONS (see db_pool.py), so by
+# default there are only as many workers as leave each of them a usable pool
+workers = int(os.getenv("WEB_CONCURRENCY", db_pool.default_process_count(multiprocessing.cpu_count())))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# Threaded workers: each request gets a thread, and async views share one event loop per
+# worker (background_loop.py), so requests waiting on Discord/RAWG don't pin the worker.
+# There is one thread per connection in the worker's pool (its DB executor is sized the same,
+# see async_storage.py), so requests queue for a thread rather than time out waiting on the pool
+worker_class = 'gthread'
+pool = db_pool.pool_settings()
+threads = int(os.getenv("GUNICORN_THREADS", pool['pool_size'] + pool['max_overflow']))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
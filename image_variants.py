@@ -0,0 +1,184 @@
+"""
+Resized WebP/JPEG variants of images in blob_store, for srcset.
+
+Variants of a blob are rendered together from a single decode of the
+original, in a process pool so Pillow never holds the GIL of a web worker.
+They are rendered at upload time (schedule) and again on demand if they are
+missing (get_variant), e.g. for uploads from before this module existed or
+a fresh disk after a deploy. Each variant is written once, atomically, to
+
+    <BLOB_STORE_DIR>/variants/ab/cd/<blob key>/<width>.<format>
+
+A variant never changes for a given key, so it can be cached forever.
+Originals narrower than a width are not upscaled; the variant is the
+original's size. EXIF (including GPS), ICC and other metadata are dropped.
+
+With the cloudinary blob backend, variants come from Cloudinary URL
+transformations instead and nothing is rendered here.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280, 1920)
+VARIANT_FORMATS = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+VARIANT_QUALITY = {'webp': 80, 'jpg': 82}
+# Width used for grid thumbnails
+THUMBNAIL_WIDTH = 640
+# Processes rendering variants per web worker
+VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', 2))
+# How long a request waits for a missing variant to be rendered
+RENDER_TIMEOUT_SECONDS = 20
+
+_BLOB_KEY = re.compile(r'^[0-9a-f]{64}$')
+FAILED_MARKER = 'failed'
+
+def variant_url(blob_key: str, width: int, fmt: str = 'webp') -> str:
+    return f'/api/media/{blob_key}/{width}.{fmt}'
+
+def srcset(blob_key: str, fmt: str = 'webp') -> str:
+    """srcset attribute value listing every width of one format"""
+    return ', '.join(f'{variant_url(blob_key, width, fmt)} {width}w' for width in VARIANT_WIDTHS)
+
+def responsive_image(blob_key: Optional[str]) -> Dict[str, Optional[str]]:
+    """Fields the listing APIs add for an image so the page can use <picture>/srcset"""
+    if not blob_key:
+        return {'thumbnail_url': None, 'srcset': None, 'srcset_jpeg': None}
+    return {
+        'thumbnail_url': variant_url(blob_key, THUMBNAIL_WIDTH, 'webp'),
+        'srcset': srcset(blob_key, 'webp'),
+        'srcset_jpeg': srcset(blob_key, 'jpg'),
+    }
+
+def is_variant(blob_key: str, width: int, fmt: str) -> bool:
+    return bool(_BLOB_KEY.match(blob_key)) and width in VARIANT_WIDTHS and fmt in VARIANT_FORMATS
+
+def render_variants(source_path: str, output_dir: str) -> List[str]:
+    """Write every width/format of one image into output_dir; returns the file names written"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    try:
+        original = Image.open(source_path)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        # Not an image Pillow can (or should) decode; don't try again on every request
+        with open(os.path.join(output_dir, FAILED_MARKER), 'w') as marker:
+            marker.write(str(e))
+        raise
+    with original:
+        # Let the JPEG decoder scale down while decoding when even the largest variant is smaller
+        original.draft('RGB', (max(VARIANT_WIDTHS), max(VARIANT_WIDTHS)))
+        # First frame of animated GIF/WebP; variants are stills
+        original.seek(0)
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+        for width in VARIANT_WIDTHS:
+            if width < image.width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+            else:
+                resized = image
+            for fmt in VARIANT_FORMATS:
+                frame = resized.convert('RGB') if fmt == 'jpg' and resized.mode != 'RGB' else resized
+                # Re-encoding without exif/icc_profile and with empty info drops all metadata
+                frame.info = {}
+                fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as temp_file:
+                        if fmt == 'jpg':
+                            frame.save(temp_file, format='JPEG', quality=VARIANT_QUALITY[fmt],
+                                       optimize=True, progressive=True)
+                        else:
+                            frame.save(temp_file, format='WEBP', quality=VARIANT_QUALITY[fmt], method=4)
+                    os.replace(temp_path, os.path.join(output_dir, f'{width}.{fmt}'))
+                except BaseException:
+                    os.remove(temp_path)
+                    raise
+                written.append(f'{width}.{fmt}')
+    return written
+
+class ImageVariants:
+    """Render variants in a process pool and find them on disk"""
+
+    def __init__(self, store=blob_store, max_workers: int = VARIANT_WORKERS):
+        self.store = store
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.RLock()
+        self._inflight = {}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # One pool per process: a pool inherited across a gunicorn fork is unusable.
+        # spawn, because forking a threaded worker can copy held locks into the child.
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def directory(self, blob_key: str) -> str:
+        return os.path.join(self.store.root, 'variants', blob_key[:2], blob_key[2:4], blob_key)
+
+    def path(self, blob_key: str, width: int, fmt: str) -> str:
+        return os.path.join(self.directory(blob_key), f'{width}.{fmt}')
+
+    def public_url(self, blob_key: str, width: int, fmt: str) -> Optional[str]:
+        """External URL of a variant, or None if it is served from local disk"""
+        return self.store.public_variant_url(blob_key, width, fmt)
+
+    def schedule(self, blob_key: str):
+        """Start rendering a blob's variants without waiting; concurrent calls share one render"""
+        if self.store.public_variant_url(blob_key, VARIANT_WIDTHS[0], 'webp'):
+            return None
+        with self._lock:
+            future = self._inflight.get(blob_key)
+            if future is not None:
+                return future
+            future = self._pool().submit(render_variants, self.store.path(blob_key), self.directory(blob_key))
+            self._inflight[blob_key] = future
+        future.add_done_callback(lambda done: self._finished(blob_key, done))
+        return future
+
+    def _finished(self, blob_key: str, future) -> None:
+        with self._lock:
+            self._inflight.pop(blob_key, None)
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            # A render process died (e.g. killed for memory); start a new pool next time
+            logger.warning(f"Image variant pool broke while rendering blob {blob_key}")
+            with self._lock:
+                self._executor = None
+        elif error is not None:
+            logger.warning(f"Could not render variants of blob {blob_key}: {error}")
+
+    def get_variant(self, blob_key: str, width: int, fmt: str) -> Optional[str]:
+        """Local path of a variant, rendering it first if it is missing; None if it can't be rendered"""
+        path = self.path(blob_key, width, fmt)
+        if os.path.exists(path):
+            return path
+        if not self.store.exists(blob_key) or os.path.exists(os.path.join(self.directory(blob_key), FAILED_MARKER)):
+            return None
+        try:
+            self.schedule(blob_key).result(timeout=RENDER_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Variant {width}.{fmt} of blob {blob_key} not available: {e}")
+            return None
+        return path if os.path.exists(path) else None
+
+image_variants = ImageVariants()
@@ -12,6 +12,7 @@ from constants import TOKEN, COMMAND_PREFIX
 from keepalive import keep_alive
 import asyncio
 from storage import GameStorage  # Add this import
+from async_storage import AsyncGameStorage
 import logging
 
 # Set up logging
@@ -101,7 +102,8 @@ async def async_main():
     try:
         logger.info("Initializing database...")
         # Initialize the database before starting the bot
-        storage = GameStorage()
+        # Bot commands await storage on a DB thread pool instead of querying on the event loop
+        storage = AsyncGameStorage(GameStorage())
         logger.info("Database initialized successfully!")
         
         logger.info("Starting bot...")
@@ -0,0 +1,188 @@
+"""
+Disk-backed, byte-bounded cache for media the website serves out of the database.
+
+Background files uploaded before the blob store existed are base64 text in
+user_preferences. Decoding one per request is slow. Keeping the decoded
+bytes in a per-worker dict (the old background_file_cache) held up to 100MB
+per user in every gunicorn worker. This cache keeps decoded files on local
+disk instead:
+
+- shared by every worker on the host (MEDIA_CACHE_DIR)
+- bounded by MEDIA_CACHE_MAX_BYTES in total; the least recently used
+  entries are evicted first
+- entries unused for MEDIA_CACHE_TTL_SECONDS are dropped
+- filled once per key: concurrent misses, even from other workers, wait on
+  a file lock for the first fill instead of decoding the file again
+- responses are served from the file, so a worker never holds a whole file
+  in memory and Range requests work
+
+Keys should include a version of the source, so a changed source gets a
+new entry instead of serving a stale one.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), 'gamercred-media-cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# Don't rewrite an entry's access time more often than this on hits
+TOUCH_INTERVAL_SECONDS = 60
+
+class MediaCache:
+    """Files on local disk, keyed by string, with a total byte budget and LRU/TTL eviction"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None):
+        self.directory = directory or os.getenv('MEDIA_CACHE_DIR', DEFAULT_DIR)
+        self.max_bytes = max_bytes or int(os.getenv('MEDIA_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        self.ttl_seconds = ttl_seconds or int(os.getenv('MEDIA_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'fills': 0, 'evictions': 0, 'oversized': 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[counter] += amount
+
+    def _open_fresh(self, path: str) -> Optional[BinaryIO]:
+        """Open an entry if it exists and has not expired, marking it as recently used"""
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        used_at = os.fstat(file.fileno()).st_mtime
+        if now - used_at > self.ttl_seconds:
+            file.close()
+            return None
+        if now - used_at > TOUCH_INTERVAL_SECONDS:
+            try:
+                # mtime is the LRU clock (atime is often disabled on the mount)
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return file
+
+    def get_or_fill(self, key: str, fill: Callable[[BinaryIO], None], size_hint: Optional[int] = None) -> BinaryIO:
+        """
+        The cached file for key, opened for reading. On a miss, fill(file) writes
+        the content first; other processes missing the same key wait for it.
+        The returned file stays readable even if the entry is evicted meanwhile.
+        """
+        path = self._path(key)
+        file = self._open_fresh(path)
+        if file:
+            self._count('hits')
+            return file
+        self._count('misses')
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have filled it while we waited for the lock
+                file = self._open_fresh(path)
+                if file:
+                    return file
+                if size_hint and size_hint > self.max_bytes:
+                    self._count('oversized')
+                    return self._fill_uncached(fill)
+                self._evict(reserve=size_hint or 0)
+                fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as temp_file:
+                        fill(temp_file)
+                    os.replace(temp_path, path)
+                except BaseException:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+                self._count('fills')
+                file = open(path, 'rb')
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        if not size_hint:
+            self._evict()
+        return file
+
+    def _fill_uncached(self, fill: Callable[[BinaryIO], None]) -> BinaryIO:
+        # Larger than the whole budget: serve from an anonymous temp file that disappears on close
+        file = tempfile.TemporaryFile(dir=self.directory)
+        try:
+            fill(file)
+            file.seek(0)
+            return file
+        except BaseException:
+            file.close()
+            raise
+
+    def _evict(self, reserve: int = 0) -> None:
+        """Drop expired entries, then the least recently used ones until reserve more bytes fit the budget"""
+        entries = []
+        total = 0
+        now = time.time()
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(('.lock', '.tmp')) or not entry.is_file():
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if now - stat.st_mtime > self.ttl_seconds:
+                        self._remove(entry.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except FileNotFoundError:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total + reserve <= self.max_bytes:
+                break
+            # Readers that already opened the file keep reading it after the unlink
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+            self._count('evictions')
+        except FileNotFoundError:
+            pass
+        try:
+            os.remove(path + '.lock')
+        except FileNotFoundError:
+            pass
+
+    def size(self) -> int:
+        """Bytes currently cached on disk, across all processes"""
+        try:
+            with os.scandir(self.directory) as scan:
+                return sum(entry.stat().st_size for entry in scan
+                           if entry.is_file() and not entry.name.endswith(('.lock', '.tmp')))
+        except FileNotFoundError:
+            return 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """This process's counters plus the shared size on disk"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['bytes'] = self.size()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+media_cache = MediaCache()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Migration script to move uploaded background images and videos out of
+user_preferences.background_image_data / background_video_data (base64 in
+Text columns) into the content-addressed blob store. There,
+image_variants.py can serve resized copies of images and videos are
+streamed from disk.
+
+It adds the background_image_blob_key and background_video_blob_key columns,
+then moves rows in small batches. It is safe to re-run or interrupt: only
+rows without a blob key are moved. Run VACUUM FULL user_preferences
+afterwards to give the freed space back to the operating system.
+"""
+
+import base64
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Rows per batch; keeps at most this many decoded files in memory
+BATCH_SIZE = 20
+
+def add_columns():
+    """Add the background blob key columns"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        print("Adding background_image_blob_key and background_video_blob_key columns...")
+        cursor.execute("ALTER TABLE user_preferences ADD COLUMN IF NOT EXISTS background_image_blob_key VARCHAR(64)")
+        cursor.execute("ALTER TABLE user_preferences ADD COLUMN IF NOT EXISTS background_video_blob_key VARCHAR(64)")
+
+        # Commit changes
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Columns ready")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error adding columns: {str(e)}")
+        return False
+
+def move_backgrounds(file_type):
+    """Move background_<file_type>_data into the blob store batch by batch"""
+
+    database_url = os.getenv('DATABASE_URL')
+    data_column = f"background_{file_type}_data"
+    key_column = f"background_{file_type}_blob_key"
+    mime_column = f"background_{file_type}_mime_type"
+
+    try:
+        # Add the project root to the path so we can import blob_store
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from blob_store import blob_store
+
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        moved = 0
+        moved_bytes = 0
+        last_id = 0
+        while True:
+            cursor.execute(f"""
+                SELECT id, {data_column}, {mime_column}
+                FROM user_preferences
+                WHERE {key_column} IS NULL AND {data_column} IS NOT NULL AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            for prefs_id, file_data, mime_type in rows:
+                last_id = prefs_id
+                try:
+                    data = base64.b64decode(file_data)
+                except Exception as e:
+                    print(f"⚠️ Skipping preferences {prefs_id}: invalid base64 ({str(e)})")
+                    continue
+                blob_key, size = blob_store.put_bytes(data, mime_type)
+                cursor.execute(f"""
+                    UPDATE user_preferences
+                    SET {key_column} = %s, {data_column} = NULL
+                    WHERE id = %s
+                """, (blob_key, prefs_id))
+                moved += 1
+                moved_bytes += size
+
+            # Commit each batch so an interrupted run keeps its progress
+            conn.commit()
+            print(f"Moved {moved} background {file_type}s ({moved_bytes / 1024 / 1024:.1f} MB)...")
+
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Moved {moved} background {file_type}s into the blob store")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error moving background {file_type}s: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting background blob store migration...")
+
+    if not (add_columns() and move_backgrounds('image') and move_backgrounds('video')):
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Migration script to move screenshots out of game_screenshots.image_data
+(base64 in a Text column) into the content-addressed blob store.
+
+It adds the blob_key and image_size columns, then moves rows in small
+batches. Each batch decodes the images, writes them to blob_store, records
+their keys and clears image_data. It is safe to re-run or interrupt: only
+rows without a blob_key are moved. Run VACUUM FULL game_screenshots
+afterwards to give the freed space back to the operating system.
+"""
+
+import base64
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Rows per batch; keeps at most this many decoded images in memory
+BATCH_SIZE = 20
+
+def add_columns():
+    """Add the blob columns and let image_data be empty"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL environment variable not set")
+        return False
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        print("Adding blob_key and image_size columns...")
+        cursor.execute("ALTER TABLE game_screenshots ADD COLUMN IF NOT EXISTS blob_key VARCHAR(64)")
+        cursor.execute("ALTER TABLE game_screenshots ADD COLUMN IF NOT EXISTS image_size INTEGER")
+        cursor.execute("ALTER TABLE game_screenshots ALTER COLUMN image_data DROP NOT NULL")
+
+        # Commit changes
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        print("✅ Columns ready")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error adding columns: {str(e)}")
+        return False
+
+def move_screenshots():
+    """Move image_data into the blob store batch by batch"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        # Add the project root to the path so we can import blob_store
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from blob_store import blob_store
+
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        moved = 0
+        moved_bytes = 0
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT id, image_data, image_mime_type
+                FROM game_screenshots
+                WHERE blob_key IS NULL AND image_data IS NOT NULL AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            for screenshot_id, image_data, mime_type in rows:
+                last_id = screenshot_id
+                try:
+                    data = base64.b64decode(image_data)
+                except Exception as e:
+                    print(f"⚠️ Skipping screenshot {screenshot_id}: invalid base64 ({str(e)})")
+                    continue
+                blob_key, size = blob_store.put_bytes(data, mime_type)
+                cursor.execute("""
+                    UPDATE game_screenshots
+                    SET blob_key = %s, image_size = %s, image_data = NULL
+                    WHERE id = %s
+                """, (blob_key, size, screenshot_id))
+                moved += 1
+                moved_bytes += size
+
+            # Commit each batch so an interrupted run keeps its progress
+            conn.commit()
+            print(f"Moved {moved} screenshots ({moved_bytes / 1024 / 1024:.1f} MB)...")
+
+        cursor.close()
+        conn.close()
+
+        print(f"✅ Moved {moved} screenshots into the blob store")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error moving screenshots: {str(e)}")
+        return False
+
+def verify_migration():
+    """Check that every screenshot has a blob and none is left in the database"""
+
+    database_url = os.getenv('DATABASE_URL')
+
+    try:
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from blob_store import blob_store
+
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COUNT(*) FROM game_screenshots WHERE image_data IS NOT NULL")
+        remaining = cursor.fetchone()[0]
+        cursor.execute("SELECT id, blob_key FROM game_screenshots WHERE blob_key IS NOT NULL")
+        missing = [screenshot_id for screenshot_id, blob_key in cursor.fetchall() if not blob_store.exists(blob_key)]
+
+        cursor.close()
+        conn.close()
+
+        if remaining:
+            print(f"⚠️ {remaining} screenshots still stored in the database")
+        if missing:
+            print(f"❌ Blob files missing for screenshots: {missing}")
+            return False
+
+        print("✅ Screenshot migration verified successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error verifying migration: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting screenshot blob store migration...")
+
+    if add_columns() and move_screenshots():
+        verify_migration()
+    else:
+        print("❌ Migration failed!")
+        sys.exit(1)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Enum, BigInteger, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Enum, BigInteger, Text, Index, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 import enum
 
 Base = declarative_base()
@@ -28,6 +28,23 @@ class Game(Base):
     completions = relationship("GameCompletion", back_populates="game")
     screenshots = relationship("GameScreenshot", back_populates="game")
 
+Index('ix_games_lower_name', func.lower(Game.name))
+
+class GameEnrichmentJob(Base):
+    """Queued RAWG metadata lookup for a game, processed by enrichment_worker"""
+    __tablename__ = 'game_enrichment_jobs'
+    id = Column(Integer, primary_key=True)
+    game_id = Column(Integer, ForeignKey('games.id', ondelete='CASCADE'), unique=True, nullable=False)
+    status = Column(String, nullable=False, default='pending')  # 'pending', 'running', 'done', 'not_found' or 'failed'
+    force = Column(Boolean, nullable=False, default=False)  # Overwrite metadata the game already has
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)  # Not picked up before this time (retry backoff, negative cache)
+    locked_at = Column(DateTime)  # When a worker claimed the job
+    last_error = Column(String)
+    updated_at = Column(DateTime)
+
+Index('ix_game_enrichment_jobs_due', GameEnrichmentJob.status, GameEnrichmentJob.next_attempt_at)
+
 class UserStats(Base):
     __tablename__ = 'user_stats'
     
@@ -36,6 +53,7 @@ class UserStats(Base):
     total_credits = Column(Float, default=0)
     username = Column(String)
     avatar_url = Column(String)
+    profile_updated_at = Column(DateTime)  # Last Discord refresh of username/avatar_url
     
     gaming_sessions = relationship("GamingSession", back_populates="user")
     bonuses = relationship("Bonus", back_populates="user")
@@ -44,6 +62,9 @@ class UserStats(Base):
     completions = relationship("GameCompletion", back_populates="user")
     screenshots = relationship("GameScreenshot", back_populates="user")
 
+# A user's rank is one more than the number of balances above theirs, counted from this index
+Index('ix_user_stats_total_credits', UserStats.total_credits.desc().nullslast())
+
 class GamingSession(Base):
     __tablename__ = 'gaming_sessions'
     
@@ -52,12 +73,16 @@ class GamingSession(Base):
     game_id = Column(Integer, ForeignKey('games.id'), nullable=False)
     hours = Column(Float, nullable=False)
     credits_earned = Column(Float, nullable=False)
-    timestamp = Column(DateTime, nullable=False)
+    timestamp = Column(DateTime, nullable=False)  # Naive UTC wall-clock time
     players = Column(Integer, nullable=False, default=1)  # Number of players in the session
     
     user = relationship("UserStats", back_populates="gaming_sessions")
     game = relationship("Game", back_populates="gaming_sessions")
 
+Index('ix_gaming_sessions_user_game_timestamp', GamingSession.user_id, GamingSession.game_id, GamingSession.timestamp)
+Index('ix_gaming_sessions_game_timestamp', GamingSession.game_id, GamingSession.timestamp)
+Index('ix_gaming_sessions_timestamp', GamingSession.timestamp)
+
 class LeaderboardPeriod(Base):
     __tablename__ = 'leaderboard_periods'
     id = Column(Integer, primary_key=True)
@@ -82,6 +107,38 @@ class LeaderboardHistory(Base):
     timestamp = Column(DateTime)
     period = relationship("LeaderboardPeriod", back_populates="history")
 
+Index('ix_leaderboard_history_user_id', LeaderboardHistory.user_id)
+Index('ix_leaderboard_history_period_id', LeaderboardHistory.period_id)
+# One placement per player per period; period rollovers upsert on it
+Index('ux_leaderboard_history_period_user', LeaderboardHistory.period_id, LeaderboardHistory.user_id, unique=True)
+
+class LeaderboardRollup(Base):
+    """Running per-period totals for a user, maintained on every credit-changing write"""
+    __tablename__ = 'leaderboard_rollups'
+    period_type = Column(String, primary_key=True)  # 'weekly', 'monthly' or 'alltime'
+    period_start = Column(DateTime, primary_key=True)  # Period start as CST wall-clock time
+    user_id = Column(BigInteger, ForeignKey('user_stats.user_id'), primary_key=True)
+    credits = Column(Float, nullable=False, default=0)  # Session credits (plus bonuses/completions for alltime)
+    total_hours = Column(Float, nullable=False, default=0)
+    session_count = Column(Integer, nullable=False, default=0)
+    games_played = Column(Integer, nullable=False, default=0)
+    most_played_game_id = Column(Integer, ForeignKey('games.id'), nullable=True)
+    most_played_hours = Column(Float, nullable=False, default=0)
+
+# Leaderboard pages are keyset scans in (credits DESC, user_id) order within a period
+Index('ix_leaderboard_rollups_page', LeaderboardRollup.period_type, LeaderboardRollup.period_start, LeaderboardRollup.credits.desc(), LeaderboardRollup.user_id)
+
+class LeaderboardGameRollup(Base):
+    """Running per-period totals for a user on a single game"""
+    __tablename__ = 'leaderboard_game_rollups'
+    period_type = Column(String, primary_key=True)
+    period_start = Column(DateTime, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey('user_stats.user_id'), primary_key=True)
+    game_id = Column(Integer, ForeignKey('games.id'), primary_key=True)
+    hours = Column(Float, nullable=False, default=0)
+    credits = Column(Float, nullable=False, default=0)
+    session_count = Column(Integer, nullable=False, default=0)
+
 class Bonus(Base):
     __tablename__ = 'bonuses'
     
@@ -94,6 +151,22 @@ class Bonus(Base):
     
     user = relationship("UserStats", back_populates="bonuses")
 
+Index('ix_bonuses_user_id', Bonus.user_id)
+
+class CreditLedger(Base):
+    """Append-only history of every credit change; user_stats.total_credits is the latest balance (see add_credit_ledger.py)"""
+    __tablename__ = 'credit_ledger'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(BigInteger, ForeignKey('user_stats.user_id'), nullable=False)
+    delta = Column(Float, nullable=False)
+    balance = Column(Float, nullable=False)  # Running balance after this entry
+    source = Column(String, nullable=False)  # 'session', 'bonus', 'completion', 'completion_removed', 'recalculation', ...
+    reference_id = Column(Integer)  # Id of the gaming session, bonus or completion, if any
+    created_at = Column(DateTime, nullable=False)
+
+Index('ix_credit_ledger_user_created', CreditLedger.user_id, CreditLedger.created_at, CreditLedger.id)
+
 class GameReview(Base):
     __tablename__ = 'game_reviews'
     
@@ -106,6 +179,10 @@ class GameReview(Base):
     user = relationship("UserStats", back_populates="reviews")
     game = relationship("Game", back_populates="reviews")
 
+Index('ix_game_reviews_user_id', GameReview.user_id)
+# Also serves plain game_id lookups; replaces the old ix_game_reviews_game_id
+Index('ix_game_reviews_game_timestamp', GameReview.game_id, GameReview.timestamp, GameReview.id)
+
 class GameRating(Base):
     __tablename__ = 'game_ratings'
     
@@ -118,6 +195,9 @@ class GameRating(Base):
     user = relationship("UserStats", back_populates="ratings")
     game = relationship("Game", back_populates="ratings")
 
+Index('ix_game_ratings_user_id', GameRating.user_id)
+Index('ix_game_ratings_game_id', GameRating.game_id)
+
 class GameCompletion(Base):
     __tablename__ = 'game_completions'
     
@@ -130,13 +210,19 @@ class GameCompletion(Base):
     user = relationship("UserStats", back_populates="completions")
     game = relationship("Game", back_populates="completions")
 
+Index('ix_game_completions_user_id', GameCompletion.user_id)
+Index('ix_game_completions_game_id', GameCompletion.game_id)
+
 class GameScreenshot(Base):
     __tablename__ = 'game_screenshots'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, ForeignKey('user_stats.user_id'), nullable=False)
     game_id = Column(Integer, ForeignKey('games.id'), nullable=False)
-    image_data = Column(Text, nullable=False)  # Base64 encoded image data
+    # Deferred: loaded only when accessed, so queries for listings never pull the payload
+    image_data = deferred(Column(Text, nullable=True))  # Legacy base64 image data, moved to blob_store by migrate_screenshots_to_blob_store.py
+    blob_key = Column(String(64), nullable=True)  # SHA-256 key of the image in blob_store
+    image_size = Column(Integer, nullable=True)  # Image size in bytes
     image_filename = Column(String, nullable=True)  # Original filename
     image_mime_type = Column(String, nullable=True)  # MIME type
     caption = Column(String)  # Optional caption for the screenshot
@@ -152,8 +238,11 @@ class UserPreferences(Base):
     theme = Column(String, nullable=True)
     background_image_url = Column(String, nullable=True)  # URL for external images
     background_video_url = Column(String, nullable=True)  # URL for external videos
-    background_image_data = Column(Text, nullable=True)  # Base64 encoded image data
-    background_video_data = Column(Text, nullable=True)  # Base64 encoded video data
+    # Payload columns are deferred: loaded only when accessed
+    background_image_data = deferred(Column(Text, nullable=True))  # Legacy base64 image data, moved to blob_store by migrate_backgrounds_to_blob_store.py
+    background_image_blob_key = Column(String(64), nullable=True)  # SHA-256 key of an uploaded image in blob_store
+    background_video_data = deferred(Column(Text, nullable=True))  # Legacy base64 video data, moved to blob_store by migrate_backgrounds_to_blob_store.py
+    background_video_blob_key = Column(String(64), nullable=True)  # SHA-256 key of an uploaded video in blob_store
     background_image_filename = Column(String, nullable=True)  # Original filename for image
     background_video_filename = Column(String, nullable=True)  # Original filename for video
     background_image_mime_type = Column(String, nullable=True)  # MIME type for image
@@ -162,4 +251,11 @@ class UserPreferences(Base):
     background_type = Column(String, default='image')  # 'image', 'video', or 'none'
     # Add more preference columns as needed
 
-    user = relationship('UserStats', backref='preferences')
\ No newline at end of file
+    user = relationship('UserStats', backref='preferences')
+
+class DataRevision(Base):
+    """Change counter for a table, bumped by a trigger on every committed write (see add_data_revisions.py)"""
+    __tablename__ = 'data_revisions'
+    table_name = Column(String, primary_key=True)
+    revision = Column(BigInteger, nullable=False)  # From data_revision_seq, so it only ever grows
+    updated_at = Column(DateTime, nullable=False)
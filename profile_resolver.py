@@ -0,0 +1,189 @@
+"""
+Discord profile (username/avatar) resolution backed by user_stats.
+
+UserStats.username and avatar_url are the cache, and every gunicorn worker
+and the bot share it, so a restarted worker reuses profiles that were
+already fetched. A profile older than PROFILE_TTL_SECONDS, or one that was
+never fetched, is still returned straight away. It is also queued for a
+batched refresh on the background loop, so a request never waits on the
+Discord API.
+
+Before fetching, a refresh claims its rows by pushing profile_updated_at
+forward. When several workers see the same stale profile, only one of them
+calls Discord.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+from sqlalchemy import text
+
+from background_loop import background_loop
+
+logger = logging.getLogger(__name__)
+
+# How long a fetched profile is served before it is refreshed
+PROFILE_TTL_SECONDS = int(os.getenv('PROFILE_TTL_SECONDS', 6 * 60 * 60))
+# How long to wait before retrying a profile Discord could not return
+PROFILE_RETRY_SECONDS = int(os.getenv('PROFILE_RETRY_SECONDS', 5 * 60))
+# Users fetched per Discord batch
+REFRESH_BATCH_SIZE = 50
+# Stale ids from concurrent requests are collected for this long and refreshed together
+REFRESH_DELAY_SECONDS = 0.5
+
+def default_profile(user_id: str) -> Dict[str, str]:
+    """Placeholder profile for a user whose Discord info is not known yet"""
+    user_id = str(user_id)
+    return {
+        'username': f'Unknown User {user_id}',
+        'avatar_url': f'https://cdn.discordapp.com/embed/avatars/{int(user_id[-1]) % 6}.png'
+    }
+
+class ProfileResolver:
+    """Serve Discord profiles from user_stats and refresh stale ones in the background"""
+
+    def __init__(self, storage, fetch_profiles: Callable[[List[str]], Awaitable[Dict[str, Dict]]],
+                 ttl_seconds: int = PROFILE_TTL_SECONDS, retry_seconds: int = PROFILE_RETRY_SECONDS,
+                 batch_size: int = REFRESH_BATCH_SIZE, refresh_delay: float = REFRESH_DELAY_SECONDS,
+                 loop=background_loop):
+        self.storage = storage
+        self.fetch_profiles = fetch_profiles
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = min(retry_seconds, ttl_seconds)
+        self.batch_size = max(1, batch_size)
+        self.refresh_delay = refresh_delay
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._refresh_scheduled = False
+
+    def resolve(self, user_id) -> Dict[str, str]:
+        return self.resolve_many([user_id])[str(user_id)]
+
+    def resolve_many(self, user_ids: Iterable) -> Dict[str, Dict[str, str]]:
+        """Map each user id (as a string) to {'username', 'avatar_url'} with one query and no Discord calls"""
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids if user_id is not None))
+        if not ids:
+            return {}
+
+        session = self.storage.Session()
+        try:
+            rows = session.execute(text("""
+                SELECT user_id, username, avatar_url,
+                       profile_updated_at IS NULL
+                           OR profile_updated_at < LOCALTIMESTAMP - make_interval(secs => :ttl) AS stale
+                FROM user_stats
+                WHERE user_id = ANY(CAST(:ids AS bigint[]))
+            """), {"ids": [int(user_id) for user_id in ids], "ttl": self.ttl_seconds}).fetchall()
+        finally:
+            session.close()
+
+        profiles = {}
+        stale = []
+        for user_id, username, avatar_url, is_stale in rows:
+            user_id = str(user_id)
+            profile = default_profile(user_id)
+            if username:
+                profile['username'] = username
+            if avatar_url:
+                profile['avatar_url'] = avatar_url
+            profiles[user_id] = profile
+            if is_stale:
+                stale.append(user_id)
+
+        # Users without a user_stats row have nowhere to store a profile; serve the placeholder
+        for user_id in ids:
+            if user_id not in profiles:
+                profiles[user_id] = default_profile(user_id)
+
+        if stale:
+            self.schedule_refresh(stale)
+        return profiles
+
+    def schedule_refresh(self, user_ids: Iterable[str]) -> None:
+        """Queue user ids for the next background refresh batch"""
+        with self._lock:
+            self._pending.update(str(user_id) for user_id in user_ids)
+            if self._refresh_scheduled or not self._pending:
+                return
+            self._refresh_scheduled = True
+        self.loop.submit(self._refresh_pending())
+
+    async def _refresh_pending(self) -> None:
+        try:
+            await asyncio.sleep(self.refresh_delay)
+            with self._lock:
+                user_ids, self._pending = list(self._pending), set()
+            for start in range(0, len(user_ids), self.batch_size):
+                await self.refresh(user_ids[start:start + self.batch_size])
+        except Exception as e:
+            logger.error(f"Error refreshing Discord profiles: {str(e)}", exc_info=True)
+        finally:
+            with self._lock:
+                self._refresh_scheduled = False
+                more_pending = bool(self._pending)
+            if more_pending:
+                self.schedule_refresh([])
+
+    async def refresh(self, user_ids: List[str]) -> int:
+        """Fetch the claimed profiles from Discord and store them; returns how many were updated"""
+        loop = asyncio.get_running_loop()
+        claimed = await loop.run_in_executor(None, self._claim, user_ids)
+        if not claimed:
+            return 0
+
+        fetched = await self.fetch_profiles(claimed) or {}
+        # Users Discord could not return keep their stored profile and are retried after retry_seconds
+        updates = [
+            (user_id, fetched[user_id]['username'], fetched[user_id].get('avatar_url'))
+            for user_id in claimed
+            if fetched.get(user_id) and fetched[user_id].get('username')
+        ]
+        if updates:
+            await loop.run_in_executor(None, self._store, updates)
+        return len(updates)
+
+    def _claim(self, user_ids: List[str]) -> List[str]:
+        """Mark stale profiles as being refreshed so other processes skip them; returns the ids this process won"""
+        session = self.storage.Session()
+        try:
+            rows = session.execute(text("""
+                UPDATE user_stats
+                SET profile_updated_at = LOCALTIMESTAMP - make_interval(secs => :ttl - :retry)
+                WHERE user_id = ANY(CAST(:ids AS bigint[]))
+                  AND (profile_updated_at IS NULL
+                       OR profile_updated_at < LOCALTIMESTAMP - make_interval(secs => :ttl))
+                RETURNING user_id
+            """), {"ids": [int(user_id) for user_id in user_ids],
+                   "ttl": self.ttl_seconds, "retry": self.retry_seconds}).fetchall()
+            session.commit()
+            return [str(row[0]) for row in rows]
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.storage.Session.remove()
+
+    def _store(self, updates) -> None:
+        session = self.storage.Session()
+        try:
+            user_ids, usernames, avatar_urls = zip(*updates)
+            session.execute(text("""
+                UPDATE user_stats AS us
+                SET username = v.username,
+                    avatar_url = COALESCE(v.avatar_url, us.avatar_url),
+                    profile_updated_at = LOCALTIMESTAMP
+                FROM unnest(CAST(:ids AS bigint[]), CAST(:usernames AS varchar[]), CAST(:avatar_urls AS varchar[]))
+                    AS v(user_id, username, avatar_url)
+                WHERE us.user_id = v.user_id
+            """), {"ids": [int(user_id) for user_id in user_ids],
+                   "usernames": list(usernames), "avatar_urls": list(avatar_urls)})
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.storage.Session.remove()
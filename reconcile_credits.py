@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Reconciliation job for user balances.
+
+Every write that adds or removes a session, bonus or completion appends the
+change to credit_ledger and moves user_stats.total_credits, the latest ledger
+balance, in the same transaction (GameStorage.record_credits); !balance,
+!leaderboard and the website only read it. This job checks every balance and
+ledger against the sum of the user's sessions, bonuses and completions,
+reports how much drift it found and corrects the drifted balances, recording
+each correction in the ledger (GameStorage.reconcile_user_credits).
+
+Run with: python reconcile_credits.py [--dry-run]
+Exits with status 1 when --dry-run finds drift, so it can be used as a check.
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from storage import GameStorage
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+    print("🧮 Reconciling user balances" + (" (dry run)" if dry_run else ""))
+    print("=" * 50)
+
+    report = GameStorage().reconcile_user_credits(fix=not dry_run)
+
+    print(f"👥 Users checked: {report['users_checked']:,}")
+    print(f"⚠️ Users with drift: {report['users_drifted']:,}")
+    print(f"📏 Total drift: {report['total_drift']:,.2f} cred (net {report['net_drift']:+,.2f}, largest {report['max_drift']:,.2f})")
+    for user_id, stored, expected in report['sample']:
+        print(f"   User {user_id}: stored {stored:,.2f}, expected {expected:,.2f} ({stored - expected:+,.2f})")
+
+    if not report['users_drifted']:
+        print("✅ Every balance matches its sessions, bonuses and completions")
+    elif dry_run:
+        print("❌ Balances have drifted; run without --dry-run to fix them")
+        sys.exit(1)
+    else:
+        print(f"✅ Fixed {report['fixed']:,} balances")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple, Optional, Any
-from sqlalchemy import create_engine, func, DateTime as sqlalchemy_DateTime, and_, Integer, String, BigInteger, text, distinct
+from sqlalchemy import func, DateTime as sqlalchemy_DateTime, and_, Integer, String, BigInteger, text, distinct
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
 from models import Base, Game, UserStats, GamingSession, LeaderboardHistory, LeaderboardType, LeaderboardPeriod, Bonus, GameCompletion
@@ -16,6 +16,8 @@ import traceback
 import time
 import sys
 import logging
+import credit_engine
+import db_pool
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +29,25 @@ if not DATABASE_URL:
 
 logger = logging.getLogger(__name__)
 
+# Rollup key for the all-time leaderboard (matches the ALLTIME period start)
+ROLLUP_ALLTIME_START = datetime(2020, 1, 1)
+
+# Reviews per page on the game page
+REVIEWS_PAGE_SIZE = 20
+
+# Leaderboard rows per page
+LEADERBOARD_PAGE_SIZE = 50
+
+# A period's leaderboard rows, in the shape _leaderboard_rows formats
+LEADERBOARD_ROLLUP_ROWS_SQL = """
+    SELECT r.user_id, r.credits, r.games_played, g.name AS most_played_game, r.most_played_hours, r.total_hours
+    FROM leaderboard_rollups r
+    LEFT JOIN games g ON g.id = r.most_played_game_id
+    WHERE r.period_type = :period_type
+      AND r.period_start = :period_start
+      AND r.session_count > 0
+"""
+
 class GameStorage:
     def __init__(self):
         """Initialize the storage with database connection"""
@@ -53,11 +74,33 @@ class GameStorage:
                 time.sleep(retry_delay)
                 retry_delay *= 2  # Exponential backoff
 
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Get connection pool checkout wait and saturation metrics for this process"""
+        return db_pool.pool_metrics(self.engine)
+
+    def get_data_revisions(self, tables: List[str]) -> Optional[Dict[str, int]]:
+        """Current revision of each table, bumped on every committed write (see add_data_revisions.py).
+        Returns None if any of the tables is not tracked."""
+        session = self.Session()
+        try:
+            rows = session.execute(text("""
+                SELECT table_name, revision FROM data_revisions WHERE table_name = ANY(:tables)
+            """), {"tables": list(tables)}).fetchall()
+            revisions = {row.table_name: row.revision for row in rows}
+            # An untracked table's changes would go unnoticed, so nothing derived from it can be validated
+            return revisions if len(revisions) == len(set(tables)) else None
+        except Exception as e:
+            logger.warning(f"Could not read data revisions: {str(e)}")
+            session.rollback()
+            return None
+        finally:
+            session.close()
+
     def _initialize_db(self):
         """Initialize the database connection"""
         try:
             logger.info("Initializing database connection")
-            self.engine = create_engine(self.database_url)
+            self.engine = db_pool.create_pooled_engine(self.database_url)
             self.Session = scoped_session(
                 sessionmaker(
                     bind=self.engine,
@@ -96,20 +139,13 @@ class GameStorage:
                     backloggd_url=backloggd_url
                 )
                 session.add(game)
-                session.commit()  # Commit to get the game ID
+                session.flush()  # Flush to get the game ID
                 created = True
 
-            # Fetch and update RAWG data if missing
+            # Queue a RAWG lookup if metadata is missing; the enrichment worker fills it in
             if game and (game.rawg_id is None or game.box_art_url is None):
-                rawg_details = await self.fetch_game_details_from_rawg(game.name)
-                if rawg_details:
-                    logger.debug(f"Updating game with RAWG details: {rawg_details}")
-                    game.rawg_id = rawg_details.get('rawg_id')
-                    game.box_art_url = rawg_details.get('box_art_url')
-                    game.release_date = rawg_details.get('release_date')
-                    game.description = rawg_details.get('description')
-                    session.add(game)
-                    session.commit()  # Commit RAWG data updates
+                self.enqueue_game_enrichment(session, [game.id])
+            session.commit()
 
             return game, created
         except Exception as e:
@@ -121,6 +157,14 @@ class GameStorage:
 
     async def fetch_game_details_from_rawg(self, game_name: str) -> Optional[Dict[str, Any]]:
         """Fetch game details from RAWG API"""
+        try:
+            return await self.search_rawg_game(game_name)
+        except Exception as e:
+            logger.error(f"Error fetching RAWG data: {str(e)}", exc_info=True)
+            return None
+
+    async def search_rawg_game(self, game_name: str, http_session: aiohttp.ClientSession = None) -> Optional[Dict[str, Any]]:
+        """Look a game up on RAWG; returns None if RAWG has no match and raises if the request fails"""
         rawg_api_key = os.getenv('RAWG_API_KEY')
         rawg_api_url = os.getenv('RAWG_API_URL', 'https://api.rawg.io/api')
         
@@ -128,59 +172,86 @@ class GameStorage:
             logger.warning("RAWG_API_KEY not set")
             return None
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f'{rawg_api_url}/games',
-                    params={
-                        'key': rawg_api_key,
-                        'search': game_name,
-                        'page_size': 1
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data and data.get('results'):
-                            game = data['results'][0]
-                            game_id = game.get('id')
-                            if game_id:
-                                async with session.get(
-                                    f'{rawg_api_url}/games/{game_id}',
-                                    params={'key': rawg_api_key}
-                                ) as detail_response:
-                                    if detail_response.status == 200:
-                                        detail_data = await detail_response.json()
-                                        return {
-                                            'rawg_id': game.get('id'),
-                                            'box_art_url': game.get('background_image'),
-                                            'release_date': game.get('released'),
-                                            'description': detail_data.get('description_raw', ''),
-                                            'backloggd_url': f"https://www.backloggd.com/games/{game.get('slug')}/"
-                                        }
-                            return {
-                                'rawg_id': game.get('id'),
-                                'box_art_url': game.get('background_image'),
-                                'release_date': game.get('released'),
-                                'description': game.get('description_raw', ''),
-                                'backloggd_url': f"https://www.backloggd.com/games/{game.get('slug')}/"
-                            }
-                    return None
-        except Exception as e:
-            logger.error(f"Error fetching RAWG data: {str(e)}", exc_info=True)
+        if http_session is None:
+            async with aiohttp.ClientSession() as http_session:
+                return await self.search_rawg_game(game_name, http_session)
+
+        async with http_session.get(
+            f'{rawg_api_url}/games',
+            params={
+                'key': rawg_api_key,
+                'search': game_name,
+                'page_size': 1
+            }
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"RAWG search returned HTTP {response.status}")
+            data = await response.json()
+        if not data or not data.get('results'):
             return None
 
-    async def announce_period_end(self, bot: discord.Client, leaderboard_type: LeaderboardType, old_period: LeaderboardPeriod) -> None:
-        """Create an announcement for the end of a leaderboard period"""
+        game = data['results'][0]
+        details = {
+            'rawg_id': game.get('id'),
+            'box_art_url': game.get('background_image'),
+            'release_date': game.get('released'),
+            'description': game.get('description_raw', ''),
+            'backloggd_url': f"https://www.backloggd.com/games/{game.get('slug')}/"
+        }
+        if game.get('id'):
+            async with http_session.get(
+                f'{rawg_api_url}/games/{game["id"]}',
+                params={'key': rawg_api_key}
+            ) as detail_response:
+                if detail_response.status == 200:
+                    detail_data = await detail_response.json()
+                    details['description'] = detail_data.get('description_raw', '')
+        return details
+
+    def enqueue_game_enrichment(self, session, game_ids: List[int], force: bool = False) -> None:
+        """Queue RAWG metadata lookups for games (in the caller's transaction); enrichment_worker runs them.
+
+        A game that is already queued, was not found on RAWG or has run out of
+        retries is left alone unless force is set, which also lets the lookup
+        overwrite metadata the game already has.
+        """
+        game_ids = [game_id for game_id in game_ids if game_id is not None]
+        if not game_ids:
+            return
+        session.execute(text("""
+            INSERT INTO game_enrichment_jobs (game_id, status, force, attempts, next_attempt_at, updated_at)
+            SELECT game_id, 'pending', :force, 0, LOCALTIMESTAMP, LOCALTIMESTAMP
+            FROM unnest(CAST(:game_ids AS integer[])) AS game_id
+            ON CONFLICT (game_id) DO UPDATE
+            SET status = 'pending',
+                force = game_enrichment_jobs.force OR EXCLUDED.force,
+                attempts = 0,
+                next_attempt_at = LOCALTIMESTAMP,
+                last_error = NULL,
+                updated_at = LOCALTIMESTAMP
+            WHERE EXCLUDED.force AND game_enrichment_jobs.status <> 'running'
+        """), {"game_ids": list(game_ids), "force": force})
+
+    def get_period_placements(self, period_id: int, leaderboard_type: LeaderboardType) -> List[LeaderboardHistory]:
+        """Get the recorded placements for a leaderboard period, best first"""
         session = self.Session()
         try:
-            # Get the final placements for the period
-            placements = session.query(LeaderboardHistory)\
+            return session.query(LeaderboardHistory)\
                 .filter(
-                    LeaderboardHistory.period_id == old_period.id,
+                    LeaderboardHistory.period_id == period_id,
                     LeaderboardHistory.leaderboard_type == leaderboard_type
                 )\
                 .order_by(LeaderboardHistory.placement)\
                 .all()
+        finally:
+            session.close()
+
+    async def announce_period_end(self, bot: discord.Client, leaderboard_type: LeaderboardType, old_period: LeaderboardPeriod, placements: Optional[List[LeaderboardHistory]] = None) -> None:
+        """Create an announcement for the end of a leaderboard period"""
+        try:
+            # Get the final placements for the period (callers on the bot loop load them off-loop first)
+            if placements is None:
+                placements = self.get_period_placements(old_period.id, leaderboard_type)
 
             if not placements:
                 return
@@ -260,15 +331,11 @@ class GameStorage:
 
         except Exception as e:
             print(f"Error creating leaderboard announcement: {str(e)}")
-        finally:
-            session.close()
 
     async def get_or_create_current_period(self, timeframe: LeaderboardType) -> LeaderboardPeriod:
         """Get or create the current leaderboard period."""
         try:
             with self.Session() as session:
-                # Use enum name (uppercase) for PostgreSQL enum
-                timeframe_str = timeframe.name
                 cst = pytz.timezone('America/Chicago')
                 now = datetime.now(cst)
                 if timeframe in [LeaderboardType.WEEKLY, LeaderboardType.MONTHLY]:
@@ -276,14 +343,17 @@ class GameStorage:
                 else:  # ALLTIME
                     start = datetime(2020, 1, 1, tzinfo=cst)
                     end = datetime(2100, 1, 1, tzinfo=cst)
+                # Period boundaries are stored as naive CST wall-clock times
+                start = start.replace(tzinfo=None)
+                end = end.replace(tzinfo=None)
                 period = session.query(LeaderboardPeriod).filter_by(
-                    leaderboard_type=timeframe_str,
+                    leaderboard_type=timeframe,
                     start_time=start,
                     end_time=end
                 ).first()
                 if not period:
                     period = LeaderboardPeriod(
-                        leaderboard_type=timeframe_str,
+                        leaderboard_type=timeframe,
                         start_time=start,
                         end_time=end,
                         is_active=True
@@ -295,6 +365,67 @@ class GameStorage:
         except Exception as e:
             raise Exception(str(e))
 
+    def get_ended_periods(self, timeframe: LeaderboardType) -> List[LeaderboardPeriod]:
+        """Active periods of a timeframe whose end has passed, oldest first"""
+        session = self.Session()
+        try:
+            return session.query(LeaderboardPeriod).filter(
+                LeaderboardPeriod.leaderboard_type == timeframe,
+                LeaderboardPeriod.is_active == True,
+                LeaderboardPeriod.end_time <= datetime.now(self.cst).replace(tzinfo=None)
+            ).order_by(LeaderboardPeriod.end_time).all()
+        finally:
+            session.close()
+
+    def roll_over_period(self, period_id: int) -> Optional[LeaderboardPeriod]:
+        """
+        Close an ended period in one transaction: compute its final placements once, write them with a single
+        upsert, mark it inactive and open the next period. Returns the next period, or None when the period had
+        already been closed. A rollover that fails part way leaves nothing behind, so it can simply be retried.
+        """
+        session = self.Session()
+        try:
+            # Lock the period so a concurrent rollover waits for this one and then finds it closed
+            period = session.query(LeaderboardPeriod).filter(
+                LeaderboardPeriod.id == period_id
+            ).with_for_update().first()
+            if not period or not period.is_active:
+                session.rollback()
+                return None
+
+            # Boundaries are stored as naive CST wall-clock times; the next period starts where this one ends
+            timeframe = period.leaderboard_type
+            start = self.cst.localize(period.start_time)
+            end = self.cst.localize(period.end_time)
+            placements = self._get_leaderboard_for_window(session, timeframe, start, end)
+            self._write_placements(session, period.id, timeframe, placements)
+            period.is_active = False
+
+            next_start, next_end = get_period_boundaries(end, timeframe.value.lower())
+            next_start = next_start.replace(tzinfo=None)
+            next_end = next_end.replace(tzinfo=None)
+            new_period = session.query(LeaderboardPeriod).filter_by(
+                leaderboard_type=timeframe,
+                start_time=next_start
+            ).first()
+            if not new_period:
+                new_period = LeaderboardPeriod(
+                    leaderboard_type=timeframe,
+                    start_time=next_start,
+                    end_time=next_end,
+                    is_active=True
+                )
+                session.add(new_period)
+
+            session.commit()
+            print(f"Closed {timeframe.value} period {period.id} with {len(placements)} placements")
+            return new_period
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     async def get_total_game_hours_by_timeframe(self, timeframe: str) -> List[Tuple[str, float, str]]:
         """Get the total hours played for each game within a given timeframe."""
         session = self.Session()
@@ -363,179 +494,443 @@ class GameStorage:
             if custom_start is not None and custom_end is not None:
                 start_time = custom_start
                 end_time = custom_end
-            else:
-                current_time = datetime.now(self.cst)
+            elif timeframe == LeaderboardType.ALLTIME:
                 start_time = None
                 end_time = None
+            else:
+                start_time, end_time = get_period_boundaries(datetime.now(self.cst), timeframe.value)
 
-                if timeframe == LeaderboardType.WEEKLY:
-                    days_since_monday = current_time.weekday()
-                    start_time = (current_time - timedelta(days=days_since_monday)).replace(
-                        hour=0, minute=0, second=0, microsecond=0
-                    )
-                    end_time = start_time + timedelta(days=7)
-                elif timeframe == LeaderboardType.MONTHLY:
-                    start_time = current_time.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                    if current_time.month == 12:
-                        end_time = current_time.replace(year=current_time.year + 1, month=1, day=1)
-                    else:
-                        end_time = current_time.replace(month=current_time.month + 1, day=1)
-                else:  # ALLTIME
-                    start_time = None
-                    end_time = None
+            return self._get_leaderboard_for_window(db_session, timeframe, start_time, end_time)
 
-            # First, get the most played game for each user
-            user_most_played = db_session.query(
-                GamingSession.user_id,
-                Game.name.label('game_name'),
-                func.sum(GamingSession.hours).label('game_hours')
-            ).join(
-                Game, GamingSession.game_id == Game.id
-            )
+        except Exception as e:
+            print(f"ERROR: Failed to get leaderboard data: {str(e)}")
+            print("Full traceback:")
+            traceback.print_exc()
+            return []
+        finally:
+            db_session.close()
 
-            if start_time:
-                user_most_played = user_most_played.filter(GamingSession.timestamp >= start_time)
-            if end_time:
-                user_most_played = user_most_played.filter(GamingSession.timestamp < end_time)
+    def _get_leaderboard_for_window(self, db_session, timeframe: LeaderboardType, start_time, end_time) -> List[Tuple[int, float, int, str, float, float]]:
+        """Whole periods are served from the maintained rollups; any other window is aggregated from sessions"""
+        period_start = self._rollup_period_for_window(timeframe, start_time, end_time)
+        if period_start is not None:
+            return self._get_leaderboard_from_rollups(db_session, timeframe.value, period_start)
+        return self._get_leaderboard_from_sessions(db_session, timeframe, start_time, end_time)
+
+    def _get_leaderboard_from_rollups(self, db_session, period_type: str, period_start: datetime) -> List[Tuple[int, float, int, str, float, float]]:
+        """Read a whole-period leaderboard from leaderboard_rollups with one indexed, ordered scan"""
+        results = db_session.execute(text(f"""
+            {LEADERBOARD_ROLLUP_ROWS_SQL}
+            ORDER BY r.credits DESC, r.user_id
+        """), {"period_type": period_type, "period_start": period_start}).fetchall()
+
+        return [(
+            row.user_id,
+            float(row.credits or 0),
+            int(row.games_played or 0),
+            row.most_played_game or 'No games',
+            float(row.most_played_hours or 0),
+            float(row.total_hours or 0)
+        ) for row in results]
+
+    def _leaderboard_rows(self, rows, first_rank: int) -> List[Dict[str, Any]]:
+        return [{
+            'rank': first_rank + n,
+            'user_id': row.user_id,
+            'credits': float(row.credits or 0),
+            'games_played': int(row.games_played or 0),
+            'most_played_game': row.most_played_game or 'No games',
+            'most_played_hours': float(row.most_played_hours or 0),
+            'total_hours': float(row.total_hours or 0)
+        } for n, row in enumerate(rows)]
+
+    def get_leaderboard_page(self, timeframe: LeaderboardType, limit: int = LEADERBOARD_PAGE_SIZE,
+                             cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of the current period's leaderboard, best first (ties by user id), and the cursor of the next
+        page (None on the last one). Rows are {'rank', 'user_id', 'credits', 'games_played', 'most_played_game',
+        'most_played_hours', 'total_hours'}; rank is the position on the board.
+        Pages are a keyset range scan of ix_leaderboard_rollups_page, so a deep page costs the same as the first.
+        Raises ValueError for a malformed cursor.
+        """
+        period_start = self._rollup_period_start(datetime.now(self.cst), timeframe.value)
+        params = {"period_type": timeframe.value, "period_start": period_start, "limit": limit + 1}
+        position = 0
+        after = ""
+        if cursor:
+            position, params["credits"], params["user_id"] = decode_leaderboard_cursor(cursor)
+            after = "AND (r.credits < :credits OR (r.credits = :credits AND r.user_id > :user_id))"
 
-            user_most_played = user_most_played.group_by(
-                GamingSession.user_id,
-                Game.name
+        session = self.Session()
+        try:
+            rows = session.execute(text(f"""
+                {LEADERBOARD_ROLLUP_ROWS_SQL}
+                {after}
+                ORDER BY r.credits DESC, r.user_id
+                LIMIT :limit
+            """), params).fetchall()
+        finally:
+            session.close()
+
+        entries = self._leaderboard_rows(rows[:limit], position + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            last = entries[-1]
+            next_cursor = encode_leaderboard_cursor(last['rank'], last['credits'], last['user_id'])
+        return entries, next_cursor
+
+    def get_leaderboard_around(self, timeframe: LeaderboardType, user_id: int, radius: int) -> Optional[Dict[str, Any]]:
+        """
+        The user's row on the current period's leaderboard with up to radius rows above and below it, in one query:
+        {'entries': rows as in get_leaderboard_page, 'user_rank', 'next_cursor'}. None if the user isn't on the board.
+        """
+        period_start = self._rollup_period_start(datetime.now(self.cst), timeframe.value)
+        params = {"period_type": timeframe.value, "period_start": period_start, "user_id": user_id, "radius": radius}
+        session = self.Session()
+        try:
+            # Rows above the user are read upwards from them, rows below (the user first) downwards
+            rows = session.execute(text(f"""
+                WITH me AS (
+                    SELECT credits FROM leaderboard_rollups
+                    WHERE period_type = :period_type AND period_start = :period_start
+                      AND user_id = :user_id AND session_count > 0
+                ),
+                above AS (
+                    SELECT COUNT(*) AS n FROM leaderboard_rollups r, me
+                    WHERE r.period_type = :period_type AND r.period_start = :period_start AND r.session_count > 0
+                      AND (r.credits > me.credits OR (r.credits = me.credits AND r.user_id < :user_id))
+                ),
+                neighbours AS (
+                    (SELECT board.*, 'above' AS side FROM ({LEADERBOARD_ROLLUP_ROWS_SQL}) board, me
+                     WHERE board.credits > me.credits OR (board.credits = me.credits AND board.user_id < :user_id)
+                     ORDER BY board.credits, board.user_id DESC
+                     LIMIT :radius)
+                    UNION ALL
+                    (SELECT board.*, 'below' AS side FROM ({LEADERBOARD_ROLLUP_ROWS_SQL}) board, me
+                     WHERE board.credits < me.credits OR (board.credits = me.credits AND board.user_id >= :user_id)
+                     ORDER BY board.credits DESC, board.user_id
+                     LIMIT :radius + 2)
+                )
+                SELECT neighbours.*, above.n AS users_above
+                FROM neighbours, above
+                ORDER BY neighbours.credits DESC, neighbours.user_id
+            """), params).fetchall()
+        finally:
+            session.close()
+
+        if not rows:
+            return None
+        above = sum(1 for row in rows if row.side == 'above')
+        below = len(rows) - above
+        user_rank = rows[0].users_above + 1
+        # The extra row below only says whether the board goes on
+        entries = self._leaderboard_rows(rows[:above + min(below, radius + 1)], user_rank - above)
+        next_cursor = None
+        if below > radius + 1:
+            last = entries[-1]
+            next_cursor = encode_leaderboard_cursor(last['rank'], last['credits'], last['user_id'])
+        return {'entries': entries, 'user_rank': user_rank, 'next_cursor': next_cursor}
+
+    def _get_leaderboard_from_sessions(self, db_session, timeframe: LeaderboardType, start_time, end_time) -> List[Tuple[int, float, int, str, float, float]]:
+        """Aggregate a leaderboard for an arbitrary window directly from gaming_sessions"""
+        # First, get the most played game for each user
+        user_most_played = db_session.query(
+            GamingSession.user_id,
+            Game.name.label('game_name'),
+            func.sum(GamingSession.hours).label('game_hours')
+        ).join(
+            Game, GamingSession.game_id == Game.id
+        )
+
+        if start_time:
+            user_most_played = user_most_played.filter(GamingSession.timestamp >= start_time)
+        if end_time:
+            user_most_played = user_most_played.filter(GamingSession.timestamp < end_time)
+
+        user_most_played = user_most_played.group_by(
+            GamingSession.user_id,
+            Game.name
+        ).subquery()
+
+        # Get the most played game for each user
+        most_played_games = db_session.query(
+            user_most_played.c.user_id,
+            user_most_played.c.game_name,
+            user_most_played.c.game_hours
+        ).distinct(
+            user_most_played.c.user_id
+        ).order_by(
+            user_most_played.c.user_id,
+            user_most_played.c.game_hours.desc()
+        ).subquery()
+
+        # Get total hours for each user
+        total_hours = db_session.query(
+            GamingSession.user_id,
+            func.sum(GamingSession.hours).label('total_hours')
+        )
+
+        if start_time:
+            total_hours = total_hours.filter(GamingSession.timestamp >= start_time)
+        if end_time:
+            total_hours = total_hours.filter(GamingSession.timestamp < end_time)
+
+        total_hours = total_hours.group_by(
+            GamingSession.user_id
+        ).subquery()
+
+        # Get session credits for each user
+        session_credits = db_session.query(
+            GamingSession.user_id,
+            func.sum(GamingSession.credits_earned).label('session_credits'),
+            func.count(GamingSession.game_id.distinct()).label('games_played')
+        )
+
+        if start_time:
+            session_credits = session_credits.filter(GamingSession.timestamp >= start_time)
+        if end_time:
+            session_credits = session_credits.filter(GamingSession.timestamp < end_time)
+
+        session_credits = session_credits.group_by(
+            GamingSession.user_id
+        ).subquery()
+
+        if timeframe == LeaderboardType.ALLTIME:
+            # Get bonus credits for each user (only for all-time)
+            bonus_credits = db_session.query(
+                Bonus.user_id,
+                func.sum(Bonus.credits).label('bonus_credits')
+            ).group_by(
+                Bonus.user_id
             ).subquery()
 
-            # Get the most played game for each user
-            most_played_games = db_session.query(
-                user_most_played.c.user_id,
-                user_most_played.c.game_name,
-                user_most_played.c.game_hours
-            ).distinct(
-                user_most_played.c.user_id
-            ).order_by(
-                user_most_played.c.user_id,
-                user_most_played.c.game_hours.desc()
+            # Get completion credits for each user (only for all-time)
+            completion_credits = db_session.query(
+                GameCompletion.user_id,
+                func.sum(GameCompletion.credits_awarded).label('completion_credits')
+            ).group_by(
+                GameCompletion.user_id
             ).subquery()
 
-            # Get total hours for each user
-            total_hours = db_session.query(
-                GamingSession.user_id,
-                func.sum(GamingSession.hours).label('total_hours')
-            )
+            # Combine session, bonus, and completion credits for all-time
+            results = db_session.query(
+                session_credits.c.user_id,
+                (func.coalesce(session_credits.c.session_credits, 0) + 
+                 func.coalesce(bonus_credits.c.bonus_credits, 0) + 
+                 func.coalesce(completion_credits.c.completion_credits, 0)).label('total_credits'),
+                session_credits.c.games_played,
+                most_played_games.c.game_name,
+                most_played_games.c.game_hours,
+                total_hours.c.total_hours
+            ).outerjoin(
+                most_played_games,
+                session_credits.c.user_id == most_played_games.c.user_id
+            ).outerjoin(
+                total_hours,
+                session_credits.c.user_id == total_hours.c.user_id
+            ).outerjoin(
+                bonus_credits,
+                session_credits.c.user_id == bonus_credits.c.user_id
+            ).outerjoin(
+                completion_credits,
+                session_credits.c.user_id == completion_credits.c.user_id
+            ).order_by(
+                (func.coalesce(session_credits.c.session_credits, 0) + 
+                 func.coalesce(bonus_credits.c.bonus_credits, 0) + 
+                 func.coalesce(completion_credits.c.completion_credits, 0)).desc()
+            ).all()
+        else:
+            # For weekly and monthly, only use session credits
+            results = db_session.query(
+                session_credits.c.user_id,
+                session_credits.c.session_credits.label('total_credits'),
+                session_credits.c.games_played,
+                most_played_games.c.game_name,
+                most_played_games.c.game_hours,
+                total_hours.c.total_hours
+            ).outerjoin(
+                most_played_games,
+                session_credits.c.user_id == most_played_games.c.user_id
+            ).outerjoin(
+                total_hours,
+                session_credits.c.user_id == total_hours.c.user_id
+            ).order_by(
+                session_credits.c.session_credits.desc()
+            ).all()
 
-            if start_time:
-                total_hours = total_hours.filter(GamingSession.timestamp >= start_time)
-            if end_time:
-                total_hours = total_hours.filter(GamingSession.timestamp < end_time)
+        # Format the results
+        leaderboard = []
+        seen_users = set()  # Track users we've already added
+        for user_id, credits, games, most_played_game, most_played_hours, total_hours in results:
+            if user_id not in seen_users:  # Only add each user once
+                leaderboard.append((
+                    user_id,
+                    float(credits or 0),
+                    int(games or 0),
+                    most_played_game or 'No games',
+                    float(most_played_hours or 0),
+                    float(total_hours or 0)
+                ))
+                seen_users.add(user_id)
 
-            total_hours = total_hours.group_by(
-                GamingSession.user_id
-            ).subquery()
+        return leaderboard
 
-            # Get session credits for each user
-            session_credits = db_session.query(
-                GamingSession.user_id,
-                func.sum(GamingSession.credits_earned).label('session_credits'),
-                func.count(GamingSession.game_id.distinct()).label('games_played')
-            )
 
-            if start_time:
-                session_credits = session_credits.filter(GamingSession.timestamp >= start_time)
-            if end_time:
-                session_credits = session_credits.filter(GamingSession.timestamp < end_time)
+    def _rollup_period_start(self, dt: datetime, period_type: str) -> datetime:
+        """Return the rollup key (naive CST wall-clock start) of the period containing dt"""
+        if period_type == 'alltime':
+            return ROLLUP_ALLTIME_START
+        start, _ = get_period_boundaries(dt, period_type)
+        return start.replace(tzinfo=None)
 
-            session_credits = session_credits.group_by(
-                GamingSession.user_id
-            ).subquery()
+    def _rollup_periods(self, dt: datetime) -> List[Tuple[str, datetime]]:
+        """Return every (period_type, period_start) rollup bucket a write at dt belongs to"""
+        return [(period_type, self._rollup_period_start(dt, period_type)) for period_type in ('weekly', 'monthly', 'alltime')]
 
-            if timeframe == LeaderboardType.ALLTIME:
-                # Get bonus credits for each user (only for all-time)
-                bonus_credits = db_session.query(
-                    Bonus.user_id,
-                    func.sum(Bonus.credits).label('bonus_credits')
-                ).group_by(
-                    Bonus.user_id
-                ).subquery()
-
-                # Get completion credits for each user (only for all-time)
-                completion_credits = db_session.query(
-                    GameCompletion.user_id,
-                    func.sum(GameCompletion.credits_awarded).label('completion_credits')
-                ).group_by(
-                    GameCompletion.user_id
-                ).subquery()
-
-                # Combine session, bonus, and completion credits for all-time
-                results = db_session.query(
-                    session_credits.c.user_id,
-                    (func.coalesce(session_credits.c.session_credits, 0) + 
-                     func.coalesce(bonus_credits.c.bonus_credits, 0) + 
-                     func.coalesce(completion_credits.c.completion_credits, 0)).label('total_credits'),
-                    session_credits.c.games_played,
-                    most_played_games.c.game_name,
-                    most_played_games.c.game_hours,
-                    total_hours.c.total_hours
-                ).outerjoin(
-                    most_played_games,
-                    session_credits.c.user_id == most_played_games.c.user_id
-                ).outerjoin(
-                    total_hours,
-                    session_credits.c.user_id == total_hours.c.user_id
-                ).outerjoin(
-                    bonus_credits,
-                    session_credits.c.user_id == bonus_credits.c.user_id
-                ).outerjoin(
-                    completion_credits,
-                    session_credits.c.user_id == completion_credits.c.user_id
-                ).order_by(
-                    (func.coalesce(session_credits.c.session_credits, 0) + 
-                     func.coalesce(bonus_credits.c.bonus_credits, 0) + 
-                     func.coalesce(completion_credits.c.completion_credits, 0)).desc()
-                ).all()
-            else:
-                # For weekly and monthly, only use session credits
-                results = db_session.query(
-                    session_credits.c.user_id,
-                    session_credits.c.session_credits.label('total_credits'),
-                    session_credits.c.games_played,
-                    most_played_games.c.game_name,
-                    most_played_games.c.game_hours,
-                    total_hours.c.total_hours
-                ).outerjoin(
-                    most_played_games,
-                    session_credits.c.user_id == most_played_games.c.user_id
-                ).outerjoin(
-                    total_hours,
-                    session_credits.c.user_id == total_hours.c.user_id
-                ).order_by(
-                    session_credits.c.session_credits.desc()
-                ).all()
+    def _rollup_period_for_window(self, timeframe: LeaderboardType, start_time, end_time) -> Optional[datetime]:
+        """Return the rollup key when [start_time, end_time) is exactly one period, otherwise None"""
+        if timeframe == LeaderboardType.ALLTIME:
+            return ROLLUP_ALLTIME_START if start_time is None and end_time is None else None
+        if start_time is None or end_time is None or start_time.tzinfo is None or end_time.tzinfo is None:
+            return None
 
-            # Format the results
-            leaderboard = []
-            seen_users = set()  # Track users we've already added
-            for user_id, credits, games, most_played_game, most_played_hours, total_hours in results:
-                if user_id not in seen_users:  # Only add each user once
-                    leaderboard.append((
-                        user_id,
-                        float(credits or 0),
-                        int(games or 0),
-                        most_played_game or 'No games',
-                        float(most_played_hours or 0),
-                        float(total_hours or 0)
-                    ))
-                    seen_users.add(user_id)
+        # Compare CST wall-clock times; get_period_boundaries can carry a stale DST offset across a change
+        if getattr(start_time.tzinfo, 'zone', None) != self.cst.zone:
+            start_time = start_time.astimezone(self.cst)
+        if getattr(end_time.tzinfo, 'zone', None) != self.cst.zone:
+            end_time = end_time.astimezone(self.cst)
+        start = start_time.replace(tzinfo=None)
+        end = end_time.replace(tzinfo=None)
+        if start != start.replace(hour=0, minute=0, second=0, microsecond=0):
+            return None
 
-            return leaderboard
+        if timeframe == LeaderboardType.WEEKLY:
+            aligned = start.weekday() == 0 and end == start + timedelta(days=7)
+        else:
+            next_month = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+            aligned = start.day == 1 and end == next_month
+        return start if aligned else None
 
-        except Exception as e:
-            print(f"ERROR: Failed to get leaderboard data: {str(e)}")
-            print("Full traceback:")
-            traceback.print_exc()
-            return []
-        finally:
-            db_session.close()
+    def update_rollups_for_session(self, session, user_id: int, game_id: int, hours: float, credits: float, timestamp: datetime) -> None:
+        """
+        Fold a newly logged gaming session into its weekly, monthly and all-time rollups. A naive timestamp is
+        read as UTC, like the stored session timestamps. The caller commits.
+        """
+        session.flush()
+        if timestamp.tzinfo is None:
+            timestamp = pytz.UTC.localize(timestamp)
+        for period_type, period_start in self._rollup_periods(timestamp):
+            params = {
+                "period_type": period_type,
+                "period_start": period_start,
+                "user_id": user_id,
+                "game_id": game_id,
+                "hours": hours,
+                "credits": credits
+            }
+            game_rollup = session.execute(text("""
+                INSERT INTO leaderboard_game_rollups (period_type, period_start, user_id, game_id, hours, credits, session_count)
+                VALUES (:period_type, :period_start, :user_id, :game_id, :hours, :credits, 1)
+                ON CONFLICT (period_type, period_start, user_id, game_id) DO UPDATE SET
+                    hours = leaderboard_game_rollups.hours + EXCLUDED.hours,
+                    credits = leaderboard_game_rollups.credits + EXCLUDED.credits,
+                    session_count = leaderboard_game_rollups.session_count + 1
+                RETURNING hours, (xmax = 0) AS inserted
+            """), params).first()
+
+            params["game_hours"] = game_rollup.hours
+            params["new_game"] = 1 if game_rollup.inserted else 0
+            session.execute(text("""
+                INSERT INTO leaderboard_rollups (period_type, period_start, user_id, credits, total_hours, session_count, games_played, most_played_game_id, most_played_hours)
+                VALUES (:period_type, :period_start, :user_id, :credits, :hours, 1, 1, :game_id, :game_hours)
+                ON CONFLICT (period_type, period_start, user_id) DO UPDATE SET
+                    credits = leaderboard_rollups.credits + EXCLUDED.credits,
+                    total_hours = leaderboard_rollups.total_hours + EXCLUDED.total_hours,
+                    session_count = leaderboard_rollups.session_count + 1,
+                    games_played = leaderboard_rollups.games_played + :new_game,
+                    most_played_game_id = CASE
+                        WHEN EXCLUDED.most_played_hours > leaderboard_rollups.most_played_hours THEN EXCLUDED.most_played_game_id
+                        ELSE leaderboard_rollups.most_played_game_id
+                    END,
+                    most_played_hours = GREATEST(leaderboard_rollups.most_played_hours, EXCLUDED.most_played_hours)
+            """), params)
+
+    def update_rollups_for_credits(self, session, user_id: int, credits: float) -> None:
+        """Fold bonus or completion credits (negative to remove them) into the all-time rollup. The caller commits."""
+        session.flush()
+        session.execute(text("""
+            INSERT INTO leaderboard_rollups (period_type, period_start, user_id, credits, total_hours, session_count, games_played, most_played_hours)
+            VALUES ('alltime', :period_start, :user_id, :credits, 0, 0, 0, 0)
+            ON CONFLICT (period_type, period_start, user_id) DO UPDATE SET
+                credits = leaderboard_rollups.credits + EXCLUDED.credits
+        """), {"period_start": ROLLUP_ALLTIME_START, "user_id": user_id, "credits": credits})
+
+    def rebuild_leaderboard_rollups(self, session, user_ids: Optional[List[int]] = None) -> None:
+        """Recompute rollups from the source tables, for the given users or everyone. The caller commits."""
+        session.flush()
+        user_filter = "" if user_ids is None else "WHERE user_id = ANY(:user_ids)"
+        params = {"alltime_start": ROLLUP_ALLTIME_START, "user_ids": [int(u) for u in (user_ids or [])]}
+
+        session.execute(text(f"DELETE FROM leaderboard_rollups {user_filter}"), params)
+        session.execute(text(f"DELETE FROM leaderboard_game_rollups {user_filter}"), params)
+
+        # Session timestamps are stored as naive UTC wall-clock time; bucket them in CST like update_rollups_for_session
+        session.execute(text(f"""
+            INSERT INTO leaderboard_game_rollups (period_type, period_start, user_id, game_id, hours, credits, session_count)
+            SELECT p.period_type, p.period_start, s.user_id, s.game_id,
+                   SUM(s.hours), SUM(s.credits_earned), COUNT(*)
+            FROM (
+                SELECT
+                    user_id,
+                    game_id,
+                    hours,
+                    credits_earned,
+                    (gaming_sessions.timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'America/Chicago' AS local_ts
+                FROM gaming_sessions
+                {user_filter}
+            ) s
+            CROSS JOIN LATERAL (VALUES
+                ('weekly', date_trunc('week', s.local_ts)),
+                ('monthly', date_trunc('month', s.local_ts)),
+                ('alltime', CAST(:alltime_start AS timestamp))
+            ) AS p(period_type, period_start)
+            GROUP BY p.period_type, p.period_start, s.user_id, s.game_id
+        """), params)
+
+        session.execute(text(f"""
+            INSERT INTO leaderboard_rollups (period_type, period_start, user_id, credits, total_hours, session_count, games_played, most_played_game_id, most_played_hours)
+            SELECT
+                period_type,
+                period_start,
+                user_id,
+                SUM(credits),
+                SUM(hours),
+                SUM(session_count),
+                COUNT(*),
+                (ARRAY_AGG(game_id ORDER BY hours DESC))[1],
+                MAX(hours)
+            FROM leaderboard_game_rollups
+            {user_filter}
+            GROUP BY period_type, period_start, user_id
+        """), params)
+
+        # Bonuses and completions only count towards the all-time board
+        session.execute(text(f"""
+            INSERT INTO leaderboard_rollups (period_type, period_start, user_id, credits, total_hours, session_count, games_played, most_played_hours)
+            SELECT 'alltime', CAST(:alltime_start AS timestamp), user_id, SUM(credits), 0, 0, 0, 0
+            FROM (
+                SELECT user_id, credits FROM bonuses
+                UNION ALL
+                SELECT user_id, COALESCE(credits_awarded, 0) AS credits FROM game_completions
+            ) extra_credits
+            {user_filter}
+            GROUP BY user_id
+            ON CONFLICT (period_type, period_start, user_id) DO UPDATE SET
+                credits = leaderboard_rollups.credits + EXCLUDED.credits
+        """), params)
 
     async def record_leaderboard_placements(self, leaderboard_type: LeaderboardType, placements: List[Tuple[int, float, int, str, float, float]], period: LeaderboardPeriod) -> None:
-        """Record placements for the given leaderboard period. Always use unified period boundaries for recalculation."""
+        """Record the given placements (leaderboard rows, best first) for a leaderboard period in one upsert"""
         session = self.Session()
         try:
             # Only allow updating the most recent inactive period or an active period
@@ -546,48 +941,59 @@ class GameStorage:
             if not period.is_active and (not most_recent_inactive or period.id != most_recent_inactive.id):
                 print(f"Refusing to update placements for period {period.id} (not the most recent inactive period). No changes made.")
                 return
-            # Use unified period boundary calculation
-            from storage import get_period_boundaries
-            period_type = period.leaderboard_type.value.lower()
-            start, end = get_period_boundaries(period.start_time, period_type)
-            # Recalculate leaderboard data for this period
-            leaderboard_data = await self.get_leaderboard_by_timeframe(leaderboard_type, custom_start=start, custom_end=end)
-            naive_now = datetime.now()
-            current_time = self.cst.localize(naive_now)
-            print(f"\nRecording placements for {leaderboard_type.value}:")
-            print(f"Period: {start} to {end} CST")
-            print(f"Number of placements: {len(leaderboard_data)}")
-            existing_records = session.query(LeaderboardHistory)\
-                .filter(LeaderboardHistory.period_id == period.id)\
-                .all()
-            if existing_records:
-                print(f"Found {len(existing_records)} existing records for this period - updating")
-                for record in existing_records:
-                    session.delete(record)
-                session.commit()
-            for position, (user_id, credits, games, most_played, most_played_hours, total_hours) in enumerate(leaderboard_data, 1):
-                history = LeaderboardHistory(
-                    user_id=user_id,
-                    period_id=period.id,
-                    leaderboard_type=leaderboard_type,
-                    placement=position,
-                    credits=credits,
-                    games_played=games,
-                    most_played_game=most_played,
-                    most_played_hours=most_played_hours,
-                    total_hours=total_hours,
-                    timestamp=current_time
-                )
-                session.add(history)
-                print(f"Recording {position}{self._get_ordinal_suffix(position)} place: User {user_id} with {credits:,.1f} credits")
+            self._write_placements(session, period.id, leaderboard_type, placements)
             session.commit()
-            print("Successfully recorded all placements")
+            print(f"Recorded {len(placements)} {leaderboard_type.value} placements for period {period.id}")
         except Exception as e:
             print(f"Error recording leaderboard history: {str(e)}")
             session.rollback()
         finally:
             session.close()
 
+    def _write_placements(self, session, period_id: int, leaderboard_type: LeaderboardType, placements: List[Tuple[int, float, int, str, float, float]]) -> None:
+        """
+        Make a period's leaderboard_history exactly the given placements with one statement: rows are upserted
+        on (period_id, user_id) and players no longer on the board are removed, so writing the same placements
+        again changes nothing. The caller commits.
+        """
+        columns = list(zip(*placements)) if placements else [[]] * 6
+        session.execute(text("""
+            WITH placements AS (
+                SELECT *
+                FROM unnest(CAST(:user_ids AS BIGINT[]), CAST(:credits AS FLOAT[]), CAST(:games_played AS INTEGER[]),
+                            CAST(:most_played_games AS VARCHAR[]), CAST(:most_played_hours AS FLOAT[]), CAST(:total_hours AS FLOAT[]))
+                     WITH ORDINALITY AS p(user_id, credits, games_played, most_played_game, most_played_hours, total_hours, placement)
+            ),
+            dropped AS (
+                DELETE FROM leaderboard_history
+                WHERE period_id = :period_id AND user_id <> ALL(CAST(:user_ids AS BIGINT[]))
+            )
+            INSERT INTO leaderboard_history (user_id, period_id, leaderboard_type, placement, credits, games_played,
+                                             most_played_game, most_played_hours, total_hours, timestamp)
+            SELECT user_id, :period_id, CAST(:leaderboard_type AS leaderboardtype), placement, credits, games_played,
+                   most_played_game, most_played_hours, total_hours, :recorded_at
+            FROM placements
+            ON CONFLICT (period_id, user_id) DO UPDATE SET
+                leaderboard_type = EXCLUDED.leaderboard_type,
+                placement = EXCLUDED.placement,
+                credits = EXCLUDED.credits,
+                games_played = EXCLUDED.games_played,
+                most_played_game = EXCLUDED.most_played_game,
+                most_played_hours = EXCLUDED.most_played_hours,
+                total_hours = EXCLUDED.total_hours,
+                timestamp = EXCLUDED.timestamp
+        """), {
+            "period_id": period_id,
+            "leaderboard_type": leaderboard_type.name,
+            "user_ids": list(columns[0]),
+            "credits": list(columns[1]),
+            "games_played": list(columns[2]),
+            "most_played_games": list(columns[3]),
+            "most_played_hours": list(columns[4]),
+            "total_hours": list(columns[5]),
+            "recorded_at": datetime.now(self.cst)
+        })
+
     def _get_ordinal_suffix(self, number: int) -> str:
         """Helper method to get ordinal suffix (st, nd, rd, th)"""
         if 10 <= number % 100 <= 20:
@@ -748,33 +1154,15 @@ class GameStorage:
                 game.credits_per_hour = credits
                 game.added_by = user_id
                 
-                # Force fetch and update RAWG data for existing games
-                try:
-                    print(f"Force fetching RAWG data for existing game: {game.name}")
-                    rawg_data = await self.fetch_game_details_from_rawg(game.name)
-                    if rawg_data:
-                        # Force update all RAWG-related fields
-                        game.rawg_id = rawg_data.get('rawg_id')
-                        game.box_art_url = rawg_data.get('box_art_url')
-                        game.release_date = rawg_data.get('release_date')
-                        game.description = rawg_data.get('description')
-                        print(f"Successfully force updated RAWG data for existing game: {game.name}")
-                        print(f"- RAWG ID: {game.rawg_id}")
-                        print(f"- Box art URL: {game.box_art_url}")
-                        print(f"- Release date: {game.release_date}")
-                        print(f"- Description: {len(game.description) if game.description else 0} chars")
-                    else:
-                        print(f"Failed to fetch RAWG data for existing game: {game.name}")
-                except Exception as e:
-                    print(f"Error fetching RAWG data for existing game {game.name}: {str(e)}")
-                    print("Full traceback:")
-                    traceback.print_exc()
+                # Refresh RAWG data for existing games in the background
+                self.enqueue_game_enrichment(session, [game.id], force=True)
                 
-                # Update all existing gaming sessions for this game
-                gaming_sessions = session.query(GamingSession).filter(GamingSession.game_id == game.id).all()
-                for gaming_session in gaming_sessions:
-                    # Recalculate credits based on hours and new CPH
-                    gaming_session.credits_earned = gaming_session.hours * credits
+                # Recalculate all existing gaming sessions for this game with the new CPH and its half-life
+                affected_users = self.recalculate_session_credits(session, game_id=game.id)
+
+                # Session credits changed, so refresh the totals and rollups of everyone who played it
+                self.refresh_user_total_credits(session, affected_users)
+                self.rebuild_leaderboard_rollups(session, affected_users)
             else:
                 # Create the Backloggd URL
                 url_name = formatted_name.lower()
@@ -784,36 +1172,17 @@ class GameStorage:
                 
                 backloggd_url = f"https://www.backloggd.com/games/{url_name}/"
                 
-                # Fetch RAWG data
-                rawg_data = None
-                try:
-                    print(f"Fetching RAWG data for new game: {formatted_name}")
-                    rawg_data = await self.fetch_game_details_from_rawg(formatted_name)
-                    if rawg_data:
-                        print(f"Successfully fetched RAWG data for new game: {formatted_name}")
-                        print(f"- RAWG ID: {rawg_data.get('rawg_id')}")
-                        print(f"- Box art URL: {rawg_data.get('box_art_url')}")
-                        print(f"- Release date: {rawg_data.get('release_date')}")
-                    else:
-                        print(f"Failed to fetch RAWG data for new game: {formatted_name}")
-                except Exception as e:
-                    print(f"Error fetching RAWG data for new game {formatted_name}: {str(e)}")
-                    print("Full traceback:")
-                    traceback.print_exc()
-                
-                # Create new game with all data
+                # Create new game; RAWG data is filled in by the enrichment worker
                 game = Game(
                     name=formatted_name, 
                     credits_per_hour=credits, 
                     added_by=user_id,
-                    backloggd_url=backloggd_url,
-                    rawg_id=rawg_data.get('rawg_id') if rawg_data else None,
-                    box_art_url=rawg_data.get('box_art_url') if rawg_data else None,
-                    release_date=rawg_data.get('release_date') if rawg_data else None,
-                    description=rawg_data.get('description') if rawg_data else None
+                    backloggd_url=backloggd_url
                 )
                 
                 session.add(game)
+                session.flush()
+                self.enqueue_game_enrichment(session, [game.id])
             
             session.commit()
             return True
@@ -827,44 +1196,6 @@ class GameStorage:
         finally:
             session.close()
 
-    def _check_and_update_credits(self, session) -> bool:
-        """Check if any game rates have changed in the database and update credits if needed"""
-        try:
-            # Force a new session to ensure we get fresh data
-            temp_session = self.Session()
-            try:
-                # Get all games and their current rates from the database
-                current_games = temp_session.query(Game.id, Game.credits_per_hour).all()
-                current_rates = {game.id: game.credits_per_hour for game in current_games}
-
-                # Check if we need to recalculate by comparing with stored sessions
-                needs_update = False
-                sessions = temp_session.query(
-                    GamingSession.game_id,
-                    GamingSession.hours,
-                    GamingSession.credits_earned
-                ).all()
-
-                for session_data in sessions:
-                    expected_credits = session_data.hours * current_rates.get(session_data.game_id, 1.0)
-                    if abs(session_data.credits_earned - expected_credits) > 0.001:
-                        needs_update = True
-                        break
-            finally:
-                temp_session.close()
-
-            # If we found any discrepancies, recalculate everything using a new session
-            if needs_update:
-                self.recalculate_all_credits()
-                # Refresh the provided session to see the updates
-                session.expire_all()
-                session.commit()
-                return True
-
-            return False
-        except Exception as e:
-            return False
-
     def recalculate_all_credits(self) -> None:
         """Recalculate all credits based on current game rates and half-life settings"""
         session = self.Session()
@@ -872,101 +1203,35 @@ class GameStorage:
             # Force refresh of all data
             session.expire_all()
 
-            # Get all games and their current rates
-            games_dict = {}
-            for game in session.query(Game).all():
-                games_dict[game.id] = game
-
-            # Update all gaming sessions
-            total_sessions = 0
-            updated_sessions = 0
-
-            for game_id, game in games_dict.items():
-                # Get all sessions for this game
-                sessions = session.query(GamingSession).filter(GamingSession.game_id == game_id).all()
-                total_sessions += len(sessions)
-
-                for gaming_session in sessions:
-                    # Calculate new credits based on current rate and half-life
-                    new_credits = self.calculate_credits_with_half_life(
-                        gaming_session.hours, 
-                        game.credits_per_hour, 
-                        game.half_life_hours
-                    )
-
-                    # Update credits regardless of whether they've changed
-                    gaming_session.credits_earned = new_credits
-                    updated_sessions += 1
+            # Update all gaming sessions based on current rate and half-life in one batch
+            self.recalculate_session_credits(session)
 
+            # Now recalculate all user totals and rollups based on their sessions
+            self.refresh_user_total_credits(session)
+            self.rebuild_leaderboard_rollups(session)
             session.commit()
 
-            # Now recalculate all user totals based on their sessions
-            self.recalculate_all_user_credits()
-
         except Exception as e:
             session.rollback()
         finally:
             session.close()
 
     def update_user_total_credits(self, user_id: str) -> float:
-        """Calculate and update user's total credits from their gaming sessions"""
+        """Recalculate and store a user's total credits from their sessions, bonuses and completions"""
         session = self.Session()
         try:
-            # Calculate total credits from all gaming sessions
-            session_credits = session.query(func.sum(GamingSession.credits_earned))\
-                .filter(GamingSession.user_id == user_id)\
-                .scalar() or 0.0
-
-            # Calculate total credits from bonuses
-            bonus_credits = session.query(func.sum(Bonus.credits))\
-                .filter(Bonus.user_id == user_id)\
-                .scalar() or 0.0
-            
-            # Total credits is sum of both
-            total_credits = session_credits + bonus_credits
-
-            # Update user stats
-            user_stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
-            if not user_stats:
-                user_stats = UserStats(user_id=user_id, total_credits=total_credits)
-                session.add(user_stats)
-            else:
-                user_stats.total_credits = total_credits
-
+            self.refresh_user_total_credits(session, [int(user_id)])
             session.commit()
-            return total_credits
+            return self.get_user_credits(user_id)
         finally:
             session.close()
 
     def recalculate_all_user_credits(self) -> None:
-        """Recalculate all users' total credits from their gaming sessions"""
+        """Recalculate all users' total credits from their sessions, bonuses and completions"""
         session = self.Session()
         try:
-            # Get all unique user IDs from gaming sessions
-            user_ids = session.query(GamingSession.user_id.distinct()).all()
-
-            for (user_id,) in user_ids:
-                # Calculate total credits for this user
-                session_credits = session.query(func.sum(GamingSession.credits_earned))\
-                    .filter(GamingSession.user_id == user_id)\
-                    .scalar() or 0.0
-            
-                 # Calculate total from bonuses
-                bonus_credits = session.query(func.sum(Bonus.credits))\
-                    .filter(Bonus.user_id == user_id)\
-                    .scalar() or 0.0
-                
-                 # Total credits is sum of both
-                total_credits = session_credits + bonus_credits
-
-                # Update or create user stats
-                user_stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
-                if not user_stats:
-                    user_stats = UserStats(user_id=user_id, total_credits=total_credits)
-                    session.add(user_stats)
-
+            self.refresh_user_total_credits(session)
             session.commit()
-
         except Exception as e:
             session.rollback()
             raise
@@ -999,23 +1264,23 @@ class GameStorage:
                 game.half_life_hours
             )
             
-            # Create or update gaming session
+            self.ensure_user_stats(session, user_id)
+
+            # Create or update gaming session; session timestamps are stored as naive UTC wall-clock time
+            timestamp = datetime.now(timezone.utc)
             gaming_session = GamingSession(
                 user_id=user_id,
                 game_id=game.id,
                 hours=hours,
                 credits_earned=credits_earned,
-                timestamp=datetime.now(timezone.utc)
+                timestamp=timestamp.replace(tzinfo=None)
             )
             session.add(gaming_session)
-            
-            # Update user stats
-            user_stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
-            if not user_stats:
-                user_stats = UserStats(user_id=user_id)
-                session.add(user_stats)
-            
-            user_stats.total_credits += credits_earned
+            session.flush()
+            self.record_credits(session, user_id, credits_earned, 'session', gaming_session.id)
+
+            # Keep the leaderboard rollups in step with the new session
+            self.update_rollups_for_session(session, user_id, game.id, hours, credits_earned, timestamp)
             
             # Commit changes
             session.commit()
@@ -1034,92 +1299,26 @@ class GameStorage:
                 session.close()
 
     def get_user_credits(self, user_id: int) -> float:
-        """Get user's total credits by summing all gaming sessions and bonuses"""
+        """Get user's total credits (their latest credit_ledger balance, kept in user_stats; see record_credits)"""
         session = self.Session()
         try:
-            # Calculate total from gaming sessions
-            session_credits = session.query(func.sum(GamingSession.credits_earned))\
-                .filter(GamingSession.user_id == user_id)\
-                .scalar() or 0.0
-                
-            # Calculate total from bonuses
-            bonus_credits = session.query(func.sum(Bonus.credits))\
-                .filter(Bonus.user_id == user_id)\
-                .scalar() or 0.0
-
-            # Total credits is sum of both
-            total_credits = session_credits + bonus_credits
-
-            # Update the stored total in user_stats to keep it in sync
-            user_stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
-            if user_stats and abs(user_stats.total_credits - total_credits) > 0.001:
-                user_stats.total_credits = total_credits
-                session.commit()
-
-            return total_credits
+            total_credits = session.execute(text("""
+                SELECT total_credits FROM user_stats WHERE user_id = :user_id
+            """), {"user_id": user_id}).scalar()
+            return float(total_credits or 0.0)
         finally:
             session.close()
 
     def get_leaderboard(self) -> List[Tuple[int, float]]:
-        """Get sorted list of (user_id, credits) tuples"""
+        """Get sorted list of (user_id, credits) tuples from the ledger balances kept in user_stats"""
         session = self.Session()
         try:
-            # Get total credits from gaming sessions for each user
-            session_credits = session.query(
-                GamingSession.user_id,
-                func.sum(GamingSession.credits_earned).label('session_credits')
-            ).group_by(
-                GamingSession.user_id
-            ).subquery()
-
-            # Get total bonus credits for each user
-            bonus_credits = session.query(
-                Bonus.user_id,
-                func.sum(Bonus.credits).label('bonus_credits')
-            ).group_by(
-                Bonus.user_id
-            ).subquery()
-
-            # Get total completion credits for each user
-            completion_credits = session.query(
-                GameCompletion.user_id,
-                func.sum(GameCompletion.credits_awarded).label('completion_credits')
-            ).group_by(
-                GameCompletion.user_id
-            ).subquery()
-
-            # Combine session credits, bonus credits, and completion credits
-            results = session.query(
-                session_credits.c.user_id,
-                (func.coalesce(session_credits.c.session_credits, 0) + 
-                 func.coalesce(bonus_credits.c.bonus_credits, 0) + 
-                 func.coalesce(completion_credits.c.completion_credits, 0)).label('total_credits')
-            ).outerjoin(
-                bonus_credits,
-                session_credits.c.user_id == bonus_credits.c.user_id
-            ).outerjoin(
-                completion_credits,
-                session_credits.c.user_id == completion_credits.c.user_id
-            ).all()
-
-            # Update user_stats table with new total credits
-            for user_id, total_credits in results:
-                user_stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
-                if user_stats:
-                    user_stats.total_credits = total_credits
-                else:
-                    user_stats = UserStats(user_id=user_id, total_credits=total_credits)
-                    session.add(user_stats)
-            
-            session.commit()
-
-            # Get all users ordered by total credits
-            users = session.query(UserStats)\
-                .order_by(UserStats.total_credits.desc())\
-                .all()
-            
-            # Return list of (user_id, total_credits) tuples
-            return [(user.user_id, user.total_credits) for user in users]
+            results = session.execute(text("""
+                SELECT user_id, COALESCE(total_credits, 0) AS total_credits
+                FROM user_stats
+                ORDER BY total_credits DESC
+            """)).fetchall()
+            return [(row.user_id, float(row.total_credits)) for row in results]
         finally:
             session.close()
 
@@ -1152,12 +1351,12 @@ class GameStorage:
         """Get overall gaming statistics for a user"""
         session = self.Session()
         try:
-            # Get all stats in a single query
+            # Get all stats in a single query. The balance is the user's ledger balance, and the rank is one
+            # more than the number of users above it: a range scan of ix_user_stats_total_credits
             result = session.execute(text("""
-                WITH user_stats AS (
+                WITH session_stats AS (
                     SELECT 
                         COALESCE(SUM(hours), 0) as total_hours,
-                        COALESCE(SUM(credits_earned), 0) as session_credits,
                         COUNT(DISTINCT game_id) as games_played,
                         COUNT(*) as total_sessions,
                         MIN(timestamp) as first_played,
@@ -1165,18 +1364,6 @@ class GameStorage:
                     FROM gaming_sessions
                     WHERE user_id = :user_id
                 ),
-                bonus_stats AS (
-                    SELECT 
-                        COALESCE(SUM(credits), 0) as bonus_credits
-                    FROM bonuses
-                    WHERE user_id = :user_id
-                ),
-                completion_stats AS (
-                    SELECT 
-                        COALESCE(SUM(credits_awarded), 0) as completion_credits
-                    FROM game_completions
-                    WHERE user_id = :user_id
-                ),
                 most_played AS (
                     SELECT 
                         g.name,
@@ -1188,49 +1375,24 @@ class GameStorage:
                     ORDER BY total_hours DESC
                     LIMIT 1
                 ),
-                user_rank AS (
-                    SELECT 
-                        user_id,
-                        RANK() OVER (ORDER BY (COALESCE(SUM(credits_earned), 0) + COALESCE(SUM(bonus_credits), 0) + COALESCE(SUM(completion_credits), 0)) DESC) as rank
-                    FROM (
-                        SELECT 
-                            gs.user_id,
-                            gs.credits_earned,
-                            0 as bonus_credits,
-                            0 as completion_credits
-                        FROM gaming_sessions gs
-                        UNION ALL
-                        SELECT 
-                            b.user_id,
-                            0 as credits_earned,
-                            b.credits as bonus_credits,
-                            0 as completion_credits
-                        FROM bonuses b
-                        UNION ALL
-                        SELECT 
-                            gc.user_id,
-                            0 as credits_earned,
-                            0 as bonus_credits,
-                            gc.credits_awarded as completion_credits
-                        FROM game_completions gc
-                    ) combined_credits
-                    GROUP BY user_id
+                balance AS (
+                    SELECT total_credits FROM user_stats WHERE user_id = :user_id
                 )
                 SELECT 
-                    us.total_hours,
-                    (us.session_credits + COALESCE(bs.bonus_credits, 0) + COALESCE(cs.completion_credits, 0)) as total_credits,
-                    us.games_played,
-                    us.total_sessions,
-                    us.first_played,
-                    us.last_played,
+                    ss.total_hours,
+                    COALESCE(b.total_credits, 0) as total_credits,
+                    ss.games_played,
+                    ss.total_sessions,
+                    ss.first_played,
+                    ss.last_played,
                     mp.name as most_played_game,
                     mp.total_hours as most_played_hours,
-                    ur.rank
-                FROM user_stats us
-                LEFT JOIN bonus_stats bs ON true
-                LEFT JOIN completion_stats cs ON true
+                    CASE WHEN b.total_credits IS NOT NULL THEN
+                        (SELECT COUNT(*) FROM user_stats WHERE total_credits > b.total_credits) + 1
+                    END as rank
+                FROM session_stats ss
+                LEFT JOIN balance b ON true
                 LEFT JOIN most_played mp ON true
-                LEFT JOIN user_rank ur ON ur.user_id = :user_id
             """), {"user_id": user_id}).first()
 
             if not result:
@@ -1375,15 +1537,7 @@ class GameStorage:
         """Add bonus credits to a user's balance and log the bonus"""
         session = self.Session()
         try:
-            # Get or create user stats
-            user_stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
-            if not user_stats:
-                user_stats = UserStats(user_id=user_id, total_credits=0.0)
-                session.add(user_stats)
-                session.commit()
-
-            # Add the bonus credits
-            user_stats.total_credits += credits
+            self.ensure_user_stats(session, user_id)
 
             # Log the bonus
             bonus = Bonus(
@@ -1394,8 +1548,13 @@ class GameStorage:
                 timestamp=datetime.now(pytz.UTC)
             )
             session.add(bonus)
+            session.flush()
+
+            # Add the bonus credits
+            total_credits = self.record_credits(session, user_id, credits, 'bonus', bonus.id)
+            self.update_rollups_for_credits(session, user_id, credits)
             session.commit()
-            return user_stats.total_credits
+            return total_credits
 
         finally:
             session.close()
@@ -1461,8 +1620,13 @@ class GameStorage:
             }
 
             # Delete all gaming sessions for this game first
+            affected_users = [user_id for (user_id,) in session.query(GamingSession.user_id.distinct()).filter(GamingSession.game_id == game.id).all()]
             session.query(GamingSession).filter(GamingSession.game_id == game.id).delete()
 
+            # Rebuild the players' balances and rollups without the deleted sessions
+            self.refresh_user_total_credits(session, affected_users, source='game_deleted')
+            self.rebuild_leaderboard_rollups(session, affected_users)
+
             # Then delete the game itself
             session.delete(game)
             session.commit()
@@ -1525,17 +1689,8 @@ class GameStorage:
 
             sessions_data = []
             for row in rows:
+                # Missing box art is filled in by the enrichment worker, not on this read path
                 box_art_url = row.box_art_url
-                # If no box art URL, try to fetch from RAWG
-                if not box_art_url:
-                    rawg_data = await self.fetch_game_details_from_rawg(row.game_name)
-                    if rawg_data and rawg_data.get('box_art_url'):
-                        box_art_url = rawg_data['box_art_url']
-                        # Update the game in the database with the RAWG box art URL
-                        game = session.query(Game).filter(Game.id == row.game_id).first()
-                        if game:
-                            game.box_art_url = box_art_url
-                            session.commit()
 
                 sessions_data.append({
                     'id': row.id,
@@ -1769,6 +1924,201 @@ class GameStorage:
         finally:
             session.close()
 
+    def _query_game_reviews(self, session, game_id: int, limit: int = REVIEWS_PAGE_SIZE,
+                            before: Optional[Tuple[datetime, int]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        A page of a game's reviews, newest first, with each reviewer's rating, total hours and
+        hours at review time, in one query. before is a decoded cursor (see decode_review_cursor).
+        Returns (reviews, cursor of the next page or None on the last page).
+        """
+        params = {"game_id": game_id, "limit": limit + 1}
+        after_cursor = ""
+        if before:
+            # Keyset pagination: the page starts right after the last review of the previous one
+            after_cursor = "AND (r.timestamp, r.id) < (:before_timestamp, :before_id)"
+            params.update(before_timestamp=before[0], before_id=before[1])
+
+        # The lateral aggregates run once per review on the page, using the (user_id, game_id, timestamp) index
+        rows = session.execute(text(f"""
+            SELECT
+                r.id,
+                r.user_id,
+                r.review_text,
+                r.timestamp,
+                gr.rating,
+                h.total_hours,
+                h.hours_at_review
+            FROM game_reviews r
+            LEFT JOIN LATERAL (
+                SELECT rating FROM game_ratings
+                WHERE user_id = r.user_id AND game_id = r.game_id
+                LIMIT 1
+            ) gr ON TRUE
+            CROSS JOIN LATERAL (
+                SELECT
+                    COALESCE(SUM(hours), 0) AS total_hours,
+                    COALESCE(SUM(hours) FILTER (WHERE timestamp <= r.timestamp), 0) AS hours_at_review
+                FROM gaming_sessions
+                WHERE user_id = r.user_id AND game_id = r.game_id
+            ) h
+            WHERE r.game_id = :game_id {after_cursor}
+            ORDER BY r.timestamp DESC, r.id DESC
+            LIMIT :limit
+        """), params).fetchall()
+
+        # One row past the page tells whether there is a next page
+        next_cursor = encode_review_cursor(rows[limit - 1].timestamp, rows[limit - 1].id) if len(rows) > limit else None
+        return [{
+            'id': row.id,
+            'user_id': str(row.user_id),
+            'review_text': row.review_text,
+            'timestamp': row.timestamp,
+            'rating': row.rating,
+            'total_hours': float(row.total_hours),
+            'hours_at_review': float(row.hours_at_review)
+        } for row in rows[:limit]], next_cursor
+
+    def get_game_reviews(self, game_name: str, limit: int = REVIEWS_PAGE_SIZE,
+                         cursor: Optional[str] = None) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """A page of a game's reviews and the next page's cursor (see _query_game_reviews), or None if the game doesn't exist.
+        Raises ValueError for a malformed cursor."""
+        before = decode_review_cursor(cursor) if cursor else None
+        session = self.Session()
+        try:
+            game_id = session.execute(text("SELECT id FROM games WHERE name = :name"), {"name": game_name}).scalar()
+            if game_id is None:
+                return None
+            return self._query_game_reviews(session, game_id, limit, before)
+        finally:
+            session.close()
+
+    def get_game_page(self, game_name: str, viewer_id: Optional[int] = None,
+                      players_limit: int = 6, activity_limit: int = 15) -> Optional[Dict[str, Any]]:
+        """Everything the game page shows, read in one session with a fixed number of queries.
+        User ids are returned unresolved so the caller can look up every profile at once.
+        viewer_id adds the logged-in user's own stats, rating and completion."""
+        session = self.Session()
+        try:
+            game = session.query(Game).filter(func.lower(Game.name) == func.lower(game_name)).first()
+            if not game:
+                return None
+            params = {"game_id": game.id, "viewer_id": viewer_id}
+
+            stats = session.execute(text("""
+                SELECT
+                    COALESCE(SUM(hours), 0) AS total_hours,
+                    COALESCE(SUM(credits_earned), 0) AS total_credits,
+                    COUNT(*) AS total_sessions,
+                    COUNT(DISTINCT user_id) AS unique_players,
+                    COALESCE(SUM(hours) FILTER (WHERE user_id = :viewer_id), 0) AS viewer_hours,
+                    COALESCE(SUM(credits_earned) FILTER (WHERE user_id = :viewer_id), 0) AS viewer_credits,
+                    COUNT(*) FILTER (WHERE user_id = :viewer_id) AS viewer_sessions,
+                    MIN(timestamp) FILTER (WHERE user_id = :viewer_id) AS viewer_first_played,
+                    MAX(timestamp) FILTER (WHERE user_id = :viewer_id) AS viewer_last_played
+                FROM gaming_sessions
+                WHERE game_id = :game_id
+            """), params).first()
+
+            # Players of the last 7 days, most recently active first
+            players = session.execute(text("""
+                SELECT user_id, SUM(hours) AS total_hours
+                FROM gaming_sessions
+                WHERE game_id = :game_id AND timestamp >= :since
+                GROUP BY user_id
+                ORDER BY MAX(timestamp) DESC
+                LIMIT :limit
+            """), {**params, "since": datetime.now(self.cst) - timedelta(days=7), "limit": players_limit}).fetchall()
+
+            activity = session.execute(text("""
+                SELECT id, user_id, hours, timestamp
+                FROM gaming_sessions
+                WHERE game_id = :game_id
+                ORDER BY timestamp DESC
+                LIMIT :limit
+            """), {**params, "limit": activity_limit}).fetchall()
+
+            ratings = session.execute(text("""
+                SELECT AVG(rating) AS average, COUNT(*) AS count,
+                       MAX(rating) FILTER (WHERE user_id = :viewer_id) AS viewer_rating
+                FROM game_ratings
+                WHERE game_id = :game_id
+            """), params).first()
+
+            completions = session.execute(text("""
+                SELECT COUNT(*) AS count, COALESCE(BOOL_OR(user_id = :viewer_id), FALSE) AS viewer_completed
+                FROM game_completions
+                WHERE game_id = :game_id
+            """), params).first()
+
+            reviews, reviews_next_cursor = self._query_game_reviews(session, game.id)
+
+            screenshots = session.execute(text("""
+                SELECT id, user_id, blob_key, caption, uploaded_at
+                FROM game_screenshots
+                WHERE game_id = :game_id
+                ORDER BY uploaded_at DESC
+            """), params).fetchall()
+
+            page = {
+                'game': {
+                    "name": game.name,
+                    "total_hours": float(stats.total_hours),
+                    "total_credits": float(stats.total_credits),
+                    "total_sessions": stats.total_sessions,
+                    "unique_players": stats.unique_players,
+                    "credits_per_hour": game.credits_per_hour,
+                    "half_life_hours": game.half_life_hours,
+                    "added_by": game.added_by,
+                    "backloggd_url": game.backloggd_url,
+                    "box_art_url": game.box_art_url,
+                    "rawg_id": game.rawg_id,
+                    "release_date": game.release_date,
+                    "description": game.description
+                },
+                'players': [{'user_id': str(p.user_id), 'hours': float(p.total_hours)} for p in players],
+                'activity': [{
+                    'id': a.id,
+                    'user_id': str(a.user_id),
+                    'hours': float(a.hours),
+                    'timestamp': a.timestamp,
+                    'game_name': game.name,
+                    'box_art_url': game.box_art_url
+                } for a in activity],
+                'ratings': {
+                    'average': round(float(ratings.average), 2) if ratings.count else None,
+                    'count': ratings.count,
+                    'viewer_rating': ratings.viewer_rating
+                },
+                'completions': {
+                    'count': completions.count,
+                    'viewer_completed': bool(viewer_id) and completions.viewer_completed
+                },
+                'reviews': reviews,
+                'reviews_next_cursor': reviews_next_cursor,
+                'screenshots': [{
+                    'id': s.id,
+                    'user_id': str(s.user_id),
+                    'blob_key': s.blob_key,
+                    'caption': s.caption,
+                    'uploaded_at': s.uploaded_at
+                } for s in screenshots],
+                'viewer': None
+            }
+            if viewer_id:
+                page['viewer'] = {
+                    "name": game.name,
+                    "total_hours": float(stats.viewer_hours),
+                    "total_credits": float(stats.viewer_credits),
+                    "total_sessions": stats.viewer_sessions,
+                    "first_played": stats.viewer_first_played,
+                    "last_played": stats.viewer_last_played,
+                    "credits_per_hour": game.credits_per_hour,
+                    "backloggd_url": game.backloggd_url
+                }
+            return page
+        finally:
+            session.close()
+
     def get_multiple_game_stats(self, game_names):
         session = self.Session()
         try:
@@ -1843,31 +2193,7 @@ class GameStorage:
         Returns:
             Total credits earned
         """
-        if half_life_hours is None or half_life_hours <= 0:
-            # No half-life, use simple calculation
-            return hours * base_cph
-        
-        total_credits = 0.0
-        remaining_hours = hours
-        current_cph = base_cph
-        current_threshold = half_life_hours
-        
-        while remaining_hours > 0:
-            # Calculate how many hours we can apply at the current CPH rate
-            hours_at_current_rate = min(remaining_hours, current_threshold)
-            
-            # Add credits for this segment
-            total_credits += hours_at_current_rate * current_cph
-            
-            # Update remaining hours
-            remaining_hours -= hours_at_current_rate
-            
-            # If we still have hours remaining, halve the CPH and double the threshold
-            if remaining_hours > 0:
-                current_cph /= 2.0
-                current_threshold *= 2.0
-        
-        return total_credits
+        return credit_engine.credits_for_total_hours(hours, base_cph, half_life_hours)
 
     def calculate_credits_with_half_life_for_session(self, session_hours: float, total_game_hours: float, base_cph: float, half_life_hours: float = None) -> float:
         """
@@ -1882,38 +2208,207 @@ class GameStorage:
         Returns:
             Total credits earned for this session
         """
-        if half_life_hours is None or half_life_hours <= 0:
-            # No half-life, use simple calculation
-            return session_hours * base_cph
-        
-        total_credits = 0.0
-        remaining_session_hours = session_hours
-        current_hour = total_game_hours  # Start from where we left off
-        
-        while remaining_session_hours > 0:
-            # Calculate how many half-life boundaries have been crossed
-            # At 0-10h: 0 boundaries crossed, CPH = base_cph
-            # At 10-20h: 1 boundary crossed, CPH = base_cph/2
-            # At 20-30h: 2 boundaries crossed, CPH = base_cph/4
-            # etc.
-            boundaries_crossed = int(current_hour // half_life_hours)
-            current_cph = base_cph / (2 ** boundaries_crossed)
-            
-            # Calculate the next threshold
-            next_threshold = (boundaries_crossed + 1) * half_life_hours
-            
-            # Calculate how many hours we can apply at the current CPH rate
-            hours_until_next_threshold = next_threshold - current_hour
-            hours_at_current_rate = min(remaining_session_hours, hours_until_next_threshold)
-            
-            # Add credits for this segment
-            total_credits += hours_at_current_rate * current_cph
-            
-            # Update remaining hours and current hour
-            remaining_session_hours -= hours_at_current_rate
-            current_hour += hours_at_current_rate
-        
-        return total_credits
+        return credit_engine.credits_for_session(session_hours, total_game_hours, base_cph, half_life_hours)
+
+    def recalculate_session_credits(self, session, game_id: Optional[int] = None) -> List[int]:
+        """Recompute credits_earned for every session (or one game's sessions) in a single batch; returns affected user IDs"""
+        # Each session's prior hours on the game come from a running total, so
+        # recalculated credits match what logging the sessions in order awarded
+        query = """
+            SELECT gs.id, gs.user_id, gs.hours,
+                   SUM(gs.hours) OVER (PARTITION BY gs.user_id, gs.game_id ORDER BY gs.timestamp, gs.id) - gs.hours AS prior_hours,
+                   gs.players, g.credits_per_hour, g.half_life_hours
+            FROM gaming_sessions gs
+            JOIN games g ON g.id = gs.game_id
+        """
+        params = {}
+        if game_id is not None:
+            query += " WHERE gs.game_id = :game_id"
+            params["game_id"] = game_id
+
+        session.flush()
+        rows = session.execute(text(query), params).fetchall()
+        if not rows:
+            return []
+
+        session_ids, user_ids, hours, prior_hours, players, cph, half_life = zip(*rows)
+        credits = credit_engine.batch_credits_for_sessions(
+            hours,
+            prior_hours,
+            [1.0 if rate is None else rate for rate in cph],
+            [float('nan') if hl is None else hl for hl in half_life]
+        )
+
+        # Same players bonus as log_game_session: +10% per extra player, up to 5 players
+        players_bonus = [1 + 0.1 * (max(1, min(count or 1, 5)) - 1) for count in players]
+        credits = credits * players_bonus
+
+        # One UPDATE joined against the computed values instead of a write per ORM row
+        session.execute(text("""
+            UPDATE gaming_sessions gs
+            SET credits_earned = v.credits
+            FROM unnest(CAST(:ids AS integer[]), CAST(:credits AS double precision[])) AS v(id, credits)
+            WHERE gs.id = v.id
+        """), {"ids": list(session_ids), "credits": credits.tolist()})
+        session.expire_all()
+
+        return list(set(user_ids))
+
+    def ensure_user_stats(self, session, user_id: int) -> None:
+        """Create the user's user_stats row (balance 0) if it doesn't exist yet. The caller commits."""
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits) VALUES (:user_id, 0)
+            ON CONFLICT (user_id) DO NOTHING
+        """), {"user_id": user_id})
+
+    def record_credits(self, session, user_id: int, credits: float, source: str, reference_id: Optional[int] = None) -> float:
+        """
+        Append a credit change (negative to deduct) to credit_ledger and move the user's balance in
+        user_stats with it, in one statement; creates the user if needed. source says where the credits
+        came from ('session', 'bonus', 'completion', ...) and reference_id is that row's id.
+        The balance row stays locked until the caller commits, so a user's entries are applied one at
+        a time and each entry's running balance is exact. Every write that adds or removes sessions,
+        bonuses or completions must call this (or refresh_user_total_credits) in the same transaction.
+        Returns the new balance.
+        """
+        return session.execute(text("""
+            WITH balance AS (
+                INSERT INTO user_stats (user_id, total_credits) VALUES (:user_id, :credits)
+                ON CONFLICT (user_id) DO UPDATE SET total_credits = COALESCE(user_stats.total_credits, 0) + EXCLUDED.total_credits
+                RETURNING total_credits
+            )
+            INSERT INTO credit_ledger (user_id, delta, balance, source, reference_id, created_at)
+            SELECT :user_id, :credits, total_credits, :source, :reference_id, CAST(clock_timestamp() AS timestamp)
+            FROM balance
+            RETURNING balance
+        """), {"user_id": user_id, "credits": credits, "source": source, "reference_id": reference_id}).scalar()
+
+    def get_credit_history(self, user_id: int, limit: int = 50, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        A user's ledger entries, newest first; pass the last entry's id as before_id for the next page.
+        Entries are ordered by id, the order they were applied in: backfilled created_at values don't share a
+        time zone, so they can't order or page the history.
+        """
+        session = self.Session()
+        try:
+            results = session.execute(text(f"""
+                SELECT id, delta, balance, source, reference_id, created_at
+                FROM credit_ledger
+                WHERE user_id = :user_id
+                {"AND id < :before_id" if before_id is not None else ""}
+                ORDER BY id DESC
+                LIMIT :limit
+            """), {"user_id": user_id, "before_id": before_id, "limit": limit}).fetchall()
+            return [{
+                'id': row.id,
+                'delta': float(row.delta),
+                'balance': float(row.balance),
+                'source': row.source,
+                'reference_id': row.reference_id,
+                'created_at': row.created_at
+            } for row in results]
+        finally:
+            session.close()
+
+    def reconcile_user_credits(self, fix: bool = True, tolerance: float = 0.001, sample_size: int = 10) -> Dict[str, Any]:
+        """
+        Compare every balance (user_stats and the latest ledger entry) with the sum of the user's sessions,
+        bonuses and completions. With fix, balances that drifted by more than tolerance are reset to that
+        sum, and the correction is appended to the ledger as a 'reconciliation' entry.
+        Returns {'users_checked', 'users_drifted', 'total_drift', 'net_drift', 'max_drift', 'fixed',
+        'sample': [(user_id, stored, expected), ...] for the largest drifts}.
+        """
+        session = self.Session()
+        try:
+            users_checked = session.execute(text("SELECT COUNT(*) FROM user_stats")).scalar()
+            drifted = session.execute(text(f"""
+                SELECT user_id, stored, expected FROM ({self._balance_check_sql()}) t
+                WHERE abs(stored - expected) > :tolerance OR abs(ledger_balance - expected) > :tolerance
+            """), {"tolerance": tolerance}).fetchall()
+
+            fixed = 0
+            if fix and drifted:
+                # Rechecked under lock: a write that committed meanwhile may have changed both sides
+                drifted = self.refresh_user_total_credits(session, [row.user_id for row in drifted],
+                                                          source='reconciliation', tolerance=tolerance)
+                fixed = len(drifted)
+                session.commit()
+
+            drifts = [float(row.stored) - float(row.expected) for row in drifted]
+            largest = sorted(drifted, key=lambda row: abs(float(row.stored) - float(row.expected)), reverse=True)
+            return {
+                'users_checked': users_checked,
+                'users_drifted': len(drifted),
+                'total_drift': sum(abs(drift) for drift in drifts),
+                'net_drift': sum(drifts),
+                'max_drift': max((abs(drift) for drift in drifts), default=0.0),
+                'fixed': fixed,
+                'sample': [(row.user_id, float(row.stored), float(row.expected)) for row in largest[:sample_size]]
+            }
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _balance_check_sql(self, user_filter: str = "") -> str:
+        """(user_id, stored, ledger_balance, expected) per user: user_stats, the last ledger entry applied and source sums"""
+        return f"""
+            SELECT us.user_id,
+                   COALESCE(us.total_credits, 0) AS stored,
+                   COALESCE(latest.balance, 0) AS ledger_balance,
+                   COALESCE((SELECT SUM(credits_earned) FROM gaming_sessions WHERE user_id = us.user_id), 0)
+                 + COALESCE((SELECT SUM(credits) FROM bonuses WHERE user_id = us.user_id), 0)
+                 + COALESCE((SELECT SUM(credits_awarded) FROM game_completions WHERE user_id = us.user_id), 0) AS expected
+            FROM user_stats us
+            LEFT JOIN LATERAL (
+                SELECT balance FROM credit_ledger
+                WHERE user_id = us.user_id
+                ORDER BY id DESC
+                LIMIT 1
+            ) latest ON true
+            {user_filter}
+        """
+
+    def refresh_user_total_credits(self, session, user_ids: Optional[List[int]] = None, source: str = 'recalculation',
+                                   tolerance: float = 1e-6) -> List[Any]:
+        """
+        Reset balances to the sum of sessions, bonuses and completions for the given users (all users if None),
+        appending each change to credit_ledger under source. The caller commits.
+        Returns the (user_id, stored, expected) rows that changed.
+        """
+        if user_ids is not None and not user_ids:
+            return []
+
+        user_filter = ""
+        params = {"source": source, "tolerance": tolerance}
+        if user_ids is not None:
+            user_filter = "WHERE us.user_id = ANY(:user_ids)"
+            params["user_ids"] = sorted(int(u) for u in user_ids)
+
+        session.flush()
+        # Lock the balances in id order, like every other multi-row writer; the sums below then can't move
+        session.execute(text(f"SELECT us.user_id FROM user_stats us {user_filter} ORDER BY us.user_id FOR UPDATE"), params)
+        changed = session.execute(text(f"""
+            WITH checked AS ({self._balance_check_sql(user_filter)}),
+            changed AS (
+                UPDATE user_stats us
+                SET total_credits = c.expected
+                FROM checked c
+                WHERE us.user_id = c.user_id
+                  AND (abs(c.stored - c.expected) > :tolerance OR abs(c.ledger_balance - c.expected) > :tolerance)
+                RETURNING c.user_id, c.stored, c.ledger_balance, c.expected
+            ),
+            ledger AS (
+                INSERT INTO credit_ledger (user_id, delta, balance, source, created_at)
+                SELECT user_id, expected - ledger_balance, expected, :source, CAST(clock_timestamp() AS timestamp)
+                FROM changed
+                WHERE abs(ledger_balance - expected) > :tolerance
+            )
+            SELECT user_id, stored, expected FROM changed ORDER BY user_id
+        """), params).fetchall()
+        session.expire_all()
+        return changed
 
     def calculate_credits(self, duration_minutes: int) -> float:
         """Calculate credits earned for a given duration in minutes."""
@@ -1926,84 +2421,55 @@ class GameStorage:
         """Get all-time leaderboard data."""
         db_session = self.Session()
         try:
-            # Get total credits from gaming sessions for each user
-            session_credits = db_session.query(
-                GamingSession.user_id,
-                func.sum(GamingSession.credits_earned).label('session_credits'),
-                func.count(GamingSession.game_id.distinct()).label('games_played'),
-                func.sum(GamingSession.hours).label('total_hours')
-            ).group_by(
-                GamingSession.user_id
-            ).subquery()
-
-            # Get total bonus credits for each user
-            bonus_credits = db_session.query(
-                Bonus.user_id,
-                func.sum(Bonus.credits).label('bonus_credits')
-            ).group_by(
-                Bonus.user_id
-            ).subquery()
-
-            # Get total completion credits for each user
-            completion_credits = db_session.query(
-                GameCompletion.user_id,
-                func.sum(GameCompletion.credits_awarded).label('completion_credits')
-            ).group_by(
-                GameCompletion.user_id
-            ).subquery()
-
-            # Combine session credits, bonus credits, and completion credits
-            results = db_session.query(
-                session_credits.c.user_id,
-                (func.coalesce(session_credits.c.session_credits, 0) + 
-                 func.coalesce(bonus_credits.c.bonus_credits, 0) + 
-                 func.coalesce(completion_credits.c.completion_credits, 0)).label('total_credits'),
-                session_credits.c.games_played,
-                session_credits.c.total_hours
-            ).outerjoin(
-                bonus_credits,
-                session_credits.c.user_id == bonus_credits.c.user_id
-            ).outerjoin(
-                completion_credits,
-                session_credits.c.user_id == completion_credits.c.user_id
-            ).order_by(
-                (func.coalesce(session_credits.c.session_credits, 0) + 
-                 func.coalesce(bonus_credits.c.bonus_credits, 0) + 
-                 func.coalesce(completion_credits.c.completion_credits, 0)).desc()
-            ).all()
-
-            # Get most played game for each user
-            most_played_games = {}
-            for user_id, _, _, _ in results:
-                most_played = db_session.query(
-                    Game.name,
-                    func.sum(GamingSession.hours).label('game_hours')
-                ).join(
-                    GamingSession, Game.id == GamingSession.game_id
-                ).filter(
-                    GamingSession.user_id == user_id
-                ).group_by(
-                    Game.name
-                ).order_by(
-                    func.sum(GamingSession.hours).desc()
-                ).first()
-
-                if most_played:
-                    most_played_games[user_id] = (most_played.name, float(most_played.game_hours))
-                else:
-                    most_played_games[user_id] = ('No games', 0.0)
+            # One statement for every user: per-game totals are computed once and feed both the
+            # user's totals and, through ROW_NUMBER, the user's most played game
+            results = db_session.execute(text("""
+                WITH per_game AS (
+                    SELECT user_id, game_id, SUM(hours) AS hours, SUM(credits_earned) AS credits
+                    FROM gaming_sessions
+                    GROUP BY user_id, game_id
+                ),
+                ranked AS (
+                    SELECT per_game.*, g.name,
+                           ROW_NUMBER() OVER (PARTITION BY per_game.user_id ORDER BY per_game.hours DESC, g.name) AS game_rank
+                    FROM per_game
+                    JOIN games g ON g.id = per_game.game_id
+                ),
+                totals AS (
+                    SELECT user_id, SUM(credits) AS session_credits, COUNT(*) AS games_played, SUM(hours) AS total_hours
+                    FROM per_game
+                    GROUP BY user_id
+                ),
+                bonus_credits AS (
+                    SELECT user_id, SUM(credits) AS bonus_credits FROM bonuses GROUP BY user_id
+                ),
+                completion_credits AS (
+                    SELECT user_id, SUM(credits_awarded) AS completion_credits FROM game_completions GROUP BY user_id
+                )
+                SELECT
+                    t.user_id,
+                    COALESCE(t.session_credits, 0) + COALESCE(b.bonus_credits, 0) + COALESCE(c.completion_credits, 0) AS total_credits,
+                    t.games_played,
+                    t.total_hours,
+                    r.name AS most_played_game,
+                    r.hours AS most_played_hours
+                FROM totals t
+                LEFT JOIN ranked r ON r.user_id = t.user_id AND r.game_rank = 1
+                LEFT JOIN bonus_credits b ON b.user_id = t.user_id
+                LEFT JOIN completion_credits c ON c.user_id = t.user_id
+                ORDER BY total_credits DESC
+            """)).fetchall()
 
             # Format the results
             leaderboard = []
-            for user_id, total_credits, games_played, total_hours in results:
-                most_played_game, most_played_hours = most_played_games.get(user_id, ('No games', 0.0))
+            for row in results:
                 leaderboard.append((
-                    user_id,
-                    float(total_credits or 0),
-                    int(games_played or 0),
-                    most_played_game,
-                    float(most_played_hours or 0),
-                    float(total_hours or 0)
+                    row.user_id,
+                    float(row.total_credits or 0),
+                    int(row.games_played or 0),
+                    row.most_played_game or 'No games',
+                    float(row.most_played_hours or 0),
+                    float(row.total_hours or 0)
                 ))
 
             return leaderboard
@@ -2117,9 +2583,8 @@ class GameStorage:
             players = max(1, min(players, 5))
             credits_earned = base_credits * (1 + 0.1 * (players - 1))
 
-            # Create timestamp in CST
+            # Session timestamps are stored as naive UTC wall-clock time
             utc_now = datetime.now(pytz.UTC)
-            cst_time = utc_now.astimezone(self.cst)
 
             # Create the gaming session
             gaming_session = GamingSession(
@@ -2127,10 +2592,16 @@ class GameStorage:
                 game_id=game.id,
                 hours=hours,
                 credits_earned=credits_earned,
-                timestamp=cst_time,
+                timestamp=utc_now.replace(tzinfo=None),
                 players=players
             )
+            self.ensure_user_stats(session, user_id)
             session.add(gaming_session)
+            session.flush()
+            self.record_credits(session, user_id, credits_earned, 'session', gaming_session.id)
+
+            # Keep the leaderboard rollups in step with the new session
+            self.update_rollups_for_session(session, user_id, game.id, hours, credits_earned, utc_now)
             session.commit()
 
         except Exception as e:
@@ -2276,15 +2747,11 @@ class GameStorage:
                 game.added_by = user_id
                 
                 # Recalculate all existing gaming sessions for this game with new half-life
-                gaming_sessions = session.query(GamingSession).filter(GamingSession.game_id == game.id).all()
-                for gaming_session in gaming_sessions:
-                    # Recalculate credits based on hours and new half-life
-                    new_credits = self.calculate_credits_with_half_life(
-                        gaming_session.hours, 
-                        game.credits_per_hour, 
-                        game.half_life_hours
-                    )
-                    gaming_session.credits_earned = new_credits
+                affected_users = self.recalculate_session_credits(session, game_id=game.id)
+
+                # Session credits changed, so refresh the totals and rollups of everyone who played it
+                self.refresh_user_total_credits(session, affected_users)
+                self.rebuild_leaderboard_rollups(session, affected_users)
             else:
                 # Game doesn't exist, create it with default CPH
                 game = Game(
@@ -2294,12 +2761,11 @@ class GameStorage:
                     added_by=user_id
                 )
                 session.add(game)
+                session.flush()
+                self.enqueue_game_enrichment(session, [game.id])
             
             session.commit()
             
-            # Recalculate user totals since credits may have changed
-            self.recalculate_all_user_credits()
-            
             return True
 
         except Exception as e:
@@ -2336,6 +2802,8 @@ class GameStorage:
                     added_by=user_id
                 )
                 session.add(game)
+                session.flush()
+                self.enqueue_game_enrichment(session, [game.id])
                 session.commit()
                 return True
 
@@ -2402,4 +2870,24 @@ def get_period_boundaries(dt: datetime, period_type: str):
             end = dt.replace(month=dt.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
     else:
         raise ValueError('period_type must be weekly or monthly')
-    return start, end
\ No newline at end of file
+    return start, end
+
+def encode_review_cursor(timestamp: datetime, review_id: int) -> str:
+    """Opaque cursor pointing just past a review in newest-first order"""
+    return f"{timestamp.isoformat()}_{review_id}"
+
+def decode_review_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(timestamp, review id) of a cursor from encode_review_cursor; raises ValueError if it is malformed"""
+    timestamp, _, review_id = cursor.rpartition('_')
+    return datetime.fromisoformat(timestamp), int(review_id)
+
+def encode_leaderboard_cursor(rank: int, credits: float, user_id: int) -> str:
+    """Opaque cursor pointing just past a leaderboard row; it carries the row's rank so later pages don't count"""
+    return f"{rank}_{credits!r}_{user_id}"
+
+def decode_leaderboard_cursor(cursor: str) -> Tuple[int, float, int]:
+    """(rank, credits, user id) of a cursor from encode_leaderboard_cursor; raises ValueError if it is malformed"""
+    rank, credits, user_id = cursor.split('_')
+    if int(rank) < 1:
+        raise ValueError(f"Invalid leaderboard cursor: {cursor}")
+    return int(rank), float(credits), int(user_id)
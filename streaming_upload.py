@@ -0,0 +1,123 @@
+"""
+Streaming multipart/form-data uploads straight into blob_store.
+
+request.files makes Werkzeug read the whole body before the view runs, and
+the size of a file is only known after that. receive_multipart reads the
+request body itself, CHUNK_SIZE bytes at a time, through Werkzeug's
+incremental multipart decoder:
+
+- file parts are written to a blob_store temp file and hashed as they arrive
+- a file's size limit is enforced on every chunk, so an oversized upload is
+  rejected as soon as it crosses the limit instead of after it has arrived
+- a file is committed to the store only once it is complete
+
+Memory per upload stays at about one chunk, whatever the file size.
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from blob_store import BlobTooLarge, blob_store
+
+CHUNK_SIZE = 256 * 1024
+# Largest non-file form field (game name, caption, ...)
+MAX_FIELD_BYTES = 64 * 1024
+# Most form parts (fields and files) one upload may have
+MAX_PARTS = 32
+
+class UploadRejected(ValueError):
+    """The upload is malformed or not acceptable; the message is safe to show to the user"""
+
+class UploadTooLarge(UploadRejected):
+    """A file (or the whole body) exceeds its size limit"""
+
+    def __init__(self, message: str, limit: Optional[int] = None):
+        super().__init__(message)
+        self.limit = limit
+
+    @classmethod
+    def over(cls, limit: int) -> 'UploadTooLarge':
+        return cls(f'File too large. Maximum size is {limit // (1024 * 1024)}MB', limit)
+
+def receive_multipart(request, file_limit: Callable[[str, str, Optional[str]], Optional[int]],
+                      max_body_bytes: Optional[int] = None,
+                      store=blob_store) -> Tuple[Dict[str, str], Dict[str, Dict]]:
+    """
+    Read a multipart request body, storing file parts in blob_store as they stream in.
+    file_limit(field name, filename, content type) returns a part's size limit in bytes
+    (None for no limit) or raises UploadRejected for a file that is not accepted.
+    Returns (form fields, files); each file is {'filename', 'mime_type', 'blob_key', 'size'}.
+    Parts without a filename (no file selected) are left out.
+    """
+    if request.mimetype != 'multipart/form-data' or not request.mimetype_params.get('boundary'):
+        raise UploadRejected('Expected a multipart/form-data upload')
+    if max_body_bytes is not None and request.content_length and request.content_length > max_body_bytes:
+        # Rejected before reading a byte of the body
+        raise UploadTooLarge.over(max_body_bytes)
+
+    # The decoder only buffers about one chunk; field lengths are checked below as they arrive
+    decoder = MultipartDecoder(request.mimetype_params['boundary'].encode(), max_parts=MAX_PARTS)
+    stream = request.stream
+    form, files = {}, {}
+    part = None        # ('field', name, buffer) or ('file', name, filename, mime_type, writer)
+    received = 0
+    try:
+        finished = False
+        while not finished:
+            event = decoder.next_event()
+            if isinstance(event, NeedData):
+                chunk = stream.read(CHUNK_SIZE)
+                received += len(chunk)
+                if max_body_bytes is not None and received > max_body_bytes:
+                    raise UploadTooLarge.over(max_body_bytes)
+                decoder.receive_data(chunk or None)
+            elif isinstance(event, Field):
+                part = ('field', event.name, bytearray())
+            elif isinstance(event, File):
+                if event.filename:
+                    mime_type = event.headers.get('Content-Type')
+                    limit = file_limit(event.name, event.filename, mime_type)
+                    part = ('file', event.name, event.filename, mime_type, store.writer(limit))
+                else:
+                    part = ('skip', event.name)
+            elif isinstance(event, Data):
+                if part[0] == 'field':
+                    part[2].extend(event.data)
+                    if len(part[2]) > MAX_FIELD_BYTES:
+                        raise UploadTooLarge(f'Form field {part[1]} is too long', MAX_FIELD_BYTES)
+                elif part[0] == 'file':
+                    try:
+                        part[4].write(event.data)
+                    except BlobTooLarge:
+                        raise UploadTooLarge.over(part[4].max_bytes)
+                if not event.more_data:
+                    if part[0] == 'field':
+                        form[part[1]] = part[2].decode('utf-8', 'replace')
+                    elif part[0] == 'file':
+                        _, name, filename, mime_type, writer = part
+                        blob_key, size = writer.commit(mime_type)
+                        files[name] = {'filename': filename, 'mime_type': mime_type,
+                                       'blob_key': blob_key, 'size': size}
+                    part = None
+            elif isinstance(event, Epilogue):
+                finished = True
+            elif event is None:
+                raise UploadRejected('Upload ended before it was complete')
+    except RequestEntityTooLarge:
+        if part is not None and part[0] == 'file':
+            part[4].discard()
+        raise UploadRejected(f'Too many form fields. At most {MAX_PARTS} are allowed')
+    except ValueError as e:
+        # Includes Werkzeug's parse errors; UploadRejected passes through unchanged
+        if part is not None and part[0] == 'file':
+            part[4].discard()
+        if isinstance(e, UploadRejected):
+            raise
+        raise UploadRejected(f'Malformed upload: {e}') from e
+    except BaseException:
+        if part is not None and part[0] == 'file':
+            part[4].discard()
+        raise
+    return form, files
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script to check that listing and preference endpoints never load blob payloads.
+
+A test user gets background image/video payloads and a test game gets legacy
+screenshots (base64 image_data), first small and then large. The payloads
+are generated inside Postgres with repeat(), so this process never holds
+them. /api/preferences and /api/game/screenshots are then requested through
+the Flask test client. For both sizes the responses must stay the same small
+size, and the process's peak RSS must not grow with the payloads.
+"""
+
+import os
+import resource
+import sys
+from dotenv import load_dotenv
+
+# Add parent and website directories to path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'website'))
+sys.path.append(ROOT)
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import text
+from app import app, storage
+
+TEST_USER_ID = 990000000000000001
+TEST_GAME_NAME = '__blob_column_loading_test__'
+SCREENSHOTS = 4
+SMALL_PAYLOAD_BYTES = 1024 * 1024
+LARGE_PAYLOAD_BYTES = 32 * 1024 * 1024
+MAX_RESPONSE_BYTES = 16 * 1024
+MAX_RSS_GROWTH_MB = 16
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter if possible; returns whether it was reset"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux; it never resets, so growth is only a lower bound
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def setup_fixtures():
+    with storage.Session() as session:
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username)
+            VALUES (:user_id, 0, 'blob-test')
+            ON CONFLICT (user_id) DO NOTHING
+        """), {"user_id": TEST_USER_ID})
+        session.execute(text("""
+            INSERT INTO games (name, credits_per_hour) VALUES (:name, 1.0)
+            ON CONFLICT (name) DO NOTHING
+        """), {"name": TEST_GAME_NAME})
+        session.commit()
+
+def store_payloads(size):
+    """Give the test user and game payloads of size bytes, generated by Postgres"""
+    with storage.Session() as session:
+        game_id = session.execute(text("SELECT id FROM games WHERE name = :name"), {"name": TEST_GAME_NAME}).scalar()
+        session.execute(text("DELETE FROM game_screenshots WHERE game_id = :game_id"), {"game_id": game_id})
+        session.execute(text("""
+            INSERT INTO game_screenshots (user_id, game_id, image_data, image_mime_type, caption, uploaded_at)
+            SELECT :user_id, :game_id, repeat('A', :size), 'image/png', 'blob test ' || n, LOCALTIMESTAMP
+            FROM generate_series(1, :count) AS n
+        """), {"user_id": TEST_USER_ID, "game_id": game_id, "size": size, "count": SCREENSHOTS})
+        session.execute(text("DELETE FROM user_preferences WHERE user_id = :user_id"), {"user_id": TEST_USER_ID})
+        session.execute(text("""
+            INSERT INTO user_preferences (user_id, theme, background_image_data, background_image_mime_type,
+                                          background_video_data, background_video_mime_type,
+                                          background_opacity, background_type)
+            VALUES (:user_id, 'dark', repeat('A', :size), 'image/png', repeat('A', :size), 'video/mp4', 0.3, 'video')
+        """), {"user_id": TEST_USER_ID, "size": size})
+        session.commit()
+
+def cleanup_fixtures():
+    with storage.Session() as session:
+        session.execute(text("DELETE FROM user_preferences WHERE user_id = :user_id"), {"user_id": TEST_USER_ID})
+        session.execute(text("""
+            DELETE FROM game_screenshots WHERE game_id IN (SELECT id FROM games WHERE name = :name)
+        """), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM games WHERE name = :name"), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM user_stats WHERE user_id = :user_id"), {"user_id": TEST_USER_ID})
+        session.commit()
+
+def measure(client, size):
+    """Request both endpoints with payloads of size bytes; returns (response sizes, peak RSS growth in MB)"""
+    store_payloads(size)
+    reset_peak_rss()
+    before = peak_rss_mb()
+    preferences = client.get('/api/preferences')
+    screenshots = client.get('/api/game/screenshots', query_string={'name': TEST_GAME_NAME})
+    growth = peak_rss_mb() - before
+
+    assert preferences.status_code == 200, preferences.get_data(as_text=True)
+    assert screenshots.status_code == 200, screenshots.get_data(as_text=True)
+    prefs = preferences.get_json()
+    assert prefs['background_image_file_url'] and prefs['background_video_file_url'], prefs
+    assert len(screenshots.get_json()) == SCREENSHOTS
+    return (len(preferences.data), len(screenshots.data)), growth
+
+def run_tests():
+    print("🧪 Testing blob column loading")
+    print("=" * 50)
+
+    setup_fixtures()
+    try:
+        client = app.test_client()
+        client.set_cookie('user_id', str(TEST_USER_ID))
+        # Warm up imports, connections and caches so the measured requests only pay for their data
+        measure(client, SMALL_PAYLOAD_BYTES)
+
+        results = {}
+        for size in (SMALL_PAYLOAD_BYTES, LARGE_PAYLOAD_BYTES):
+            results[size] = measure(client, size)
+            (prefs_bytes, screenshots_bytes), growth = results[size]
+            print(f"{size / 1024 / 1024:4.0f}MB payloads: /api/preferences {prefs_bytes:6d} bytes, "
+                  f"/api/game/screenshots {screenshots_bytes:6d} bytes, peak RSS +{growth:.1f}MB")
+    finally:
+        cleanup_fixtures()
+
+    (small_prefs, small_shots), _ = results[SMALL_PAYLOAD_BYTES]
+    (large_prefs, large_shots), large_growth = results[LARGE_PAYLOAD_BYTES]
+    ok = True
+    if max(large_prefs, large_shots) > MAX_RESPONSE_BYTES:
+        print(f"❌ A response exceeded {MAX_RESPONSE_BYTES} bytes")
+        ok = False
+    # Ids, timestamps and the URL versions (derived from the stored size) differ by a few bytes
+    if abs(large_prefs - small_prefs) > 32 or abs(large_shots - small_shots) > 32:
+        print("❌ Response size depends on the payload size")
+        ok = False
+    if large_growth > MAX_RSS_GROWTH_MB:
+        print(f"❌ Peak RSS grew {large_growth:.1f}MB with {(2 + SCREENSHOTS) * LARGE_PAYLOAD_BYTES // 1024 // 1024}MB "
+              f"of payloads stored (limit {MAX_RSS_GROWTH_MB}MB)")
+        ok = False
+    if ok:
+        print("✅ Responses and peak memory stayed bounded regardless of payload size")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
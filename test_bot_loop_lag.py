@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script to measure bot event loop lag while heavy database queries run.
+
+A heartbeat coroutine wakes every 10ms and records how late it was, the same
+way a blocked loop delays discord.py gateway heartbeats. Heavy queries are run
+first directly on the loop (the old behaviour) and then through
+AsyncGameStorage, which must keep the lag under MAX_LAG_MS.
+"""
+
+import os
+import sys
+import time
+import asyncio
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from storage import GameStorage
+from async_storage import AsyncGameStorage
+from models import LeaderboardType
+from sqlalchemy import text
+
+# Load environment variables
+load_dotenv()
+
+HEARTBEAT_INTERVAL = 0.01
+MAX_LAG_MS = 50
+SLOW_QUERY_SECONDS = 0.5
+CONCURRENT_QUERIES = 4
+
+def slow_query(storage):
+    """Stand-in for a slow leaderboard query"""
+    session = storage.Session()
+    try:
+        session.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": SLOW_QUERY_SECONDS})
+    finally:
+        session.close()
+
+async def measure_lag(workload):
+    """Run workload while a heartbeat measures how late the loop wakes up; returns max lag in ms"""
+    lags = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lags.append((time.perf_counter() - start - HEARTBEAT_INTERVAL) * 1000)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(HEARTBEAT_INTERVAL * 3)
+    start = time.perf_counter()
+    try:
+        await workload()
+    finally:
+        done.set()
+        await beat
+    return max(lags), (time.perf_counter() - start)
+
+async def run_tests():
+    storage = GameStorage()
+    async_storage = AsyncGameStorage(storage)
+
+    print("🧪 Testing Bot Event Loop Lag")
+    print("=" * 50)
+
+    async def blocking_workload():
+        # What the cog used to do: synchronous queries straight on the loop
+        for _ in range(CONCURRENT_QUERIES):
+            slow_query(storage)
+        await storage.get_leaderboard_by_timeframe(LeaderboardType.ALLTIME)
+
+    async def executor_workload():
+        await asyncio.gather(
+            *[async_storage.run(slow_query, storage) for _ in range(CONCURRENT_QUERIES)],
+            async_storage.get_leaderboard_by_timeframe(LeaderboardType.ALLTIME),
+            async_storage.get_leaderboard()
+        )
+
+    blocking_lag, blocking_time = await measure_lag(blocking_workload)
+    print(f"Direct on loop:     max lag {blocking_lag:8.1f}ms, workload {blocking_time:.2f}s")
+
+    executor_lag, executor_time = await measure_lag(executor_workload)
+    print(f"AsyncGameStorage:   max lag {executor_lag:8.1f}ms, workload {executor_time:.2f}s "
+          f"({async_storage.max_workers} DB threads)")
+
+    async_storage.shutdown()
+
+    if executor_lag < MAX_LAG_MS:
+        print(f"✅ Loop lag stayed under {MAX_LAG_MS}ms while queries ran")
+        return True
+    print(f"❌ Loop lag {executor_lag:.1f}ms exceeded {MAX_LAG_MS}ms")
+    return False
+
+if __name__ == "__main__":
+    if not asyncio.run(run_tests()):
+        sys.exit(1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch half-life credit functions.
+
+Each batch_* function must return, row for row, what its scalar counterpart
+returns, including at the edges bench_credit_engine.py's random sessions
+never reach: zero and negative hours, hours landing exactly on a half-life
+boundary, and games without a half-life (None, NaN, 0 or negative).
+"""
+
+import sys
+
+import numpy as np
+
+import credit_engine
+
+CPH = [0.5, 10.0]
+HALF_LIVES = [None, float('nan'), 0.0, -5.0, 5.0, 25.0]
+HOURS = [-40.0, -2.0, -0.25, 0.0, 0.25, 5.0, 15.0, 35.0, 500.0]
+PRIOR_HOURS = [0.0, 4.5, 5.0, 120.0]
+
+def as_array(half_lives):
+    return np.array([np.nan if half_life is None else half_life for half_life in half_lives], dtype=np.float64)
+
+def mismatches(expected, actual, rows):
+    """The rows whose batch result differs from the scalar one"""
+    return [(row, e, a) for row, e, a in zip(rows, expected, actual.tolist())
+            if abs(e - a) > 1e-9 * max(1.0, abs(e))]
+
+def run_tests():
+    print("🧪 Testing batch credit functions against the scalar ones")
+    print("=" * 50)
+
+    ok = True
+
+    rows = [(hours, cph, half_life) for hours in HOURS for cph in CPH for half_life in HALF_LIVES]
+    expected = [credit_engine.credits_for_total_hours(*row) for row in rows]
+    hours, cph, half_life = zip(*rows)
+    actual = credit_engine.batch_credits_for_total_hours(hours, cph, as_array(half_life))
+    wrong = mismatches(expected, actual, rows)
+    print(f"Total-hours schedule: {len(rows)} rows, {len(wrong)} mismatched")
+    for row, e, a in wrong[:5]:
+        print(f"❌ (hours, cph, half_life) = {row}: scalar {e}, batch {a}")
+    ok &= not wrong
+
+    rows = [(hours, prior, cph, half_life)
+            for hours in HOURS for prior in PRIOR_HOURS for cph in CPH for half_life in HALF_LIVES]
+    expected = [credit_engine.credits_for_session(*row) for row in rows]
+    hours, prior, cph, half_life = zip(*rows)
+    actual = credit_engine.batch_credits_for_sessions(hours, prior, cph, as_array(half_life))
+    wrong = mismatches(expected, actual, rows)
+    print(f"Session schedule: {len(rows)} rows, {len(wrong)} mismatched")
+    for row, e, a in wrong[:5]:
+        print(f"❌ (hours, prior_hours, cph, half_life) = {row}: scalar {e}, batch {a}")
+    ok &= not wrong
+
+    if ok:
+        print("✅ Batch and scalar credits agree, including for zero and negative hours")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test script for balance reads, the credit ledger and the reconciliation job.
+
+Test users get sessions, bonuses and a completion through the storage
+write paths; user 2's ledger starts with a backfilled bonus whose
+created_at is later than the entries applied after it. Each write must append a credit_ledger entry whose running
+balance matches user_stats.total_credits and the sum of the user's
+sessions, bonuses and completions, and the ledger must refuse updates.
+get_user_credits and get_leaderboard must then run without sending a
+single write statement. Finally a stored balance is corrupted and a bonus
+is deleted behind the ledger's back: reading must return the stored value
+unchanged, a dry-run reconciliation must report exactly that drift, and a
+fixing run must restore every balance and record the ledger correction.
+"""
+
+import asyncio
+import sys
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import event, text
+from storage import GameStorage
+
+FIRST_USER_ID = 990000000000004001
+USERS = 4
+TEST_GAME_NAME = '__credit_reconciliation_test__'
+# Credits added to user 1's stored balance behind the ledger's back
+STORED_DRIFT = 250.0
+# User 3's bonus is deleted directly, so their balance and ledger are 40 too high
+BONUS_DELETED_USER = 3
+# User 2's first ledger entry is a backfilled bonus stamped a day ahead of the entries applied after it
+BACKFILLED_USER = 2
+BACKFILLED_CREDITS = 5.0
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+def user_ids():
+    return [FIRST_USER_ID + n for n in range(USERS)]
+
+def cleanup(storage):
+    with storage.Session() as session:
+        session.execute(text("SET LOCAL gamercred.ledger_maintenance = 'on'"))
+        session.execute(text("DELETE FROM credit_ledger WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        for table in ('game_completions', 'gaming_sessions', 'bonuses', 'leaderboard_game_rollups', 'leaderboard_rollups'):
+            session.execute(text(f"DELETE FROM {table} WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        session.execute(text("DELETE FROM game_completions WHERE game_id IN (SELECT id FROM games WHERE name = :name)"),
+                        {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM games WHERE name = :name"), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM user_stats WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        session.commit()
+
+def ledger_total(storage, user_id):
+    with storage.Session() as session:
+        return float(session.execute(text("""
+            SELECT COALESCE((SELECT SUM(credits_earned) FROM gaming_sessions WHERE user_id = :id), 0)
+                 + COALESCE((SELECT SUM(credits) FROM bonuses WHERE user_id = :id), 0)
+                 + COALESCE((SELECT SUM(credits_awarded) FROM game_completions WHERE user_id = :id), 0)
+        """), {"id": user_id}).scalar())
+
+def ledger_entries(storage, user_id):
+    """(delta, balance, source) of the user's ledger entries, oldest first"""
+    with storage.Session() as session:
+        return [(float(row.delta), float(row.balance), row.source) for row in session.execute(text("""
+            SELECT delta, balance, source FROM credit_ledger WHERE user_id = :id ORDER BY id
+        """), {"id": user_id})]
+
+def ledger_consistent(storage, user_id):
+    """Every running balance is the sum of the deltas so far, and the last one is the user's balance"""
+    running = 0.0
+    for delta, balance, _ in ledger_entries(storage, user_id):
+        running += delta
+        if abs(running - balance) > 0.001:
+            return False
+    return abs(running - storage.get_user_credits(user_id)) < 0.001
+
+def statements_sent(storage, func):
+    """Run func; returns (result, SQL statements it sent from this thread)"""
+    statements = []
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement.strip())
+
+    event.listen(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        return func(), statements
+    finally:
+        event.remove(storage.engine, 'before_cursor_execute', before_cursor_execute)
+
+def run_tests():
+    print("🧪 Testing balance reads and credit reconciliation")
+    print("=" * 50)
+
+    storage = GameStorage()
+    cleanup(storage)
+    ok = True
+    try:
+        # Build each user's ledger through the normal write paths
+        with storage.Session() as session:
+            session.execute(text("INSERT INTO games (name, credits_per_hour) VALUES (:name, 1.0)"), {"name": TEST_GAME_NAME})
+            # Backfilled times don't share a time zone with new entries, so created_at doesn't follow id
+            params = {"id": user_ids()[BACKFILLED_USER], "credits": BACKFILLED_CREDITS}
+            session.execute(text("INSERT INTO user_stats (user_id, total_credits) VALUES (:id, :credits)"), params)
+            bonus_id = session.execute(text("""
+                INSERT INTO bonuses (user_id, credits, reason, granted_by, timestamp)
+                VALUES (:id, :credits, 'backfilled bonus', 0, LOCALTIMESTAMP) RETURNING id
+            """), params).scalar()
+            session.execute(text("""
+                INSERT INTO credit_ledger (user_id, delta, balance, source, reference_id, created_at)
+                VALUES (:id, :credits, :credits, 'bonus', :bonus_id, LOCALTIMESTAMP + INTERVAL '1 day')
+            """), {**params, "bonus_id": bonus_id})
+            session.commit()
+        for n, user_id in enumerate(user_ids()):
+            asyncio.run(storage.add_gaming_hours(user_id, 2.0 + n, TEST_GAME_NAME))
+            storage.add_bonus_credits(user_id, 10.0 * (n + 1), 'reconciliation test', 0)
+        with storage.Session() as session:
+            game_id = session.execute(text("SELECT id FROM games WHERE name = :name"), {"name": TEST_GAME_NAME}).scalar()
+            completion_id = session.execute(text("""
+                INSERT INTO game_completions (user_id, game_id, completed_at, credits_awarded)
+                VALUES (:id, :game_id, LOCALTIMESTAMP, 1000.0) RETURNING id
+            """), {"id": user_ids()[0], "game_id": game_id}).scalar()
+            storage.record_credits(session, user_ids()[0], 1000.0, 'completion', completion_id)
+            session.commit()
+
+        for user_id in user_ids():
+            if abs(storage.get_user_credits(user_id) - ledger_total(storage, user_id)) > 0.001:
+                print(f"❌ User {user_id}'s balance doesn't match their sessions, bonuses and completions after the writes")
+                ok = False
+            if not ledger_consistent(storage, user_id):
+                print(f"❌ User {user_id}'s ledger doesn't add up to their balance")
+                ok = False
+        sources = [source for _, _, source in ledger_entries(storage, user_ids()[0])]
+        print(f"Ledger of user 0: {sources}")
+        if sources != ['session', 'bonus', 'completion']:
+            print("❌ Expected one ledger entry per session, bonus and completion")
+            ok = False
+
+        # The ledger is append-only
+        try:
+            with storage.Session() as session:
+                session.execute(text("UPDATE credit_ledger SET delta = 0 WHERE user_id = :id"), {"id": user_ids()[0]})
+                session.commit()
+            print("❌ A ledger entry was updated")
+            ok = False
+        except Exception as e:
+            if 'append-only' not in str(e):
+                raise
+
+        # Corrupt a stored balance, and change a user's history behind the ledger's back
+        with storage.Session() as session:
+            session.execute(text("UPDATE user_stats SET total_credits = total_credits + :drift WHERE user_id = :id"),
+                            {"drift": STORED_DRIFT, "id": user_ids()[1]})
+            session.execute(text("DELETE FROM bonuses WHERE user_id = :id"), {"id": user_ids()[BONUS_DELETED_USER]})
+            session.commit()
+        stored = {user_id: storage.get_user_credits(user_id) for user_id in user_ids()}
+
+        # Reads never write, and don't quietly "fix" what they read
+        for name, func in (('get_user_credits', lambda: storage.get_user_credits(user_ids()[1])),
+                           ('get_leaderboard', storage.get_leaderboard)):
+            result, statements = statements_sent(storage, func)
+            writes = [s for s in statements if s.upper().startswith(WRITE_PREFIXES)]
+            print(f"{name}: {len(statements)} statement(s), {len(writes)} write(s)")
+            if writes:
+                print(f"❌ {name} wrote to the database: {writes}")
+                ok = False
+        leaderboard = dict(storage.get_leaderboard())
+        if any(abs(leaderboard[user_id] - stored[user_id]) > 0.001 for user_id in user_ids()):
+            print("❌ The leaderboard doesn't show the stored balances")
+            ok = False
+        if abs(storage.get_user_credits(user_ids()[1]) - stored[user_ids()[1]]) > 0.001:
+            print("❌ Reading a balance changed it")
+            ok = False
+
+        # The dry run reports the drift (other users in the database may have drifted too) without fixing it
+        report = storage.reconcile_user_credits(fix=False, sample_size=1000)
+        found = {user_id: stored_credits - expected for user_id, stored_credits, expected in report['sample']
+                 if user_id in user_ids()}
+        print(f"Dry run: {report['users_drifted']} drifted user(s), total drift {report['total_drift']:.2f}")
+        expected_found = {user_ids()[1]: STORED_DRIFT, user_ids()[BONUS_DELETED_USER]: 10.0 * (BONUS_DELETED_USER + 1)}
+        if found.keys() != expected_found.keys() or any(abs(found[k] - v) > 0.001 for k, v in expected_found.items()):
+            print(f"❌ Expected drift {expected_found}, found {found}")
+            ok = False
+        if report['fixed'] or storage.get_user_credits(user_ids()[1]) != stored[user_ids()[1]]:
+            print("❌ The dry run changed balances")
+            ok = False
+
+        report = storage.reconcile_user_credits()
+        print(f"Fix: {report['fixed']} balance(s) fixed")
+        if report['fixed'] < len(expected_found):
+            print("❌ The reconciliation didn't fix every drifted balance")
+            ok = False
+        for user_id in user_ids():
+            if abs(storage.get_user_credits(user_id) - ledger_total(storage, user_id)) > 0.001 \
+                    or not ledger_consistent(storage, user_id):
+                print(f"❌ User {user_id}'s balance and ledger still don't match their history")
+                ok = False
+        # Only the history change needs a ledger correction; the stored balance was just a stale copy
+        if [source for _, _, source in ledger_entries(storage, user_ids()[BONUS_DELETED_USER])][-1] != 'reconciliation' \
+                or ledger_entries(storage, user_ids()[1])[-1][2] == 'reconciliation':
+            print("❌ Expected one reconciliation entry, for the user whose bonus was deleted")
+            ok = False
+    finally:
+        cleanup(storage)
+
+    if ok:
+        print("✅ Writes keep the ledger and balances in step, reads never write and the reconciliation fixes drift")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
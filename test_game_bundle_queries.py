@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script to check that the game page bundle runs a fixed number of queries.
+
+A test game gets a few players and then many, each with sessions, a review,
+a rating and a screenshot, and half of them a completion. /api/game/bundle
+is requested through the Flask test client as one of the players, and every
+SQL statement it sends is counted. The count must stay within QUERY_BUDGET
+and must not grow with the number of players, reviews or screenshots.
+"""
+
+import os
+import sys
+import threading
+from dotenv import load_dotenv
+
+# Add parent and website directories to path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'website'))
+sys.path.append(ROOT)
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import event, text
+from app import app, storage
+from storage import REVIEWS_PAGE_SIZE
+
+FIRST_USER_ID = 990000000000002001
+TEST_GAME_NAME = '__game_bundle_queries_test__'
+SMALL_PLAYERS = 3
+LARGE_PLAYERS = 40
+QUERY_BUDGET = 12
+
+def user_ids(count):
+    return [FIRST_USER_ID + n for n in range(count)]
+
+def store_fixtures(players):
+    """Replace the test game's data with players players' sessions, reviews, ratings, completions and screenshots"""
+    cleanup_fixtures()
+    ids = user_ids(players)
+    with storage.Session() as session:
+        # Fresh profiles, so resolving them never schedules a Discord refresh
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username, avatar_url, profile_updated_at)
+            SELECT id, 0, 'bundle-test-' || id, 'avatar-' || id, LOCALTIMESTAMP FROM unnest(:ids) AS id
+        """), {"ids": ids})
+        game_id = session.execute(text("""
+            INSERT INTO games (name, credits_per_hour) VALUES (:name, 1.0) RETURNING id
+        """), {"name": TEST_GAME_NAME}).scalar()
+        params = {"ids": ids, "game_id": game_id}
+        session.execute(text("""
+            INSERT INTO gaming_sessions (user_id, game_id, hours, credits_earned, timestamp, players)
+            SELECT id, :game_id, 2.0, 2.0, LOCALTIMESTAMP - make_interval(hours => n), 1
+            FROM unnest(:ids) AS id, generate_series(1, 3) AS n
+        """), params)
+        session.execute(text("""
+            INSERT INTO game_reviews (user_id, game_id, review_text, timestamp)
+            SELECT id, :game_id, 'bundle test review', LOCALTIMESTAMP - make_interval(mins => 90) FROM unnest(:ids) AS id
+        """), params)
+        session.execute(text("""
+            INSERT INTO game_ratings (user_id, game_id, rating, timestamp)
+            SELECT id, :game_id, 4.5, LOCALTIMESTAMP FROM unnest(:ids) AS id
+        """), params)
+        session.execute(text("""
+            INSERT INTO game_completions (user_id, game_id, completed_at, credits_awarded)
+            SELECT id, :game_id, LOCALTIMESTAMP, 1000.0 FROM unnest(:ids) AS id WHERE id % 2 = 0
+        """), params)
+        session.execute(text("""
+            INSERT INTO game_screenshots (user_id, game_id, caption, uploaded_at)
+            SELECT id, :game_id, 'bundle test', LOCALTIMESTAMP FROM unnest(:ids) AS id
+        """), params)
+        session.commit()
+
+def cleanup_fixtures():
+    with storage.Session() as session:
+        game_filter = "game_id IN (SELECT id FROM games WHERE name = :name)"
+        for table in ('game_screenshots', 'game_completions', 'game_ratings', 'game_reviews', 'gaming_sessions'):
+            session.execute(text(f"DELETE FROM {table} WHERE {game_filter}"), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM games WHERE name = :name"), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM user_stats WHERE user_id = ANY(:ids)"), {"ids": user_ids(LARGE_PLAYERS)})
+        session.commit()
+
+def count_queries(client):
+    """Request the bundle; returns (number of SQL statements it ran, response JSON)"""
+    statements = []
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Background work (profile refreshes, cache warmers) runs on other threads
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    event.listen(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get('/api/game/bundle', query_string={'name': TEST_GAME_NAME})
+    finally:
+        event.remove(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements), response.get_json()
+
+def run_tests():
+    print("🧪 Testing game page bundle query count")
+    print("=" * 50)
+
+    results = {}
+    try:
+        client = app.test_client()
+        client.set_cookie('user_id', str(FIRST_USER_ID))
+        for players in (SMALL_PLAYERS, LARGE_PLAYERS):
+            store_fixtures(players)
+            # Warm up connections so the measured request only pays for its own queries
+            count_queries(client)
+            queries, bundle = count_queries(client)
+            results[players] = queries
+            print(f"{players:3d} players: {queries} queries, {len(bundle['reviews'])} reviews, "
+                  f"{len(bundle['screenshots'])} screenshots, {len(bundle['players'])} players shown")
+
+            # Reviews come a page at a time (see test_game_reviews_queries.py)
+            assert len(bundle['reviews']) == min(players, REVIEWS_PAGE_SIZE) and len(bundle['screenshots']) == players
+            assert (bundle['reviews_next_cursor'] is not None) == (players > REVIEWS_PAGE_SIZE)
+            assert bundle['ratings']['count'] == players and bundle['ratings']['average'] == 4.5
+            assert bundle['completions']['count'] == players // 2
+            assert all(review['username'] == f"bundle-test-{review['user_id']}" for review in bundle['reviews'])
+            # Three 2 hour sessions, the two earliest played before the review was written
+            assert all(review['total_hours'] == 6.0 and review['hours_at_review'] == 4.0 for review in bundle['reviews'])
+            assert bundle['user']['game_stats']['total_hours'] == 6.0
+            assert bundle['user']['completion_requirements']['can_complete']
+    finally:
+        cleanup_fixtures()
+
+    ok = True
+    if max(results.values()) > QUERY_BUDGET:
+        print(f"❌ The bundle ran more than {QUERY_BUDGET} queries")
+        ok = False
+    if results[LARGE_PLAYERS] != results[SMALL_PLAYERS]:
+        print("❌ The number of queries depends on the number of players")
+        ok = False
+    if ok:
+        print(f"✅ The bundle ran {results[LARGE_PLAYERS]} queries regardless of how many players the game has")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
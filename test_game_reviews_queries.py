@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script to check that the game reviews API runs a fixed number of queries per page.
+
+A test game gets a few reviews and then many, each by a different reviewer
+with a rating and sessions before and after the review. /api/game/reviews is
+paged through with its cursors via the Flask test client, counting the SQL
+every page sends. Each page must stay within QUERY_BUDGET whatever the number
+of reviews, the pages together must return every review exactly once in
+newest-first order, and the hours and ratings must match the fixtures.
+"""
+
+import os
+import sys
+import threading
+from dotenv import load_dotenv
+
+# Add parent and website directories to path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'website'))
+sys.path.append(ROOT)
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import event, text
+from app import app, storage
+
+FIRST_USER_ID = 990000000000003001
+TEST_GAME_NAME = '__game_reviews_queries_test__'
+SMALL_REVIEWS = 3
+LARGE_REVIEWS = 45
+PAGE_SIZE = 10
+# Game lookup, the page of reviews and the profile lookup
+QUERY_BUDGET = 3
+
+def user_ids(count):
+    return [FIRST_USER_ID + n for n in range(count)]
+
+def store_fixtures(reviews):
+    """Replace the test game's data with reviews reviewers, each with three sessions, a review and a rating"""
+    cleanup_fixtures()
+    ids = user_ids(reviews)
+    with storage.Session() as session:
+        # Fresh profiles, so resolving them never schedules a Discord refresh
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username, avatar_url, profile_updated_at)
+            SELECT id, 0, 'reviews-test-' || id, 'avatar-' || id, LOCALTIMESTAMP FROM unnest(:ids) AS id
+        """), {"ids": ids})
+        game_id = session.execute(text("""
+            INSERT INTO games (name, credits_per_hour) VALUES (:name, 1.0) RETURNING id
+        """), {"name": TEST_GAME_NAME}).scalar()
+        params = {"ids": ids, "game_id": game_id}
+        # Sessions 1, 2 and 3 days ago; the review is written between the second and the last one
+        session.execute(text("""
+            INSERT INTO gaming_sessions (user_id, game_id, hours, credits_earned, timestamp, players)
+            SELECT id, :game_id, n, n, LOCALTIMESTAMP - make_interval(days => n), 1
+            FROM unnest(:ids) AS id, generate_series(1, 3) AS n
+        """), params)
+        # Reviews come in pairs that share a timestamp, so the cursor has to break ties by id
+        session.execute(text("""
+            INSERT INTO game_reviews (user_id, game_id, review_text, timestamp)
+            SELECT id, :game_id, 'review by ' || id,
+                   date_trunc('second', LOCALTIMESTAMP) - interval '36 hours' - make_interval(secs => (id - :first_id) / 2)
+            FROM unnest(:ids) AS id
+        """), {**params, "first_id": FIRST_USER_ID})
+        session.execute(text("""
+            INSERT INTO game_ratings (user_id, game_id, rating, timestamp)
+            SELECT id, :game_id, 1 + (id % 5), LOCALTIMESTAMP FROM unnest(:ids) AS id
+        """), params)
+        session.commit()
+
+def cleanup_fixtures():
+    with storage.Session() as session:
+        game_filter = "game_id IN (SELECT id FROM games WHERE name = :name)"
+        for table in ('game_ratings', 'game_reviews', 'gaming_sessions'):
+            session.execute(text(f"DELETE FROM {table} WHERE {game_filter}"), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM games WHERE name = :name"), {"name": TEST_GAME_NAME})
+        session.execute(text("DELETE FROM user_stats WHERE user_id = ANY(:ids)"), {"ids": user_ids(LARGE_REVIEWS)})
+        session.commit()
+
+def get_page(client, cursor=None):
+    """Request one page of reviews; returns (number of SQL statements it ran, response JSON)"""
+    statements = []
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Background work (profile refreshes, cache warmers) runs on other threads
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    query = {'name': TEST_GAME_NAME, 'limit': PAGE_SIZE}
+    if cursor:
+        query['cursor'] = cursor
+    event.listen(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get('/api/game/reviews', query_string=query)
+    finally:
+        event.remove(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements), response.get_json()
+
+def read_all_pages(client):
+    """Follow the cursors to the last page; returns (queries per page, all reviews in order)"""
+    counts, reviews, cursor = [], [], None
+    while True:
+        queries, page = get_page(client, cursor)
+        counts.append(queries)
+        reviews.extend(page['reviews'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return counts, reviews
+
+def run_tests():
+    print("🧪 Testing game reviews query count")
+    print("=" * 50)
+
+    ok = True
+    try:
+        client = app.test_client()
+        # Warm up connections so the measured requests only pay for their own queries
+        store_fixtures(SMALL_REVIEWS)
+        get_page(client)
+
+        for reviews in (SMALL_REVIEWS, LARGE_REVIEWS):
+            store_fixtures(reviews)
+            counts, result = read_all_pages(client)
+            print(f"{reviews:3d} reviews: {len(counts)} page(s), queries per page {counts}")
+
+            if max(counts) > QUERY_BUDGET:
+                print(f"❌ A page ran more than {QUERY_BUDGET} queries")
+                ok = False
+            if len(counts) != -(-reviews // PAGE_SIZE):
+                print(f"❌ Expected {-(-reviews // PAGE_SIZE)} pages")
+                ok = False
+            # The pages put together must match one unpaged newest-first read
+            with storage.Session() as session:
+                expected = [str(row.user_id) for row in session.execute(text("""
+                    SELECT user_id FROM game_reviews
+                    WHERE game_id = (SELECT id FROM games WHERE name = :name)
+                    ORDER BY timestamp DESC, id DESC
+                """), {"name": TEST_GAME_NAME})]
+            if [review['user_id'] for review in result] != expected:
+                print("❌ Pages skipped, repeated or reordered reviews")
+                ok = False
+            for review in result:
+                user_id = int(review['user_id'])
+                if (review['total_hours'], review['hours_at_review']) != (6.0, 5.0) or review['rating'] != 1 + user_id % 5 \
+                        or review['username'] != f'reviews-test-{user_id}':
+                    print(f"❌ Wrong review data: {review}")
+                    ok = False
+                    break
+
+        bad_cursor = client.get('/api/game/reviews', query_string={'name': TEST_GAME_NAME, 'cursor': 'nonsense'})
+        if bad_cursor.status_code != 400:
+            print(f"❌ A malformed cursor returned {bad_cursor.status_code} instead of 400")
+            ok = False
+    finally:
+        cleanup_fixtures()
+
+    if ok:
+        print(f"✅ Every page ran at most {QUERY_BUDGET} queries regardless of how many reviews the game has")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the paginated and "around me" leaderboard APIs.
+
+Test players are added to the current weekly leaderboard rollup, many of
+them tied on credits. /api/leaderboard is then paged through with its
+cursors via the Flask test client, counting the SQL every page sends: the
+pages together must equal the whole leaderboard in order with consecutive
+ranks, and the last page must cost no more queries than the first.
+around=<user_id>&radius=N must return the player's neighbours with the
+player's rank, also at the top of the board, and 404 for a player who
+isn't on it.
+"""
+
+import os
+import sys
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Add parent and website directories to path
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'website'))
+sys.path.append(ROOT)
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import event, text
+from app import app, storage
+
+FIRST_USER_ID = 990000000000005001
+PLAYERS = 120
+PAGE_SIZE = 25
+RADIUS = 3
+
+def user_ids():
+    return [FIRST_USER_ID + n for n in range(PLAYERS)]
+
+def store_fixtures():
+    """PLAYERS players on this week's leaderboard; every three share a credits total"""
+    cleanup_fixtures()
+    period_start = storage._rollup_period_start(datetime.now(storage.cst), 'weekly')
+    with storage.Session() as session:
+        # Fresh profiles, so resolving them never schedules a Discord refresh
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username, avatar_url, profile_updated_at)
+            SELECT id, 0, 'pages-test-' || id, 'avatar-' || id, LOCALTIMESTAMP FROM unnest(:ids) AS id
+        """), {"ids": user_ids()})
+        session.execute(text("""
+            INSERT INTO leaderboard_rollups (period_type, period_start, user_id, credits, total_hours, session_count, games_played, most_played_hours)
+            SELECT 'weekly', :period_start, id, 5000 + ((id - :first_id) / 3) * 7.5, 1, 1, 1, 1 FROM unnest(:ids) AS id
+        """), {"ids": user_ids(), "period_start": period_start, "first_id": FIRST_USER_ID})
+        session.commit()
+
+def cleanup_fixtures():
+    with storage.Session() as session:
+        session.execute(text("DELETE FROM leaderboard_rollups WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        session.execute(text("DELETE FROM user_stats WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        session.commit()
+
+def get(client, **query):
+    """Request /api/leaderboard; returns (number of SQL statements it ran, response)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # The async view runs its queries on the DB thread pool, so every thread counts; the test
+        # profiles are fresh, so no background Discord refresh adds to them
+        statements.append(statement)
+
+    event.listen(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get('/api/leaderboard', query_string={'timeframe': 'weekly', **query})
+    finally:
+        event.remove(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements), response
+
+def run_tests():
+    print("🧪 Testing leaderboard pages")
+    print("=" * 50)
+
+    ok = True
+    try:
+        store_fixtures()
+        client = app.test_client()
+        # Warm up connections so the measured requests only pay for their own queries
+        get(client, limit=PAGE_SIZE)
+
+        _, response = get(client)
+        full = response.get_json()
+        if not isinstance(full, list) or len(full) < PLAYERS:
+            print("❌ Without paging parameters the whole leaderboard should come back as a list")
+            return False
+
+        counts, entries, cursor = [], [], None
+        while True:
+            queries, response = get(client, limit=PAGE_SIZE, **({'cursor': cursor} if cursor else {}))
+            assert response.status_code == 200, response.get_data(as_text=True)
+            page = response.get_json()
+            counts.append(queries)
+            entries.extend(page['entries'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        print(f"{len(full)} players: {len(counts)} pages, queries per page {counts}")
+
+        if [e['user_id'] for e in entries] != [e['user_id'] for e in full]:
+            print("❌ Pages skipped, repeated or reordered players")
+            ok = False
+        if [e['rank'] for e in entries] != list(range(1, len(entries) + 1)):
+            print("❌ Ranks are not consecutive across pages")
+            ok = False
+        if counts[-1] > counts[0]:
+            print("❌ A deep page ran more queries than the first")
+            ok = False
+
+        ranks = {e['user_id']: e['rank'] for e in entries}
+        # A player in the middle of a group of ties, and the player at the top of the board
+        for user_id in (str(FIRST_USER_ID + 61), entries[0]['user_id']):
+            _, response = get(client, around=user_id, radius=RADIUS)
+            assert response.status_code == 200, response.get_data(as_text=True)
+            around = response.get_json()
+            rank = ranks[user_id]
+            expected = [e['user_id'] for e in entries[max(rank - 1 - RADIUS, 0):rank + RADIUS]]
+            print(f"around {user_id}: rank {around['user_rank']}, ranks {[e['rank'] for e in around['entries']]}")
+            if around['user_rank'] != rank or [e['user_id'] for e in around['entries']] != expected:
+                print(f"❌ Wrong neighbours or rank around {user_id}")
+                ok = False
+            if [e['rank'] for e in around['entries']] != [ranks[e['user_id']] for e in around['entries']]:
+                print(f"❌ Neighbours around {user_id} have the wrong ranks")
+                ok = False
+            # The cursor continues straight after the last neighbour
+            _, response = get(client, limit=1, cursor=around['next_cursor'])
+            if response.get_json()['entries'][0]['rank'] != around['entries'][-1]['rank'] + 1:
+                print("❌ The around cursor doesn't continue after the last neighbour")
+                ok = False
+
+        _, response = get(client, around='1', radius=RADIUS)
+        if response.status_code != 404:
+            print(f"❌ A player who isn't on the leaderboard returned {response.status_code} instead of 404")
+            ok = False
+        _, response = get(client, cursor='nonsense')
+        if response.status_code != 400:
+            print(f"❌ A malformed cursor returned {response.status_code} instead of 400")
+            ok = False
+    finally:
+        cleanup_fixtures()
+
+    if ok:
+        print("✅ Pages and neighbours match the full leaderboard and deep pages cost the same as the first")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
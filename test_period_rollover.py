@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test script for closing ended leaderboard periods (GameStorage.roll_over_period).
+
+A weekly period long in the past is set up with test players on its rollup
+and stored the way the bot stores periods, as naive CST wall-clock times.
+It must be listed as ended, while a period ending an hour from now must not
+be, whatever the host's and the database's time zones. It is then rolled
+over while the SQL it sends is counted: the placements must be computed
+once and written with a single statement, whatever the number of players,
+and must match the period's leaderboard in order. A rollover that
+fails part way must leave nothing behind, and a retry after a rollover that
+succeeded must change nothing. Recording placements again must update the
+period's rows instead of adding more.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+import pytz
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sqlalchemy import event, text
+from models import LeaderboardPeriod, LeaderboardType
+from storage import GameStorage, get_period_boundaries
+
+FIRST_USER_ID = 990000000000006001
+PLAYERS = 200
+# A week nobody played in, so the fixtures are the whole leaderboard
+PERIOD_START = pytz.timezone('America/Chicago').localize(datetime(2001, 1, 1))
+# Start of a fixture period that ends an hour from now
+OPEN_PERIOD_START = datetime(2001, 1, 15)
+MAX_STATEMENTS = 6
+
+def user_ids():
+    return [FIRST_USER_ID + n for n in range(PLAYERS)]
+
+def store_fixtures(storage):
+    """
+    A weekly period that has ended, with PLAYERS players on its rollup, and one that ends an hour from now;
+    returns their ids
+    """
+    cleanup_fixtures(storage)
+    start, end = get_period_boundaries(PERIOD_START, 'weekly')
+    with storage.Session() as session:
+        session.execute(text("""
+            INSERT INTO user_stats (user_id, total_credits, username)
+            SELECT id, 0, 'rollover-test-' || id FROM unnest(:ids) AS id
+        """), {"ids": user_ids()})
+        session.execute(text("""
+            INSERT INTO leaderboard_rollups (period_type, period_start, user_id, credits, total_hours, session_count, games_played, most_played_hours)
+            SELECT 'weekly', :period_start, id, 100 + ((id - :first_id) % 37) * 2.5, 2, 1, 1, 2 FROM unnest(:ids) AS id
+        """), {"ids": user_ids(), "period_start": start.replace(tzinfo=None), "first_id": FIRST_USER_ID})
+        period = LeaderboardPeriod(leaderboard_type=LeaderboardType.WEEKLY, start_time=start.replace(tzinfo=None),
+                                   end_time=end.replace(tzinfo=None), is_active=True)
+        open_period = LeaderboardPeriod(leaderboard_type=LeaderboardType.WEEKLY, start_time=OPEN_PERIOD_START,
+                                        end_time=datetime.now(storage.cst).replace(tzinfo=None) + timedelta(hours=1),
+                                        is_active=True)
+        session.add_all([period, open_period])
+        session.commit()
+        return period.id, open_period.id
+
+def cleanup_fixtures(storage):
+    start, _ = get_period_boundaries(PERIOD_START, 'weekly')
+    with storage.Session() as session:
+        # The fixture periods and the one the rollover opens
+        period_ids = session.execute(text("""
+            SELECT id FROM leaderboard_periods
+            WHERE leaderboard_type = 'WEEKLY' AND start_time >= :start AND start_time <= :open_start
+        """), {"start": start.replace(tzinfo=None), "open_start": OPEN_PERIOD_START}).scalars().all()
+        session.execute(text("DELETE FROM leaderboard_history WHERE period_id = ANY(:ids) OR user_id = ANY(:users)"),
+                        {"ids": period_ids, "users": user_ids()})
+        session.execute(text("DELETE FROM leaderboard_periods WHERE id = ANY(:ids)"), {"ids": period_ids})
+        session.execute(text("DELETE FROM leaderboard_rollups WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        session.execute(text("DELETE FROM user_stats WHERE user_id = ANY(:ids)"), {"ids": user_ids()})
+        session.commit()
+
+def recorded(storage, period_id):
+    """(user_id, placement, credits, timestamp) rows recorded for the period, best first"""
+    with storage.Session() as session:
+        return session.execute(text("""
+            SELECT user_id, placement, credits, timestamp FROM leaderboard_history
+            WHERE period_id = :period_id ORDER BY placement
+        """), {"period_id": period_id}).fetchall()
+
+def periods(storage, period_id):
+    """(is_active of the fixture period, number of periods opened after it)"""
+    with storage.Session() as session:
+        return session.execute(text("""
+            SELECT p.is_active, (SELECT COUNT(*) FROM leaderboard_periods n
+                                 WHERE n.leaderboard_type = p.leaderboard_type AND n.start_time = p.end_time)
+            FROM leaderboard_periods p WHERE p.id = :period_id
+        """), {"period_id": period_id}).one()
+
+def roll_over(storage, period_id):
+    """roll_over_period, returning (SQL statements it ran, its result)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(storage.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        return statements, storage.roll_over_period(period_id)
+    finally:
+        event.remove(storage.engine, 'before_cursor_execute', before_cursor_execute)
+
+def run_tests():
+    print("🧪 Testing leaderboard period rollover")
+    print("=" * 50)
+
+    storage = GameStorage()
+    ok = True
+    try:
+        period_id, open_period_id = store_fixtures(storage)
+        start, end = get_period_boundaries(PERIOD_START, 'weekly')
+
+        ended = [period.id for period in storage.get_ended_periods(LeaderboardType.WEEKLY)]
+        if period_id not in ended or open_period_id in ended:
+            print("❌ Ended periods should include the past period and not the one ending in an hour")
+            ok = False
+        expected = asyncio.run(storage.get_leaderboard_by_timeframe(LeaderboardType.WEEKLY, custom_start=start, custom_end=end))
+
+        # A rollover that fails after writing the placements must leave the period as it was
+        write_placements = storage._write_placements
+
+        def failing_write(*args, **kwargs):
+            write_placements(*args, **kwargs)
+            raise RuntimeError("simulated crash")
+
+        storage._write_placements = failing_write
+        try:
+            storage.roll_over_period(period_id)
+            print("❌ The simulated crash didn't reach the caller")
+            ok = False
+        except RuntimeError:
+            pass
+        finally:
+            storage._write_placements = write_placements
+        if recorded(storage, period_id) or tuple(periods(storage, period_id)) != (True, 0):
+            print("❌ A failed rollover left placements or period changes behind")
+            ok = False
+
+        statements, new_period = roll_over(storage, period_id)
+        rows = recorded(storage, period_id)
+        writes = [s for s in statements if 'leaderboard_history' in s and 'INSERT' in s]
+        print(f"{PLAYERS} players: rollover ran {len(statements)} statements, {len(writes)} writing placements")
+        if len(statements) > MAX_STATEMENTS or len(writes) != 1:
+            print(f"❌ Expected at most {MAX_STATEMENTS} statements and one placement write")
+            ok = False
+        if [(row.user_id, row.placement, row.credits) for row in rows] != [(entry[0], n, entry[1]) for n, entry in enumerate(expected, 1)]:
+            print("❌ Recorded placements don't match the period's leaderboard")
+            ok = False
+        if new_period is None or tuple(periods(storage, period_id)) != (False, 1):
+            print("❌ The period wasn't closed with exactly one next period opened")
+            ok = False
+        elif (new_period.start_time, new_period.is_active) != (end.replace(tzinfo=None), True):
+            print("❌ The next period doesn't start when the closed one ended")
+            ok = False
+
+        # Retrying a rollover that already happened changes nothing
+        _, retried = roll_over(storage, period_id)
+        if retried is not None or recorded(storage, period_id) != rows or tuple(periods(storage, period_id)) != (False, 1):
+            print("❌ Retrying a finished rollover changed the period")
+            ok = False
+
+        # Recording the open period twice, then without its last player, keeps one row per player
+        placements = expected[:10]
+        asyncio.run(storage.record_leaderboard_placements(LeaderboardType.WEEKLY, placements, new_period))
+        asyncio.run(storage.record_leaderboard_placements(LeaderboardType.WEEKLY, placements, new_period))
+        if [row.user_id for row in recorded(storage, new_period.id)] != [entry[0] for entry in placements]:
+            print("❌ Recording the same placements twice duplicated rows")
+            ok = False
+        asyncio.run(storage.record_leaderboard_placements(LeaderboardType.WEEKLY, placements[:-1], new_period))
+        if [row.user_id for row in recorded(storage, new_period.id)] != [entry[0] for entry in placements[:-1]]:
+            print("❌ A player who left the board kept their placement")
+            ok = False
+    finally:
+        cleanup_fixtures(storage)
+
+    if ok:
+        print("✅ Placements are computed once, written in one statement, and rollovers are safe to retry")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
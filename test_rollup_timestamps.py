@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the period buckets of leaderboard rollups.
+
+Sessions are stored with naive UTC wall-clock timestamps. A test player gets
+sessions on either side of a CST week boundary and a CST month boundary,
+folded into the rollups one at a time the way a logged session is
+(update_rollups_for_session). Rebuilding the player's rollups from
+gaming_sessions (rebuild_leaderboard_rollups, run after rate changes and
+deletions) must put every session in the same week and month.
+"""
+
+import os
+import sys
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sqlalchemy import text
+from storage import GameStorage
+
+USER_ID = 990000000000007001
+GAME_NAME = '__test_rollup_timestamps_game__'
+# (naive UTC timestamp, CST week it belongs to, CST month it belongs to)
+SESSIONS = [
+    # Sunday 23:30 and Monday 00:30 CST
+    (datetime(2001, 1, 8, 5, 30), datetime(2001, 1, 1), datetime(2001, 1, 1)),
+    (datetime(2001, 1, 8, 6, 30), datetime(2001, 1, 8), datetime(2001, 1, 1)),
+    # January 31st 23:30 and February 1st 00:30 CST
+    (datetime(2001, 2, 1, 5, 30), datetime(2001, 1, 29), datetime(2001, 1, 1)),
+    (datetime(2001, 2, 1, 6, 30), datetime(2001, 1, 29), datetime(2001, 2, 1)),
+]
+
+def cleanup(storage):
+    with storage.Session() as session:
+        for table in ('leaderboard_game_rollups', 'leaderboard_rollups', 'gaming_sessions', 'user_stats'):
+            session.execute(text(f"DELETE FROM {table} WHERE user_id = :user_id"), {"user_id": USER_ID})
+        session.execute(text("DELETE FROM games WHERE name = :name"), {"name": GAME_NAME})
+        session.commit()
+
+def rollups(session):
+    """The player's weekly and monthly (period_type, period_start, session_count) rollups"""
+    return session.execute(text("""
+        SELECT period_type, period_start, session_count FROM leaderboard_rollups
+        WHERE user_id = :user_id AND period_type IN ('weekly', 'monthly')
+        ORDER BY period_type, period_start
+    """), {"user_id": USER_ID}).fetchall()
+
+def run_tests():
+    print("🧪 Testing rollup period buckets")
+    print("=" * 50)
+
+    storage = GameStorage()
+    cleanup(storage)
+    ok = True
+    try:
+        with storage.Session() as session:
+            game_id = session.execute(text("""
+                INSERT INTO games (name, credits_per_hour) VALUES (:name, 1.0) RETURNING id
+            """), {"name": GAME_NAME}).scalar()
+            storage.ensure_user_stats(session, USER_ID)
+            for timestamp, _, _ in SESSIONS:
+                session.execute(text("""
+                    INSERT INTO gaming_sessions (user_id, game_id, hours, credits_earned, timestamp, players)
+                    VALUES (:user_id, :game_id, 1.0, 1.0, :timestamp, 1)
+                """), {"user_id": USER_ID, "game_id": game_id, "timestamp": timestamp})
+                storage.update_rollups_for_session(session, USER_ID, game_id, 1.0, 1.0, timestamp)
+            live = rollups(session)
+
+            storage.rebuild_leaderboard_rollups(session, [USER_ID])
+            rebuilt = rollups(session)
+            session.rollback()
+
+        expected = {}
+        for _, week, month in SESSIONS:
+            expected[('weekly', week)] = expected.get(('weekly', week), 0) + 1
+            expected[('monthly', month)] = expected.get(('monthly', month), 0) + 1
+        expected = sorted((period_type, start, count) for (period_type, start), count in expected.items())
+
+        print(f"Logged:  {[(row[0], row[1].date().isoformat(), row[2]) for row in live]}")
+        print(f"Rebuilt: {[(row[0], row[1].date().isoformat(), row[2]) for row in rebuilt]}")
+        if [tuple(row) for row in live] != expected:
+            print("❌ Logged sessions landed in the wrong CST periods")
+            ok = False
+        if [tuple(row) for row in rebuilt] != expected:
+            print("❌ Rebuilding moved sessions to different periods")
+            ok = False
+    finally:
+        cleanup(storage)
+
+    if ok:
+        print("✅ Logged and rebuilt rollups put every session in the same CST week and month")
+    return ok
+
+if __name__ == "__main__":
+    if not run_tests():
+        sys.exit(1)
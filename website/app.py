@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory, redirect, url_for, make_response
+from flask import Flask, render_template, jsonify, request, send_from_directory, send_file, redirect, url_for, make_response
 import os
 import sys # Import the sys module
 import re # Import re for HTML cleaning
@@ -6,12 +6,21 @@ from dotenv import load_dotenv
 from flask_cors import CORS
 from requests_oauthlib import OAuth2Session
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Add parent directory to path
-from storage import GameStorage # Import GameStorage
+from storage import GameStorage, get_period_boundaries, REVIEWS_PAGE_SIZE, LEADERBOARD_PAGE_SIZE, decode_leaderboard_cursor # Import GameStorage
+from async_storage import AsyncGameStorage
+from background_loop import background_loop
+from profile_resolver import ProfileResolver
+from discord_client import discord_client
+from blob_store import blob_store, BlobTooLarge
+from streaming_upload import receive_multipart, UploadRejected
+from media_cache import media_cache
+from image_variants import image_variants, responsive_image, is_variant, VARIANT_FORMATS, VARIANT_WIDTHS
 import requests # Import requests library
-from functools import lru_cache
+import hashlib
+import hmac
+from functools import wraps
 import time
 import asyncio
-import aiohttp # Import aiohttp for async requests
 from datetime import datetime # Import datetime
 from models import LeaderboardType # Import LeaderboardType
 import traceback
@@ -20,7 +29,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from models import Base # Import Base for table creation
 import logging
 from sqlalchemy.sql import func
-from models import GameReview, GameRating, GameCompletion, GameScreenshot, UserStats, Game, LeaderboardHistory, LeaderboardPeriod, Bonus
+from models import GameReview, GameRating, GameCompletion, GameScreenshot, Game, LeaderboardHistory, LeaderboardPeriod, Bonus
 from sqlalchemy.orm import sessionmaker
 from models import UserPreferences
 
@@ -41,8 +50,18 @@ DISCORD_AUTH_URL = 'https://discord.com/api/oauth2/authorize'
 DISCORD_TOKEN_URL = 'https://discord.com/api/oauth2/token'
 DISCORD_API_URL = 'https://discord.com/api/v10'
 
+class GamerCredFlask(Flask):
+    """Flask app whose async views run on the process's shared event loop"""
+
+    def async_to_sync(self, func):
+        # Default Flask spins up an event loop per request; reuse the background loop instead
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return background_loop.run(func(*args, **kwargs))
+        return wrapper
+
 # Initialize Flask app with correct static folder path
-app = Flask(__name__, 
+app = GamerCredFlask(__name__, 
             static_folder='public',
             static_url_path='',
             template_folder='public')
@@ -56,24 +75,19 @@ print(f"Database URL: {database_url}")
 
 # Initialize storage
 storage = GameStorage()
+# Async views await storage through a DB thread pool so queries never block the shared event loop
+async_storage = AsyncGameStorage(storage)
 logger.info("Storage initialized")
 
-# Cache for Discord user info with 5-minute expiration
-discord_user_cache = {}
-discord_user_cache_timestamps = {}
-
 # Cache for leaderboard and popular games data
 cache = {
     'leaderboard': {'data': None, 'timestamp': 0},
     'popular_games': {'data': None, 'timestamp': 0},
     'recent_activity': {'data': None, 'timestamp': 0},
-    'current_champions': {'data': None, 'timestamp': 0}
+    'current_champions': {'data': None, 'timestamp': 0},
+    'home': {'data': None, 'timestamp': 0, 'version': None, 'etag': None}
 }
 
-# Cache for background files (1 hour expiration)
-background_file_cache = {}
-background_file_cache_timestamps = {}
-
 # Get RAWG API key from environment variable
 RAWG_API_KEY = os.getenv('RAWG_API_KEY')
 RAWG_API_URL = os.getenv('RAWG_API_URL', 'https://api.rawg.io/api')
@@ -89,7 +103,7 @@ def refresh_cache():
         if current_time - cache['leaderboard']['timestamp'] > 30:
             try:
                 # Get leaderboard data for weekly
-                leaderboard_data = run_async(storage.get_leaderboard_by_timeframe(LeaderboardType.WEEKLY))
+                leaderboard_data = run_async(async_storage.get_leaderboard_by_timeframe(LeaderboardType.WEEKLY))
                 cache['leaderboard']['data'] = leaderboard_data
                 cache['leaderboard']['timestamp'] = current_time
             except Exception as e:
@@ -97,211 +111,58 @@ def refresh_cache():
     except Exception as e:
         logger.error(f"Error in refresh_cache: {str(e)}")
 
-# Cache for Discord user info with 5-minute expiration
-@lru_cache(maxsize=1000)
-def get_cached_discord_user_info(user_id):
-    # Get the current time
-    current_time = time.time()
-    # Check if the cache entry exists and is not expired
-    cache_key = f"{user_id}_{current_time // 300}"  # 300 seconds = 5 minutes
-    # Run the async function in a sync context
-    return run_async(get_discord_user_info(user_id))  # user_id is already a string
-
-# Function to fetch Discord user info
-async def get_discord_user_info(user_id_str):
-    if not os.getenv('DISCORD_TOKEN'):
-        print("DISCORD_TOKEN not set.")
-        return None
+# Discord profiles are read from user_stats; stale ones are refreshed from Discord in the background
+profile_resolver = ProfileResolver(storage, discord_client.get_user_profiles)
 
-    DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
-    
-    headers = {
-        "Authorization": f"Bot {DISCORD_TOKEN}"
-    }
-    
-    # First try the guild members endpoint since we know they were in our server
-    guild_id = "693741073394040843"
-    guild_url = f"https://discord.com/api/v10/guilds/{guild_id}/members/{user_id_str}"
-    
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(guild_url, headers=headers) as guild_response:
-                if guild_response.status == 200:
-                    guild_data = await guild_response.json()
-                    user_data = guild_data.get('user', {})
-                    avatar_hash = user_data.get('avatar')
-                    
-                    if avatar_hash:
-                        if avatar_hash.startswith('a_'):
-                            avatar_url = f"https://cdn.discordapp.com/avatars/{user_id_str}/{avatar_hash}.gif"
-                        else:
-                            avatar_url = f"https://cdn.discordapp.com/avatars/{user_id_str}/{avatar_hash}.png"
-                    else:
-                        # Use string manipulation for the default avatar index to avoid rounding
-                        default_avatar_index = int(user_id_str[-1]) % 6
-                        avatar_url = f"https://cdn.discordapp.com/embed/avatars/{default_avatar_index}.png"
-                    
-                    # Get username from user data, fallback to display name from member data
-                    username = user_data.get('username')
-                    if not username and 'nick' in guild_data:
-                        username = guild_data['nick']
-                    if not username:
-                        username = f'Unknown User {user_id_str}'
-                    
-                    return {
-                        'username': username,
-                        'avatar_url': avatar_url
-                    }
-                
-                # If not found in guild, try global user endpoint
-                url = f"https://discord.com/api/v10/users/{user_id_str}"
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        user_data = await response.json()
-                        avatar_hash = user_data.get('avatar')
-                        
-                        if avatar_hash:
-                            if avatar_hash.startswith('a_'):
-                                avatar_url = f"https://cdn.discordapp.com/avatars/{user_id_str}/{avatar_hash}.gif"
-                            else:
-                                avatar_url = f"https://cdn.discordapp.com/avatars/{user_id_str}/{avatar_hash}.png"
-                        else:
-                            # Use string manipulation for the default avatar index to avoid rounding
-                            default_avatar_index = int(user_id_str[-1]) % 6
-                            avatar_url = f"https://cdn.discordapp.com/embed/avatars/{default_avatar_index}.png"
-                        
-                        username = user_data.get('username')
-                        if not username:
-                            username = f'Unknown User {user_id_str}'
-                        
-                        return {
-                            'username': username,
-                            'avatar_url': avatar_url
-                        }
-                    else:
-                        # Return a default user object instead of None
-                        return {
-                            'username': f'Unknown User {user_id_str}',
-                            'avatar_url': f'https://cdn.discordapp.com/embed/avatars/{int(user_id_str[-1]) % 6}.png'
-                        }
-    except Exception as e:
-        # Return a default user object instead of None
-        return {
-            'username': f'Unknown User {user_id_str}',
-            'avatar_url': f'https://cdn.discordapp.com/embed/avatars/{int(user_id_str[-1]) % 6}.png'
-        }
+def get_user_profiles(user_ids):
+    """Map user ids (as strings) to {'username', 'avatar_url'} without calling Discord"""
+    return profile_resolver.resolve_many(user_ids)
 
-# Function to batch fetch Discord user info for multiple users
-async def get_batch_discord_user_info(user_ids):
-    if not os.getenv('DISCORD_TOKEN'):
-        print("DISCORD_TOKEN not set.")
-        return {}
-    
-    DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
-    headers = {"Authorization": f"Bot {DISCORD_TOKEN}"}
-    guild_id = "693741073394040843"
-    
-    results = {}
-    
-    try:
-        async with aiohttp.ClientSession() as session:
-            # Create tasks for all user IDs
-            tasks = []
-            for user_id_str in user_ids:
-                # First try guild endpoint
-                guild_url = f"https://discord.com/api/v10/guilds/{guild_id}/members/{user_id_str}"
-                tasks.append((user_id_str, session.get(guild_url, headers=headers), 'guild'))
-                
-                # Also try global endpoint as fallback
-                global_url = f"https://discord.com/api/v10/users/{user_id_str}"
-                tasks.append((user_id_str, session.get(global_url, headers=headers), 'global'))
-            
-            # Execute all requests concurrently
-            responses = []
-            for user_id_str, task, endpoint_type in tasks:
-                try:
-                    response = await task
-                    responses.append((user_id_str, response, endpoint_type))
-                except Exception as e:
-                    # If guild request fails, we'll still have the global request
-                    continue
-            
-            # Process responses
-            for user_id_str, response, endpoint_type in responses:
-                if user_id_str in results:
-                    continue  # Already processed this user
-                
-                if response.status == 200:
-                    try:
-                        data = await response.json()
-                        
-                        if endpoint_type == 'guild':
-                            user_data = data.get('user', {})
-                            avatar_hash = user_data.get('avatar')
-                            username = user_data.get('username')
-                            if not username and 'nick' in data:
-                                username = data['nick']
-                        else:  # global
-                            user_data = data
-                            avatar_hash = user_data.get('avatar')
-                            username = user_data.get('username')
-                        
-                        if not username:
-                            username = f'Unknown User {user_id_str}'
-                        
-                        if avatar_hash:
-                            if avatar_hash.startswith('a_'):
-                                avatar_url = f"https://cdn.discordapp.com/avatars/{user_id_str}/{avatar_hash}.gif"
-                            else:
-                                avatar_url = f"https://cdn.discordapp.com/avatars/{user_id_str}/{avatar_hash}.png"
-                        else:
-                            default_avatar_index = int(user_id_str[-1]) % 6
-                            avatar_url = f"https://cdn.discordapp.com/embed/avatars/{default_avatar_index}.png"
-                        
-                        results[user_id_str] = {
-                            'username': username,
-                            'avatar_url': avatar_url
-                        }
-                    except Exception as e:
-                        # Fallback to default
-                        results[user_id_str] = {
-                            'username': f'Unknown User {user_id_str}',
-                            'avatar_url': f'https://cdn.discordapp.com/embed/avatars/{int(user_id_str[-1]) % 6}.png'
-                        }
-            
-            # Add defaults for any users that weren't found
-            for user_id_str in user_ids:
-                if user_id_str not in results:
-                    results[user_id_str] = {
-                        'username': f'Unknown User {user_id_str}',
-                        'avatar_url': f'https://cdn.discordapp.com/embed/avatars/{int(user_id_str[-1]) % 6}.png'
-                    }
-    
-    except Exception as e:
-        # Fallback: return defaults for all users
-        for user_id_str in user_ids:
-            results[user_id_str] = {
-                'username': f'Unknown User {user_id_str}',
-                'avatar_url': f'https://cdn.discordapp.com/embed/avatars/{int(user_id_str[-1]) % 6}.png'
-            }
-    
-    return results
+async def get_user_profiles_async(user_ids):
+    return await async_storage.run(profile_resolver.resolve_many, user_ids)
 
-# Helper function to run async functions
+# Helper function to run async functions from sync views on the shared event loop
 def run_async(coro):
     try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
+        return background_loop.run(coro)
     except Exception as e:
         print(f"Error in run_async: {str(e)}")
         print("Full traceback:")
         traceback.print_exc()
         raise
 
+# Tables each revalidated read API is computed from (tracked by add_data_revisions.py)
+GAME_STATS_TABLES = ('games', 'gaming_sessions')
+LEADERBOARD_TABLES = ('games', 'gaming_sessions', 'leaderboard_rollups', 'user_stats')
+
+def timeframe_window(timeframe):
+    """Key of the current period a weekly/monthly view covers, so its ETag changes when the period rolls over"""
+    if timeframe in ('weekly', 'monthly'):
+        return get_period_boundaries(datetime.now(storage.cst), timeframe)[0].strftime('%Y-%m-%d')
+    return timeframe
+
+def revision_etag(revisions, *parts):
+    """ETag of a response built from tables at the given revisions, or None if they aren't tracked"""
+    if revisions is None:
+        return None
+    key = ';'.join([f'{table}={revision}' for table, revision in sorted(revisions.items())] + [str(part) for part in parts])
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+def not_modified(etag):
+    """A 304 response if the client already has the representation with this ETag, otherwise None"""
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    return revalidated(make_response('', 304), etag)
+
+def revalidated(response, etag):
+    """Let clients keep a response, but only reuse it after checking its ETag with If-None-Match.
+    List APIs pass None for an empty list, since the storage reads also return [] when they fail."""
+    if etag is not None:
+        # Weak: the same data may be re-encoded (e.g. compressed) on the way to the client
+        response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 # Helper function to clean HTML and truncate text
 def clean_and_truncate_description(html_text):
     if not html_text:
@@ -434,51 +295,43 @@ def serve_uploads(filename):
         traceback.print_exc()
         return jsonify({'error': 'Internal server error'}), 500
 
+def game_info_payload(game_db_info):
+    """/api/game's view of a game's stats and stored metadata; missing RAWG data is filled in by the enrichment worker"""
+    unique_players = game_db_info.get('unique_players', 0)
+    total_hours = game_db_info.get('total_hours', 0.0)
+    return {
+        'name': game_db_info['name'],  # Use the name from the database
+        'box_art_url': game_db_info.get('box_art_url', ''),
+        'description': game_db_info.get('description', ''),
+        'backloggd_url': game_db_info.get('backloggd_url', ''),
+        'unique_players': unique_players,
+        'total_hours': total_hours,
+        'credits_per_hour': game_db_info.get('credits_per_hour', 1.0),
+        'half_life_hours': game_db_info.get('half_life_hours'),
+        'avg_hours': total_hours / unique_players if unique_players > 0 else 0.0,
+        'release_date': game_db_info.get('release_date', '')
+    }
+
 # API routes
 @app.route('/api/game')
-def get_game():
+async def get_game():
     try:
         game_name = request.args.get('name')
         if not game_name:
             return jsonify({'error': 'Game name parameter missing'}), 400
 
+        # Nothing has been written to the game's tables since the client's copy: skip the queries
+        etag = revision_etag(await async_storage.get_data_revisions(GAME_STATS_TABLES), 'game', game_name.lower())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         # Get game info from database
-        game_db_info = storage.get_game_stats(game_name)
+        game_db_info = await async_storage.get_game_stats(game_name)
         if not game_db_info:
             return jsonify({'error': 'Game not found'}), 404
 
-        # Use stored description from database
-        description = game_db_info.get('description', '')
-        box_art_url = game_db_info.get('box_art_url', '')
-        backloggd_url = game_db_info.get('backloggd_url', '')
-
-        # Only fetch from RAWG API if we don't have the data in the database
-        if not description or not box_art_url:
-            rawg_data = run_async(storage.fetch_game_details_from_rawg(game_name))
-            if rawg_data:
-                # Use RAWG data to fill in missing information
-                if not description:
-                    description = rawg_data.get('description', '')
-                if not box_art_url:
-                    box_art_url = rawg_data.get('box_art_url', '')
-                if not backloggd_url:
-                    backloggd_url = rawg_data.get('backloggd_url', '')
-
-        # Combine database info with API info
-        final_game_data = {
-            'name': game_db_info['name'],  # Use the name from the database
-            'box_art_url': box_art_url,
-            'description': description,
-            'backloggd_url': backloggd_url,
-            'unique_players': game_db_info.get('unique_players', 0),
-            'total_hours': game_db_info.get('total_hours', 0.0),
-            'credits_per_hour': game_db_info.get('credits_per_hour', 1.0),
-            'half_life_hours': game_db_info.get('half_life_hours'),
-            'avg_hours': game_db_info.get('total_hours', 0.0) / game_db_info.get('unique_players', 1) if game_db_info.get('unique_players', 0) > 0 else 0.0,
-            'release_date': game_db_info.get('release_date', '')
-        }
-
-        return jsonify(final_game_data)
+        return revalidated(jsonify(game_info_payload(game_db_info)), etag)
     except Exception as e:
         print(f"Error getting game info: {str(e)}")
         return jsonify({'error': 'Failed to get game information'}), 500
@@ -493,10 +346,11 @@ def get_game_players():
         players_data = storage.get_recent_players_for_game(game_name, timeframe='weekly', limit=6)
 
         # Fetch Discord info for players
+        profiles = get_user_profiles(player['user_id'] for player in players_data)
         formatted_players = []
         for player in players_data:
             user_id = player['user_id']
-            discord_info = get_cached_discord_user_info(user_id)
+            discord_info = profiles.get(str(user_id))
             formatted_players.append({
                 'user_id': user_id,
                 'username': discord_info['username'] if discord_info else f'User{user_id}',
@@ -520,10 +374,11 @@ def get_game_activity():
         activity_data = storage.get_recent_activity_for_game(game_name, limit=limit)
 
         # Fetch Discord info for users in activity
+        profiles = get_user_profiles(activity['user_id'] for activity in activity_data)
         formatted_activity = []
         for activity in activity_data:
             user_id = activity['user_id']
-            discord_info = get_cached_discord_user_info(user_id)
+            discord_info = profiles.get(str(user_id))
             formatted_activity.append({
                 'id': activity['id'],
                 'user_id': user_id,
@@ -541,6 +396,85 @@ def get_game_activity():
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), 500
 
+MAX_REVIEWS_PAGE_SIZE = 100
+
+def review_payload(review, profiles):
+    """A review from GameStorage.get_game_reviews with its author's profile, as the reviews API returns it"""
+    profile = profiles[review['user_id']]
+    return {
+        'user_id': review['user_id'],
+        'username': profile['username'],
+        'avatar_url': profile['avatar_url'],
+        'review_text': review['review_text'],
+        'timestamp': review['timestamp'].isoformat(),
+        'rating': review['rating'],
+        'hours_at_review': review['hours_at_review'],
+        'total_hours': review['total_hours']
+    }
+
+@app.route('/api/game/bundle')
+def get_game_bundle():
+    """Everything the game page loads, in one response: game info, players, activity, ratings,
+    completions, reviews, screenshots and the logged-in user's own stats and completion requirements.
+    Reads a fixed number of queries however many players, reviews or screenshots the game has."""
+    try:
+        game_name = request.args.get('name')
+        if not game_name:
+            return jsonify({'error': 'Game name parameter missing'}), 400
+        user_id = request.cookies.get('user_id')
+        viewer_id = int(user_id) if user_id and user_id.isdigit() else None
+
+        page = storage.get_game_page(game_name, viewer_id=viewer_id)
+        if not page:
+            return jsonify({'error': 'Game not found'}), 404
+
+        # Every user on the page is looked up at once
+        profiles = get_user_profiles(
+            [p['user_id'] for p in page['players']] + [a['user_id'] for a in page['activity']] +
+            [r['user_id'] for r in page['reviews']] + [s['user_id'] for s in page['screenshots']])
+
+        def with_profile(item):
+            profile = profiles.get(item['user_id'])
+            return {
+                **item,
+                'username': profile['username'] if profile else f"User{item['user_id']}",
+                'avatar_url': profile['avatar_url'] if profile else f"https://randomuser.me/api/portraits/men/{item['user_id']}.jpg"
+            }
+
+        viewer = page['viewer']
+        return jsonify({
+            'game': game_info_payload(page['game']),
+            'players': [with_profile(p) for p in page['players']],
+            'activity': [{**with_profile(a), 'type': 'played'} for a in page['activity']],
+            'ratings': {
+                'average': page['ratings']['average'],
+                'count': page['ratings']['count'],
+                'user_rating': page['ratings']['viewer_rating']
+            },
+            'completions': {
+                'count': page['completions']['count'],
+                'user_completed': page['completions']['viewer_completed']
+            },
+            'reviews': [review_payload(r, profiles) for r in page['reviews']],
+            'reviews_next_cursor': page['reviews_next_cursor'],
+            'screenshots': [{
+                **with_profile({'id': s['id'], 'user_id': s['user_id']}),
+                'image_url': f"/api/game/screenshot/{s['id']}",
+                **responsive_image(s['blob_key']),
+                'caption': s['caption'],
+                'uploaded_at': s['uploaded_at'].isoformat()
+            } for s in page['screenshots']],
+            'user': {
+                'game_stats': viewer,
+                'completion_requirements': completion_requirements_payload(
+                    page['completions']['viewer_completed'], viewer['total_hours'], page['ratings']['viewer_rating'])
+            } if viewer else None
+        })
+    except Exception as e:
+        print(f"Error getting game page bundle: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': 'Failed to get game information'}), 500
+
 @app.errorhandler(Exception)
 def handle_error(error):
     """Global error handler for all routes"""
@@ -549,213 +483,287 @@ def handle_error(error):
     traceback.print_exc()
     return jsonify({'error': str(error)}), 500
 
-# Add endpoint to fetch leaderboard data
+# Add endpoint to expose database pool metrics for this worker
+@app.route('/api/metrics/db-pool')
+def get_db_pool_metrics():
+    # Operators only: requires "Authorization: Bearer $METRICS_TOKEN", and doesn't exist without one
+    metrics_token = os.getenv('METRICS_TOKEN')
+    if not metrics_token:
+        return jsonify({'error': 'Not found'}), 404
+    auth_header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(auth_header.encode(), f'Bearer {metrics_token}'.encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+    try:
+        return jsonify(storage.get_pool_metrics())
+    except Exception as e:
+        logger.error(f"Error getting database pool metrics: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Failed to get database pool metrics'}), 500
+
+LEADERBOARD_TYPES = {
+    'weekly': LeaderboardType.WEEKLY,
+    'monthly': LeaderboardType.MONTHLY,
+    'alltime': LeaderboardType.ALLTIME,
+}
+MAX_LEADERBOARD_PAGE_SIZE = 100
+DEFAULT_LEADERBOARD_RADIUS = 5
+MAX_LEADERBOARD_RADIUS = 25
+
+def leaderboard_entry_payload(entry, profiles):
+    """A row from get_leaderboard_page/get_leaderboard_around with the user's profile, as served by /api/leaderboard"""
+    user_id_str = str(entry['user_id'])
+    discord_info = profiles.get(user_id_str, {})
+    return {
+        'rank': entry['rank'],
+        'user_id': user_id_str,
+        'username': discord_info.get('username', 'Unknown'),
+        'avatar_url': discord_info.get('avatar_url', ''),
+        'total_credits': entry['credits'],
+        'games_played': entry['games_played'],
+        'most_played_game': entry['most_played_game'],
+        'most_played_hours': entry['most_played_hours'],
+        'total_hours': entry['total_hours']
+    }
+
+async def build_leaderboard_page(timeframe, limit=LEADERBOARD_PAGE_SIZE, cursor=None):
+    """One page of a timeframe's leaderboard and the next page's cursor; only the page's users are looked up"""
+    entries, next_cursor = await async_storage.get_leaderboard_page(LEADERBOARD_TYPES[timeframe], limit, cursor)
+    profiles = await get_user_profiles_async(entry['user_id'] for entry in entries)
+    return {
+        'entries': [leaderboard_entry_payload(entry, profiles) for entry in entries],
+        'next_cursor': next_cursor
+    }
+
+async def build_leaderboard_around(timeframe, user_id, radius):
+    """A user's leaderboard row with radius rows either side, or None if they aren't on the leaderboard"""
+    around = await async_storage.get_leaderboard_around(LEADERBOARD_TYPES[timeframe], user_id, radius)
+    if around is None:
+        return None
+    profiles = await get_user_profiles_async(entry['user_id'] for entry in around['entries'])
+    return {
+        'entries': [leaderboard_entry_payload(entry, profiles) for entry in around['entries']],
+        'user_rank': around['user_rank'],
+        'next_cursor': around['next_cursor']
+    }
+
+async def build_leaderboard(timeframe):
+    """Every leaderboard row of a timeframe, as served by /api/leaderboard without paging parameters"""
+    # Get the leaderboard data using the new timeframe calculation
+    leaderboard_data = await async_storage.get_leaderboard_by_timeframe(LEADERBOARD_TYPES[timeframe])
+    
+    # Format the data for the frontend
+    formatted_data = []
+    if leaderboard_data:
+        # Look up every user's Discord info in one query
+        profiles = await get_user_profiles_async(row[0] for row in leaderboard_data)
+        for user_id, credits, games_played, most_played_game, most_played_hours, total_hours in leaderboard_data:
+            try:
+                user_id_str = str(user_id)
+                discord_info = profiles.get(user_id_str)
+                if discord_info:
+                    user_data = {
+                        'user_id': user_id_str,
+                        'username': discord_info.get('username', 'Unknown'),
+                        'avatar_url': discord_info.get('avatar_url', ''),
+                        'total_credits': float(credits or 0),
+                        'games_played': int(games_played or 0),
+                        'most_played_game': most_played_game or 'Unknown',
+                        'most_played_hours': float(most_played_hours or 0),
+                        'total_hours': float(total_hours or 0)
+                    }
+                    formatted_data.append(user_data)
+            except Exception as e:
+                logger.error(f"Error formatting user data for user {user_id}: {str(e)}", exc_info=True)
+    return formatted_data
+
+# Add endpoint to fetch leaderboard data. With limit and/or cursor it returns one page
+# ({entries, next_cursor}); with around=<user_id> (and radius) the user's row and its neighbours
+# ({entries, user_rank, next_cursor}). Without either it returns the whole leaderboard as a list.
 @app.route('/api/leaderboard')
-def get_leaderboard():
+async def get_leaderboard():
     timeframe = request.args.get('timeframe', 'weekly')
     logger.info(f"Fetching leaderboard for timeframe: {timeframe}")
     try:
-        if timeframe == 'weekly':
-            leaderboard_type = LeaderboardType.WEEKLY
-        elif timeframe == 'monthly':
-            leaderboard_type = LeaderboardType.MONTHLY
-        elif timeframe == 'alltime':
-            leaderboard_type = LeaderboardType.ALLTIME
-        else:
+        if timeframe not in LEADERBOARD_TYPES:
             return jsonify({'error': 'Invalid timeframe specified'}), 400
-
-        # Get the leaderboard data using the new timeframe calculation
-        leaderboard_data = run_async(storage.get_leaderboard_by_timeframe(leaderboard_type))
-        
-        # Format the data for the frontend
-        formatted_data = []
-        if leaderboard_data:
-            for user_id, credits, games_played, most_played_game, most_played_hours, total_hours in leaderboard_data:
-                try:
-                    user_id_str = str(user_id)
-                    discord_info = get_cached_discord_user_info(user_id_str)
-                    if discord_info:
-                        user_data = {
-                            'user_id': user_id_str,
-                            'username': discord_info.get('username', 'Unknown'),
-                            'avatar_url': discord_info.get('avatar_url', ''),
-                            'total_credits': float(credits or 0),
-                            'games_played': int(games_played or 0),
-                            'most_played_game': most_played_game or 'Unknown',
-                            'most_played_hours': float(most_played_hours or 0),
-                            'total_hours': float(total_hours or 0)
-                        }
-                        formatted_data.append(user_data)
-                except Exception as e:
-                    logger.error(f"Error formatting user data for user {user_id}: {str(e)}", exc_info=True)
-
-        return jsonify(formatted_data)
+        paged = any(request.args.get(arg) for arg in ('limit', 'cursor', 'around'))
+        try:
+            limit = min(max(int(request.args.get('limit', LEADERBOARD_PAGE_SIZE)), 1), MAX_LEADERBOARD_PAGE_SIZE)
+            radius = min(max(int(request.args.get('radius', DEFAULT_LEADERBOARD_RADIUS)), 0), MAX_LEADERBOARD_RADIUS)
+            around = int(request.args['around']) if request.args.get('around') else None
+            cursor = request.args.get('cursor') or None
+            if cursor:
+                decode_leaderboard_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit, radius, around or cursor'}), 400
+
+        paging = (limit, cursor, around, radius) if paged else ()
+        etag = revision_etag(await async_storage.get_data_revisions(LEADERBOARD_TABLES), 'leaderboard', timeframe_window(timeframe), *paging)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        if around is not None:
+            formatted_data = await build_leaderboard_around(timeframe, around, radius)
+            if formatted_data is None:
+                return jsonify({'error': 'User is not on this leaderboard'}), 404
+        elif paged:
+            formatted_data = await build_leaderboard_page(timeframe, limit, cursor)
+        else:
+            formatted_data = await build_leaderboard(timeframe)
+        return revalidated(jsonify(formatted_data), etag if formatted_data else None)
 
     except Exception as e:
         logger.error(f"Error getting leaderboard data: {str(e)}", exc_info=True)
         return jsonify({'error': 'Failed to get leaderboard data'}), 500
 
 # Add endpoint to fetch recent bonuses
+async def build_recent_bonuses(limit=10):
+    """Most recent bonuses with their users' profiles, as served by /api/recent-bonuses"""
+    recent_bonuses_data = await async_storage.get_recent_bonuses(limit=limit)
+
+    profiles = await get_user_profiles_async(bonus_data['user_id'] for bonus_data in recent_bonuses_data)
+
+    formatted_bonuses = []
+    for bonus_data in recent_bonuses_data:
+        # Ensure user_id is a string
+        user_id = str(bonus_data['user_id'])
+        discord_info = profiles.get(user_id)
+        username = discord_info['username'] if discord_info else f'User{user_id}'
+        avatar_url = discord_info['avatar_url'] if discord_info else f'https://randomuser.me/api/portraits/men/{user_id}.jpg'
+
+        timestamp = bonus_data['timestamp']
+        timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M:%S') if isinstance(timestamp, datetime) else str(timestamp)
+
+        formatted_bonuses.append({
+            'id': bonus_data['id'],
+            'user_id': user_id,  # Use string version
+            'username': username,
+            'avatar_url': avatar_url,
+            'credits': bonus_data['credits'],
+            'reason': bonus_data['reason'],
+            'granted_by': str(bonus_data['granted_by']),  # Convert granted_by to string
+            'timestamp': timestamp_str
+        })
+
+    return formatted_bonuses
+
 @app.route('/api/recent-bonuses')
-def get_recent_bonuses():
+async def get_recent_bonuses():
     try:
-        recent_bonuses_data = run_async(storage.get_recent_bonuses(limit=10))
-
-        formatted_bonuses = []
-        for bonus_data in recent_bonuses_data:
-            # Ensure user_id is a string
-            user_id = str(bonus_data['user_id'])
-            discord_info = get_cached_discord_user_info(user_id)
-            username = discord_info['username'] if discord_info else f'User{user_id}'
-            avatar_url = discord_info['avatar_url'] if discord_info else f'https://randomuser.me/api/portraits/men/{user_id}.jpg'
-
-            timestamp = bonus_data['timestamp']
-            timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M:%S') if isinstance(timestamp, datetime) else str(timestamp)
-
-            formatted_bonuses.append({
-                'id': bonus_data['id'],
-                'user_id': user_id,  # Use string version
-                'username': username,
-                'avatar_url': avatar_url,
-                'credits': bonus_data['credits'],
-                'reason': bonus_data['reason'],
-                'granted_by': str(bonus_data['granted_by']),  # Convert granted_by to string
-                'timestamp': timestamp_str
-            })
-
-        return jsonify(formatted_bonuses)
+        return jsonify(await build_recent_bonuses())
     except Exception as e:
         return jsonify({'error': 'Failed to get recent bonuses'}), 500
 
+async def build_current_champions():
+    """Top 3 of the most recent finished weekly and monthly periods, as served by /api/current-champions"""
+    def load_champion_placements():
+        """Top 3 placements of the most recent inactive weekly and monthly periods"""
+        placements = {}
+        with storage.Session() as session:
+            for key, leaderboard_type in (('weekly', LeaderboardType.WEEKLY), ('monthly', LeaderboardType.MONTHLY)):
+                # Get the most recent inactive period of this type
+                period = session.query(LeaderboardPeriod).filter(
+                    LeaderboardPeriod.leaderboard_type == leaderboard_type,
+                    LeaderboardPeriod.is_active == False
+                ).order_by(LeaderboardPeriod.end_time.desc()).first()
+                if not period:
+                    continue
+
+                # Get 1st, 2nd, 3rd place for the period
+                history = session.query(LeaderboardHistory).filter(
+                    LeaderboardHistory.period_id == period.id,
+                    LeaderboardHistory.placement.in_([1, 2, 3])
+                ).order_by(LeaderboardHistory.placement.asc()).all()
+
+                placements[key] = [{
+                    'user_id': str(entry.user_id),
+                    'placement': entry.placement,
+                    'credits': float(entry.credits or 0),
+                    'period_start': period.start_time.isoformat(),
+                    'period_end': period.end_time.isoformat()
+                } for entry in history]
+        return placements
+
+    placements = await async_storage.run(load_champion_placements)
+
+    # Look up Discord info for all unique users
+    all_user_ids = {entry['user_id'] for entries in placements.values() for entry in entries}
+    discord_info_map = await get_user_profiles_async(all_user_ids)
+
+    champions = {
+        'weekly': [],
+        'monthly': []
+    }
+    for key, entries in placements.items():
+        for entry in entries:
+            user_id_str = entry['user_id']
+            discord_info = discord_info_map.get(user_id_str)
+            champions[key].append({
+                'user_id': user_id_str,
+                'username': discord_info.get('username', f'User{user_id_str}') if discord_info else f'User{user_id_str}',
+                'avatar_url': discord_info.get('avatar_url', '') if discord_info else f'https://randomuser.me/api/portraits/men/{user_id_str}.jpg',
+                'placement': entry['placement'],
+                'credits': entry['credits'],
+                'period_start': entry['period_start'],
+                'period_end': entry['period_end']
+            })
+    return champions
+
 # Add endpoint to fetch current champions (1st, 2nd, 3rd place from most recent inactive periods)
 @app.route('/api/current-champions')
-def get_current_champions():
+async def get_current_champions():
     try:
         # Check cache first (5 minute cache)
         current_time = time.time()
         if (cache['current_champions']['data'] is not None and 
             current_time - cache['current_champions']['timestamp'] < 300):  # 5 minutes
             return jsonify(cache['current_champions']['data'])
-        
-        with storage.Session() as session:
-            # Get the most recent inactive weekly period
-            weekly_period = session.query(LeaderboardPeriod).filter(
-                LeaderboardPeriod.leaderboard_type == LeaderboardType.WEEKLY,
-                LeaderboardPeriod.is_active == False
-            ).order_by(LeaderboardPeriod.end_time.desc()).first()
-            
-            # Get the most recent inactive monthly period
-            monthly_period = session.query(LeaderboardPeriod).filter(
-                LeaderboardPeriod.leaderboard_type == LeaderboardType.MONTHLY,
-                LeaderboardPeriod.is_active == False
-            ).order_by(LeaderboardPeriod.end_time.desc()).first()
-            
-            champions = {
-                'weekly': [],
-                'monthly': []
-            }
-            
-            # Collect all unique user IDs to batch Discord API calls
-            all_user_ids = set()
-            
-            # Get 1st, 2nd, 3rd place for weekly if period exists
-            if weekly_period:
-                weekly_history = session.query(LeaderboardHistory).filter(
-                    LeaderboardHistory.period_id == weekly_period.id,
-                    LeaderboardHistory.placement.in_([1, 2, 3])
-                ).order_by(LeaderboardHistory.placement.asc()).all()
-                
-                for entry in weekly_history:
-                    all_user_ids.add(str(entry.user_id))
-            
-            # Get 1st, 2nd, 3rd place for monthly if period exists
-            if monthly_period:
-                monthly_history = session.query(LeaderboardHistory).filter(
-                    LeaderboardHistory.period_id == monthly_period.id,
-                    LeaderboardHistory.placement.in_([1, 2, 3])
-                ).order_by(LeaderboardHistory.placement.asc()).all()
-                
-                for entry in monthly_history:
-                    all_user_ids.add(str(entry.user_id))
-            
-            # Batch fetch Discord user info for all unique users
-            if all_user_ids:
-                discord_info_map = run_async(get_batch_discord_user_info(list(all_user_ids)))
-            else:
-                discord_info_map = {}
-            
-            # Process weekly champions (1st, 2nd, 3rd place)
-            if weekly_period:
-                weekly_history = session.query(LeaderboardHistory).filter(
-                    LeaderboardHistory.period_id == weekly_period.id,
-                    LeaderboardHistory.placement.in_([1, 2, 3])
-                ).order_by(LeaderboardHistory.placement.asc()).all()
-                
-                for entry in weekly_history:
-                    user_id_str = str(entry.user_id)
-                    discord_info = discord_info_map.get(user_id_str)
-                    champions['weekly'].append({
-                        'user_id': user_id_str,
-                        'username': discord_info.get('username', f'User{user_id_str}') if discord_info else f'User{user_id_str}',
-                        'avatar_url': discord_info.get('avatar_url', '') if discord_info else f'https://randomuser.me/api/portraits/men/{user_id_str}.jpg',
-                        'placement': entry.placement,
-                        'credits': float(entry.credits or 0),
-                        'period_start': weekly_period.start_time.isoformat(),
-                        'period_end': weekly_period.end_time.isoformat()
-                    })
-            
-            # Process monthly champions (1st, 2nd, 3rd place)
-            if monthly_period:
-                monthly_history = session.query(LeaderboardHistory).filter(
-                    LeaderboardHistory.period_id == monthly_period.id,
-                    LeaderboardHistory.placement.in_([1, 2, 3])
-                ).order_by(LeaderboardHistory.placement.asc()).all()
-                
-                for entry in monthly_history:
-                    user_id_str = str(entry.user_id)
-                    discord_info = discord_info_map.get(user_id_str)
-                    champions['monthly'].append({
-                        'user_id': user_id_str,
-                        'username': discord_info.get('username', f'User{user_id_str}') if discord_info else f'User{user_id_str}',
-                        'avatar_url': discord_info.get('avatar_url', '') if discord_info else f'https://randomuser.me/api/portraits/men/{user_id_str}.jpg',
-                        'placement': entry.placement,
-                        'credits': float(entry.credits or 0),
-                        'period_start': monthly_period.start_time.isoformat(),
-                        'period_end': monthly_period.end_time.isoformat()
-                    })
-            
-            # Cache the result
-            cache['current_champions']['data'] = champions
-            cache['current_champions']['timestamp'] = current_time
-            
-            return jsonify(champions)
+
+        champions = await build_current_champions()
+
+        # Cache the result
+        cache['current_champions']['data'] = champions
+        cache['current_champions']['timestamp'] = current_time
+
+        return jsonify(champions)
     except Exception as e:
         logger.error(f"Error getting current champions: {str(e)}", exc_info=True)
         return jsonify({'error': 'Failed to get current champions'}), 500
 
+async def build_popular_games(timeframe):
+    """Games by hours played in a timeframe, as served by /api/popular-games"""
+    # Use the new function to get aggregated game hours and box art URL
+    # The storage function now returns (game_name, total_hours, box_art_url)
+    game_data_from_storage = await async_storage.get_total_game_hours_by_timeframe(timeframe)
+
+    # Format the data for the frontend
+    formatted_data = []
+    for game_name, total_hours, box_art_url in game_data_from_storage:
+        if game_name and total_hours:
+            formatted_data.append({
+                'name': game_name,
+                'total_hours': total_hours,
+                'box_art_url': box_art_url if box_art_url else f"https://static-cdn.jtvnw.net/ttv-boxart/{game_name}-144x192.jpg"
+            })
+
+    # Sort by hours played and return all data (no limit)
+    formatted_data.sort(key=lambda x: x['total_hours'], reverse=True)
+    return formatted_data
+
 # Add endpoint to fetch popular games data
 @app.route('/api/popular-games')
-def get_popular_games():
+async def get_popular_games():
     timeframe = request.args.get('timeframe', 'weekly')
     try:
-        # Use the new function to get aggregated game hours and box art URL
-        # The storage function now returns (game_name, total_hours, box_art_url)
-        game_data_from_storage = run_async(storage.get_total_game_hours_by_timeframe(timeframe))
-
-        # Format the data for the frontend
-        formatted_data = []
-        for game_name, total_hours, box_art_url in game_data_from_storage:
-            if game_name and total_hours:
-                formatted_data.append({
-                    'name': game_name,
-                    'total_hours': total_hours,
-                    'box_art_url': box_art_url if box_art_url else f"https://static-cdn.jtvnw.net/ttv-boxart/{game_name}-144x192.jpg"
-                })
-
-        # Sort by hours played and return all data (no limit)
-        formatted_data.sort(key=lambda x: x['total_hours'], reverse=True)
-
-        return jsonify(formatted_data)
+        etag = None
+        if timeframe in LEADERBOARD_TYPES:
+            etag = revision_etag(await async_storage.get_data_revisions(GAME_STATS_TABLES), 'popular-games', timeframe_window(timeframe))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        formatted_data = await build_popular_games(timeframe)
+        return revalidated(jsonify(formatted_data), etag if formatted_data else None)
     except Exception as e:
         print(f"Error getting popular games data: {str(e)}")
         print("Full traceback:")
@@ -764,7 +772,7 @@ def get_popular_games():
 
 # Add endpoint to fetch user overall stats
 @app.route('/api/user-stats/<user_identifier>')
-def get_user_stats_endpoint(user_identifier):
+async def get_user_stats_endpoint(user_identifier):
     try:
         # Get timeframe from query parameters, default to 'alltime'
         timeframe = request.args.get('timeframe', 'alltime')
@@ -772,27 +780,19 @@ def get_user_stats_endpoint(user_identifier):
         # Keep as string to preserve precision
         user_id_str = str(user_identifier)
         
-        # Get overall stats from storage (this always gets all-time total_credits and rank)
-        user_overall_stats = storage.get_user_overall_stats(user_id_str)
+        # Overall stats (all-time total_credits and rank), the top 3 games for the
+        # timeframe and the stored Discord profile are independent, so fetch them together
+        user_overall_stats, most_played_games_data, profiles = await asyncio.gather(
+            async_storage.get_user_overall_stats(user_id_str),
+            async_storage.get_user_most_played_game_by_timeframe(user_id_str, timeframe, limit=3),
+            get_user_profiles_async([user_id_str])
+        )
+        discord_info = profiles[user_id_str]
 
         if not user_overall_stats:
             # Even if no stats, we might still have Discord info
             user_overall_stats = {'total_credits': 0, 'rank': None}
 
-        # Get most played game for the specified timeframe (fetch top 3)
-        most_played_games_data = run_async(storage.get_user_most_played_game_by_timeframe(user_id_str, timeframe, limit=3))
-
-        # Fetch Discord user info using the cached function
-        discord_info = get_cached_discord_user_info(user_id_str)  # Use string version
-
-        # --- Update username in DB if missing or outdated ---
-        if discord_info and discord_info.get('username'):
-            storage.update_user_username_and_avatar(
-                user_id_str,
-                discord_info['username'],
-                discord_info.get('avatar_url')
-            )
-
         # Combine stats with Discord info and most played game data
         formatted_stats = {
             'user_id': user_id_str,  # Use string version
@@ -834,6 +834,11 @@ def get_user_history_endpoint(user_identifier):
         game_info_map = storage.get_multiple_game_stats(game_names)
         end_batch = time.time()
 
+        # Get Discord info for the user
+        discord_info = get_user_profiles([user_id_str])[user_id_str]
+        username = discord_info['username']
+        avatar_url = discord_info['avatar_url']
+
         # Format the history data
         formatted_history = []
         start_loop = time.time()
@@ -843,11 +848,6 @@ def get_user_history_endpoint(user_identifier):
                 game_info = game_info_map.get(game_name, {})
                 box_art_url = game_info.get('box_art_url')
                 
-                # Get Discord info for the user
-                discord_info = get_cached_discord_user_info(user_id_str)
-                username = discord_info['username'] if discord_info else f'User{user_id_str}'
-                avatar_url = discord_info['avatar_url'] if discord_info else f'https://randomuser.me/api/portraits/men/{user_id_str}.jpg'
-                
                 formatted_entry = {
                     'game_name': game_name or 'Unknown Game',
                     'hours': float(entry.get('hours', 0.0)),
@@ -892,14 +892,14 @@ def get_user_leaderboard_history(user_identifier):
         # Get leaderboard history from storage, optionally filtered by type
         leaderboard_history = storage.get_user_placement_history(user_id_str, leaderboard_type=leaderboard_type)
 
+        # Get Discord info for the user
+        discord_info = get_user_profiles([user_id_str])[user_id_str]
+        username = discord_info['username']
+        avatar_url = discord_info['avatar_url']
+
         # Format the history data with Discord info
         formatted_history = []
         for entry in leaderboard_history:
-            # Get Discord info for the user
-            discord_info = get_cached_discord_user_info(user_id_str)
-            username = discord_info.get('username', f'User{user_id_str}')
-            avatar_url = discord_info.get('avatar_url', f'https://randomuser.me/api/portraits/men/{user_id_str}.jpg')
-
             # Format the dates properly
             start_date = entry.get('start_time')
             end_date = entry.get('end_time')
@@ -921,35 +921,123 @@ def get_user_leaderboard_history(user_identifier):
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), 500
 
+# Add endpoint to page through a user's credit ledger (every credit change with its running balance)
+MAX_CREDIT_HISTORY_PAGE_SIZE = 100
+
+@app.route('/api/user-stats/<user_identifier>/credit-history')
+def get_user_credit_history(user_identifier):
+    try:
+        user_id = int(user_identifier)
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_CREDIT_HISTORY_PAGE_SIZE)
+        before = request.args.get('before')
+        before_id = int(before) if before else None
+    except ValueError:
+        return jsonify({'error': 'Invalid user id, limit or cursor'}), 400
+    try:
+        entries = storage.get_credit_history(user_id, limit=limit, before_id=before_id)
+        return jsonify({
+            'entries': [{**entry, 'created_at': entry['created_at'].isoformat()} for entry in entries],
+            'next_cursor': str(entries[-1]['id']) if len(entries) == limit else None
+        })
+    except Exception as e:
+        print(f"Error getting credit history: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': 'Internal server error'}), 500
+
 # Add endpoint to fetch recent gaming sessions
+async def build_recent_activity(timeframe='alltime'):
+    """Most recent gaming sessions with their users' profiles, as served by /api/recent-activity"""
+    # Fetch recent sessions using the new timeframe logic
+    recent_sessions_data = await async_storage.get_recent_gaming_sessions(timeframe=timeframe)
+    if not recent_sessions_data:
+        return []
+    profiles = await get_user_profiles_async(session['user_id'] for session in recent_sessions_data)
+    formatted_sessions = []
+    for session in recent_sessions_data:
+        user_id_str = str(session['user_id'])
+        discord_info = profiles.get(user_id_str)
+        if discord_info:
+            formatted_sessions.append({
+                'id': session['id'],
+                'user_id': user_id_str,
+                'username': discord_info.get('username', 'Unknown'),
+                'avatar_url': discord_info.get('avatar_url', ''),
+                'game_name': session['game_name'],
+                'hours': session['hours'],
+                'players': session.get('players', 1),
+                'timestamp': session['timestamp'].isoformat() if hasattr(session['timestamp'], 'isoformat') else str(session['timestamp']),
+                'box_art_url': session['box_art_url']
+            })
+    return formatted_sessions
+
 @app.route('/api/recent-activity')
-def recent_activity():
+async def recent_activity():
     try:
         timeframe = request.args.get('timeframe', 'alltime')
-        # Fetch recent sessions using the new timeframe logic
-        recent_sessions_data = run_async(storage.get_recent_gaming_sessions(timeframe=timeframe))
-        if not recent_sessions_data:
-            return jsonify([])
-        formatted_sessions = []
-        for session in recent_sessions_data:
-            user_id_str = str(session['user_id'])
-            discord_info = get_cached_discord_user_info(user_id_str)
-            if discord_info:
-                formatted_sessions.append({
-                    'id': session['id'],
-                    'user_id': user_id_str,
-                    'username': discord_info.get('username', 'Unknown'),
-                    'avatar_url': discord_info.get('avatar_url', ''),
-                    'game_name': session['game_name'],
-                    'hours': session['hours'],
-                    'players': session.get('players', 1),
-                    'timestamp': session['timestamp'].isoformat() if hasattr(session['timestamp'], 'isoformat') else str(session['timestamp']),
-                    'box_art_url': session['box_art_url']
-                })
-        return jsonify(formatted_sessions)
+        return jsonify(await build_recent_activity(timeframe))
     except Exception as e:
         return jsonify({'error': 'Failed to get recent activity'}), 500
 
+# Tables the home page snapshot is computed from (tracked by add_data_revisions.py)
+HOME_TABLES = LEADERBOARD_TABLES + ('bonuses', 'leaderboard_history', 'leaderboard_periods')
+# A snapshot is rebuilt when a tracked table changes, and in any case once it is this old
+HOME_SNAPSHOT_MAX_AGE = 60
+home_snapshot_lock = asyncio.Lock()
+
+async def build_home_snapshot():
+    """Every public section of the home page, built concurrently from the same helpers as the single-section APIs"""
+    timeframes = list(LEADERBOARD_TYPES)
+    champions, recent_activity, recent_bonuses, *lists = await asyncio.gather(
+        build_current_champions(),
+        build_recent_activity(),
+        build_recent_bonuses(),
+        *(build_leaderboard_page(timeframe) for timeframe in timeframes),
+        *(build_popular_games(timeframe) for timeframe in timeframes)
+    )
+    return {
+        'current_champions': champions,
+        # The first page of each leaderboard; the page shows more from /api/leaderboard with the cursor
+        'leaderboard': {timeframe: page['entries'] for timeframe, page in zip(timeframes, lists)},
+        'leaderboard_next_cursor': {timeframe: page['next_cursor'] for timeframe, page in zip(timeframes, lists)},
+        'popular_games': dict(zip(timeframes, lists[len(timeframes):])),
+        'recent_activity': recent_activity,
+        'recent_bonuses': recent_bonuses
+    }
+
+def home_snapshot_is_current(version):
+    snapshot = cache['home']
+    if snapshot['data'] is None or time.time() - snapshot['timestamp'] >= HOME_SNAPSHOT_MAX_AGE:
+        return False
+    return version is None or snapshot['version'] == version
+
+@app.route('/api/home')
+async def get_home():
+    """The home page's leaderboards, popular games, champions, activity and bonuses in one response,
+    served from a snapshot kept in memory (see HOME_SNAPSHOT_MAX_AGE)"""
+    try:
+        version = revision_etag(await async_storage.get_data_revisions(HOME_TABLES), 'home',
+                                timeframe_window('weekly'), timeframe_window('monthly'))
+        if not home_snapshot_is_current(version):
+            # One rebuild at a time; requests that waited for it use its result
+            async with home_snapshot_lock:
+                if not home_snapshot_is_current(version):
+                    body = app.json.dumps(await build_home_snapshot()).encode()
+                    cache['home'] = {
+                        'data': body,
+                        'timestamp': time.time(),
+                        'version': version,
+                        'etag': hashlib.sha256(body).hexdigest()[:32]
+                    }
+
+        snapshot = cache['home']
+        cached = not_modified(snapshot['etag'])
+        if cached:
+            return cached
+        return revalidated(app.response_class(snapshot['data'], mimetype='application/json'), snapshot['etag'])
+    except Exception as e:
+        logger.error(f"Error getting home snapshot: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Failed to get home page data'}), 500
+
 @app.route('/api/search')
 def search_api():
     query = request.args.get('query', '').strip()
@@ -966,33 +1054,14 @@ def search_api():
 @app.route('/api/all-games')
 def get_all_games():
     try:
-        # Test database connection
-        with storage.Session() as session:
-            try:
-                result = session.execute(text("SELECT 1")).scalar()
-                
-                # Check if tables exist
-                tables = session.execute(text("""
-                    SELECT table_name 
-                    FROM information_schema.tables 
-                    WHERE table_schema = 'public'
-                """)).fetchall()
-                
-                # Check games table specifically
-                games_count = session.execute(text("SELECT COUNT(*) FROM games")).scalar()
-            except Exception as e:
-                print(f"ERROR: Database query failed: {str(e)}")
-                print("Full traceback:")
-                traceback.print_exc()
-                raise
-        
+        # Unchanged since the client's copy: answer without running the aggregation
+        etag = revision_etag(storage.get_data_revisions(GAME_STATS_TABLES), 'all-games')
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         games_data = storage.get_all_games_with_stats()
-        response = jsonify(games_data)
-        # Prevent caching
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-        return response
+        return revalidated(jsonify(games_data), etag if games_data else None)
     except Exception as e:
         return jsonify({'error': 'Failed to get all games'}), 500
 
@@ -1357,7 +1426,7 @@ def rate_game():
         
         try:
             # Use the storage method to set the game rate
-            success = run_async(storage.set_game_credits_per_hour(game_name, rating, user_id))
+            success = run_async(async_storage.set_game_credits_per_hour(game_name, rating, user_id))
             if success:
                 return jsonify({'message': f'Successfully set rate for {game_name} to {rating} credits/hour'}), 200
             else:
@@ -1502,12 +1571,12 @@ def set_game_rate():
         
         try:
             # Set CPH
-            cph_success = run_async(storage.set_game_credits_per_hour(game_name, cph, user_id))
+            cph_success = run_async(async_storage.set_game_credits_per_hour(game_name, cph, user_id))
             if not cph_success:
                 return jsonify({'error': f'Failed to set CPH for {game_name}'}), 500
 
             # Set half-life
-            half_life_success = run_async(storage.set_game_half_life(game_name, half_life, user_id))
+            half_life_success = run_async(async_storage.set_game_half_life(game_name, half_life, user_id))
             if not half_life_success:
                 return jsonify({'error': f'Failed to set half-life for {game_name}'}), 500
 
@@ -1535,10 +1604,11 @@ def get_recent_rate_changes():
         changes = storage.get_recent_rate_changes(limit=10)
         
         # Fetch Discord usernames for each change
+        profiles = get_user_profiles(change.get('user_id') for change in changes if change.get('user_id'))
         for change in changes:
             user_id = change.get('user_id')
             if user_id:
-                discord_info = get_cached_discord_user_info(user_id)
+                discord_info = profiles.get(str(user_id))
                 if discord_info:
                     change['user_name'] = discord_info.get('username', f'User{user_id}')
                 else:
@@ -1580,49 +1650,24 @@ def submit_game_review():
 
 @app.route('/api/game/reviews')
 def get_game_reviews():
+    """A page of a game's reviews, newest first: {'reviews', 'next_cursor'}.
+    Pass next_cursor back as ?cursor= for the following page; it is null on the last page."""
     game_name = request.args.get('name')
     if not game_name:
         return jsonify({'error': 'Game name parameter missing'}), 400
-    with storage.Session() as session:
-        game = session.query(Game).filter_by(name=game_name).first()
-        if not game:
-            return jsonify({'error': 'Game not found'}), 404
-        reviews = session.query(GameReview).filter_by(game_id=game.id).order_by(GameReview.timestamp.desc()).all()
-        result = []
-        for r in reviews:
-            user = session.query(UserStats).filter_by(user_id=r.user_id).first()
-            
-            # Get user's rating for this game
-            user_rating = session.query(GameRating).filter_by(user_id=r.user_id, game_id=game.id).first()
-            rating = user_rating.rating if user_rating else None
-            
-            # Get user's total hours for this game
-            total_hours_result = session.execute(text("""
-                SELECT COALESCE(SUM(hours), 0) as total_hours
-                FROM gaming_sessions
-                WHERE user_id = :user_id AND game_id = :game_id
-            """), {"user_id": r.user_id, "game_id": game.id}).first()
-            total_hours = float(total_hours_result.total_hours) if total_hours_result else 0.0
-            
-            # Get user's hours at the time of review (sum of sessions before review timestamp)
-            hours_at_review_result = session.execute(text("""
-                SELECT COALESCE(SUM(hours), 0) as hours_at_review
-                FROM gaming_sessions
-                WHERE user_id = :user_id AND game_id = :game_id AND timestamp <= :review_timestamp
-            """), {"user_id": r.user_id, "game_id": game.id, "review_timestamp": r.timestamp}).first()
-            hours_at_review = float(hours_at_review_result.hours_at_review) if hours_at_review_result else 0.0
-            
-            result.append({
-                'user_id': r.user_id,
-                'username': user.username if user else f'User{r.user_id}',
-                'avatar_url': user.avatar_url if user else '',
-                'review_text': r.review_text,
-                'timestamp': r.timestamp.isoformat(),
-                'rating': rating,
-                'hours_at_review': hours_at_review,
-                'total_hours': total_hours
-            })
-        return jsonify(result)
+    try:
+        limit = min(max(int(request.args.get('limit', REVIEWS_PAGE_SIZE)), 1), MAX_REVIEWS_PAGE_SIZE)
+        page = storage.get_game_reviews(game_name, limit=limit, cursor=request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    if page is None:
+        return jsonify({'error': 'Game not found'}), 404
+    reviews, next_cursor = page
+    profiles = get_user_profiles(r['user_id'] for r in reviews)
+    return jsonify({
+        'reviews': [review_payload(r, profiles) for r in reviews],
+        'next_cursor': next_cursor
+    })
 
 @app.route('/api/game/review', methods=['DELETE'])
 def delete_game_review():
@@ -1789,19 +1834,17 @@ def complete_game():
             }), 400
         
         # Mark as completed
+        storage.ensure_user_stats(session, int(user_id))
         completion = GameCompletion(user_id=user_id, game_id=game.id, completed_at=datetime.utcnow(), credits_awarded=1000.0)
         session.add(completion)
-        
-        # Award credits - ensure user exists first
-        user = session.query(UserStats).filter_by(user_id=user_id).first()
-        if not user:
-            user = UserStats(user_id=user_id, total_credits=0.0)
-            session.add(user)
-            print(f"Created new UserStats for user {user_id}")  # Debug logging
-        
-        old_credits = user.total_credits or 0
-        user.total_credits = old_credits + 1000.0
-        print(f"Updating credits for user {user_id}: {old_credits} -> {user.total_credits}")  # Debug logging
+        session.flush()
+
+        # Award credits
+        new_credits = storage.record_credits(session, int(user_id), 1000.0, 'completion', completion.id)
+        print(f"Updating credits for user {user_id}: {new_credits - 1000.0} -> {new_credits}")  # Debug logging
+
+        # Completion credits count towards the all-time leaderboard
+        storage.update_rollups_for_credits(session, int(user_id), 1000.0)
         
         try:
             session.commit()
@@ -1832,9 +1875,10 @@ def uncomplete_game():
             return jsonify({'error': 'Game not marked as completed'}), 400
         # Remove completion and deduct credits
         session.delete(completion)
-        user = session.query(UserStats).filter_by(user_id=user_id).first()
-        if user and completion.credits_awarded:
-            user.total_credits = max((user.total_credits or 0) - completion.credits_awarded, 0)
+        if completion.credits_awarded:
+            # The balance stays the sum of the user's sessions, bonuses and completions
+            storage.record_credits(session, int(user_id), -completion.credits_awarded, 'completion_removed', completion.id)
+            storage.update_rollups_for_credits(session, int(user_id), -completion.credits_awarded)
         session.commit()
         # Get new completion count
         completions = session.query(GameCompletion).filter_by(game_id=game.id).all()
@@ -1858,6 +1902,33 @@ def get_game_completions():
             'user_completed': user_completed
         })
 
+COMPLETION_HOURS_REQUIRED = 3.0
+
+def completion_requirements_payload(completed, total_hours, rating_value):
+    """What a user still needs to mark a game completed (only hours matter; the rating is informational)"""
+    if completed:
+        return {
+            'already_completed': True,
+            'message': 'You have already completed this game'
+        }
+    hours_met = total_hours >= COMPLETION_HOURS_REQUIRED
+    return {
+        'already_completed': False,
+        'hours_required': COMPLETION_HOURS_REQUIRED,
+        'current_hours': total_hours,
+        'hours_met': hours_met,
+        'has_rating': rating_value is not None,
+        'rating_value': rating_value,
+        'can_complete': hours_met,
+        'requirements': {
+            'hours': {
+                'required': COMPLETION_HOURS_REQUIRED,
+                'current': total_hours,
+                'met': hours_met
+            }
+        }
+    }
+
 @app.route('/api/game/completion-requirements')
 def get_completion_requirements():
     """Get completion requirements for a game (hours only)"""
@@ -1876,11 +1947,8 @@ def get_completion_requirements():
         # Check if already completed
         existing = session.query(GameCompletion).filter_by(user_id=user_id, game_id=game.id).first()
         if existing:
-            return jsonify({
-                'already_completed': True,
-                'message': 'You have already completed this game'
-            })
-        
+            return jsonify(completion_requirements_payload(True, 0.0, None))
+
         # Get user's total hours for this game
         total_hours_result = session.execute(text("""
             SELECT COALESCE(SUM(hours), 0) as total_hours
@@ -1888,36 +1956,88 @@ def get_completion_requirements():
             WHERE user_id = :user_id AND game_id = :game_id
         """), {"user_id": user_id, "game_id": game.id}).first()
         total_hours = float(total_hours_result.total_hours) if total_hours_result else 0.0
-        
+
         # Check if user has rated this game (for display purposes only)
         user_rating = session.query(GameRating).filter_by(user_id=user_id, game_id=game.id).first()
-        has_rating = user_rating is not None
-        rating_value = user_rating.rating if user_rating else None
-        
-        # Check requirements - only hours matter for completion
-        hours_met = total_hours >= 3.0
-        can_complete = hours_met
-        
-        return jsonify({
-            'already_completed': False,
-            'hours_required': 3.0,
-            'current_hours': total_hours,
-            'hours_met': hours_met,
-            'has_rating': has_rating,
-            'rating_value': rating_value,
-            'can_complete': can_complete,
-            'requirements': {
-                'hours': {
-                    'required': 3.0,
-                    'current': total_hours,
-                    'met': hours_met
-                }
-            }
-        })
+
+        return jsonify(completion_requirements_payload(False, total_hours, user_rating.rating if user_rating else None))
 
 # --- GAME SCREENSHOTS ---
 import uuid
 import base64
+
+MAX_SCREENSHOT_BYTES = 100 * 1024 * 1024
+# Base64 is 4/3 the size of the data, plus the other JSON fields
+MAX_SCREENSHOT_JSON_BYTES = MAX_SCREENSHOT_BYTES * 4 // 3 + 64 * 1024
+# Multipart boundaries, part headers and form fields on top of the file itself
+MAX_FORM_OVERHEAD_BYTES = 1024 * 1024
+SCREENSHOT_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+# Base64 characters decoded at a time; a multiple of 4
+BASE64_DECODE_CHUNK = 4 * 1024 * 1024
+
+def screenshot_file_limit(field_name, filename, content_type):
+    """receive_multipart file_limit for screenshot uploads"""
+    if field_name != 'screenshot':
+        raise UploadRejected(f'Unexpected file field {field_name}')
+    if filename.lower().split('.')[-1] not in SCREENSHOT_EXTENSIONS:
+        raise UploadRejected('Invalid file type. Please upload PNG, JPG, JPEG, GIF, or WebP')
+    return MAX_SCREENSHOT_BYTES
+
+def store_base64_blob(encoded, mime_type, max_bytes):
+    """Decode base64 text into the blob store a slice at a time, so the decoded data is never whole in memory"""
+    with blob_store.writer(max_bytes) as writer:
+        for start in range(0, len(encoded), BASE64_DECODE_CHUNK):
+            writer.write(base64.b64decode(encoded[start:start + BASE64_DECODE_CHUNK]))
+        return writer.commit(mime_type)
+
+def send_immutable_file(path, mime_type, etag):
+    """Stream a file that never changes, with Range and If-None-Match support, cached forever"""
+    response = send_file(
+        path,
+        mimetype=mime_type or 'application/octet-stream',
+        conditional=True,
+        etag=etag,
+        max_age=31536000
+    )
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+def send_blob(blob_key, mime_type):
+    """Serve a blob_store file; blobs never change, so the key is the ETag"""
+    public_url = blob_store.public_url(blob_key, mime_type)
+    if public_url:
+        return redirect(public_url)
+    if not blob_store.exists(blob_key):
+        return jsonify({'error': 'File not found'}), 404
+    return send_immutable_file(blob_store.path(blob_key), mime_type, blob_key)
+
+def send_image_variant(blob_key, width, fmt='webp'):
+    """Serve a resized copy of a blob_store image, rendering it first if needed (see image_variants.py)"""
+    public_url = image_variants.public_url(blob_key, width, fmt)
+    if public_url:
+        return redirect(public_url)
+    path = image_variants.get_variant(blob_key, width, fmt)
+    if not path:
+        return jsonify({'error': 'File not found'}), 404
+    return send_immutable_file(path, VARIANT_FORMATS[fmt], f'{blob_key}-{width}.{fmt}')
+
+def schedule_image_variants(blob_key, mime_type):
+    """Start rendering an uploaded image's variants so the first page view doesn't wait for them"""
+    if not mime_type or not mime_type.startswith('image/'):
+        return
+    try:
+        image_variants.schedule(blob_key)
+    except Exception as e:
+        # Variants are also rendered on first request, so an upload never fails over them
+        print(f"Could not schedule image variants for {blob_key}: {e}")
+
+@app.route('/api/media/<blob_key>/<int:width>.<fmt>')
+def serve_image_variant(blob_key, width, fmt):
+    """Resized WebP/JPEG copy of an uploaded image, as listed in srcset by the listing APIs"""
+    if not is_variant(blob_key, width, fmt):
+        return jsonify({'error': 'File not found'}), 404
+    return send_image_variant(blob_key, width, fmt)
+
 @app.route('/api/game/screenshot', methods=['POST'])
 def upload_game_screenshot():
     access_token = request.cookies.get('discord_token')
@@ -1926,33 +2046,29 @@ def upload_game_screenshot():
         return jsonify({'error': 'Not logged in'}), 401
     
     # Check if it's a file upload or base64 data
-    if 'screenshot' in request.files:
-        # Handle file upload (for backward compatibility)
-        file = request.files['screenshot']
-        if file.filename == '':
+    if request.mimetype == 'multipart/form-data':
+        # Streamed into the blob store as it arrives (see streaming_upload.py)
+        try:
+            form, files = receive_multipart(request, screenshot_file_limit,
+                                            max_body_bytes=MAX_SCREENSHOT_BYTES + MAX_FORM_OVERHEAD_BYTES)
+        except UploadRejected as e:
+            return jsonify({'error': str(e)}), 400
+        upload = files.get('screenshot')
+        if not upload:
             return jsonify({'error': 'No screenshot file provided'}), 400
         
-        # Check file type
-        allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-        file_extension = file.filename.lower().split('.')[-1]
-        if file_extension not in allowed_extensions:
-            return jsonify({'error': 'Invalid file type. Please upload PNG, JPG, JPEG, GIF, or WebP'}), 400
-        
-        # Check file size (100MB limit for screenshots)
-        file.seek(0, 2)
-        file_size = file.tell()
-        file.seek(0)
-        if file_size > 100 * 1024 * 1024:
-            return jsonify({'error': 'File too large. Maximum size is 100MB'}), 400
-        
-        # Read file data and encode as base64
-        file_data = file.read()
-        image_data = base64.b64encode(file_data).decode('utf-8')
-        filename = file.filename
-        mime_type = file.content_type or f'image/{file_extension}'
+        filename = upload['filename']
+        mime_type = upload['mime_type'] or f"image/{filename.lower().split('.')[-1]}"
+        blob_key, image_size = upload['blob_key'], upload['size']
+        caption = form.get('caption', '')
+        game_name = form.get('game_name')
+        if not game_name:
+            return jsonify({'error': 'Missing game name'}), 400
         
     elif request.is_json:
-        # Handle base64 data from JSON
+        # Handle base64 data from JSON (the body is parsed whole, so it is capped up front)
+        if request.content_length and request.content_length > MAX_SCREENSHOT_JSON_BYTES:
+            return jsonify({'error': 'Image too large. Maximum size is 100MB'}), 400
         data = request.json
         image_data = data.get('image_data')
         filename = data.get('filename', 'screenshot.png')
@@ -1963,24 +2079,15 @@ def upload_game_screenshot():
         if not image_data or not game_name:
             return jsonify({'error': 'Missing image_data or game_name'}), 400
         
-        # Validate base64 data
         try:
-            # Check if it's valid base64
-            decoded_data = base64.b64decode(image_data)
-            if len(decoded_data) > 100 * 1024 * 1024:  # 100MB limit
-                return jsonify({'error': 'Image too large. Maximum size is 100MB'}), 400
-        except Exception:
+            blob_key, image_size = store_base64_blob(image_data, mime_type, MAX_SCREENSHOT_BYTES)
+        except BlobTooLarge:
+            return jsonify({'error': 'Image too large. Maximum size is 100MB'}), 400
+        except ValueError:
             return jsonify({'error': 'Invalid base64 data'}), 400
     else:
         return jsonify({'error': 'No screenshot data provided'}), 400
     
-    # Get caption and game name from form data if not from JSON
-    if not request.is_json:
-        caption = request.form.get('caption', '')
-        game_name = request.form.get('game_name')
-        if not game_name:
-            return jsonify({'error': 'Missing game name'}), 400
-    
     with storage.Session() as session:
         game = session.query(Game).filter_by(name=game_name).first()
         if not game:
@@ -1989,7 +2096,8 @@ def upload_game_screenshot():
         screenshot = GameScreenshot(
             user_id=user_id, 
             game_id=game.id, 
-            image_data=image_data,
+            blob_key=blob_key,
+            image_size=image_size,
             image_filename=filename,
             image_mime_type=mime_type,
             caption=caption, 
@@ -1997,6 +2105,7 @@ def upload_game_screenshot():
         )
         session.add(screenshot)
         session.commit()
+        schedule_image_variants(blob_key, mime_type)
         
         return jsonify({
             'message': 'Screenshot uploaded successfully', 
@@ -2012,16 +2121,25 @@ def get_game_screenshots():
         game = session.query(Game).filter_by(name=game_name).first()
         if not game:
             return jsonify({'error': 'Game not found'}), 404
-        screenshots = session.query(GameScreenshot).filter_by(game_id=game.id).order_by(GameScreenshot.uploaded_at.desc()).all()
+        # Only the listing columns; the images themselves are served by serve_screenshot
+        screenshots = session.query(
+            GameScreenshot.id,
+            GameScreenshot.user_id,
+            GameScreenshot.blob_key,
+            GameScreenshot.caption,
+            GameScreenshot.uploaded_at
+        ).filter_by(game_id=game.id).order_by(GameScreenshot.uploaded_at.desc()).all()
+        profiles = get_user_profiles(s.user_id for s in screenshots)
         result = []
         for s in screenshots:
-            user = session.query(UserStats).filter_by(user_id=s.user_id).first()
+            profile = profiles[str(s.user_id)]
             result.append({
                 'id': s.id,
                 'user_id': s.user_id,
-                'username': user.username if user else f'User{s.user_id}',
-                'avatar_url': user.avatar_url if user else '',
+                'username': profile['username'],
+                'avatar_url': profile['avatar_url'],
                 'image_url': f'/api/game/screenshot/{s.id}',  # URL to serve the image
+                **responsive_image(s.blob_key),
                 'caption': s.caption,
                 'uploaded_at': s.uploaded_at.isoformat()
             })
@@ -2029,15 +2147,25 @@ def get_game_screenshots():
 
 @app.route('/api/game/screenshot/<int:screenshot_id>')
 def serve_screenshot(screenshot_id):
-    """Serve a screenshot image from the database"""
+    """Serve a screenshot image from the blob store"""
     with storage.Session() as session:
-        screenshot = session.query(GameScreenshot).filter_by(id=screenshot_id).first()
+        screenshot = session.query(
+            GameScreenshot.blob_key,
+            GameScreenshot.image_mime_type,
+            GameScreenshot.uploaded_at
+        ).filter_by(id=screenshot_id).first()
         if not screenshot:
             return jsonify({'error': 'Screenshot not found'}), 404
-        
+        if screenshot.blob_key:
+            return send_blob(screenshot.blob_key, screenshot.image_mime_type or 'image/png')
+
+        # Not yet moved out of the database by migrate_screenshots_to_blob_store.py
+        legacy = session.query(GameScreenshot.image_data).filter_by(id=screenshot_id).scalar()
+        if not legacy:
+            return jsonify({'error': 'Screenshot not found'}), 404
         try:
             # Decode base64 data
-            image_data = base64.b64decode(screenshot.image_data)
+            image_data = base64.b64decode(legacy)
             
             # Set response headers
             response = make_response(image_data)
@@ -2060,15 +2188,34 @@ def get_user_preferences():
         print(f"Getting preferences for user: {user_id}")
         
         with storage.Session() as session:
-            prefs = session.query(UserPreferences).filter_by(user_id=user_id).first()
-            if prefs:
+            # The payload columns are deferred; pg_column_size tells whether (and roughly what) a
+            # file is stored without reading it, and versions its URL so browsers can cache it
+            row = session.query(
+                UserPreferences,
+                func.pg_column_size(UserPreferences.background_image_data),
+                func.pg_column_size(UserPreferences.background_video_data)
+            ).filter_by(user_id=user_id).first()
+            if row:
+                prefs, image_data_size, video_data_size = row
                 print(f"Found preferences: theme={prefs.theme}, bg_image={prefs.background_image_url}, bg_video={prefs.background_video_url}")
+                if prefs.background_image_blob_key:
+                    image_file_url = f'/api/preferences/background/{user_id}/image?v={prefs.background_image_blob_key[:16]}'
+                elif image_data_size:
+                    image_file_url = f'/api/preferences/background/{user_id}/image?v=d{image_data_size}'
+                else:
+                    image_file_url = None
+                if prefs.background_video_blob_key:
+                    video_file_url = f'/api/preferences/background/{user_id}/video?v={prefs.background_video_blob_key[:16]}'
+                elif video_data_size:
+                    video_file_url = f'/api/preferences/background/{user_id}/video?v=d{video_data_size}'
+                else:
+                    video_file_url = None
                 return jsonify({
                     'theme': prefs.theme,
                     'background_image_url': prefs.background_image_url,
                     'background_video_url': prefs.background_video_url,
-                    'background_image_data': prefs.background_image_data,
-                    'background_video_data': prefs.background_video_data,
+                    'background_image_file_url': image_file_url,
+                    'background_video_file_url': video_file_url,
                     'background_image_filename': prefs.background_image_filename,
                     'background_video_filename': prefs.background_video_filename,
                     'background_image_mime_type': prefs.background_image_mime_type,
@@ -2119,6 +2266,7 @@ def set_user_preferences():
                 prefs.background_image_url = background_image_url
                 # Clear database-stored image data if switching to external URL
                 prefs.background_image_data = None
+                prefs.background_image_blob_key = None
                 prefs.background_image_filename = None
                 prefs.background_image_mime_type = None
             elif background_image_url is None:
@@ -2129,6 +2277,7 @@ def set_user_preferences():
                 prefs.background_video_url = background_video_url
                 # Clear database-stored video data if switching to external URL
                 prefs.background_video_data = None
+                prefs.background_video_blob_key = None
                 prefs.background_video_filename = None
                 prefs.background_video_mime_type = None
             elif background_video_url is None:
@@ -2158,113 +2307,76 @@ def set_user_preferences():
             'background_type': background_type
         })
 
+BACKGROUND_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+BACKGROUND_VIDEO_EXTENSIONS = {'mp4', 'webm', 'ogg', 'mov'}
+MAX_BACKGROUND_IMAGE_BYTES = 100 * 1024 * 1024
+# Videos are capped at 10 seconds; at roughly 1MB per second of compressed video, with some buffer
+MAX_BACKGROUND_VIDEO_BYTES = 15 * 1024 * 1024
+
+def background_file_limit(field_name, filename, content_type):
+    """receive_multipart file_limit for background uploads"""
+    if field_name != 'background_file':
+        raise UploadRejected(f'Unexpected file field {field_name}')
+    file_extension = filename.lower().split('.')[-1]
+    if file_extension in BACKGROUND_IMAGE_EXTENSIONS:
+        return MAX_BACKGROUND_IMAGE_BYTES
+    if file_extension in BACKGROUND_VIDEO_EXTENSIONS:
+        return MAX_BACKGROUND_VIDEO_BYTES
+    raise UploadRejected('Invalid file type. Please upload PNG, JPG, JPEG, GIF, WebP, MP4, WebM, OGG, or MOV')
+
 @app.route('/api/preferences/upload-background', methods=['POST'])
 def upload_background_image():
     user_id = request.cookies.get('user_id')
     if not user_id:
         return jsonify({'error': 'Not logged in'}), 401
     
-    if 'background_file' not in request.files:
+    # Streamed into the blob store as it arrives, with the size limit checked on every chunk
+    try:
+        _, files = receive_multipart(request, background_file_limit,
+                                     max_body_bytes=MAX_BACKGROUND_IMAGE_BYTES + MAX_FORM_OVERHEAD_BYTES)
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 400
+    upload = files.get('background_file')
+    if not upload:
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['background_file']
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    # Check file type
-    allowed_image_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-    allowed_video_extensions = {'mp4', 'webm', 'ogg', 'mov'}
-    file_extension = file.filename.lower().split('.')[-1]
-    
-    if file_extension in allowed_image_extensions:
-        file_type = 'image'
-        mime_type = file.content_type or f'image/{file_extension}'
-        max_size = None  # No size limit for images
-    elif file_extension in allowed_video_extensions:
-        file_type = 'video'
-        mime_type = file.content_type or f'video/{file_extension}'
-        max_size = 100 * 1024 * 1024  # 100MB for videos
-    else:
-        return jsonify({'error': 'Invalid file type. Please upload PNG, JPG, JPEG, GIF, WebP, MP4, WebM, OGG, or MOV'}), 400
+    filename = upload['filename']
+    blob_key = upload['blob_key']
+    file_extension = filename.lower().split('.')[-1]
+    file_type = 'image' if file_extension in BACKGROUND_IMAGE_EXTENSIONS else 'video'
+    mime_type = upload['mime_type'] or f'{file_type}/{file_extension}'
     
     try:
-        # Check file size
-        file.seek(0, 2)  # Seek to end
-        file_size = file.tell()
-        file.seek(0)  # Reset to beginning
-        
-        if max_size and file_size > max_size:
-            size_mb = max_size / (1024 * 1024)
-            return jsonify({'error': f'File too large. Maximum size is {size_mb}MB'}), 400
-        
-        # For videos, check duration (approximate based on file size)
-        if file_type == 'video':
-            # Rough estimate: 1MB per second for compressed video
-            estimated_duration = file_size / (1024 * 1024)  # seconds
-            if estimated_duration > 15:  # Allow some buffer
-                return jsonify({'error': 'Video too long. Maximum duration is 10 seconds'}), 400
-        
-        # Read file data and encode as base64
-        file_data = file.read()
-        import base64
-        encoded_data = base64.b64encode(file_data).decode('utf-8')
-        
-        # Check encoded size (base64 increases size by ~33%)
-        encoded_size = len(encoded_data)
-        if encoded_size > 100 * 1024 * 1024:  # 100MB limit for database storage
-            return jsonify({'error': 'File too large for database storage. Please use a smaller file or external URL'}), 400
-        
-        # Update user preferences with the file data stored in database
+        # Only the blob key goes into the database
         with storage.Session() as session:
             prefs = session.query(UserPreferences).filter_by(user_id=user_id).first()
-            if prefs:
-                if file_type == 'image':
-                    prefs.background_image_data = encoded_data
-                    prefs.background_image_filename = file.filename
-                    prefs.background_image_mime_type = mime_type
-                    prefs.background_image_url = None  # Clear URL if storing in DB
-                    prefs.background_type = 'image'
-                else:
-                    prefs.background_video_data = encoded_data
-                    prefs.background_video_filename = file.filename
-                    prefs.background_video_mime_type = mime_type
-                    prefs.background_video_url = None  # Clear URL if storing in DB
-                    prefs.background_type = 'video'
-            else:
+            if not prefs:
                 prefs = UserPreferences(
                     user_id=user_id,
                     theme='dark',  # Default theme
-                    background_image_data=encoded_data if file_type == 'image' else None,
-                    background_video_data=encoded_data if file_type == 'video' else None,
-                    background_image_filename=file.filename if file_type == 'image' else None,
-                    background_video_filename=file.filename if file_type == 'video' else None,
-                    background_image_mime_type=mime_type if file_type == 'image' else None,
-                    background_video_mime_type=mime_type if file_type == 'video' else None,
-                    background_opacity=0.3,
-                    background_type=file_type
+                    background_opacity=0.3
                 )
                 session.add(prefs)
-            
-            try:
-                session.commit()
-                # Clear cache for this user's background files
-                cache_key_image = f"{user_id}_image"
-                cache_key_video = f"{user_id}_video"
-                if cache_key_image in background_file_cache:
-                    del background_file_cache[cache_key_image]
-                if cache_key_video in background_file_cache:
-                    del background_file_cache[cache_key_video]
-            except Exception as db_error:
-                session.rollback()
-                print(f"Database error: {str(db_error)}")
-                if "SSL connection has been closed" in str(db_error):
-                    return jsonify({'error': 'File too large for database storage. Please use a smaller file or external URL'}), 400
-                else:
-                    raise db_error
+            if file_type == 'image':
+                prefs.background_image_blob_key = blob_key
+                prefs.background_image_data = None
+                prefs.background_image_filename = filename
+                prefs.background_image_mime_type = mime_type
+                prefs.background_image_url = None  # Clear URL if storing a file
+            else:
+                prefs.background_video_blob_key = blob_key
+                prefs.background_video_data = None
+                prefs.background_video_filename = filename
+                prefs.background_video_mime_type = mime_type
+                prefs.background_video_url = None  # Clear URL if storing a file
+            prefs.background_type = file_type
+            session.commit()
         
+        if file_type == 'image':
+            schedule_image_variants(blob_key, mime_type)
         return jsonify({
             'message': f'Background {file_type} uploaded successfully',
-            'file_url': f'/api/preferences/background/{user_id}/{file_type}?t={int(time.time())}',
+            'file_url': f'/api/preferences/background/{user_id}/{file_type}?v={blob_key[:16]}',
             'file_type': file_type
         })
     except Exception as e:
@@ -2273,60 +2385,100 @@ def upload_background_image():
         traceback.print_exc()
         return jsonify({'error': f'Failed to upload {file_type}: {str(e)}'}), 500
 
+# Payload, MIME type and filename columns of database-stored backgrounds, by file type
+BACKGROUND_PAYLOAD_COLUMNS = {
+    'image': ('background_image_data', 'background_image_mime_type', 'background_image_filename'),
+    'video': ('background_video_data', 'background_video_mime_type', 'background_video_filename'),
+}
+# Base64 characters decoded per query; a multiple of 4 so every slice decodes on its own
+BACKGROUND_DECODE_CHUNK = 8 * 1024 * 1024
+
+def write_background_payload(user_id, data_column, version, out):
+    """Decode a base64 background payload into out a slice at a time, so it is never whole in memory"""
+    with storage.Session() as session:
+        # One snapshot for every slice, so a concurrent upload can't mix two files
+        session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+        offset = 1
+        while True:
+            chunk = session.execute(text(f"""
+                SELECT substr({data_column}, :offset, :length)
+                FROM user_preferences
+                WHERE user_id = :user_id AND xmin::text = :version
+            """), {"user_id": int(user_id), "offset": offset, "length": BACKGROUND_DECODE_CHUNK,
+                   "version": version}).scalar()
+            if chunk is None and offset == 1:
+                raise RuntimeError(f"Background {data_column} of user {user_id} changed while it was being read")
+            if chunk:
+                out.write(base64.b64decode(chunk))
+            if not chunk or len(chunk) < BACKGROUND_DECODE_CHUNK:
+                return
+            offset += BACKGROUND_DECODE_CHUNK
+
 @app.route('/api/preferences/background/<user_id>/<file_type>')
 def serve_background_file(user_id, file_type):
-    """Serve background files stored in the database with caching."""
+    """Serve a user's uploaded background file from the blob store.
+    Files still stored in the database are served through media_cache.
+    Uploaded images take ?w=<display width in px> to get a resized WebP copy."""
     try:
-        # Check cache first
-        cache_key = f"{user_id}_{file_type}"
-        current_time = time.time()
-        cache_expiry = 3600  # 1 hour
-        
-        if (cache_key in background_file_cache and 
-            current_time - background_file_cache_timestamps.get(cache_key, 0) < cache_expiry):
-            cached_data = background_file_cache[cache_key]
-            from flask import Response
-            response = Response(cached_data['file_data'], mimetype=cached_data['mime_type'])
-            response.headers['Content-Disposition'] = f'inline; filename="{cached_data["filename"]}"'
-            response.headers['Cache-Control'] = 'public, max-age=31536000'
-            response.headers['ETag'] = cached_data['etag']
-            return response
-        
-        # If not in cache, get from database
         with storage.Session() as session:
-            prefs = session.query(UserPreferences).filter_by(user_id=user_id).first()
-            if not prefs:
-                return jsonify({'error': 'User preferences not found'}), 404
-            
-            if file_type == 'image' and prefs.background_image_data:
-                import base64
-                file_data = base64.b64decode(prefs.background_image_data)
-                mime_type = prefs.background_image_mime_type or 'image/jpeg'
-                filename = prefs.background_image_filename or 'background.jpg'
-            elif file_type == 'video' and prefs.background_video_data:
-                import base64
-                file_data = base64.b64decode(prefs.background_video_data)
-                mime_type = prefs.background_video_mime_type or 'video/mp4'
-                filename = prefs.background_video_filename or 'background.mp4'
-            else:
-                return jsonify({'error': 'File not found'}), 404
-            
-            # Cache the result
-            etag = f'"{user_id}_{file_type}_{hash(file_data) % 1000000}"'
-            background_file_cache[cache_key] = {
-                'file_data': file_data,
-                'mime_type': mime_type,
-                'filename': filename,
-                'etag': etag
-            }
-            background_file_cache_timestamps[cache_key] = current_time
-            
-            from flask import Response
-            response = Response(file_data, mimetype=mime_type)
-            response.headers['Content-Disposition'] = f'inline; filename="{filename}"'
-            response.headers['Cache-Control'] = 'public, max-age=31536000'
-            response.headers['ETag'] = etag
+            uploaded = session.query(
+                UserPreferences.background_image_blob_key,
+                UserPreferences.background_image_mime_type,
+                UserPreferences.background_video_blob_key,
+                UserPreferences.background_video_mime_type
+            ).filter_by(user_id=user_id).first()
+        if uploaded and file_type == 'image' and uploaded.background_image_blob_key:
+            width = request.args.get('w', type=int)
+            if width:
+                # Smallest variant at least as wide as the display, else the largest
+                width = next((w for w in VARIANT_WIDTHS if w >= width), VARIANT_WIDTHS[-1])
+                return send_image_variant(uploaded.background_image_blob_key, width)
+            return send_blob(uploaded.background_image_blob_key, uploaded.background_image_mime_type or 'image/jpeg')
+        if uploaded and file_type == 'video' and uploaded.background_video_blob_key:
+            return send_blob(uploaded.background_video_blob_key, uploaded.background_video_mime_type or 'video/mp4')
+
+        if file_type not in BACKGROUND_PAYLOAD_COLUMNS:
+            return jsonify({'error': 'File not found'}), 404
+        data_column, mime_column, filename_column = BACKGROUND_PAYLOAD_COLUMNS[file_type]
+
+        # Stored in the database (uploads from before the blob store): look up the version only.
+        # xmin changes whenever the row is written, so it versions the payload without reading it.
+        with storage.Session() as session:
+            stored = session.execute(text(f"""
+                SELECT xmin::text AS version, pg_column_size({data_column}) AS stored_size,
+                       {mime_column} AS mime_type, {filename_column} AS filename
+                FROM user_preferences
+                WHERE user_id = :user_id
+            """), {"user_id": int(user_id)}).first()
+        if not stored:
+            return jsonify({'error': 'User preferences not found'}), 404
+        if not stored.stored_size:
+            return jsonify({'error': 'File not found'}), 404
+
+        etag = f'{user_id}-{file_type}-{stored.version}-{stored.stored_size}'
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+            response.set_etag(etag)
             return response
+
+        # Decoded once into the shared disk cache, then streamed from there with Range support
+        file = media_cache.get_or_fill(
+            etag,
+            lambda out: write_background_payload(user_id, data_column, stored.version, out),
+            size_hint=stored.stored_size
+        )
+        size = os.fstat(file.fileno()).st_size
+        response = send_file(
+            file,
+            mimetype=stored.mime_type or ('image/jpeg' if file_type == 'image' else 'video/mp4'),
+            max_age=31536000
+        )
+        # send_file can't see the size of an open file, which Range support needs
+        response.content_length = size
+        response.set_etag(etag)
+        response.make_conditional(request, accept_ranges=True, complete_length=size)
+        response.headers['Content-Disposition'] = f'inline; filename="{stored.filename or f"background.{file_type}"}"'
+        return response
             
     except Exception as e:
         print(f"Error serving background file: {str(e)}")
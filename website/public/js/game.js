@@ -1,83 +1,66 @@
 // Game Page JavaScript
 
+// The page loads its data from one /api/game/bundle request and /api/user once;
+// the DOMContentLoaded handlers below share these promises
+let gameBundlePromise = null;
+let currentUserPromise = null;
+
+function loadGameBundle(gameName) {
+  if (!gameBundlePromise) {
+    gameBundlePromise = fetch(`/api/game/bundle?name=${encodeURIComponent(gameName)}`)
+      .then(response => response.json().then(data => {
+        if (!response.ok || data.error) {
+          throw new Error(data.error || `HTTP ${response.status}`);
+        }
+        return data;
+      }));
+  }
+  return gameBundlePromise;
+}
+
+function loadCurrentUser() {
+  if (!currentUserPromise) {
+    currentUserPromise = fetch('/api/user')
+      .then(response => response.ok ? response.json() : null)
+      .catch(() => null);
+  }
+  return currentUserPromise;
+}
+
 document.addEventListener('DOMContentLoaded', function() {
-  // Check authentication status
-  fetch('/api/user')
-    .then(response => {
-      if (response.ok) {
-        return response.json();
-      }
-      throw new Error('Not authenticated');
-    })
-    .then(user => {
-      const authContainer = document.getElementById('auth-container');
-      authContainer.innerHTML = `
-        <a href="/pages/user.html?user=${user.id}" class="user-profile">
-          <img src="${user.avatar ? `https://cdn.discordapp.com/avatars/${user.id}/${user.avatar}.png` : 'https://cdn.discordapp.com/embed/avatars/0.png'}" 
-               alt="${user.username}" 
-               class="user-avatar">
-          <span class="user-name">${user.username}</span>
-        </a>
-        <a href="/pages/preferences.html" class="preferences-button" title="Preferences">
-          <i class="fas fa-cog"></i>
-        </a>
-        <a href="/logout" class="logout-button" title="Logout">
-          <i class="fas fa-sign-out-alt"></i>
-        </a>
-      `;
+  // Get game name from URL
+  const urlParams = new URLSearchParams(window.location.search);
+  const gameName = urlParams.get('game');
 
-      // Show user stats section and fetch user's game stats
-      const userStatsSection = document.getElementById('userGameStats');
-      userStatsSection.style.display = 'block';
-      
-      // Get game name from URL
-      const urlParams = new URLSearchParams(window.location.search);
-      const gameName = urlParams.get('game');
-      
-      // Fetch user's stats for this game
-      fetch(`/api/user-stats/${user.id}/game?name=${encodeURIComponent(gameName)}`)
-        .then(response => response.json())
-        .then(data => {
-          const loadingSpinner = userStatsSection.querySelector('.loading-spinner');
-          const statsContainer = userStatsSection.querySelector('.user-stats-grid');
-          
-          if (data.error) {
-            loadingSpinner.innerHTML = `<i class="fas fa-exclamation-circle"></i> ${data.error}`;
-            return;
-          }
-          
-          // Update stats
-          document.getElementById('userHours').textContent = formatNumber(data.total_hours || 0);
-          document.getElementById('userCredits').textContent = formatNumber(data.total_credits || 0);
-          document.getElementById('userSessions').textContent = formatNumber(data.total_sessions || 0);
-          document.getElementById('firstPlayed').textContent = data.first_played ? new Date(data.first_played).toLocaleDateString() : 'Never';
-          document.getElementById('lastPlayed').textContent = data.last_played ? new Date(data.last_played).toLocaleDateString() : 'Never';
-          
-          // Show stats container and hide loading spinner
-          loadingSpinner.style.display = 'none';
-          statsContainer.style.display = 'flex';
-          userStatsSection.querySelector('.user-stats-header').style.display = 'flex';
-        })
-        .catch(error => {
-          console.error('Error fetching user game stats:', error);
-          const loadingSpinner = userStatsSection.querySelector('.loading-spinner');
-          loadingSpinner.innerHTML = '<i class="fas fa-exclamation-circle"></i> Error loading your stats';
-        });
-    })
-    .catch(() => {
+  // Check authentication status
+  loadCurrentUser().then(user => {
+    const authContainer = document.getElementById('auth-container');
+    if (!user) {
       // User is not authenticated, keep the login button
-      const authContainer = document.getElementById('auth-container');
       authContainer.innerHTML = `
         <a href="/login" class="auth-button login-button">
           <i class="fab fa-discord"></i>
           Login with Discord
         </a>
       `;
-    });
+      return;
+    }
+    authContainer.innerHTML = `
+      <a href="/pages/user.html?user=${user.id}" class="user-profile">
+        <img src="${user.avatar ? `https://cdn.discordapp.com/avatars/${user.id}/${user.avatar}.png` : 'https://cdn.discordapp.com/embed/avatars/0.png'}" 
+             alt="${user.username}" 
+             class="user-avatar">
+        <span class="user-name">${user.username}</span>
+      </a>
+      <a href="/pages/preferences.html" class="preferences-button" title="Preferences">
+        <i class="fas fa-cog"></i>
+      </a>
+      <a href="/logout" class="logout-button" title="Logout">
+        <i class="fas fa-sign-out-alt"></i>
+      </a>
+    `;
+  });
 
-  // Get game name from URL
-  const urlParams = new URLSearchParams(window.location.search);
-  const gameName = urlParams.get('game');
   if (!gameName) {
     showError('No game specified');
     return;
@@ -86,92 +69,80 @@ document.addEventListener('DOMContentLoaded', function() {
   // Update page title
   document.title = `${gameName} - Gamer Cred`;
 
-  // Fetch game data
-  console.log('DEBUG: Fetching game data for:', gameName);
-  fetch(`/api/game?name=${encodeURIComponent(gameName)}`)
-    .then(response => {
-      console.log('DEBUG: API response status:', response.status);
-      return response.json();
-    })
-    .then(data => {
-      console.log('DEBUG: API response data:', data);
-      if (data.error) {
-        console.error('DEBUG: API returned error:', data.error);
-        showError(data.error);
-        return;
+  Promise.all([loadCurrentUser(), loadGameBundle(gameName)])
+    .then(([user, bundle]) => {
+      updateGameInfo(bundle.game);
+      renderPlayers(bundle.players);
+      renderActivity(bundle.activity);
+      if (user && bundle.user) {
+        renderUserGameStats(bundle.user.game_stats);
       }
-      console.log('DEBUG: Updating game info with:', data);
-      updateGameInfo(data);
     })
     .catch(error => {
       console.error('Error fetching game data:', error);
-      showError('Failed to load game information');
+      showError(error.message === 'Game not found' ? error.message : 'Failed to load game information');
     });
+});
 
-  // Fetch current players
-  fetch(`/api/game/players?name=${encodeURIComponent(gameName)}`)
-    .then(response => response.json())
-    .then(data => {
-      const playersList = document.querySelector('.players-list');
-      const loadingSpinner = document.querySelector('.game-playing .loading-spinner');
-      
-      if (data.error) {
-        playersList.innerHTML = `<li>Error loading players: ${data.error}</li>`;
-      } else if (data.length === 0) {
-        playersList.innerHTML = '<li>No one is currently playing this game</li>';
-      } else {
-        playersList.innerHTML = data.map(player => `
-          <li>
-            <img class="avatar-sm" src="${player.avatar_url}" alt="${player.username}">
-            <a class="user-link" href="/pages/user.html?user=${player.user_id}">${player.username}</a>
-          </li>
-        `).join('');
-      }
-      
-      loadingSpinner.style.display = 'none';
-      playersList.style.display = 'flex';
-    })
-    .catch(error => {
-      console.error('Error fetching players:', error);
-      document.querySelector('.game-playing .loading-spinner').style.display = 'none';
-      document.querySelector('.players-list').innerHTML = '<li>Error loading players</li>';
-      document.querySelector('.players-list').style.display = 'flex';
-    });
+function renderUserGameStats(data) {
+  // Show user stats section with the user's stats for this game
+  const userStatsSection = document.getElementById('userGameStats');
+  userStatsSection.style.display = 'block';
 
-  // Fetch recent activity
-  fetch(`/api/game/activity?name=${encodeURIComponent(gameName)}&limit=15`)
-    .then(response => response.json())
-    .then(data => {
-      const activityList = document.querySelector('.activity-list');
-      const loadingSpinner = document.querySelector('.game-activity .loading-spinner');
-      
-      if (data.error) {
-        activityList.innerHTML = `<li>Error loading activity: ${data.error}</li>`;
-      } else if (data.length === 0) {
-        activityList.innerHTML = '<li>No recent activity</li>';
-      } else {
-        activityList.innerHTML = data.map(activity => `
-          <li>
-            <img class="avatar-sm" src="${activity.avatar_url}" alt="${activity.username}">
-            <div class="activity-details">
-              <a class="user-link" href="/pages/user.html?user=${String(activity.user_id)}">${activity.username}</a>
-              <span class="activity-text">played for ${formatHours(activity.hours)}</span>
-            </div>
-            <span class="activity-time">${formatTimeAgo(activity.timestamp)}</span>
-          </li>
-        `).join('');
-      }
-      
-      loadingSpinner.style.display = 'none';
-      activityList.style.display = 'grid';
-    })
-    .catch(error => {
-      console.error('Error fetching activity:', error);
-      document.querySelector('.game-activity .loading-spinner').style.display = 'none';
-      document.querySelector('.activity-list').innerHTML = '<li>Error loading activity</li>';
-      document.querySelector('.activity-list').style.display = 'grid';
-    });
-});
+  // Update stats
+  document.getElementById('userHours').textContent = formatNumber(data.total_hours || 0);
+  document.getElementById('userCredits').textContent = formatNumber(data.total_credits || 0);
+  document.getElementById('userSessions').textContent = formatNumber(data.total_sessions || 0);
+  document.getElementById('firstPlayed').textContent = data.first_played ? new Date(data.first_played).toLocaleDateString() : 'Never';
+  document.getElementById('lastPlayed').textContent = data.last_played ? new Date(data.last_played).toLocaleDateString() : 'Never';
+
+  // Show stats container and hide loading spinner
+  userStatsSection.querySelector('.loading-spinner').style.display = 'none';
+  userStatsSection.querySelector('.user-stats-grid').style.display = 'flex';
+  userStatsSection.querySelector('.user-stats-header').style.display = 'flex';
+}
+
+function renderPlayers(players) {
+  const playersList = document.querySelector('.players-list');
+  const loadingSpinner = document.querySelector('.game-playing .loading-spinner');
+
+  if (players.length === 0) {
+    playersList.innerHTML = '<li>No one is currently playing this game</li>';
+  } else {
+    playersList.innerHTML = players.map(player => `
+      <li>
+        <img class="avatar-sm" src="${player.avatar_url}" alt="${player.username}">
+        <a class="user-link" href="/pages/user.html?user=${player.user_id}">${player.username}</a>
+      </li>
+    `).join('');
+  }
+
+  loadingSpinner.style.display = 'none';
+  playersList.style.display = 'flex';
+}
+
+function renderActivity(activity) {
+  const activityList = document.querySelector('.activity-list');
+  const loadingSpinner = document.querySelector('.game-activity .loading-spinner');
+
+  if (activity.length === 0) {
+    activityList.innerHTML = '<li>No recent activity</li>';
+  } else {
+    activityList.innerHTML = activity.map(item => `
+      <li>
+        <img class="avatar-sm" src="${item.avatar_url}" alt="${item.username}">
+        <div class="activity-details">
+          <a class="user-link" href="/pages/user.html?user=${String(item.user_id)}">${item.username}</a>
+          <span class="activity-text">played for ${formatHours(item.hours)}</span>
+        </div>
+        <span class="activity-time">${formatTimeAgo(item.timestamp)}</span>
+      </li>
+    `).join('');
+  }
+
+  loadingSpinner.style.display = 'none';
+  activityList.style.display = 'grid';
+}
 
 function updateGameInfo(game) {
   // Update page title with game name
@@ -400,122 +371,21 @@ document.addEventListener('DOMContentLoaded', function() {
   const gameName = urlParams.get('game');
   let currentUser = null;
 
-  // Check login status and fetch user info
-  fetch('/api/user').then(r => r.ok ? r.json() : null).then(user => {
-    currentUser = user;
-    setupInteractivityUI(user);
-  }).catch(() => {
-    setupInteractivityUI(null);
-  });
+  if (!gameName) {
+    return;
+  }
 
-  function setupInteractivityUI(user) {
-    // Ratings
-    fetch(`/api/game/ratings?name=${encodeURIComponent(gameName)}`)
-      .then(r => r.json())
-      .then(data => {
-        document.getElementById('averageRating').textContent = data.average !== null ? data.average : '-';
-        // Pluralization fix for rating count
-        const ratingCount = data.count;
-        const ratingText = ratingCount === 1 ? 'rating' : 'ratings';
-        document.getElementById('ratingCount').textContent = ratingCount;
-        document.querySelector('.game-info-rating-display').innerHTML = `${data.average !== null ? data.average : '-'} / 5 (<span id="ratingCount">${ratingCount}</span> ${ratingText})`;
-        if (user) {
-          document.getElementById('user-rating-widget').style.display = 'block';
-          renderStarWidget(data.user_rating || 0);
-        }
-      });
+  // Check login status; a bundle that failed to load replaces the page with an error (see above)
+  Promise.all([loadCurrentUser(), loadGameBundle(gameName)]).then(([user, bundle]) => {
+    currentUser = user;
+    setupInteractivityUI(user, bundle);
+  }).catch(() => {});
 
-    // Completion status
-    fetch(`/api/game/completions?name=${encodeURIComponent(gameName)}`)
-      .then(r => r.json())
-      .then(data => {
-        document.getElementById('completionCount').textContent = data.count;
-        if (user) {
-          if (data.user_completed) {
-            document.getElementById('completedBadge').style.display = 'inline-block';
-            document.getElementById('markCompletedBtn').style.display = 'none';
-            document.getElementById('undoCompletedBtn').style.display = 'inline-block';
-          } else {
-            document.getElementById('completedBadge').style.display = 'none';
-            document.getElementById('markCompletedBtn').style.display = 'inline-block';
-            document.getElementById('undoCompletedBtn').style.display = 'none';
-          }
-        }
-      });
-    
-    // Get completion requirements
-    console.log('User object for completion requirements:', user); // Debug logging
-    if (user) {
-      console.log('Fetching completion requirements for game:', gameName); // Debug logging
-      fetch(`/api/game/completion-requirements?name=${encodeURIComponent(gameName)}`)
-        .then(r => {
-          console.log('Completion requirements response status:', r.status); // Debug logging
-          if (!r.ok) {
-            throw new Error(`HTTP ${r.status}: ${r.statusText}`);
-          }
-          return r.json();
-        })
-        .then(data => {
-          console.log('Completion requirements data:', data); // Debug logging
-          
-          if (data.already_completed) {
-            // Already completed, no need to show requirements
-            return;
-          }
-          
-          // Validate required data fields
-          if (typeof data.hours_met === 'undefined') {
-            console.error('Invalid completion requirements data:', data);
-            return;
-          }
-          
-          // Update completion button based on requirements
-          const markCompletedBtn = document.getElementById('markCompletedBtn');
-          if (data.can_complete) {
-            markCompletedBtn.textContent = 'Mark as Completed';
-            markCompletedBtn.disabled = false;
-            markCompletedBtn.style.opacity = '1';
-          } else {
-            markCompletedBtn.textContent = 'Requirements Not Met';
-            markCompletedBtn.disabled = true;
-            markCompletedBtn.style.opacity = '0.6';
-          }
-          
-          // Show requirements status
-          const completionContent = document.querySelector('.game-info-completion-content');
-          console.log('Completion content element:', completionContent); // Debug logging
-          if (!completionContent) {
-            console.error('Could not find .game-info-completion-content element');
-            return;
-          }
-          let requirementsHtml = '';
-          
-          // Add the main requirement message
-          requirementsHtml += `<div class="requirement-message">
-            <i class="fas fa-info-circle"></i>
-            <span>3 logged hours required to rate or mark as complete</span>
-          </div>`;
-          
-          // Show rating status (informational only)
-          if (data.has_rating) {
-            const ratingValue = data.rating_value || 0;
-            requirementsHtml += `<div class="requirement-item requirement-info">
-              <i class="fas fa-star"></i>
-              <span>Rated: ${ratingValue} stars</span>
-            </div>`;
-          }
-          
-          // Add requirements display
-          const requirementsDiv = document.createElement('div');
-          requirementsDiv.className = 'completion-requirements';
-          requirementsDiv.innerHTML = requirementsHtml;
-          console.log('Generated requirements HTML:', requirementsHtml); // Debug logging
-          console.log('Requirements div element:', requirementsDiv); // Debug logging
-          completionContent.appendChild(requirementsDiv);
-        })
-        .catch(error => {
-          console.error('Error fetching completion requirements:', error);
-        });
+  function setupInteractivityUI(user, bundle) {
+    renderRatings(bundle.ratings, user);
+    renderCompletions(bundle.completions, user);
+    if (user && bundle.user) {
+      renderCompletionRequirements(bundle.user.completion_requirements);
     }
     
     // Completion button event listeners
@@ -599,11 +469,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // Reviews
-    fetch(`/api/game/reviews?name=${encodeURIComponent(gameName)}`)
-      .then(r => r.json())
-      .then(reviews => {
-        renderReviews(reviews);
-      });
+    renderReviews(bundle.reviews, bundle.reviews_next_cursor);
     if (user) {
       document.getElementById('reviewFormContainer').style.display = 'block';
       document.getElementById('submitReviewBtn').onclick = function() {
@@ -630,9 +496,7 @@ document.addEventListener('DOMContentLoaded', function() {
           } else {
             document.getElementById('reviewText').value = '';
             showMessage('Review submitted successfully!', 'success');
-            fetch(`/api/game/reviews?name=${encodeURIComponent(gameName)}`)
-              .then(r => r.json())
-              .then(renderReviews);
+            fetchReviews().then(page => renderReviews(page.reviews, page.next_cursor));
           }
         })
         .catch(error => {
@@ -647,9 +511,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // Screenshots
-    fetch(`/api/game/screenshots?name=${encodeURIComponent(gameName)}`)
-      .then(r => r.json())
-      .then(renderScreenshots);
+    renderScreenshots(bundle.screenshots);
     if (user) {
       document.getElementById('screenshotUploadForm').style.display = 'block';
       document.getElementById('screenshotUploadForm').onsubmit = function(e) {
@@ -680,58 +542,128 @@ document.addEventListener('DOMContentLoaded', function() {
         submitBtn.textContent = 'Uploading...';
         submitBtn.disabled = true;
         
-        // Convert file to base64
-        const reader = new FileReader();
-        reader.onload = function(e) {
-          const base64Data = e.target.result.split(',')[1]; // Remove data:image/...;base64, prefix
-          
-          const uploadData = {
-            game_name: gameName,
-            caption: document.getElementById('screenshotCaption').value,
-            image_data: base64Data,
-            filename: file.name,
-            mime_type: file.type
-          };
-          
-          fetch('/api/game/screenshot', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(uploadData)
-          })
-          .then(r => r.json())
-          .then(data => {
-            if (data.error) {
-              showMessage(data.error, 'error');
-            } else if (data.screenshot_id) {
-              showMessage('Screenshot uploaded successfully!', 'success');
-              fetch(`/api/game/screenshots?name=${encodeURIComponent(gameName)}`)
-                .then(r => r.json())
-                .then(renderScreenshots);
-              fileInput.value = '';
-              document.getElementById('screenshotCaption').value = '';
-            }
-          })
-          .catch(error => {
-            console.error('Error uploading screenshot:', error);
-            showMessage('Failed to upload screenshot. Please try again.', 'error');
-          })
-          .finally(() => {
-            submitBtn.textContent = originalText;
-            submitBtn.disabled = false;
-          });
-        };
+        // Sent as multipart so the server can stream the file instead of parsing base64 JSON
+        const uploadData = new FormData();
+        uploadData.append('game_name', gameName);
+        uploadData.append('caption', document.getElementById('screenshotCaption').value);
+        uploadData.append('screenshot', file, file.name);
         
-        reader.onerror = function() {
-          showMessage('Error reading file. Please try again.', 'error');
+        fetch('/api/game/screenshot', {
+          method: 'POST',
+          body: uploadData
+        })
+        .then(r => r.json())
+        .then(data => {
+          if (data.error) {
+            showMessage(data.error, 'error');
+          } else if (data.screenshot_id) {
+            showMessage('Screenshot uploaded successfully!', 'success');
+            fetch(`/api/game/screenshots?name=${encodeURIComponent(gameName)}`)
+              .then(r => r.json())
+              .then(renderScreenshots);
+            fileInput.value = '';
+            document.getElementById('screenshotCaption').value = '';
+          }
+        })
+        .catch(error => {
+          console.error('Error uploading screenshot:', error);
+          showMessage('Failed to upload screenshot. Please try again.', 'error');
+        })
+        .finally(() => {
           submitBtn.textContent = originalText;
           submitBtn.disabled = false;
-        };
-        
-        reader.readAsDataURL(file);
+        });
       };
     }
   }
 
+  function renderRatings(data, user) {
+    document.getElementById('averageRating').textContent = data.average !== null ? data.average : '-';
+    // Pluralization fix for rating count
+    const ratingCount = data.count;
+    const ratingText = ratingCount === 1 ? 'rating' : 'ratings';
+    document.getElementById('ratingCount').textContent = ratingCount;
+    document.querySelector('.game-info-rating-display').innerHTML = `${data.average !== null ? data.average : '-'} / 5 (<span id="ratingCount">${ratingCount}</span> ${ratingText})`;
+    if (user) {
+      document.getElementById('user-rating-widget').style.display = 'block';
+      renderStarWidget(data.user_rating || 0);
+    }
+  }
+
+  function renderCompletions(data, user) {
+    document.getElementById('completionCount').textContent = data.count;
+    if (user) {
+      if (data.user_completed) {
+        document.getElementById('completedBadge').style.display = 'inline-block';
+        document.getElementById('markCompletedBtn').style.display = 'none';
+        document.getElementById('undoCompletedBtn').style.display = 'inline-block';
+      } else {
+        document.getElementById('completedBadge').style.display = 'none';
+        document.getElementById('markCompletedBtn').style.display = 'inline-block';
+        document.getElementById('undoCompletedBtn').style.display = 'none';
+      }
+    }
+  }
+
+  function renderCompletionRequirements(data) {
+    console.log('Completion requirements data:', data); // Debug logging
+
+    if (data.already_completed) {
+      // Already completed, no need to show requirements
+      return;
+    }
+
+    // Validate required data fields
+    if (typeof data.hours_met === 'undefined') {
+      console.error('Invalid completion requirements data:', data);
+      return;
+    }
+
+    // Update completion button based on requirements
+    const markCompletedBtn = document.getElementById('markCompletedBtn');
+    if (data.can_complete) {
+      markCompletedBtn.textContent = 'Mark as Completed';
+      markCompletedBtn.disabled = false;
+      markCompletedBtn.style.opacity = '1';
+    } else {
+      markCompletedBtn.textContent = 'Requirements Not Met';
+      markCompletedBtn.disabled = true;
+      markCompletedBtn.style.opacity = '0.6';
+    }
+
+    // Show requirements status
+    const completionContent = document.querySelector('.game-info-completion-content');
+    console.log('Completion content element:', completionContent); // Debug logging
+    if (!completionContent) {
+      console.error('Could not find .game-info-completion-content element');
+      return;
+    }
+    let requirementsHtml = '';
+
+    // Add the main requirement message
+    requirementsHtml += `<div class="requirement-message">
+      <i class="fas fa-info-circle"></i>
+      <span>3 logged hours required to rate or mark as complete</span>
+    </div>`;
+
+    // Show rating status (informational only)
+    if (data.has_rating) {
+      const ratingValue = data.rating_value || 0;
+      requirementsHtml += `<div class="requirement-item requirement-info">
+        <i class="fas fa-star"></i>
+        <span>Rated: ${ratingValue} stars</span>
+      </div>`;
+    }
+
+    // Add requirements display
+    const requirementsDiv = document.createElement('div');
+    requirementsDiv.className = 'completion-requirements';
+    requirementsDiv.innerHTML = requirementsHtml;
+    console.log('Generated requirements HTML:', requirementsHtml); // Debug logging
+    console.log('Requirements div element:', requirementsDiv); // Debug logging
+    completionContent.appendChild(requirementsDiv);
+  }
+
   function renderStarWidget(userRating) {
     const starRating = document.getElementById('starRating');
     starRating.innerHTML = '';
@@ -970,10 +902,23 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   }
   
-  function renderReviews(reviews) {
+  // Reviews come a page at a time; pass a page's next_cursor to get the one after it
+  function fetchReviews(cursor) {
+    const params = new URLSearchParams({ name: gameName });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    return fetch(`/api/game/reviews?${params}`).then(r => r.json());
+  }
+
+  function renderReviews(reviews, nextCursor, append = false) {
     const reviewsList = document.getElementById('reviewsList');
     console.log('Rendering reviews:', reviews); // Debug logging
-    if (!reviews.length) {
+    const previousLoadMore = reviewsList.querySelector('.load-more-reviews');
+    if (previousLoadMore) {
+      previousLoadMore.remove();
+    }
+    if (!reviews.length && !append) {
       reviewsList.innerHTML = '<div style="text-align: center; color: #6272a4; padding: 2rem;">No reviews yet. Be the first to share your thoughts!</div>';
       return;
     }
@@ -982,7 +927,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const currentUserId = document.cookie.split('; ').find(row => row.startsWith('user_id='))?.split('=')[1];
     console.log('Current user ID from cookie:', currentUserId); // Debug logging
     
-    reviewsList.innerHTML = reviews.map(r => {
+    const reviewsHtml = reviews.map(r => {
       // Generate star rating HTML
       const ratingStars = r.rating ? generateStarRatingHTML(r.rating) : '';
       
@@ -1025,6 +970,35 @@ document.addEventListener('DOMContentLoaded', function() {
         </div>
       `;
     }).join('');
+    if (append) {
+      reviewsList.insertAdjacentHTML('beforeend', reviewsHtml);
+    } else {
+      reviewsList.innerHTML = reviewsHtml;
+    }
+
+    if (nextCursor) {
+      const loadMore = document.createElement('button');
+      loadMore.className = 'load-more-reviews';
+      loadMore.textContent = 'Load more reviews';
+      loadMore.onclick = function() {
+        loadMore.textContent = 'Loading...';
+        loadMore.disabled = true;
+        fetchReviews(nextCursor)
+          .then(page => {
+            if (page.error) {
+              throw new Error(page.error);
+            }
+            renderReviews(page.reviews, page.next_cursor, true);
+          })
+          .catch(error => {
+            console.error('Error loading more reviews:', error);
+            showMessage('Failed to load more reviews. Please try again.', 'error');
+            loadMore.textContent = 'Load more reviews';
+            loadMore.disabled = false;
+          });
+      };
+      reviewsList.appendChild(loadMore);
+    }
   }
   
   function generateStarRatingHTML(rating) {
@@ -1061,11 +1035,7 @@ document.addEventListener('DOMContentLoaded', function() {
           showMessage('Review deleted successfully!', 'success');
           
           // Refresh reviews
-          fetch(`/api/game/reviews?name=${encodeURIComponent(gameName)}`)
-            .then(r => r.json())
-            .then(reviews => {
-              renderReviews(reviews);
-            });
+          fetchReviews().then(page => renderReviews(page.reviews, page.next_cursor));
         }
       })
       .catch(error => {
@@ -1075,6 +1045,9 @@ document.addEventListener('DOMContentLoaded', function() {
     }
   }
 
+  // Gallery cells are at most ~400px wide; the browser picks the variant from srcset
+  const SCREENSHOT_SIZES = '(max-width: 600px) 100vw, 400px';
+
   function renderScreenshots(screens) {
     const gallery = document.getElementById('screenshotsGallery');
     if (!screens.length) {
@@ -1085,7 +1058,10 @@ document.addEventListener('DOMContentLoaded', function() {
       const hasCaption = s.caption && s.caption.trim() !== '';
       return `
         <div class="screenshot-item" onclick="openScreenshotModal('${s.image_url}', '${s.caption || ''}', '${s.username}', '${s.avatar_url}')">
-          <img src="${s.image_url}" alt="Screenshot by ${s.username}" loading="lazy" style="height: ${hasCaption ? '200px' : '280px'};">
+          <picture>
+            ${s.srcset ? `<source type="image/webp" srcset="${s.srcset}" sizes="${SCREENSHOT_SIZES}">` : ''}
+            <img src="${s.thumbnail_url || s.image_url}" ${s.srcset_jpeg ? `srcset="${s.srcset_jpeg}" sizes="${SCREENSHOT_SIZES}"` : ''} alt="Screenshot by ${s.username}" loading="lazy" decoding="async" style="height: ${hasCaption ? '200px' : '280px'};">
+          </picture>
           ${hasCaption ? `<div class="screenshot-caption">${s.caption}</div>` : ''}
           <div class="screenshot-user">
             <img class="avatar-sm" src="${s.avatar_url}" alt="${s.username}">
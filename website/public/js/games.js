@@ -15,8 +15,8 @@ async function fetchGames() {
         localStorage.removeItem('popular_monthly');
         localStorage.removeItem('popular_alltime');
         
-        // Force a fresh fetch by adding a timestamp
-        const response = await fetch(`/api/all-games?t=${Date.now()}`);
+        // The server answers 304 while the browser's copy is current (ETag)
+        const response = await fetch('/api/all-games');
         console.log('Response status:', response.status);
         const data = await response.json();
         console.log('Response data:', data);
@@ -1,59 +1,15 @@
 // Home Page JavaScript
 
 document.addEventListener('DOMContentLoaded', function() {
-  // Check authentication status
-  fetch('/api/user')
-    .then(response => {
-      if (response.ok) {
-        return response.json();
-      }
-      throw new Error('Not authenticated');
-    })
-    .then(user => {
-      const authContainer = document.getElementById('auth-container');
-      authContainer.innerHTML = `
-        <a href="/pages/user.html?user=${user.id}" class="user-profile">
-          <img src="${user.avatar ? `https://cdn.discordapp.com/avatars/${user.id}/${user.avatar}.png` : 'https://cdn.discordapp.com/embed/avatars/0.png'}" 
-               alt="${user.username}" 
-               class="user-avatar">
-          <span class="user-name">${user.username}</span>
-        </a>
-        <a href="/pages/preferences.html" class="preferences-button" title="Preferences">
-          <i class="fas fa-cog"></i>
-        </a>
-        <a href="/logout" class="logout-button" title="Logout">
-          <i class="fas fa-sign-out-alt"></i>
-        </a>
-      `;
-    })
-    .catch(() => {
-      // User is not authenticated, keep the login button
-      const authContainer = document.getElementById('auth-container');
-      authContainer.innerHTML = `
-        <a href="/login" class="auth-button login-button">
-          <i class="fab fa-discord"></i>
-          Login with Discord
-        </a>
-      `;
-    });
-
-  // Champions functions (defined first for immediate use)
-  async function fetchCurrentChampions() {
-    try {
-      const response = await fetch('/api/current-champions');
-      if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-      const champions = await response.json();
-      renderCurrentChampions(champions);
-    } catch (error) {
-      console.error('Error fetching current champions:', error);
-      const weeklyContainer = document.getElementById('weekly-champions');
-      const monthlyContainer = document.getElementById('monthly-champions');
-      if (weeklyContainer) {
-        weeklyContainer.innerHTML = '<div class="loading-spinner"><i class="fas fa-spinner fa-spin"></i> Error loading champions</div>';
-      }
-      if (monthlyContainer) {
-        monthlyContainer.innerHTML = '<div class="loading-spinner"><i class="fas fa-spinner fa-spin"></i> Error loading champions</div>';
-      }
+  // Champions functions
+  function renderChampionsError() {
+    const weeklyContainer = document.getElementById('weekly-champions');
+    const monthlyContainer = document.getElementById('monthly-champions');
+    if (weeklyContainer) {
+      weeklyContainer.innerHTML = '<div class="loading-spinner"><i class="fas fa-spinner fa-spin"></i> Error loading champions</div>';
+    }
+    if (monthlyContainer) {
+      monthlyContainer.innerHTML = '<div class="loading-spinner"><i class="fas fa-spinner fa-spin"></i> Error loading champions</div>';
     }
   }
 
@@ -121,9 +77,6 @@ document.addEventListener('DOMContentLoaded', function() {
      return number.toLocaleString();
   }
 
-  // Fetch current champions FIRST (highest priority)
-  fetchCurrentChampions();
-
   // Existing tab switching logic
   const tabContainers = document.querySelectorAll('.leaderboard-tabs, .popular-tabs');
 
@@ -139,8 +92,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
               // Determine which section this tab belongs to and fetch data accordingly
               if (parentSection.classList.contains('leaderboard')) {
-                  // Leaderboard tabs
-                  const timeframe = tabId; // Tab ID is the timeframe directly (weekly, monthly, alltime)
+                  // Leaderboard tabs (tab ID is the timeframe: weekly, monthly, alltime)
                    // Deactivate all buttons in this container
                   container.querySelectorAll('.tab-btn').forEach(btn => {
                       btn.classList.remove('active');
@@ -154,13 +106,8 @@ document.addEventListener('DOMContentLoaded', function() {
                    });
                    document.getElementById(tabId).style.display = 'block';
 
-                   fetchLeaderboardData(timeframe); // Fetch data on click
-
               } else if (parentSection.classList.contains('most-popular')) {
                   // Most Popular tabs
-                  // Extract timeframe from tab ID (e.g., 'popular-weekly' -> 'weekly')
-                  const timeframe = tabId.replace('popular-', '');
-
                    // Deactivate all buttons in this container
                   container.querySelectorAll('.tab-btn').forEach(btn => {
                       btn.classList.remove('active');
@@ -173,8 +120,6 @@ document.addEventListener('DOMContentLoaded', function() {
                        content.style.display = 'none';
                    });
                    document.getElementById(tabId).style.display = 'block';
-
-                   fetchPopularGames(timeframe); // Fetch data on click
               }
           });
       });
@@ -192,23 +137,6 @@ document.addEventListener('DOMContentLoaded', function() {
       }
   });
 
-  // Delay other API calls to ensure champions load first
-  setTimeout(() => {
-    document.querySelectorAll('.tab-btn.active').forEach(activeButton => {
-        const tabId = activeButton.getAttribute('data-tab');
-        // Trigger initial fetch for the active tabs
-        if (activeButton.closest('.leaderboard-tabs')) {
-            fetchLeaderboardData(tabId);
-        } else if (activeButton.closest('.popular-tabs')) {
-            // Extract timeframe from popular tab ID (e.g., 'popular-weekly' -> 'weekly')
-            const timeframe = tabId.replace('popular-', '');
-            fetchPopularGames(timeframe);
-        }
-    });
-  }, 100); // Small delay to ensure champions load first
-
-  // Function to fetch and display leaderboard data for a specific timeframe
-
   // Function to show loading state
   function setLoadingState(element, isLoading) {
     if (isLoading) {
@@ -228,179 +156,161 @@ document.addEventListener('DOMContentLoaded', function() {
     return placeholders;
   }
 
-  function fetchPopularGames(timeframe) {
+  function renderPopularGames(timeframe, data) {
     const popularList = document.querySelector(`#popular-${timeframe} ol`);
     if (!popularList) return;
-
-    // Try to show cached data instantly
-    const cacheKey = `popular_${timeframe}`;
-    const cached = localStorage.getItem(cacheKey);
-    if (cached) {
-      try {
-        const data = JSON.parse(cached);
-        popularList.innerHTML = '';
-        if (data && data.length > 0) {
-          data.forEach((game, index) => {
-            const listItem = document.createElement('li');
-            
-            let mediaElement;
-            if (game.box_art_url && game.box_art_url.endsWith('.webm')) {
-                mediaElement = document.createElement('video');
-                mediaElement.src = game.box_art_url;
-                mediaElement.autoplay = true;
-                mediaElement.loop = true;
-                mediaElement.muted = true;
-                mediaElement.playsInline = true;
-            } else {
-                mediaElement = document.createElement('img');
-                mediaElement.src = game.box_art_url || 'https://static-cdn.jtvnw.net/ttv-boxart/loading_boxart.png';
-                mediaElement.onerror = function() {
-                    this.src = 'https://static-cdn.jtvnw.net/ttv-boxart/loading_boxart.png';
-                };
-            }
-            mediaElement.className = 'game-cover-sm';
-            mediaElement.alt = game.name;
-
-            listItem.innerHTML = `
-              <span class="rank">${index + 1}</span>
-              <div class="popular-game-row">
-                <a class="game-link" href="/pages/game.html?game=${encodeURIComponent(game.name)}">${game.name}</a>
-                <span class="hours">${formatNumberWithCommas(game.total_hours || 0)} hrs</span>
-              </div>
-            `;
-            
-            listItem.insertBefore(mediaElement, listItem.firstChild);
-            popularList.appendChild(listItem);
-          });
+    popularList.innerHTML = '';
+    if (data && data.length > 0) {
+      data.forEach((game, index) => {
+        const listItem = document.createElement('li');
+        
+        let mediaElement;
+        if (game.box_art_url && game.box_art_url.endsWith('.webm')) {
+            mediaElement = document.createElement('video');
+            mediaElement.src = game.box_art_url;
+            mediaElement.autoplay = true;
+            mediaElement.loop = true;
+            mediaElement.muted = true;
+            mediaElement.playsInline = true;
         } else {
-          popularList.innerHTML = '<li>No game data available.</li>';
+            mediaElement = document.createElement('img');
+            mediaElement.src = game.box_art_url || 'https://static-cdn.jtvnw.net/ttv-boxart/loading_boxart.png';
+            mediaElement.onerror = function() {
+                this.src = 'https://static-cdn.jtvnw.net/ttv-boxart/loading_boxart.png';
+            };
         }
-      } catch (e) {}
+        mediaElement.className = 'game-cover-sm';
+        mediaElement.alt = game.name;
+
+        listItem.innerHTML = `
+          <span class="rank">${index + 1}</span>
+          <div class="popular-game-row">
+            <a class="game-link" href="/pages/game.html?game=${encodeURIComponent(game.name)}">${game.name}</a>
+            <span class="hours">${formatNumberWithCommas(game.total_hours || 0)} hrs</span>
+          </div>
+        `;
+        
+        listItem.insertBefore(mediaElement, listItem.firstChild);
+        popularList.appendChild(listItem);
+      });
     } else {
-      // Show loading state if no cache
-      popularList.innerHTML = '';
-      const loadingPlaceholders = createLoadingPlaceholders(5);
-      loadingPlaceholders.forEach(placeholder => popularList.appendChild(placeholder));
+      popularList.innerHTML = '<li>No game data available.</li>';
     }
-
-    // Always fetch fresh data in the background
-    fetch(`/api/popular-games?timeframe=${timeframe}`)
-      .then(response => response.json())
-      .then(data => {
-        popularList.innerHTML = '';
-        if (data && data.length > 0) {
-          data.forEach((game, index) => {
-            const listItem = document.createElement('li');
-            
-            let mediaElement;
-            if (game.box_art_url && game.box_art_url.endsWith('.webm')) {
-                mediaElement = document.createElement('video');
-                mediaElement.src = game.box_art_url;
-                mediaElement.autoplay = true;
-                mediaElement.loop = true;
-                mediaElement.muted = true;
-                mediaElement.playsInline = true;
-            } else {
-                mediaElement = document.createElement('img');
-                mediaElement.src = game.box_art_url || 'https://static-cdn.jtvnw.net/ttv-boxart/loading_boxart.png';
-                mediaElement.onerror = function() {
-                    this.src = 'https://static-cdn.jtvnw.net/ttv-boxart/loading_boxart.png';
-                };
-            }
-            mediaElement.className = 'game-cover-sm';
-            mediaElement.alt = game.name;
-
-            listItem.innerHTML = `
-              <span class="rank">${index + 1}</span>
-              <div class="popular-game-row">
-                <a class="game-link" href="/pages/game.html?game=${encodeURIComponent(game.name)}">${game.name}</a>
-                <span class="hours">${formatNumberWithCommas(game.total_hours || 0)} hrs</span>
-              </div>
-            `;
-            
-            listItem.insertBefore(mediaElement, listItem.firstChild);
-            popularList.appendChild(listItem);
-          });
-          localStorage.setItem(cacheKey, JSON.stringify(data));
-        } else {
-          popularList.innerHTML = '<li>No game data available.</li>';
-          localStorage.removeItem(cacheKey);
-        }
-      })
-      .catch(error => {
-        console.error(`Error fetching ${timeframe} popular games data:`, error);
-        popularList.innerHTML = '<li>Error loading game data.</li>';
-      });
   }
 
-  function fetchLeaderboardData(timeframe) {
+  // Render a page of a leaderboard (replacing the list, or appended to it), with a "Show more" button
+  // that fetches the next page while there is one
+  function renderLeaderboard(timeframe, data, nextCursor = null, append = false) {
     const leaderboardList = document.querySelector(`#${timeframe} ol`);
     if (!leaderboardList) return;
+    if (!append) leaderboardList.innerHTML = '';
+    const oldButton = leaderboardList.querySelector('.load-more-leaderboard');
+    if (oldButton) oldButton.parentElement.remove();
+    if (data && data.length > 0) {
+      const offset = leaderboardList.children.length;
+      data.forEach((player, index) => {
+        const listItem = document.createElement('li');
+        listItem.innerHTML = `
+          <span class="rank">${player.rank || offset + index + 1}</span>
+          <img class="avatar" src="${player.avatar_url || 'https://www.gravatar.com/avatar/?d=mp&s=50'}" alt="${player.username}">
+          <a class="user-link" href="/pages/user.html?user=${player.user_id}">${player.username}</a>
+          <span class="score">${formatNumberWithCommas(player.total_credits || 0)} cred</span>
+        `;
+        leaderboardList.appendChild(listItem);
+      });
+    } else if (!append) {
+      leaderboardList.innerHTML = '<li>No leaderboard data available.</li>';
+    }
+
+    if (nextCursor) {
+      const buttonItem = document.createElement('li');
+      buttonItem.className = 'load-more-item';
+      buttonItem.innerHTML = '<button class="load-more-leaderboard">Show more</button>';
+      const button = buttonItem.querySelector('button');
+      button.addEventListener('click', () => {
+        button.disabled = true;
+        button.textContent = 'Loading...';
+        fetch(`/api/leaderboard?timeframe=${timeframe}&cursor=${encodeURIComponent(nextCursor)}`)
+          .then(response => {
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+            return response.json();
+          })
+          .then(page => renderLeaderboard(timeframe, page.entries, page.next_cursor, true))
+          .catch(error => {
+            console.error('Error fetching leaderboard page:', error);
+            button.disabled = false;
+            button.textContent = 'Show more';
+          });
+      });
+      leaderboardList.appendChild(buttonItem);
+    }
+  }
 
-    // Try to show cached data instantly
-    const cacheKey = `leaderboard_${timeframe}`;
+  // Show the last snapshot's lists instantly (or loading placeholders) while the fresh one loads
+  function showCachedList(cacheKey, selector, render) {
     const cached = localStorage.getItem(cacheKey);
     if (cached) {
       try {
-        const data = JSON.parse(cached);
-        leaderboardList.innerHTML = '';
-        if (data && data.length > 0) {
-          data.forEach((player, index) => {
-            const listItem = document.createElement('li');
-            listItem.innerHTML = `
-              <span class="rank">${index + 1}</span>
-              <img class="avatar" src="${player.avatar_url || 'https://www.gravatar.com/avatar/?d=mp&s=50'}" alt="${player.username}">
-              <a class="user-link" href="/pages/user.html?user=${player.user_id}">${player.username}</a>
-              <span class="score">${formatNumberWithCommas(player.total_credits || 0)} cred</span>
-            `;
-            leaderboardList.appendChild(listItem);
-          });
-        } else {
-          leaderboardList.innerHTML = '<li>No leaderboard data available.</li>';
-        }
+        render(JSON.parse(cached));
+        return;
       } catch (e) {}
-    } else {
-      // Show loading state if no cache
-      leaderboardList.innerHTML = '';
-      const loadingPlaceholders = createLoadingPlaceholders(5);
-      loadingPlaceholders.forEach(placeholder => leaderboardList.appendChild(placeholder));
     }
+    const list = document.querySelector(selector);
+    if (!list) return;
+    list.innerHTML = '';
+    createLoadingPlaceholders(5).forEach(placeholder => list.appendChild(placeholder));
+  }
 
-    // Always fetch fresh data in the background
-    fetch(`/api/leaderboard?timeframe=${timeframe}`)
-      .then(response => response.json())
-      .then(data => {
-        leaderboardList.innerHTML = '';
-        if (data && data.length > 0) {
-          data.forEach((player, index) => {
-            const listItem = document.createElement('li');
-            listItem.innerHTML = `
-              <span class="rank">${index + 1}</span>
-              <img class="avatar" src="${player.avatar_url || 'https://www.gravatar.com/avatar/?d=mp&s=50'}" alt="${player.username}">
-              <a class="user-link" href="/pages/user.html?user=${player.user_id}">${player.username}</a>
-              <span class="score">${formatNumberWithCommas(player.total_credits || 0)} cred</span>
-            `;
-            leaderboardList.appendChild(listItem);
-          });
-          localStorage.setItem(cacheKey, JSON.stringify(data));
+  const TIMEFRAMES = ['weekly', 'monthly', 'alltime'];
+  TIMEFRAMES.forEach(timeframe => {
+    showCachedList(`leaderboard_${timeframe}`, `#${timeframe} ol`, data => renderLeaderboard(timeframe, data));
+    showCachedList(`popular_${timeframe}`, `#popular-${timeframe} ol`, data => renderPopularGames(timeframe, data));
+  });
+
+  // Every public section of the page comes from one snapshot request
+  fetch('/api/home')
+    .then(response => {
+      if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+      return response.json();
+    })
+    .then(home => {
+      renderCurrentChampions(home.current_champions);
+      TIMEFRAMES.forEach(timeframe => {
+        const leaderboard = home.leaderboard[timeframe];
+        renderLeaderboard(timeframe, leaderboard, (home.leaderboard_next_cursor || {})[timeframe]);
+        if (leaderboard && leaderboard.length > 0) {
+          localStorage.setItem(`leaderboard_${timeframe}`, JSON.stringify(leaderboard));
         } else {
-          leaderboardList.innerHTML = '<li>No leaderboard data available.</li>';
-          localStorage.removeItem(cacheKey);
+          localStorage.removeItem(`leaderboard_${timeframe}`);
         }
-      })
-      .catch(error => {
-        console.error(`Error fetching ${timeframe} leaderboard data:`, error);
-        leaderboardList.innerHTML = '<li>Error loading leaderboard data.</li>';
-      });
-  }
 
-  // Fetch data for all timeframes on page load
-  fetchLeaderboardData('weekly');
-  fetchLeaderboardData('monthly');
-  fetchLeaderboardData('alltime');
-  fetchPopularGames('weekly');
-  fetchPopularGames('monthly');
-  fetchPopularGames('alltime');
+        const popular = home.popular_games[timeframe];
+        renderPopularGames(timeframe, popular);
+        if (popular && popular.length > 0) {
+          localStorage.setItem(`popular_${timeframe}`, JSON.stringify(popular));
+        } else {
+          localStorage.removeItem(`popular_${timeframe}`);
+        }
+      });
+      renderRecentActivity(home.recent_activity);
+      localStorage.setItem('recent_activity', JSON.stringify(home.recent_activity));
+      renderBonuses(home.recent_bonuses);
+      localStorage.setItem('recent_bonuses', JSON.stringify(home.recent_bonuses));
+    })
+    .catch(error => {
+      console.error('Error fetching home page data:', error);
+      renderChampionsError();
+      TIMEFRAMES.forEach(timeframe => {
+        const leaderboardList = document.querySelector(`#${timeframe} ol`);
+        if (leaderboardList) leaderboardList.innerHTML = '<li>Error loading leaderboard data.</li>';
+        const popularList = document.querySelector(`#popular-${timeframe} ol`);
+        if (popularList) popularList.innerHTML = '<li>Error loading game data.</li>';
+      });
+      const activityCarousel = document.querySelector('.activity-carousel');
+      if (activityCarousel) {
+        activityCarousel.innerHTML = '<div class="loading-spinner"><i class="fas fa-spinner fa-spin"></i> Error loading activity</div>';
+      }
+    });
 
   // Setup champions tabs
   const championsTabs = document.querySelectorAll('.champions-tabs .tab-btn');
@@ -444,48 +354,33 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 // --- Recent Activity with localStorage cache ---
-async function fetchRecentActivity() {
+// Shows the last snapshot's activity (or loading cards) until the /api/home response arrives
+function showCachedRecentActivity() {
   const activityCarousel = document.querySelector('.activity-carousel');
   if (!activityCarousel) return;
 
-  // Try to show cached data instantly
-  const cacheKey = 'recent_activity';
-  const cached = localStorage.getItem(cacheKey);
+  const cached = localStorage.getItem('recent_activity');
   if (cached) {
     try {
-      const recentActivity = JSON.parse(cached);
-      renderRecentActivity(recentActivity);
+      renderRecentActivity(JSON.parse(cached));
+      return;
     } catch (e) {}
-  } else {
-    // Show loading state if no cache
-    activityCarousel.innerHTML = '';
-    for (let i = 0; i < 5; i++) {
-      const loadingCard = document.createElement('div');
-      loadingCard.className = 'activity-card-wrap';
-      loadingCard.innerHTML = `
-        <div class="activity-card loading">
-          <div class="activity-overlay loading">
-            <div class="activity-userblock">
-              <span class="activity-sessions">Loading...</span>
-              <span class="activity-time">Loading...</span>
-            </div>
+  }
+  activityCarousel.innerHTML = '';
+  for (let i = 0; i < 5; i++) {
+    const loadingCard = document.createElement('div');
+    loadingCard.className = 'activity-card-wrap';
+    loadingCard.innerHTML = `
+      <div class="activity-card loading">
+        <div class="activity-overlay loading">
+          <div class="activity-userblock">
+            <span class="activity-sessions">Loading...</span>
+            <span class="activity-time">Loading...</span>
           </div>
         </div>
-      `;
-      activityCarousel.appendChild(loadingCard);
-    }
-  }
-
-  // Always fetch fresh data in the background
-  try {
-    const response = await fetch('/api/recent-activity');
-    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-    const recentActivity = await response.json();
-    renderRecentActivity(recentActivity);
-    localStorage.setItem(cacheKey, JSON.stringify(recentActivity));
-  } catch (error) {
-    console.error('Error fetching recent activity:', error);
-    activityCarousel.innerHTML = '<div class="loading-spinner"><i class="fas fa-spinner fa-spin"></i> Error loading activity</div>';
+      </div>
+    `;
+    activityCarousel.appendChild(loadingCard);
   }
 }
 
@@ -643,7 +538,6 @@ function setupActivityCarousel() {
   });
 }
 
-// On page load, show alltime activity by default - delayed to ensure champions load first
-setTimeout(() => {
-  fetchRecentActivity().then(() => setupActivityCarousel());
-}, 200); // Delay to ensure champions load first 
\ No newline at end of file
+// On page load, show the cached activity; the home snapshot replaces it
+showCachedRecentActivity();
+setupActivityCarousel();
@@ -1,4 +1,34 @@
 // console.log('Script loaded');
+// Render the recent bonuses list (also used by home.js)
+function renderBonuses(bonuses) {
+  const bonusesSection = document.querySelector('.bonuses');
+  if (!bonusesSection) return;
+  
+  const spinner = bonusesSection.querySelector('.loading-spinner');
+  if (spinner) spinner.remove();
+  
+  // Clear previous bonuses list to prevent duplicates
+  const oldUl = bonusesSection.querySelector('ul');
+  if (oldUl) oldUl.remove();
+  
+  const ul = document.createElement('ul');
+  if (!bonuses || bonuses.length === 0) {
+    ul.innerHTML = '<li>No recent bonuses</li>';
+  } else {
+    bonuses.forEach(bonus => {
+      const li = document.createElement('li');
+      li.innerHTML = `
+        <img class="avatar-sm" src="${bonus.avatar_url || `https://cdn.discordapp.com/embed/avatars/${parseInt(bonus.user_id.slice(-1)) % 6}.png`}" alt="${bonus.username}">
+        <a class="user-link" href="/pages/user.html?user=${String(bonus.user_id)}">${bonus.username}</a> earned 
+        <span class="bonus-credits">${bonus.credits.toLocaleString()} cred</span>
+        <span class="bonus"><i class="fas fa-bolt"></i> "${bonus.reason}"</span>
+      `;
+      ul.appendChild(li);
+    });
+  }
+  bonusesSection.appendChild(ul);
+}
+
 document.addEventListener('DOMContentLoaded', function() {
   const params = new URLSearchParams(window.location.search);
   if (params.get('just_logged_in')) {
@@ -49,7 +79,10 @@ document.addEventListener('DOMContentLoaded', function() {
         renderBonuses(bonuses);
       } catch (e) {}
     }
-
+  }
+  // The home page gets fresh bonuses from its /api/home snapshot (home.js)
+  if (bonusesSection && bonusesSection.dataset.source !== 'home') {
+    const cacheKey = 'recent_bonuses';
     // Always fetch fresh data in the background
     fetch('/api/recent-bonuses')
       .then(res => res.json())
@@ -66,35 +99,6 @@ document.addEventListener('DOMContentLoaded', function() {
       });
   }
 
-  function renderBonuses(bonuses) {
-    const bonusesSection = document.querySelector('.bonuses');
-    if (!bonusesSection) return;
-    
-    const spinner = bonusesSection.querySelector('.loading-spinner');
-    if (spinner) spinner.remove();
-    
-    // Clear previous bonuses list to prevent duplicates
-    const oldUl = bonusesSection.querySelector('ul');
-    if (oldUl) oldUl.remove();
-    
-    const ul = document.createElement('ul');
-    if (!bonuses || bonuses.length === 0) {
-      ul.innerHTML = '<li>No recent bonuses</li>';
-    } else {
-      bonuses.forEach(bonus => {
-        const li = document.createElement('li');
-        li.innerHTML = `
-          <img class="avatar-sm" src="${bonus.avatar_url || `https://cdn.discordapp.com/embed/avatars/${parseInt(bonus.user_id.slice(-1)) % 6}.png`}" alt="${bonus.username}">
-          <a class="user-link" href="/pages/user.html?user=${String(bonus.user_id)}">${bonus.username}</a> earned 
-          <span class="bonus-credits">${bonus.credits.toLocaleString()} cred</span>
-          <span class="bonus"><i class="fas fa-bolt"></i> "${bonus.reason}"</span>
-        `;
-        ul.appendChild(li);
-      });
-    }
-    bonusesSection.appendChild(ul);
-  }
-
   // Discord login button mockup
   const loginBtn = document.querySelector('.discord-login');
   if (loginBtn) {
@@ -1543,6 +1547,15 @@ document.addEventListener('DOMContentLoaded', function() {
   }
 }); 
 
+// Uploaded background images are served resized: ask for one that fits the screen
+function sizedBackgroundUrl(url) {
+  if (!url || !url.startsWith('/api/preferences/background/') || !url.includes('/image')) {
+    return url;
+  }
+  const width = Math.round(Math.max(window.screen.width, window.innerWidth) * (window.devicePixelRatio || 1));
+  return url + (url.includes('?') ? '&' : '?') + `w=${width}`;
+}
+
 // THEME PREFERENCE LOGIC
 (function() {
   // Helper: set theme
@@ -1604,7 +1617,7 @@ document.addEventListener('DOMContentLoaded', function() {
           existingVideo.remove();
         }
         // Apply image background
-        document.body.style.backgroundImage = `url(${url})`;
+        document.body.style.backgroundImage = `url(${sizedBackgroundUrl(url)})`;
         document.body.style.backgroundSize = 'cover';
         document.body.style.backgroundPosition = 'center';
         document.body.style.backgroundAttachment = 'fixed';
@@ -1654,17 +1667,17 @@ document.addEventListener('DOMContentLoaded', function() {
           
           // Determine background URL (handle both database-stored and external URLs)
           if (bgType === 'image') {
-            if (data.background_image_data) {
-              // File stored in database
-              bgUrl = `/api/preferences/background/${data.user_id}/image?t=${Date.now()}`;
+            if (data.background_image_file_url) {
+              // Uploaded file
+              bgUrl = data.background_image_file_url;
             } else {
               // External URL
               bgUrl = data.background_image_url;
             }
           } else if (bgType === 'video') {
-            if (data.background_video_data) {
-              // File stored in database
-              bgUrl = `/api/preferences/background/${data.user_id}/video?t=${Date.now()}`;
+            if (data.background_video_file_url) {
+              // Uploaded file
+              bgUrl = data.background_video_file_url;
             } else {
               // External URL
               bgUrl = data.background_video_url;